@@ -17,6 +17,9 @@ from scripts.commandlogger import CommandLogger
 from scripts.constants import RED, GREEN, BLUE, RESET, YELLOW, EMBED_COLOR_ERROR
 from scripts.musicbot import MusicBot
 from scripts.process_queue import process_queue
+from scripts.queue_journal import queue_journal
+from scripts.kvstore import state_store
+from scripts.log_writer import log_writer
 from scripts.clear_queue import clear_queue
 from scripts.config import load_config
 from scripts.logging import setup_logging
@@ -28,14 +31,18 @@ from scripts.ffmpeg import get_ffmpeg_path
 from scripts.js_runtime import get_js_runtime_config
 from scripts.cleardownloads import clear_downloads_folder
 from scripts.caching import playlist_cache
+from scripts.transcode import ingest_transcoder
 from scripts.load_commands import load_commands
 from scripts.load_scripts import load_scripts
 from scripts.activity import update_activity
+from scripts.aliases import alias_table
 from scripts.priority import set_high_priority
 from scripts.paths import get_downloads_dir, get_root_dir
 from scripts.server_prefixes import get_prefix, init_server_prefixes_sync
 from scripts.setup import run_setup
 from scripts.connection_handler import patch_discord_client
+from scripts.startup_timing import startup_timer
+from scripts.track import bind_client
 
 # Apply the connection handler patch to improve DNS resolution handling
 patch_discord_client()
@@ -81,8 +88,9 @@ SHOW_PROGRESS_BAR = config_vars['SHOW_PROGRESS_BAR']  # Whether to show download
 setup_logging(LOG_LEVEL)
 
 # Get paths to external tools
-YTDLP_PATH = get_ytdlp_path()  # Path to yt-dlp executable
-FFMPEG_PATH = get_ffmpeg_path()  # Path to ffmpeg executable
+with startup_timer.phase('ffmpeg check'):
+    YTDLP_PATH = get_ytdlp_path()  # Path to yt-dlp executable
+    FFMPEG_PATH = get_ffmpeg_path()  # Path to ffmpeg executable
 
 # Set up directories
 ROOT_DIR = Path(get_root_dir())  # Root directory of the bot
@@ -110,9 +118,27 @@ bot = commands.Bot(
     chunk_guilds_at_startup=False  # Don't download full member lists on startup (faster)
 )
 
+# Queued Tracks look their context up again through the bot
+bind_client(bot)
+
 # Initialize command logger
 command_logger = CommandLogger()
 
+@bot.event
+async def on_message(message):
+    """
+    Dispatch commands, resolving server aliases.
+
+    Same as discord.py's default handler, except that a context whose
+    invoked name isn't a command is checked against the server's aliases
+    before it is invoked.
+    """
+    if message.author.bot:
+        return
+    ctx = await bot.get_context(message)
+    alias_table.resolve(ctx)
+    await bot.invoke(ctx)
+
 @bot.event
 async def on_command(ctx):
     """Log commands when they are used"""
@@ -181,6 +207,7 @@ async def on_ready():
     
     # Mark that we've completed the first ready event
     first_ready = False
+    startup_timer.record('Discord login', startup_timer.elapsed() - login_started)
     
     clear_downloads_folder()
     set_high_priority()
@@ -188,6 +215,9 @@ async def on_ready():
     # Import uncached files in background (don't block startup)
     asyncio.create_task(playlist_cache.ensure_cache_imported())
     
+    # Measure loudness of cached files that haven't been analyzed yet, and bake large gains into Opus files
+    asyncio.create_task(ingest_transcoder.scan_cache())
+    
     prefix = config_vars.get('PREFIX', '!')  # Get prefix from config
     
     # Setup a MusicBot instance for initialization
@@ -209,7 +239,8 @@ async def on_ready():
         pass
     
     print(f"{GREEN}YT-DLP version: {BLUE}{yt_dlp.version.__version__}{RESET}")
-    get_js_runtime_config(verbose=True)
+    with startup_timer.phase('JavaScript runtime check'):
+        get_js_runtime_config(verbose=True)
     print(f"----------------------------------------")
     
     # Now show the credentials
@@ -311,8 +342,9 @@ async def on_ready():
         asyncio.create_task(_run_tests_and_report())
 
     # Load scripts and commands
-    load_scripts()
-    await load_commands(bot)
+    with startup_timer.phase('command loading'):
+        load_scripts()
+        await load_commands(bot)
     
     # Only start the update_checker if it's not already running
     if not update_checker.is_running():
@@ -324,7 +356,8 @@ async def on_ready():
         setup_instance = MusicBot.get_instance('setup')
         # Ensure the bot_loop is set to the current event loop
         setup_instance.bot_loop = asyncio.get_event_loop()
-        await setup_instance.setup(bot)
+        with startup_timer.phase('MusicBot setup'):
+            await setup_instance.setup(bot)
         
         # Set the bot reference for all existing instances
         for guild_id, instance in MusicBot._instances.items():
@@ -332,6 +365,8 @@ async def on_ready():
             # Ensure each instance has the same event loop
             instance.bot_loop = setup_instance.bot_loop
 
+    startup_timer.report()
+
 bot.remove_command('help')
 
 # Add signal handlers for immediate shutdown
@@ -339,6 +374,11 @@ def signal_handler(sig, frame):
     # Clear the current line to remove the ^C character
     print('\r', end='')
     print(f"{RED}Shutting down...{RESET}")
+    # Write pending queue changes so the queues can be restored on the next start
+    queue_journal.stop()
+    # Commit pending state changes (prefixes, aliases, caches)
+    state_store.close()
+    log_writer.stop()
     # Use os._exit which exits immediately without cleanup
     os._exit(0)
 
@@ -382,4 +422,5 @@ async def on_error(event, *args, **kwargs):
         f.write(f"[{datetime.now()}] Error in {event}:\n{error_message}\n\n")
 
 # Start the bot with the Discord token from environment variables
+login_started = startup_timer.elapsed()
 bot.run(os.getenv('DISCORD_TOKEN'))
\ No newline at end of file
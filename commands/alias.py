@@ -1,6 +1,5 @@
 from discord.ext import commands
-import json
-import os
+from scripts.aliases import alias_table
 from scripts.messages import create_embed
 from scripts.permissions import check_dj_role
 from scripts.config import load_config
@@ -11,6 +10,7 @@ class AliasCog(commands.Cog):
     
     This cog handles the 'alias' command group, which allows users to create,
     remove, and list custom aliases for existing commands on a per-server basis.
+    Aliases are resolved when commands are dispatched (see scripts/aliases.py).
     """
     
     def __init__(self, bot):
@@ -21,32 +21,9 @@ class AliasCog(commands.Cog):
             bot: The bot instance
         """
         self.bot = bot
-        self.aliases_file = 'aliases.json'
-        self.aliases = self.load_aliases()
+        self.aliases = alias_table
         self.config = load_config()
 
-    def load_aliases(self):
-        """
-        Load aliases from the JSON file.
-        
-        Returns:
-            dict: Dictionary containing server-specific aliases
-        """
-        if os.path.exists(self.aliases_file):
-            try:
-                with open(self.aliases_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-        return {}
-
-    def save_aliases(self):
-        """
-        Save aliases to the JSON file.
-        """
-        with open(self.aliases_file, 'w') as f:
-            json.dump(self.aliases, f, indent=4)
-
     def get_server_aliases(self, guild_id):
         """
         Get aliases for a specific server.
@@ -57,10 +34,7 @@ class AliasCog(commands.Cog):
         Returns:
             dict: Dictionary of aliases for the specified server
         """
-        guild_id = str(guild_id)  # Convert to string for JSON compatibility
-        if guild_id not in self.aliases:
-            self.aliases[guild_id] = {}
-        return self.aliases[guild_id]
+        return self.aliases.server_aliases(guild_id)
 
     @commands.group(name='alias', invoke_without_command=True)
     async def alias(self, ctx):
@@ -74,7 +48,7 @@ class AliasCog(commands.Cog):
             ctx: The command context
         """
         if ctx.invoked_subcommand is None:
-            prefix = self.config['PREFIX']
+            prefix = ctx.clean_prefix
             embed = create_embed(
                 'Alias Commands',
                 'Use these commands to manage aliases:\n'
@@ -98,7 +72,7 @@ class AliasCog(commands.Cog):
             command (str): The existing command to create an alias for
             alias (str): The new alias to create
         """
-        prefix = self.config['PREFIX']
+        prefix = ctx.clean_prefix
         if command is None or alias is None:
             embed = create_embed('Error', f'Usage: `{prefix}alias add <command> <alias>`\nExample: `{prefix}alias add play p`', ctx=ctx)
             await ctx.send(embed=embed)
@@ -123,8 +97,7 @@ class AliasCog(commands.Cog):
             return
 
         # Add the alias
-        server_aliases[alias] = command
-        self.save_aliases()
+        self.aliases.add(ctx.guild.id, alias, command)
         
         embed = create_embed('Success', f'Added alias `{alias}` for command `{command}`', ctx=ctx)
         await ctx.send(embed=embed)
@@ -141,22 +114,19 @@ class AliasCog(commands.Cog):
             ctx: The command context
             alias (str): The alias to remove
         """
-        prefix = self.config['PREFIX']
+        prefix = ctx.clean_prefix
         if alias is None:
             embed = create_embed('Error', f'Usage: `{prefix}alias remove <alias>`\nExample: `{prefix}alias remove p`', ctx=ctx)
             await ctx.send(embed=embed)
             return
 
         alias = alias.lower()
-        server_aliases = self.get_server_aliases(ctx.guild.id)
+        command = self.aliases.remove(ctx.guild.id, alias)
         
-        if alias not in server_aliases:
+        if command is None:
             embed = create_embed('Error', f'Alias `{alias}` does not exist.', ctx=ctx)
             await ctx.send(embed=embed)
             return
-
-        command = server_aliases.pop(alias)
-        self.save_aliases()
         
         embed = create_embed('Success', f'Removed alias `{alias}` for command `{command}`', ctx=ctx)
         await ctx.send(embed=embed)
@@ -186,7 +156,7 @@ class AliasCog(commands.Cog):
             command_groups[command].append(alias)
 
         # Format each command group
-        prefix = self.config['PREFIX']
+        prefix = ctx.clean_prefix
         formatted_groups = []
         for command, aliases in sorted(command_groups.items()):
             aliases.sort()  # Sort aliases alphabetically
@@ -215,40 +185,6 @@ class AliasCog(commands.Cog):
             return self.bot.get_command(server_aliases[cmd_name])
         return None
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """
-        Event listener for messages to handle alias resolution.
-        
-        This listener checks if a message starts with the command prefix
-        and contains an alias, and if so, it executes the actual command.
-        
-        Args:
-            message: The message object
-        """
-        prefix = self.config['PREFIX']
-        if not message.content.startswith(prefix):
-            return
-
-        if message.author.bot or not message.guild:
-            return
-
-        # Handle empty prefix case
-        content_after_prefix = message.content[len(prefix):]
-        if not content_after_prefix.strip():  # If there's nothing after the prefix
-            return
-
-        cmd_name = content_after_prefix.split()[0].lower()
-        server_aliases = self.get_server_aliases(message.guild.id)
-        
-        if cmd_name in server_aliases:
-            ctx = await self.bot.get_context(message)
-            actual_command = self.bot.get_command(server_aliases[cmd_name])
-            if actual_command:
-                message.content = f"{prefix}{server_aliases[cmd_name]}{message.content[len(cmd_name)+len(prefix):]}"
-                ctx = await self.bot.get_context(message)
-                await self.bot.invoke(ctx)
-
 async def setup(bot):
     """
     Setup function to add the AliasCog to the bot.
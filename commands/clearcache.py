@@ -1,7 +1,7 @@
 from discord.ext import commands
-import os
 from scripts.messages import create_embed
 from scripts.config import config_vars
+from scripts.caching import playlist_cache
 from scripts.constants import EMBED_COLOR_ERROR, EMBED_COLOR_SUCCESS, EMBED_COLOR_WARNING
 
 class ClearCache(commands.Cog):
@@ -76,15 +76,8 @@ class ClearCache(commands.Cog):
         self.pending_confirmation.remove(ctx.author.id)
 
         try:
-            cache_dir = "./.cache"
-            cache_files = ["blacklist.json", "filecache.json", "spotify_cache.json"]
-            
-            for file in cache_files:
-                file_path = os.path.join(cache_dir, file)
-                if os.path.exists(file_path):
-                    # If it's a JSON file, clear it by writing an empty JSON object
-                    with open(file_path, 'w') as f:
-                        json.dump({}, f)
+            # Clears the blacklist, file cache and Spotify cache in memory and in the state database
+            playlist_cache.clear()
 
             await ctx.send(embed=create_embed(
                 "Cache Cleared",
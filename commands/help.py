@@ -50,6 +50,8 @@ class HelpCog(commands.Cog):
         music_embed.add_field(name=f"{prefix}stop", value="Stop playback, clear the queue, and leave the voice channel.", inline=True)
         music_embed.add_field(name=f"{prefix}skip", value="Skip the current song.", inline=True)
         music_embed.add_field(name=f"{prefix}replay", value="Restart the current song.", inline=True)
+        music_embed.add_field(name=f"{prefix}restore", value="Restore the queue saved before the bot restarted.", inline=True)
+        music_embed.add_field(name=f"{prefix}volume [0-200]", value="Show or set the playback volume.", inline=True)
         music_embed.add_field(name=f"{prefix}queue", value="Show the current song queue.", inline=True)
         music_embed.add_field(name=f"{prefix}clear", value="Clears the queue", inline=True)
         music_embed.add_field(name=f"{prefix}shuffle", value="Shuffle the queue.", inline=True)
@@ -93,7 +95,7 @@ class HelpCog(commands.Cog):
             admin_embed = discord.Embed(title="Help - Admin Commands", description="Owner only commands:", color=EMBED_COLOR_INFO)
             admin_embed.timestamp = datetime.now()
             
-            admin_embed.add_field(name=f"{prefix}log", value="Show the log file (Owner Only).", inline=True)
+            admin_embed.add_field(name=f"{prefix}log", value="Show or search the log files, e.g. since:2h guild:here (Owner Only).", inline=True)
             admin_embed.add_field(name=f"{prefix}clearcache", value="Initiates the clear cache process (Owner Only).", inline=True)
             admin_embed.add_field(name=f"{prefix}logclear", value="Clear the log file (Owner Only).", inline=True)
             admin_embed.add_field(name=f"{prefix}version", value="Check the version of yt-dlp and commit info (Owner Only).", inline=True)
@@ -1,8 +1,12 @@
 import discord
 from discord.ext import commands
 import os
+import asyncio
 import tempfile
 from scripts.config import load_config
+from scripts.log_writer import log_writer
+from scripts.log_index import LogQuery, log_search
+from scripts.commandlogger import command_logger
 
 
 class Log(commands.Cog):
@@ -10,7 +14,7 @@ class Log(commands.Cog):
     Command cog for retrieving bot log files.
     
     This cog handles the 'log' command, which allows the bot owner
-    to view the most recent log entries from the bot's log files.
+    to view and search the entries of the bot's log files.
     """
     
     def __init__(self, bot):
@@ -24,71 +28,39 @@ class Log(commands.Cog):
         config = load_config()
         logging_config = config.get('LOGGING', {})
         self.max_log_lines = logging_config.get('MAX_LOG_LINES', 1000)
-        self.file_chunk_size = logging_config.get('FILE_CHUNK_SIZE', 8192)
-
-    def read_last_lines(self, filename, max_lines=None):
-        """
-        Read the last N lines of a file.
-        
-        This method efficiently reads the last specified number of lines
-        from a file without loading the entire file into memory.
-        
-        Args:
-            filename (str): The path to the file to read
-            max_lines (int): Maximum number of lines to read (default from config)
-            
-        Returns:
-            list: The last N lines of the file as a list of strings
-        """
-        if max_lines is None:
-            max_lines = self.max_log_lines
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                f.seek(0, 2)  # Seek to end of file
-                file_size = f.tell()
-                
-                lines = []
-                chunk_size = self.file_chunk_size
-                position = file_size
-                
-                while len(lines) < max_lines and position > 0:
-                    chunk_pos = max(position - chunk_size, 0)
-                    f.seek(chunk_pos)
-                    
-                    if chunk_pos > 0:
-                        f.readline()
-                        
-                    chunk_lines = f.read(position - chunk_pos).splitlines()
-                    lines = chunk_lines + lines
-                    position = chunk_pos
-                    
-                    if len(lines) > max_lines:
-                        lines = lines[-max_lines:]
-                
-                return lines
-        except FileNotFoundError:
-            return []
-        except Exception as e:
-            return [f"Error reading file: {str(e)}"]
 
     @commands.command(name='log')
     @commands.is_owner()
-    async def log(self, ctx):
+    async def log(self, ctx, *, query: str = ''):
         """
-        Send the last 1000 lines of both log files.
+        Send the matching lines of both log files.
         
-        This command retrieves the last 1000 lines from both the system log
-        and command log files, and sends them as text file attachments.
-        This command is restricted to the bot owner only.
+        Without a query this sends the last 1000 lines of the system log and
+        the command log. A query narrows them down, for example
+        `!log since:2h until:30m guild:here level:error skipped`:
+        since/until take a relative time (30m, 2h, 1d) or an ISO date or
+        time, guild takes a server name or ID (or 'here'), and the remaining
+        words are searched for. Rotated logs are searched too. The lines are
+        sent as text file attachments. This command is restricted to the bot
+        owner only.
         
         Args:
             ctx: The command context
+            query: Optional filters and search text
         """
+        try:
+            log_query = LogQuery.parse(query, guild=ctx.guild)
+        except ValueError as e:
+            await ctx.send(f"Invalid log query: {str(e)}")
+            return
+
         temp_files = []
         try:
-            # Read both log files
-            system_log_lines = self.read_last_lines('log.txt')
-            command_log_lines = self.read_last_lines('commandlog.txt')
+            # Write queued lines first so the newest entries are included
+            await asyncio.to_thread(log_writer.flush)
+            # Search both log files
+            system_log_lines = await asyncio.to_thread(log_search.search, 'log.txt', log_query, self.max_log_lines)
+            command_log_lines = await asyncio.to_thread(log_search.search, command_logger.log_path, log_query, self.max_log_lines)
             
             # Create and send temporary files for both logs using unique temp files
             if system_log_lines:
@@ -106,7 +78,7 @@ class Log(commands.Cog):
                 await ctx.send("Command Log:", file=discord.File(temp_files[-1], filename='command_log.txt'))
                 
             if not system_log_lines and not command_log_lines:
-                await ctx.send("No log files found.")
+                await ctx.send("No matching log entries found." if query else "No log files found.")
             
         except Exception as e:
             await ctx.send(f"Error processing log files: {str(e)}")
@@ -1,6 +1,7 @@
 from discord.ext import commands
 from scripts.messages import create_embed
 from scripts.constants import EMBED_COLOR_ERROR, EMBED_COLOR_SUCCESS
+from scripts.log_writer import log_writer
 
 
 async def setup(bot):
@@ -28,9 +29,8 @@ async def logclear(ctx):
         ctx: The command context
     """
     try:
-        # Clear the log file
-        with open('log.txt', 'w', encoding='utf-8') as f:
-            f.write('---')
+        # Clear the log file (through the log writer, which holds it open)
+        log_writer.truncate('log.txt', '---')
         
         await ctx.send(embed=create_embed("Success", "Log file has been cleared.", color=EMBED_COLOR_SUCCESS, ctx=ctx))
         print("Log file cleared by owner")
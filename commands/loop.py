@@ -1,10 +1,10 @@
 import discord
-from collections import deque
 from discord.ext import commands
 from scripts.messages import create_embed
 from scripts.permissions import check_dj_role
 from scripts.constants import EMBED_COLOR_ERROR, EMBED_COLOR_INFO, ERROR_NOT_IN_VOICE, ERROR_DIFFERENT_CHANNEL, ERROR_BOT_NOT_CONNECTED
 from scripts.config import load_config
+from scripts.loop_playback import start_native_loop, stop_native_loop
 import asyncio
 
 # Load default loop count from config
@@ -17,7 +17,7 @@ class Loop(commands.Cog):
     
     This cog handles the 'loop' command, which allows users to toggle
     loop mode for the currently playing song, repeating it a specified
-    number of times in the queue.
+    number of times.
     """
     
     def __init__(self, bot):
@@ -36,7 +36,7 @@ class Loop(commands.Cog):
         
         Args:
             ctx: The command context
-            count (int): Number of times to add the song to the queue (default from config)
+            count (int): Number of times to repeat the song (default from config)
             
         Returns:
             tuple: (bool, str) - Success status and result message
@@ -80,7 +80,25 @@ class Loop(commands.Cog):
             # Enable looping for this song
             self.looped_songs.add(current_song_url)
             
-            # Add the song to the queue multiple times
+            looped_song = music_bot.current_song.copy()
+
+            def requeue_remaining(plays_left):
+                # The next pass wasn't ready in time; play the rest from the queue instead
+                if current_song_url in self.looped_songs:
+                    for _ in range(plays_left):
+                        music_bot.queue.appendleft(looped_song.copy())
+
+            # Repeat the song inside the player so no new ffmpeg process or messages are needed
+            started = await start_native_loop(
+                music_bot,
+                count,
+                on_finished=lambda: self.looped_songs.discard(current_song_url),
+                on_fallback=requeue_remaining
+            )
+            if started:
+                return True, "Looping enabled for the current song."
+            
+            # Fall back to adding the song to the queue multiple times
             async with music_bot.queue_lock:
                 for _ in range(count):
                     music_bot.queue.append(music_bot.current_song.copy())
@@ -102,12 +120,15 @@ class Loop(commands.Cog):
             # Disable looping for this song
             self.looped_songs.remove(current_song_url)
             
+            # Stop a native loop after the current pass
+            stop_native_loop(music_bot)
+            
             # Clear the callback when loop is disabled
             music_bot.after_song_callback = None
             
-            # Remove all songs from queue that match the current song's URL (maintain deque type)
+            # Remove all songs from queue that match the current song's URL
             async with music_bot.queue_lock:
-                music_bot.queue = deque(song for song in music_bot.queue if song['url'] != current_song_url)
+                music_bot.queue.remove_url(current_song_url)
             
             return True, "Looping disabled for the current song."
 
@@ -118,8 +139,8 @@ class Loop(commands.Cog):
         Toggle loop for the current song.
         
         This command toggles looping for the currently playing song.
-        When enabled, the song will be added back to the queue after it finishes playing.
-        When disabled, the song will be removed from the queue.
+        When enabled, the song is repeated inside the player without re-queueing it.
+        When disabled, the current repetition plays to the end and looping stops.
         This command requires DJ permissions.
         
         Args:
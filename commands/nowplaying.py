@@ -1,7 +1,8 @@
 from discord.ext import commands
-import time
 from scripts.messages import create_embed
 from scripts.duration import get_audio_duration, format_duration
+from scripts.seek import get_playback_position
+from scripts.loop_playback import get_native_loop
 from scripts.ui_components import create_now_playing_view
 from scripts.permissions import check_dj_role
 from scripts.constants import EMBED_COLOR_ERROR, EMBED_COLOR_INFO, ERROR_NOTHING_PLAYING
@@ -55,8 +56,8 @@ class NowPlayingCog(commands.Cog):
             await ctx.send(embed=create_embed("Error", ERROR_NOTHING_PLAYING, color=EMBED_COLOR_ERROR, ctx=ctx))
             return
 
-        # Calculate elapsed time since song started
-        current_position = int(time.time() - server_music_bot.playback_start_time) if server_music_bot.playback_start_time else 0
+        # Get the position from the frames played so far (pauses aren't counted)
+        current_position = int(get_playback_position(server_music_bot, ctx.voice_client))
         
         # Get total duration and check if it's a stream
         is_stream = server_music_bot.current_song.get('is_stream', False)
@@ -64,17 +65,11 @@ class NowPlayingCog(commands.Cog):
         
         # If duration is not set but we have a file path, try to get the duration
         if total_duration == 0 and not is_stream and 'file_path' in server_music_bot.current_song:
-            file_path = server_music_bot.current_song['file_path']
-            # Check if duration is in the cache
-            total_duration = server_music_bot.duration_cache.get(file_path, 0)
-            if total_duration == 0:
-                # Calculate duration if not cached
-                total_duration = await get_audio_duration(file_path)
-                if total_duration > 0:
-                    # Cache the duration for future use
-                    server_music_bot.duration_cache[file_path] = total_duration
-                    # Update the current song with the duration
-                    server_music_bot.current_song['duration'] = total_duration
+            # Durations are memoized by path and mtime, so this is cheap after the first call
+            total_duration = await get_audio_duration(server_music_bot.current_song['file_path'])
+            if total_duration > 0:
+                # Update the current song with the duration
+                server_music_bot.current_song['duration'] = total_duration
         
         # Format the current time using shared utility
         current_time = format_duration(current_position)
@@ -96,6 +91,11 @@ class NowPlayingCog(commands.Cog):
             
             progress_info = f"[{progress_bar}]\n{current_time} / {total_time}"
         
+        # Show which repetition is playing when the song is looped
+        looper = get_native_loop(server_music_bot)
+        if looper:
+            progress_info += f"\n🔁 {looper.current_pass} / {looper.total + 1}"
+        
         # Create description with title and progress
         description = f"[{server_music_bot.current_song['title']}]({server_music_bot.current_song['url']})\n\n{progress_info}"
 
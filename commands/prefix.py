@@ -1,6 +1,6 @@
 import discord
 from discord.ext import commands
-from scripts.server_prefixes import set_prefix, reset_prefix, load_server_prefixes
+from scripts.server_prefixes import set_prefix, reset_prefix, get_custom_prefix
 from scripts.config import config_vars
 from scripts.constants import EMBED_COLOR_INFO, EMBED_COLOR_SUCCESS, EMBED_COLOR_ERROR
 from datetime import datetime
@@ -127,15 +127,11 @@ class PrefixCog(commands.Cog):
             return
             
         # Check if the server has a custom prefix
-        prefixes = await load_server_prefixes()
-        guild_id = str(message.guild.id)
+        server_prefix = get_custom_prefix(message.guild.id)
         
         # If the server doesn't have a custom prefix, or is using the default, do nothing
-        if guild_id not in prefixes or prefixes[guild_id] == default_prefix:
+        if server_prefix is None or server_prefix == default_prefix:
             return
-            
-        # Get the custom prefix for this server
-        server_prefix = prefixes[guild_id]
         
         # Check if the message is trying to use a command (default prefix + command)
         command = message.content[len(default_prefix):].split(' ')[0]
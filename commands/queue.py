@@ -2,7 +2,8 @@ import discord
 from discord.ext import commands
 from scripts.messages import create_embed
 from scripts.permissions import check_dj_role
-from scripts.duration import get_audio_duration, format_duration
+from scripts.duration import get_audio_durations
+from scripts.queue_snapshot import get_snapshot, snapshot_key
 from scripts.constants import EMBED_COLOR_ERROR, EMBED_COLOR_INFO, ERROR_QUEUE_EMPTY
 from scripts.config import load_config
 
@@ -28,6 +29,7 @@ class QueueCog(commands.Cog):
         self.page_size = config.get('QUEUE', {}).get('PAGE_SIZE', 10)  # Number of songs to display per page
         self.queue_messages = {}  # Store queue messages by channel ID
         self.queue_contexts = {}  # Store original contexts by message ID
+        self.queue_snapshots = {}  # Latest rendered queue snapshot by guild ID
 
     def create_queue_buttons(self, current_page, total_pages):
         """
@@ -89,6 +91,8 @@ class QueueCog(commands.Cog):
         
         Creates an embed displaying the current song, upcoming songs,
         and songs being downloaded. Supports pagination for large queues.
+        Pages are rendered from a snapshot of the queue that is only taken
+        again after the queue changed, so paging is cheap.
         
         Args:
             ctx: The command context
@@ -106,91 +110,32 @@ class QueueCog(commands.Cog):
         if not server_music_bot.current_song and not server_music_bot.queue and server_music_bot.download_queue.empty():
             return create_embed("Queue is empty", ERROR_QUEUE_EMPTY, color=EMBED_COLOR_ERROR, ctx=ctx), 0
 
-        queue_text = ""
-        shown_songs = set()  # Track shown songs to avoid duplicates
-        total_songs = 0
-        queue_count = 0  # Separate counter for pagination (excludes current song)
-        total_duration = 0  # Track total duration of all songs
+        queue = server_music_bot.queue
+        current_song = server_music_bot.current_song
 
-        # Display current song if there is one
-        if server_music_bot.current_song:
-            total_songs = 1  # Count the currently playing song
-            queue_text += "**Now playing:**\n"
-            loop_cog = self.bot.get_cog('Loop')
-            is_looping = loop_cog and server_music_bot.current_song['url'] in loop_cog.looped_songs
-            
-            # Get duration for current song
-            if not server_music_bot.current_song.get('is_stream'):
-                file_path = server_music_bot.current_song['file_path']
-                duration = server_music_bot.duration_cache.get(file_path)
-                if duration is None:
-                    # Calculate duration if not cached
-                    duration = await get_audio_duration(file_path)
+        loop_cog = self.bot.get_cog('Loop')
+        is_looping = bool(current_song and loop_cog and current_song['url'] in loop_cog.looped_songs)
+
+        snapshot = self.queue_snapshots.get(ctx.guild.id)
+        if snapshot is None or snapshot.key != snapshot_key(queue, current_song, is_looping):
+            # Durations not known when a song was queued are probed once and stored in the queue's totals
+            missing = queue.missing_durations()
+            if current_song and not current_song.get('is_stream') and not current_song.get('duration'):
+                missing.append(current_song)
+            if missing:
+                durations = await get_audio_durations([song['file_path'] for song in missing])
+                for song in missing:
+                    duration = durations.get(song['file_path'], 0)
                     if duration > 0:
-                        server_music_bot.duration_cache[file_path] = duration
-                duration_str = f" `[{format_duration(duration)}]`" if duration > 0 else ""
-                if duration and duration > 0:
-                    total_duration += duration
-            else:
-                duration_str = " `[LIVE]`"  # Live streams don't have duration
-                
-            # Format the current song with title, URL, and duration
-            queue_text += f"[{server_music_bot.current_song['title']}]({server_music_bot.current_song['url']}){duration_str}"
-            if is_looping:
-                queue_text += " - :repeat:"  # Add repeat icon if song is looping
-            queue_text += "\n\n"
+                        if song is current_song:
+                            current_song['duration'] = duration
+                        queue.set_duration(song, duration)
+
+        # Only taken again when the queue changed since the last render
+        snapshot = get_snapshot(self.queue_snapshots, ctx.guild.id, queue, current_song, is_looping, self.page_size)
+        queue_count = snapshot.queue_count  # Separate counter for pagination (excludes current song)
+        queue_text = snapshot.page_text(page)
 
-        # Display upcoming songs if there are any
-        if server_music_bot.queue:
-            loop_cog = self.bot.get_cog('Loop')
-            current_song_url = server_music_bot.current_song['url'] if server_music_bot.current_song else None
-            is_looping = loop_cog and current_song_url in loop_cog.looped_songs
-            
-            # First check if there are any non-looping songs to show
-            has_non_looping_songs = False
-            for song in server_music_bot.queue:
-                if not (is_looping and song['url'] == current_song_url):
-                    has_non_looping_songs = True
-                    break
-            
-            if has_non_looping_songs:
-                queue_text += "**Up Next:**\n"
-                queue_index = 0  # Separate counter for pagination
-                start_idx = (page - 1) * self.page_size  # Calculate pagination indices
-                end_idx = start_idx + self.page_size
-                
-                for song in server_music_bot.queue:
-                    # Skip showing the looped song in queue (it will play next anyway)
-                    if is_looping and song['url'] == current_song_url:
-                        continue
-                        
-                    song_title = song['title']
-                    if song_title not in shown_songs:  # Avoid showing duplicate songs
-                        total_songs += 1
-                        queue_count += 1  # Count for pagination
-                        
-                        # Get duration for queued song (always calculate for total)
-                        song_duration = 0
-                        if not song.get('is_stream'):
-                            file_path = song['file_path']
-                            duration = server_music_bot.duration_cache.get(file_path)
-                            if duration is None:
-                                duration = await get_audio_duration(file_path)
-                                if duration > 0:
-                                    server_music_bot.duration_cache[file_path] = duration
-                            if duration and duration > 0:
-                                song_duration = duration
-                                total_duration += duration
-                            duration_str = f" `[{format_duration(duration)}]`" if duration > 0 else ""
-                        else:
-                            duration_str = " `[LIVE]`"
-                        
-                        if start_idx <= queue_index < end_idx:  # Only show songs for current page
-                            # Format each queued song with position, title, URL, and duration
-                            queue_text += f"`{total_songs}.` [{song_title}]({song['url']}){duration_str}\n"
-                        queue_index += 1  # Increment pagination counter
-                        shown_songs.add(song_title)  # Mark song as shown
-                    
         # Display downloading songs if there are any
         if not server_music_bot.download_queue.empty():
             queue_text += "\n**Downloading:**\n"
@@ -198,12 +143,8 @@ class QueueCog(commands.Cog):
             queue_text += f"{downloading_count} song(s) in download queue\n"
 
         # Create the final embed
-        footer_text = ""
-        if total_songs > 0:
-            footer_text = f"\n\nTotal in queue: {total_songs}"
-            if total_duration > 0:
-                footer_text += f"\nTotal duration: {format_duration(total_duration)}"
-        
+        footer_text = snapshot.footer_text()
+
         embed = create_embed(
             f"Queue",
             queue_text + footer_text,
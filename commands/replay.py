@@ -1,8 +1,7 @@
-import discord
 from discord.ext import commands
 from scripts.messages import create_embed
 from scripts.permissions import check_dj_role
-from scripts.config import FFMPEG_OPTIONS
+from scripts.seek import restart_at
 from scripts.voice_checks import check_voice_state
 from scripts.constants import EMBED_COLOR_ERROR, EMBED_COLOR_INFO, ERROR_NOTHING_PLAYING
 import time
@@ -32,7 +31,7 @@ class ReplayCog(commands.Cog):
         
         This command restarts the currently playing song from the beginning
         without removing it from the queue or stopping playback. It works by
-        creating a new audio source with the seek position set to 0.
+        swapping in a new audio source that starts at position 0.
         This command requires DJ permissions.
         
         Args:
@@ -56,18 +55,8 @@ class ReplayCog(commands.Cog):
             # Get current song info
             current_song = music_bot.current_song
             
-            # Create a new FFmpeg audio source with seek set to beginning
-            ffmpeg_options = FFMPEG_OPTIONS.copy()
-            ffmpeg_options['options'] = ffmpeg_options.get('options', '') + ' -ss 0'
-            
-            # Create new source with seek
-            source = discord.FFmpegPCMAudio(current_song['file_path'], **ffmpeg_options)
-            
-            # Call read() on the audio source before playing to prevent speed-up issue
-            source.read()
-            
-            # Replace the audio source without stopping playback
-            ctx.voice_client._player.source = source
+            # Restart the current song from the beginning without stopping the player
+            await restart_at(ctx.voice_client, current_song, 0)
             
             # Reset playback start time to current time
             music_bot.playback_start_time = time.time()
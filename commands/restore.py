@@ -0,0 +1,106 @@
+from discord.ext import commands
+from scripts.caching import playlist_cache
+from scripts.messages import create_embed
+from scripts.permissions import check_dj_role
+from scripts.process_queue import process_queue
+from scripts.queue_journal import queue_journal, restore_tracks, describe_saved
+from scripts.seek import restart_at
+from scripts.voice import connect_to_voice
+from scripts.voice_checks import check_user_in_voice
+from scripts.constants import EMBED_COLOR_ERROR, EMBED_COLOR_SUCCESS
+from scripts.playback import should_start_playback
+import time
+
+class RestoreCog(commands.Cog):
+    """
+    Command cog for restoring the queue saved before a restart.
+
+    This cog provides the 'restore' command, which queues the songs that were
+    playing and queued when the bot last shut down and continues the song
+    that was playing from where it stopped.
+    """
+
+    def __init__(self, bot):
+        """
+        Initialize the RestoreCog.
+
+        Args:
+            bot: The bot instance
+        """
+        self.bot = bot
+
+    @commands.command(name='restore')
+    @check_dj_role()
+    async def restore(self, ctx):
+        """
+        Restore the queue saved before the bot restarted.
+
+        Songs are looked up in the download cache by their video ID; songs
+        that are no longer cached are left out. If nothing is playing, the
+        saved current song starts again at its saved position.
+        This command requires DJ permissions.
+
+        Args:
+            ctx: The command context
+        """
+        from bot import MusicBot
+        music_bot = MusicBot.get_instance(str(ctx.guild.id))
+
+        saved = music_bot.saved_session or queue_journal.load_saved(str(ctx.guild.id))
+        if not saved:
+            await ctx.send(embed=create_embed("Error", "There is no saved queue to restore.", color=EMBED_COLOR_ERROR, ctx=ctx))
+            return
+
+        is_valid, error_embed = check_user_in_voice(ctx)
+        if not is_valid:
+            await ctx.send(embed=error_embed)
+            return
+
+        try:
+            tracks = restore_tracks(saved, playlist_cache.get_cached_file)
+            if not tracks:
+                await ctx.send(embed=create_embed("Error", "None of the saved songs are cached anymore.", color=EMBED_COLOR_ERROR, ctx=ctx))
+                return
+
+            # Only offer a saved queue once
+            music_bot.saved_session = None
+            music_bot.saved_session_offered = True
+            queue_journal.discard_saved(str(ctx.guild.id))
+
+            if not await connect_to_voice(ctx, music_bot):
+                await ctx.send(embed=create_embed("Error", "Failed to connect to voice channel", color=EMBED_COLOR_ERROR, ctx=ctx))
+                return
+
+            music_bot.explicitly_stopped = False
+            for track in tracks:
+                # Announce the restored songs in the channel the command was used in
+                track['ctx'] = ctx
+
+            async with music_bot.queue_lock:
+                music_bot.queue.extend(tracks)
+                should_play = should_start_playback(music_bot)
+
+            await ctx.send(embed=create_embed("Restored", f"Restored {describe_saved(saved)}.", color=EMBED_COLOR_SUCCESS, ctx=ctx))
+
+            if should_play:
+                await process_queue(music_bot, ctx)
+                # Continue the interrupted song where it stopped
+                position = saved.get('position') or 0
+                current = saved.get('current')
+                song = music_bot.current_song
+                if (current and position > 1 and song is tracks[0] and song.cache_key
+                        and song.cache_key == current.get('cache_key') and ctx.voice_client):
+                    await restart_at(ctx.voice_client, song, position)
+                    music_bot.playback_start_time = time.time() - position
+
+        except Exception as e:
+            await ctx.send(embed=create_embed("Error", f"An error occurred while restoring the queue: {str(e)}", color=EMBED_COLOR_ERROR, ctx=ctx))
+
+async def setup(bot):
+    """
+    Setup function to add the RestoreCog to the bot.
+
+    Args:
+        bot: The bot instance
+    """
+    await bot.add_cog(RestoreCog(bot))
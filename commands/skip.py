@@ -1,6 +1,6 @@
-from collections import deque
 from discord.ext import commands
 import time
+from collections.abc import Mapping
 from scripts.messages import create_embed
 from scripts.permissions import check_dj_role
 from scripts.voice_checks import check_voice_state
@@ -69,9 +69,9 @@ class SkipCog(commands.Cog):
         # If song is looping, remove it from looped songs and clear its instances from queue
         if is_looping:
             loop_cog.looped_songs.remove(current_song['url'])
-            # Remove all instances of the looped song from the queue (maintain deque type)
+            # Remove all instances of the looped song from the queue
             async with server_music_bot.queue_lock:
-                server_music_bot.queue = deque(song for song in server_music_bot.queue if song['url'] != current_song['url'])
+                server_music_bot.queue.remove_url(current_song['url'])
             server_music_bot.after_song_callback = None
         
         # Stop current song - this will trigger the after_playing callback
@@ -81,7 +81,6 @@ class SkipCog(commands.Cog):
         if amount > 1:
             songs_to_remove = min(amount - 1, len(server_music_bot.queue))
             if songs_to_remove > 0:
-                # Use popleft() to remove songs from deque (slice deletion doesn't work on deque)
                 async with server_music_bot.queue_lock:
                     for _ in range(songs_to_remove):
                         server_music_bot.queue.popleft()
@@ -127,12 +126,12 @@ class SkipCog(commands.Cog):
                 return
 
             # Store ctx in current_song for footer information
-            if isinstance(result, dict):
+            if isinstance(result, Mapping):
                 result['ctx'] = ctx
 
             # Don't send a skip message here since it's handled by the after_playing callback
             # Only show message for multiple skips
-            if isinstance(result, dict) and amount > 1:
+            if isinstance(result, Mapping) and amount > 1:
                 await ctx.send(embed=create_embed("Skipped", f"Skipped current song and {amount - 1} songs from queue", color=EMBED_COLOR_INFO, ctx=ctx))
 
         except Exception as e:
@@ -1,11 +1,16 @@
 from discord.ext import commands
 import psutil
-import json
-import os
+from scripts.kvstore import state_store
 from scripts.messages import create_embed
+from scripts.playback_resources import playback_resources
+from scripts.readahead import get_underruns
 from scripts.permissions import check_dj_role
 from scripts.constants import EMBED_COLOR_INFO, EMBED_COLOR_ERROR
 
+# Namespace of the state database the bandwidth totals are stored in
+BANDWIDTH_NAMESPACE = 'bandwidth'
+BANDWIDTH_KEYS = ('total_bytes_sent', 'total_bytes_recv', 'last_bytes_sent', 'last_bytes_recv')
+
 class StatsCog(commands.Cog):
     """
     Command cog for displaying bot statistics.
@@ -18,38 +23,41 @@ class StatsCog(commands.Cog):
         """
         Initialize the StatsCog.
         
-        Sets up bandwidth tracking by loading existing data or creating
-        a new bandwidth tracking file if one doesn't exist.
+        Bandwidth totals are kept in the 'bandwidth' namespace of the state
+        database and loaded the first time they are needed.
         
         Args:
             bot: The bot instance
         """
         self.bot = bot
-        self.bandwidth_file = 'bandwidth.json'
-        self.current_bytes = psutil.net_io_counters()
-        
-        # Load or create bandwidth data
-        if os.path.exists(self.bandwidth_file):
-            with open(self.bandwidth_file, 'r') as f:
-                self.bandwidth_data = json.load(f)
-        else:
-            self.bandwidth_data = {
-                'total_bytes_sent': 0,
-                'total_bytes_recv': 0,
-                'last_bytes_sent': self.current_bytes.bytes_sent,
-                'last_bytes_recv': self.current_bytes.bytes_recv
-            }
-            self._save_bandwidth_data()
+        self.bandwidth_file = 'bandwidth.json'  # Legacy file, imported once
+        self._bandwidth_data = None
+    
+    @property
+    def bandwidth_data(self):
+        """Bandwidth totals, loaded (or started fresh) on first use."""
+        if self._bandwidth_data is None:
+            state_store.migrate_json(BANDWIDTH_NAMESPACE, self.bandwidth_file)
+            self._bandwidth_data = state_store.items(BANDWIDTH_NAMESPACE)
+            if not all(key in self._bandwidth_data for key in BANDWIDTH_KEYS):
+                current_bytes = psutil.net_io_counters()
+                self._bandwidth_data = {
+                    'total_bytes_sent': 0,
+                    'total_bytes_recv': 0,
+                    'last_bytes_sent': current_bytes.bytes_sent,
+                    'last_bytes_recv': current_bytes.bytes_recv
+                }
+                self._save_bandwidth_data()
+        return self._bandwidth_data
     
     def _save_bandwidth_data(self):
         """
-        Save bandwidth data to JSON file.
+        Save bandwidth data to the state database.
         
-        This helper method writes the current bandwidth statistics to
-        the bandwidth JSON file for persistence between bot restarts.
+        The four counters are written with the next batch of state writes,
+        so they persist between bot restarts.
         """
-        with open(self.bandwidth_file, 'w') as f:
-            json.dump(self.bandwidth_data, f, indent=4)
+        state_store.set_many(BANDWIDTH_NAMESPACE, {key: self._bandwidth_data[key] for key in BANDWIDTH_KEYS})
     
     def _update_bandwidth_stats(self):
         """
@@ -121,6 +129,9 @@ class StatsCog(commands.Cog):
                     bytes_count /= 1024
                 return f"{bytes_count:.2f} TB"
             
+            # Get load from playback ffmpeg processes
+            ffmpeg = playback_resources.stats()
+            
             # Create embed with stats
             description = (
                 f"**Total Network Usage:**\n"
@@ -128,7 +139,10 @@ class StatsCog(commands.Cog):
                 f"📥 Total Download: {format_bytes(bytes_recv)}\n\n"
                 f"**System Stats:**\n"
                 f"💻 CPU Usage: {psutil.cpu_percent()}%\n"
-                f"🧠 Memory Usage: {psutil.virtual_memory().percent}%"
+                f"🧠 Memory Usage: {psutil.virtual_memory().percent}%\n"
+                f"🎛️ FFmpeg Streams: {ffmpeg['active_streams']} "
+                f"({ffmpeg['cpu_percent']:.1f}% CPU, {ffmpeg['threads_per_stream']} threads each)\n"
+                f"⏱️ Buffer Underruns: {get_underruns(ctx.guild.id) if ctx.guild else 0} in this server"
             )
             
             await ctx.send(embed=create_embed("Bot Statistics", description, color=EMBED_COLOR_INFO, ctx=ctx))
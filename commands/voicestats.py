@@ -0,0 +1,60 @@
+from discord.ext import commands
+import discord
+from scripts.voice_metrics import voice_metrics
+from scripts.constants import EMBED_COLOR_INFO
+
+async def setup(bot):
+    """
+    Setup function to add the voicestats command to the bot.
+
+    Args:
+        bot: The bot instance
+    """
+    bot.add_command(voicestats)
+    return None
+
+def _format_summary(summary):
+    """
+    Format a metric summary for an embed field.
+
+    Args:
+        summary: A summary dict with count, avg, p95 and max in milliseconds
+
+    Returns:
+        str: The formatted summary
+    """
+    if not summary['count']:
+        return "No samples"
+    return f"avg {summary['avg']:.2f} ms · p95 {summary['p95']:.2f} ms · max {summary['max']:.2f} ms"
+
+@commands.command(name='voicestats')
+@commands.is_owner()
+async def voicestats(ctx, guild_id: int = None):
+    """
+    Shows voice playback health metrics for a server (Owner only).
+
+    Reports frame read latency, send jitter, buffer underruns, ffmpeg
+    startup time and the time from play_next to the first audio frame,
+    so audio problems can be told apart from network problems.
+
+    Args:
+        ctx: The command context
+        guild_id: The server to show (defaults to the current one)
+    """
+    guild_id = guild_id or (ctx.guild.id if ctx.guild else None)
+    snapshot = voice_metrics.snapshot(guild_id) if guild_id else {}
+
+    embed = discord.Embed(title="Voice Playback Metrics", color=EMBED_COLOR_INFO)
+    if not snapshot:
+        embed.description = "No playback has been recorded for this server yet."
+        await ctx.send(embed=embed)
+        return
+
+    embed.description = f"{snapshot['frames']} frames sent · {snapshot['underruns']} buffer underruns"
+    embed.add_field(name="Frame read latency", value=_format_summary(snapshot['read_latency_ms']), inline=False)
+    embed.add_field(name="Send jitter", value=_format_summary(snapshot['jitter_ms']), inline=False)
+    embed.add_field(name="FFmpeg startup", value=_format_summary(snapshot['ffmpeg_startup_ms']), inline=False)
+    embed.add_field(name="play_next to first frame", value=_format_summary(snapshot['start_latency_ms']), inline=False)
+    embed.add_field(name="voice_client.play()", value=_format_summary(snapshot['play_call_ms']), inline=False)
+
+    await ctx.send(embed=embed)
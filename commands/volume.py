@@ -0,0 +1,97 @@
+from discord.ext import commands
+from scripts.messages import create_embed
+from scripts.permissions import check_dj_role
+from scripts.playback import TrackedAudioSource
+from scripts.seek import restart_at
+from scripts.voice_checks import get_music_bot, check_voice_state
+from scripts.volume import volume_store, max_volume
+from scripts.constants import EMBED_COLOR_ERROR, EMBED_COLOR_INFO, EMBED_COLOR_SUCCESS, GREEN, BLUE, RESET
+
+
+async def apply_live_volume(music_bot, volume: int) -> bool:
+    """
+    Apply a volume to the song that is playing right now.
+
+    PCM playback picks the new volume up on its next frame. Opus passthrough
+    packets can't be scaled, so those songs are reopened once as PCM at the
+    current position.
+
+    Args:
+        music_bot: The MusicBot instance
+        volume: Volume in percent
+
+    Returns:
+        bool: True if the volume was applied to a playing song
+    """
+    voice_client = getattr(music_bot, 'voice_client', None)
+    source = getattr(getattr(voice_client, '_player', None), 'source', None)
+    if not isinstance(source, TrackedAudioSource):
+        return False
+    source.volume = volume / 100
+
+    song = music_bot.current_song
+    if source.is_opus() and volume != 100 and song and song.get('file_path') and not song.get('is_stream'):
+        await restart_at(voice_client, song, source.position, volume)
+    return True
+
+
+class VolumeCog(commands.Cog):
+    """
+    Command cog for the playback volume.
+
+    The volume is stored per server and applied to the playing song
+    immediately, without restarting it.
+    """
+
+    def __init__(self, bot):
+        """
+        Initialize the VolumeCog.
+
+        Args:
+            bot: The bot instance
+        """
+        self.bot = bot
+
+    @commands.command(name='volume', aliases=['vol'])
+    @check_dj_role()
+    async def volume(self, ctx, level: int = None):
+        """
+        Show or change the playback volume for this server.
+
+        Args:
+            ctx: The command context
+            level: New volume in percent, or None to show the current one
+        """
+        guild_id = ctx.guild.id
+        if level is None:
+            await ctx.send(embed=create_embed("Volume", f"Volume is set to **{volume_store.get(guild_id)}%**", color=EMBED_COLOR_INFO, ctx=ctx))
+            return
+
+        if level < 0 or level > max_volume():
+            await ctx.send(embed=create_embed("Error", f"Volume must be between 0 and {max_volume()}", color=EMBED_COLOR_ERROR, ctx=ctx))
+            return
+
+        music_bot = get_music_bot(ctx)
+        if music_bot.voice_client and music_bot.voice_client.is_connected():
+            is_valid, error_embed = await check_voice_state(ctx, music_bot)
+            if not is_valid:
+                await ctx.send(embed=error_embed)
+                return
+
+        try:
+            level = volume_store.set(guild_id, level)
+            await apply_live_volume(music_bot, level)
+            print(f"{GREEN}Volume set:{RESET}{BLUE} {level}% in server: {ctx.guild.name}{RESET}")
+            await ctx.send(embed=create_embed("Volume", f"Volume set to **{level}%**", color=EMBED_COLOR_SUCCESS, ctx=ctx))
+        except Exception as e:
+            await ctx.send(embed=create_embed("Error", f"An error occurred while changing the volume: {str(e)}", color=EMBED_COLOR_ERROR, ctx=ctx))
+
+
+async def setup(bot):
+    """
+    Setup function to add the VolumeCog to the bot.
+
+    Args:
+        bot: The bot instance
+    """
+    await bot.add_cog(VolumeCog(bot))
@@ -1,4 +1,5 @@
 import discord
+from collections.abc import Mapping
 from scripts.config import load_config, config_vars
 
 async def update_activity(bot, current_song=None, is_playing=False):
@@ -33,7 +34,7 @@ async def update_activity(bot, current_song=None, is_playing=False):
             
             if show_activity:
                 # Normal behavior - show current song or play command
-                if current_song and is_playing and isinstance(current_song, dict) and 'title' in current_song:
+                if current_song and is_playing and isinstance(current_song, Mapping) and 'title' in current_song:
                     activity = discord.Activity(
                         type=discord.ActivityType.playing,
                         name=f"{current_song['title']}"
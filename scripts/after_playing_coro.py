@@ -1,5 +1,7 @@
 import asyncio
+import time
 import discord
+from collections.abc import Mapping
 from scripts.play_next import play_next
 from scripts.messages import update_or_send_message, create_embed
 from scripts.activity import update_activity
@@ -32,9 +34,8 @@ class AfterPlayingHandler:
         # Update playback state
         if hasattr(self, 'playback_state'):
             self.playback_state = "stopped"
-
-        # Add a short delay to ensure a clean state after the song ends
-        await asyncio.sleep(0.5)
+        # Remember when the song ended so play_next can log the gap
+        self.track_ended_at = time.perf_counter()
 
         # Check if there's an after_song_callback (for loop mode)
         if hasattr(self, 'after_song_callback') and self.after_song_callback:
@@ -64,10 +65,10 @@ class AfterPlayingHandler:
             # Check if the provided context is valid
             if not (ctx and hasattr(ctx, 'guild') and ctx.guild):
                 # Try to get context from current song
-                if self.current_song and isinstance(self.current_song, dict) and 'ctx' in self.current_song:
+                if self.current_song and isinstance(self.current_song, Mapping) and 'ctx' in self.current_song:
                     valid_ctx = self.current_song['ctx']
                 # Try to get context from the first song in the queue
-                elif self.queue and isinstance(self.queue[0], dict) and 'ctx' in self.queue[0]:
+                elif self.queue and isinstance(self.queue[0], Mapping) and 'ctx' in self.queue[0]:
                     valid_ctx = self.queue[0]['ctx']
             
             # Only proceed if we have a valid context
@@ -78,7 +79,7 @@ class AfterPlayingHandler:
                 # Don't clear the queue, just log the error and wait for a valid context
         else:
             # Update the now playing message to show that the song has finished
-            if self.now_playing_message and self.current_song and isinstance(self.current_song, dict):
+            if self.now_playing_message and self.current_song and isinstance(self.current_song, Mapping):
                 try:
                     # Check if the song is looped
                     loop_cog = None
@@ -0,0 +1,144 @@
+"""
+Per-server command aliases.
+
+Aliases used to be resolved by an on_message listener in the alias cog that
+only understood the default prefix, built the command context twice and
+rewrote message.content before invoking. They are now resolved while the
+command is dispatched: bot.py builds the context once (with the same prefix
+lookup as every other command, see scripts/server_prefixes.py) and, when the
+invoked name isn't a command, looks it up in the guild's alias table.
+
+The table is loaded from the 'aliases' namespace of the state database once
+and updated in place when an alias is added or removed; a change writes only
+that server's aliases (see scripts/kvstore.py). aliases.json, where aliases
+used to be stored, is imported the first time the table is loaded.
+"""
+
+from typing import Dict, Optional
+from scripts.kvstore import KVStore, state_store
+
+# Path to the legacy aliases JSON file (relative to the working directory, as before)
+ALIASES_FILE = 'aliases.json'
+
+# Namespace of the state database the aliases are stored in
+ALIASES_NAMESPACE = 'aliases'
+
+
+class AliasTable:
+    """Aliases of every server, held in memory."""
+
+    def __init__(self, store: Optional[KVStore] = None, legacy_file: str = ALIASES_FILE):
+        """
+        Initialize the table.
+
+        Args:
+            store: The state store (defaults to the shared one)
+            legacy_file: JSON file aliases used to be stored in
+        """
+        self.store = store or state_store
+        self.legacy_file = legacy_file
+        self._aliases: Optional[Dict[str, Dict[str, str]]] = None
+
+    @property
+    def aliases(self) -> Dict[str, Dict[str, str]]:
+        """Aliases by guild ID, loaded on first use."""
+        if self._aliases is None:
+            self._aliases = self._load()
+        return self._aliases
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        """
+        Load aliases from the state database.
+
+        Returns:
+            dict: Dictionary containing server-specific aliases
+        """
+        self.store.migrate_json(ALIASES_NAMESPACE, self.legacy_file)
+        # Names are matched in lower case
+        return {guild_id: {alias.lower(): command for alias, command in server.items()}
+                for guild_id, server in self.store.items(ALIASES_NAMESPACE).items() if isinstance(server, dict)}
+
+    def save(self, guild_id) -> None:
+        """
+        Save a server's aliases.
+
+        Args:
+            guild_id: The ID of the guild (server)
+        """
+        server = self.aliases.get(str(guild_id))
+        if server:
+            self.store.set(ALIASES_NAMESPACE, str(guild_id), server)
+        else:
+            self.store.delete(ALIASES_NAMESPACE, str(guild_id))
+
+    def server_aliases(self, guild_id) -> Dict[str, str]:
+        """
+        Get the aliases of a server.
+
+        Args:
+            guild_id: The ID of the guild (server)
+
+        Returns:
+            dict: Alias -> command name; don't modify it, use add() and remove()
+        """
+        return self.aliases.get(str(guild_id), {})
+
+    def add(self, guild_id, alias: str, command: str) -> None:
+        """
+        Add an alias and save the table.
+
+        Args:
+            guild_id: The ID of the guild (server)
+            alias: The new alias
+            command: The command it runs
+        """
+        self.aliases.setdefault(str(guild_id), {})[alias.lower()] = command
+        self.save(guild_id)
+
+    def remove(self, guild_id, alias: str) -> Optional[str]:
+        """
+        Remove an alias and save the table.
+
+        Args:
+            guild_id: The ID of the guild (server)
+            alias: The alias to remove
+
+        Returns:
+            str: The command the alias ran, or None if there was no such alias
+        """
+        server = self.aliases.get(str(guild_id))
+        if not server or alias.lower() not in server:
+            return None
+        command = server.pop(alias.lower())
+        if not server:
+            del self.aliases[str(guild_id)]
+        self.save(guild_id)
+        return command
+
+    def resolve(self, ctx) -> bool:
+        """
+        Point a context whose invoked name isn't a command at the aliased command.
+
+        Args:
+            ctx: A context built by bot.get_context()
+
+        Returns:
+            bool: True if the context was resolved through an alias
+        """
+        if ctx.command is not None or not ctx.invoked_with or ctx.guild is None:
+            return False
+        server = self.aliases.get(str(ctx.guild.id))
+        if not server:
+            return False
+        command_name = server.get(ctx.invoked_with.lower())
+        if command_name is None:
+            return False
+        command = ctx.bot.get_command(command_name)
+        if command is None:
+            return False
+        ctx.command = command
+        return True
+
+
+# Global instance
+alias_table = AliasTable()
@@ -1,4 +1,3 @@
-import json
 import os
 import time
 import asyncio
@@ -7,29 +6,47 @@ from pathlib import Path
 from typing import Dict, Optional, List
 from scripts.constants import RED, GREEN, RESET
 from scripts.paths import get_cache_dir, get_root_dir, get_relative_path, get_absolute_path, get_cache_file, get_downloads_dir
+from scripts.kvstore import KVStore, state_store
 import yt_dlp
 
+# A playlist listing's last_accessed is only written back when it is older than this
+PLAYLIST_TOUCH_INTERVAL = 3600
+
+
 class PlaylistCache:
     """
     Manages caching of downloaded audio files to reduce redundant downloads.
     
     This class maintains a cache of downloaded YouTube videos and Spotify tracks,
     allowing the bot to reuse previously downloaded files instead of downloading
-    them again. The cache is stored in JSON files in the .cache directory.
+    them again. The cache is kept in memory and stored in the state database
+    (see scripts/kvstore.py), one key per entry, so a change only writes the
+    entry that changed.
     """
-    def __init__(self):
+
+    # Cache attribute -> (state namespace, legacy JSON file in .cache)
+    NAMESPACES = {
+        'cache': ('filecache', 'filecache.json'),
+        'spotify_cache': ('spotify_cache', 'spotify_cache.json'),
+        'blacklist': ('blacklist', 'blacklist.json'),
+        'spotify_playlists': ('spotify_playlists', 'spotify_playlists.json'),
+        'spotify_matches': ('spotify_matches', 'spotify_matches.json'),
+    }
+
+    def __init__(self, store: Optional[KVStore] = None):
         """
         Initialize the cache system and load existing cache data.
         
-        Sets up the cache directory structure and loads existing cache data from disk.
+        Sets up the cache directory structure and loads existing cache data from the state database.
         Uncached file import is deferred to avoid blocking startup.
+
+        Args:
+            store: The state store (defaults to the shared one)
         """
         self.root_dir = Path(get_root_dir())
         self.cache_dir = Path(get_cache_dir())
-        self.cache_file = Path(get_cache_file('filecache.json'))
-        self.spotify_cache_file = Path(get_cache_file('spotify_cache.json'))
-        self.blacklist_file = Path(get_cache_file('blacklist.json'))
         self.downloads_dir = Path(get_downloads_dir())
+        self.store = store or state_store
         self.cache_dir.mkdir(exist_ok=True)  # Create cache directory if it doesn't exist
         self._should_continue_check = True
         self._import_task = None  # Track async import task
@@ -84,51 +101,77 @@ class PlaylistCache:
 
     def _load_cache(self) -> None:
         """
-        Load the cache from disk or create a new one if it doesn't exist.
+        Load the cache from the state database.
         
-        This loads three separate cache files:
-        - filecache.json: Main cache for YouTube videos
-        - spotify_cache.json: Cache for Spotify tracks
-        - blacklist.json: List of URLs that should not be cached
+        This loads five namespaces:
+        - filecache: Main cache for YouTube videos
+        - spotify_cache: Cache for Spotify tracks
+        - blacklist: List of URLs that should not be cached
+        - spotify_playlists: Spotify playlist track listings keyed by snapshot
+        - spotify_matches: Spotify track ID to chosen YouTube video ID
+
+        The JSON files these used to be stored in are imported the first time.
         """
-        try:
-            if self.cache_file.exists():
-                with open(self.cache_file, 'r') as f:
-                    self.cache = json.load(f)
-            else:
-                self.cache = {}
-            
-            if self.spotify_cache_file.exists():
-                with open(self.spotify_cache_file, 'r') as f:
-                    self.spotify_cache = json.load(f)
-            else:
-                self.spotify_cache = {}
+        for attr, (namespace, legacy_file) in self.NAMESPACES.items():
+            self.store.migrate_json(namespace, get_cache_file(legacy_file))
+            setattr(self, attr, self.store.items(namespace))
+        self._seed_spotify_matches()
+        self._cleanup_cache()
 
-            if self.blacklist_file.exists():
-                with open(self.blacklist_file, 'r') as f:
-                    self.blacklist = json.load(f)
+    def _persist(self, attr: str, *keys: str) -> None:
+        """
+        Write cache entries to the state database.
+
+        The write is batched with other pending writes; an entry that is no
+        longer in the cache is deleted.
+
+        Args:
+            attr: The cache attribute, such as 'cache' or 'blacklist'
+            *keys: The keys of the entries that changed
+        """
+        namespace = self.NAMESPACES[attr][0]
+        entries = getattr(self, attr)
+        for key in keys:
+            if key in entries:
+                self.store.set(namespace, key, entries[key])
             else:
-                self.blacklist = {}
-        except json.JSONDecodeError:
-            # Reset cache if JSON is invalid
-            self.cache = {}
-            self.spotify_cache = {}
-            self.blacklist = {}
-        self._cleanup_cache()
+                self.store.delete(namespace, key)
 
     def _save_cache(self) -> None:
         """
-        Save the cache to disk in JSON format.
+        Commit pending cache writes to disk.
+        
+        Entries are written as they change, so this only has to commit the
+        writes that are still waiting for the next batch.
+        """
+        self.store.flush()
+
+    def clear(self) -> None:
+        """Remove every cached file entry, Spotify track and blacklisted video."""
+        for attr in ('cache', 'spotify_cache', 'blacklist'):
+            getattr(self, attr).clear()
+            self.store.clear(self.NAMESPACES[attr][0])
+        self.store.flush()
+
+    def _seed_spotify_matches(self) -> None:
+        """
+        Record matches for Spotify tracks cached before the match index existed.
         
-        Writes all three cache dictionaries (YouTube cache, Spotify cache,
-        and blacklist) to their respective JSON files.
+        Downloaded files are named after their YouTube video ID, so the match
+        can be recovered from the cached file name before cleanup drops
+        entries whose files are gone.
         """
-        with open(self.cache_file, 'w') as f:
-            json.dump(self.cache, f, indent=2)
-        with open(self.spotify_cache_file, 'w') as f:
-            json.dump(self.spotify_cache, f, indent=2)
-        with open(self.blacklist_file, 'w') as f:
-            json.dump(self.blacklist, f, indent=2)
+        for track_id, entry in self.spotify_cache.items():
+            if track_id in self.spotify_matches or not isinstance(entry, dict):
+                continue
+            video_id = os.path.splitext(os.path.basename(entry.get('file_path', '')))[0]
+            if self._is_valid_youtube_id(video_id):
+                self.spotify_matches[track_id] = {
+                    'video_id': video_id,
+                    'confidence': None,
+                    'matched_at': entry.get('last_accessed', time.time())
+                }
+                self._persist('spotify_matches', track_id)
 
     def _cleanup_cache(self) -> None:
         """
@@ -162,6 +205,7 @@ class PlaylistCache:
                 
         for video_id in to_remove:
             del self.cache[video_id]
+        self._persist('cache', *to_remove)
             
         # Clean Spotify cache
         to_remove = []
@@ -183,9 +227,7 @@ class PlaylistCache:
                 
         for track_id in to_remove:
             del self.spotify_cache[track_id]
-        
-        if to_remove and self._should_continue_check:
-            self._save_cache()
+        self._persist('spotify_cache', *to_remove)
 
     def _is_valid_youtube_id(self, video_id: str) -> bool:
         """
@@ -271,7 +313,7 @@ class PlaylistCache:
         for info in results:
             self.cache[info['id']] = info
             print(f"{GREEN}Added to cache: {info['id']} - {info['title']}{RESET}")
-        self._save_cache()
+        self._persist('cache', *(info['id'] for info in results))
 
     async def _import_uncached_files(self):
         """
@@ -356,7 +398,7 @@ class PlaylistCache:
             'last_accessed': time.time()
         }
         self.cache[video_id] = cache_entry
-        self._save_cache()
+        self._persist('cache', video_id)
 
     def get_cached_info(self, video_id: str) -> Optional[Dict]:
         """
@@ -375,9 +417,9 @@ class PlaylistCache:
             absolute_path = get_absolute_path(relative_path) if not os.path.isabs(relative_path) else relative_path
             if os.path.exists(absolute_path):
                 info['file_path'] = absolute_path
-                info['last_accessed'] = time.time()
+                info['last_accessed'] = self.cache[video_id]['last_accessed'] = time.time()
                 info['id'] = video_id  # Add video ID to the info
-                self._save_cache()
+                self._persist('cache', video_id)
                 return info
         return None
 
@@ -393,6 +435,57 @@ class PlaylistCache:
         """
         return self.get_cached_file(video_id) is not None
 
+    def get_loudness(self, video_id: str) -> Optional[Dict]:
+        """
+        Get the measured loudness of a cached video.
+        
+        Args:
+            video_id: The YouTube video ID
+            
+        Returns:
+            Optional[Dict]: Dictionary with 'integrated' (LUFS) and 'true_peak' (dBTP),
+                or None if the file hasn't been analyzed
+        """
+        entry = self.cache.get(video_id)
+        if isinstance(entry, dict) and isinstance(entry.get('loudness'), dict):
+            return entry['loudness']
+        return None
+
+    def set_loudness(self, video_id: str, integrated: float, true_peak: float) -> None:
+        """
+        Store the measured loudness of a cached video.
+        
+        Args:
+            video_id: The YouTube video ID
+            integrated: Integrated loudness in LUFS
+            true_peak: True peak in dBTP
+        """
+        entry = self.cache.get(video_id)
+        if not self._should_continue_check or not isinstance(entry, dict):
+            return
+        entry['loudness'] = {'integrated': integrated, 'true_peak': true_peak}
+        self._persist('cache', video_id)
+
+    def replace_cached_file(self, video_id: str, file_path: str) -> None:
+        """
+        Point a cached video, and any Spotify tracks sharing its file, at a new file.
+
+        Args:
+            video_id: The YouTube video ID
+            file_path: Path to the replacement file
+        """
+        entry = self.cache.get(video_id)
+        if not self._should_continue_check or not isinstance(entry, dict):
+            return
+        old_path = entry['file_path']
+        relative_path = get_relative_path(file_path) if os.path.isabs(file_path) else file_path
+        entry['file_path'] = relative_path
+        self._persist('cache', video_id)
+        for track_id, track in self.spotify_cache.items():
+            if isinstance(track, dict) and track.get('file_path') == old_path:
+                track['file_path'] = relative_path
+                self._persist('spotify_cache', track_id)
+
     def get_cached_spotify_track(self, track_id: str) -> Optional[Dict]:
         """
         Get cached info for a Spotify track if it exists.
@@ -410,8 +503,8 @@ class PlaylistCache:
             absolute_path = get_absolute_path(relative_path)
             if os.path.exists(absolute_path):
                 info['file_path'] = absolute_path
-                info['last_accessed'] = time.time()
-                self._save_cache()
+                info['last_accessed'] = self.spotify_cache[track_id]['last_accessed'] = time.time()
+                self._persist('spotify_cache', track_id)
                 return info
         return None
 
@@ -437,7 +530,7 @@ class PlaylistCache:
             'last_accessed': time.time()
         }
         self.spotify_cache[track_id] = cache_entry
-        self._save_cache()
+        self._persist('spotify_cache', track_id)
 
     def is_spotify_track_cached(self, track_id: str) -> bool:
         """
@@ -451,6 +544,116 @@ class PlaylistCache:
         """
         return self.get_cached_spotify_track(track_id) is not None
 
+    def get_spotify_match(self, track_id: str) -> Optional[Dict]:
+        """
+        Get the YouTube video previously chosen for a Spotify track.
+        
+        Matches are kept even after the downloaded file is evicted, so a
+        re-download can skip the YouTube search entirely.
+        
+        Args:
+            track_id: The Spotify track ID
+            
+        Returns:
+            Optional[Dict]: Dictionary with 'video_id' and 'confidence', or None
+        """
+        entry = self.spotify_matches.get(track_id)
+        if isinstance(entry, dict) and entry.get('video_id'):
+            return entry
+        return None
+
+    def add_spotify_match(self, track_id: str, video_id: str, confidence: Optional[float] = None) -> None:
+        """
+        Record the YouTube video chosen for a Spotify track.
+        
+        Args:
+            track_id: The Spotify track ID
+            video_id: The chosen YouTube video ID
+            confidence: Match confidence between 0.0 and 1.0, if scored
+        """
+        if not self._should_continue_check:
+            return
+        self.spotify_matches[track_id] = {
+            'video_id': video_id,
+            'confidence': confidence,
+            'matched_at': time.time()
+        }
+        self._persist('spotify_matches', track_id)
+
+    def get_cached_spotify_playlist(self, playlist_id: str, snapshot_id: str) -> Optional[List[Dict]]:
+        """
+        Get the cached track listing for a Spotify playlist snapshot.
+        
+        Spotify changes a playlist's snapshot_id whenever its contents change,
+        so a listing stored against the current snapshot is still accurate.
+        
+        Args:
+            playlist_id: The Spotify playlist ID
+            snapshot_id: The playlist's current snapshot_id
+            
+        Returns:
+            Optional[List[Dict]]: The cached tracks, or None if missing or stale
+        """
+        if not snapshot_id:
+            return None
+        entry = self.spotify_playlists.get(playlist_id)
+        if isinstance(entry, dict) and entry.get('snapshot_id') == snapshot_id:
+            now = time.time()
+            # Listings can be large, so the access time is only stored now and then
+            if now - entry.get('last_accessed', 0) > PLAYLIST_TOUCH_INTERVAL:
+                entry['last_accessed'] = now
+                self._persist('spotify_playlists', playlist_id)
+            return entry.get('tracks', [])
+        return None
+
+    def add_spotify_playlist(self, playlist_id: str, snapshot_id: str, tracks: List[Dict]) -> None:
+        """
+        Store the track listing for a Spotify playlist snapshot.
+        
+        Args:
+            playlist_id: The Spotify playlist ID
+            snapshot_id: The snapshot_id the listing was fetched at
+            tracks: Compact track dictionaries in playlist order
+        """
+        if not self._should_continue_check or not snapshot_id:
+            return
+        self.spotify_playlists[playlist_id] = {
+            'snapshot_id': snapshot_id,
+            'tracks': tracks,
+            'last_accessed': time.time()
+        }
+        self._persist('spotify_playlists', playlist_id)
+        self._evict_spotify_playlists()
+
+    def _evict_spotify_playlists(self) -> None:
+        """
+        Drop playlist listings that haven't been used for a while.
+
+        Listings not used for CACHE.SPOTIFY_PLAYLIST_MAX_AGE_DAYS are removed,
+        then the least recently used ones beyond CACHE.SPOTIFY_PLAYLIST_LIMIT.
+
+        Runs whenever a listing is added, which is the only way the table grows.
+        """
+        # Imported here: scripts.config imports this module through scripts.logging
+        from scripts.config import config_service
+        limit = config_service.get_int('CACHE.SPOTIFY_PLAYLIST_LIMIT', 100)
+        max_age = config_service.get_float('CACHE.SPOTIFY_PLAYLIST_MAX_AGE_DAYS', 30) * 86400
+
+        def last_accessed(playlist_id):
+            entry = self.spotify_playlists[playlist_id]
+            return entry.get('last_accessed', 0) if isinstance(entry, dict) else 0
+
+        cutoff = time.time() - max_age
+        recent = sorted((playlist_id for playlist_id in self.spotify_playlists if last_accessed(playlist_id) >= cutoff),
+                        key=last_accessed, reverse=True)
+        keep = set(recent[:max(0, limit)])
+        to_remove = [playlist_id for playlist_id in self.spotify_playlists if playlist_id not in keep]
+        if not to_remove:
+            return
+        for playlist_id in to_remove:
+            del self.spotify_playlists[playlist_id]
+        self._persist('spotify_playlists', *to_remove)
+
     def add_to_blacklist(self, video_id: str) -> None:
         """
         Add a video ID to the blacklist with timestamp.
@@ -464,7 +667,7 @@ class PlaylistCache:
             'timestamp': time.time(),
             'reason': 'Video unavailable'
         }
-        self._save_cache()
+        self._persist('blacklist', video_id)
 
     def is_blacklisted(self, video_id: str) -> bool:
         """
@@ -515,7 +718,7 @@ class PlaylistCache:
                     result['last_accessed'] = time.time()
                     # Update cache with new access time
                     self.cache[video_id]['last_accessed'] = time.time()
-                    self._save_cache()
+                    self._persist('cache', video_id)
                     return result
         
         # Search Spotify cache if YouTube cache didn't find anything
@@ -536,7 +739,7 @@ class PlaylistCache:
                     result['last_accessed'] = time.time()
                     # Update cache with new access time
                     self.spotify_cache[track_id]['last_accessed'] = time.time()
-                    self._save_cache()
+                    self._persist('spotify_cache', track_id)
                     return result
         
         return None
@@ -1,6 +1,7 @@
 from datetime import datetime
 import os
 from scripts.constants import BLUE, GREEN, RESET
+from scripts.log_writer import log_writer
 
 class CommandLogger:
     """
@@ -8,7 +9,8 @@ class CommandLogger:
     
     This class provides functionality to log commands used in the bot,
     recording the username, command, server name, and timestamp.
-    Logs are written to a file and also printed to the console.
+    Logs are queued for the log writer (see scripts/log_writer.py) and
+    also printed to the console.
     """
     
     def __init__(self):
@@ -25,7 +27,7 @@ class CommandLogger:
         """
         Log a command with username and timestamp to the command log file.
         
-        This method writes a log entry to the command log file and also prints
+        This method queues a log entry for the command log file and also prints
         the command usage to the console with color formatting. The log entry
         includes the timestamp, username, command, and server name.
         
@@ -38,12 +40,8 @@ class CommandLogger:
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             log_entry = f"{timestamp} - {username} has used command {command} in server: {server_name}\n"
             
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
-            
-            # Append the log entry to the file
-            with open(self.log_path, 'a', encoding='utf-8') as f:
-                f.write(log_entry)
+            # Queue the log entry; the log writer appends it to the file
+            log_writer.write(self.log_path, log_entry)
             
             # Print to console in the requested format
             print(f"{BLUE}[{username}]{RESET} {GREEN}used the command:{RESET}{BLUE} {command}{RESET}{GREEN} in server: {RESET}{BLUE}{server_name}{RESET}")
@@ -1,11 +1,14 @@
 import json
 import os
+import threading
+import time
 from time import sleep
+from typing import Any, Callable, Dict, List, Optional
 from scripts.logging import get_ytdlp_logger
 from scripts.paths import get_ytdlp_path, get_ffmpeg_path, get_ffprobe_path, get_cache_dir, get_root_dir
 from scripts.js_runtime import get_js_runtime_config, ensure_ejs_installed
 from scripts.constants import RED, GREEN, BLUE, RESET, YELLOW
-import psutil
+from scripts.startup_timing import startup_timer
 from pathlib import Path
 
 # Get the absolute path to the cache directory
@@ -23,9 +26,12 @@ for subdir in ['youtube-sigfuncs', 'youtube-nsig']:
         os.remove(cache_subdir)  # Remove if it's a file
     os.makedirs(cache_subdir, exist_ok=True)
 
-def load_config():
+# Absolute path to config.json in the root directory
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
+
+def read_config_file(config_path=CONFIG_PATH):
     """
-    Load or create the configuration file.
+    Read or create the configuration file.
     
     This function loads the config.json file from the root directory.
     If the file doesn't exist, it creates a new one with default values.
@@ -34,8 +40,11 @@ def load_config():
     Note: Server-specific prefixes are stored separately in server_prefixes.json
     and can be modified using the prefix command.
     
+    Args:
+        config_path (str): Path to the config file
+    
     Returns:
-        dict: A dictionary containing all configuration values
+        tuple: (flattened config used by load_config(), full config as stored in the file)
     """
     default_config = {
         "OWNER_ID": "220301180562046977",               # Owner ID
@@ -51,6 +60,7 @@ def load_config():
             "STALE_DOWNLOAD_TIMEOUT": 300,              # Timeout for stale downloads before resetting (seconds)
             "AUTO_LEAVE_EMPTY": True,                   # if True, leave voice channel when it is empty
             "DEFAULT_VOLUME": 100,                      # default volume for voice connections
+            "MAX_VOLUME": 200,                          # highest volume the volume command accepts (percent)
             "CONNECT_TIMEOUT": 10.0,                    # Timeout for connecting to voice channel
             "DISCONNECT_TIMEOUT": 5.0,                  # Timeout for disconnecting from voice channel
         },
@@ -68,6 +78,10 @@ def load_config():
             "BUFFER_SIZE": 8192,                        # Buffer size for downloads
             "MAX_WAIT_FOR_DOWNLOAD": 5,                 # Max seconds to wait for download to start
             "STALE_FLAG_TIMEOUT": 300,                  # Seconds before resetting stale download flag
+            "SPOTIFY_PAGE_CONCURRENCY": 4,              # Max Spotify playlist/album pages fetched in parallel
+            "SPOTIFY_RESOLVE_CONCURRENCY": 8,           # Max concurrent YouTube searches for uncached Spotify tracks
+            "SPOTIFY_MATCH_CANDIDATES": 5,              # YouTube results scored when matching a Spotify track
+            "SPOTIFY_MATCH_MIN_SCORE": 0.6,             # Match confidence needed to remember a Spotify to YouTube match
         },
         "MESSAGES": {
             "SHOW_PROGRESS_BAR": True,                  # if True, show download progress bar in Discord messages
@@ -100,6 +114,10 @@ def load_config():
         "QUEUE": {
             "PAGE_SIZE": 10,                            # Number of songs per page in queue display
             "DEFAULT_SKIP_AMOUNT": 1,                   # Default number of songs to skip
+            "JOURNAL": True,                            # if True, journal queues to disk so they can be restored after a restart
+            "JOURNAL_FLUSH_INTERVAL": 1.0,              # Seconds between batched journal writes
+            "JOURNAL_COMPACT_AFTER": 500,               # Journal entries written before a journal is compacted
+            "JOURNAL_CHECKPOINT_INTERVAL": 5,           # Seconds between playback position checkpoints
         },
         "SEARCH": {
             "RESULTS_LIMIT": 5,                         # Maximum number of search results to show
@@ -109,7 +127,10 @@ def load_config():
             "TRANSITION_DELAY": 0.5,                    # Delay between songs (seconds)
             "DOWNLOAD_WAIT": 1.0,                       # Wait time for download queue
             "DEFAULT_LOOP_COUNT": 999,                  # Default loop count (effectively infinite)
+            "LOOP_BUFFER_MB": 32,                       # Max memory per looped song kept for replay without ffmpeg
             "PROGRESS_BAR_SEGMENTS": 20,                # Number of segments in now playing progress bar
+            "GAPLESS": True,                            # Hand off to a pre-spawned next song without a gap
+            "GAPLESS_PRELOAD": 5,                       # Seconds before the end to spawn the next song
         },
         "SEEK": {
             "DEFAULT_FORWARD": 10,                      # Default forward seek amount (seconds)
@@ -137,17 +158,30 @@ def load_config():
         },
         "LOGGING": {
             "MAX_LOG_LINES": 1000,                      # Max lines to read from log file
-            "FILE_CHUNK_SIZE": 8192,                    # Chunk size for reading log files
             "THROTTLE_INTERVAL": 10,                    # Connection message throttle interval (seconds)
+            "FLUSH_INTERVAL": 1.0,                      # Seconds between batched writes to the log files
+            "MAX_BYTES": 10485760,                      # Size a log file is compressed and rotated at (10MB default)
+            "BACKUP_COUNT": 5,                          # Number of compressed log archives kept per log file
         },
         "CACHE": {
             "CHUNK_SIZE": 10,                           # Number of files to process at once when importing cache
+            "SPOTIFY_PLAYLIST_LIMIT": 100,              # Max Spotify playlist listings kept (least recently used are dropped)
+            "SPOTIFY_PLAYLIST_MAX_AGE_DAYS": 30,        # Drop playlist listings not used for this many days
         },
         "AUDIO": {
             "MAX_BITRATE": 96,                          # Maximum audio bitrate (kbps)
             "FFMPEG_BITRATE": "96k",                    # FFmpeg audio bitrate
             "PLAYBACK_BUFFER": "128k",                  # Playback buffer size
             "RECONNECT_DELAY_MAX": 5,                   # Max reconnect delay (seconds)
+            "OPUS_PASSTHROUGH": True,                   # Send 48 kHz Opus files without re-encoding (skips the equalizer)
+            "FFMPEG_MAX_THREADS": 2,                    # Max threads per playback ffmpeg (shared between streams)
+            "FFMPEG_NICE": 0,                           # Niceness for playback ffmpeg processes (0 = unchanged)
+            "FFMPEG_PIN_CORES": False,                  # Pin each playback ffmpeg process to one core
+            "LOUDNESS_NORMALIZATION": True,             # Apply a precomputed EBU R128 gain to cached tracks (baked into Opus files)
+            "LOUDNESS_TARGET": -14.0,                   # Target integrated loudness (LUFS)
+            "LOUDNESS_MAX_GAIN": 12.0,                  # Max normalization gain in either direction (dB)
+            "READ_AHEAD_MS": 500,                       # Audio buffered ahead of the player thread (0 = read directly)
+            "TRANSCODE_ON_INGEST": False,               # Convert new downloads to 48 kHz Opus at MAX_BITRATE in the background
         },
         "RADIO": {
             "MAX_RETRIES": 3,                           # Max retries for radio stations
@@ -173,9 +207,6 @@ def load_config():
         },
     }
 
-    # Get absolute path to config.json in root directory
-    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
-
     # Create default config if it doesn't exist
     if not os.path.exists(config_path):
         with open(config_path, 'w') as f:
@@ -258,42 +289,255 @@ def load_config():
     flattened['PERMISSIONS'] = config.get('PERMISSIONS', default_config['PERMISSIONS'])
     flattened['AUDIO'] = config.get('AUDIO', default_config['AUDIO'])
     flattened['APIS'] = config.get('APIS', default_config['APIS'])
-    return flattened
+    flattened['QUEUE'] = config.get('QUEUE', default_config['QUEUE'])
+    return flattened, config
+
+
+class ConfigService:
+    """
+    Process-wide configuration, read once and reloaded when config.json changes.
+
+    load_config() used to re-read and re-sync config.json on every call, and it
+    is called per command, per voice event and from most cog constructors. The
+    service keeps the parsed config in memory; callers get the same dict until
+    the file's modification time changes, which is checked at most once every
+    CHECK_INTERVAL seconds. A reload builds the new config completely before
+    swapping it in, so readers never see a half-loaded file, and then calls the
+    subscribers so values derived from the config (FFmpeg and yt-dlp options)
+    follow the file without a restart.
+
+    The returned dicts are shared; treat them as read-only.
+    """
+
+    CHECK_INTERVAL = 1.0  # Seconds between modification time checks
+
+    def __init__(self, config_path: str = CONFIG_PATH):
+        """
+        Initialize the service.
+
+        Args:
+            config_path: Path to the config file
+        """
+        self.config_path = config_path
+        self._config = None  # Flattened config returned by get()
+        self._raw = None  # Full config as stored in the file
+        self._mtime = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[dict, dict], None]] = []
+
+    def _file_mtime(self) -> Optional[float]:
+        """Get the config file's modification time, or None if it doesn't exist."""
+        try:
+            return os.stat(self.config_path).st_mtime
+        except OSError:
+            return None
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Read the config file again if it changed.
+
+        Args:
+            force: Read the file even if its modification time is unchanged
+
+        Returns:
+            bool: True if the config was reloaded
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            mtime = self._file_mtime()
+            if not force and self._config is not None and mtime == self._mtime:
+                return False
+            try:
+                config, raw = read_config_file(self.config_path)
+            except (OSError, ValueError) as e:
+                if self._config is None:
+                    raise
+                # Keep the last good config while the file is being edited
+                print(f"{RED}Error reloading config: {str(e)}{RESET}")
+                self._mtime = mtime
+                return False
+            old_raw = self._raw
+            self._config, self._raw = config, raw
+            # Syncing missing keys may have rewritten the file
+            self._mtime = self._file_mtime()
+            subscribers = list(self._subscribers) if old_raw is not None and old_raw != raw else []
+        for callback in subscribers:
+            try:
+                callback(raw, old_raw)
+            except Exception as e:
+                print(f"{RED}Error applying config change: {str(e)}{RESET}")
+        return True
+
+    def get(self) -> dict:
+        """
+        Get the config in the format load_config() has always returned.
+
+        Returns:
+            dict: The flattened config
+        """
+        if self._config is None or time.monotonic() - self._checked >= self.CHECK_INTERVAL:
+            self.reload()
+        return self._config
+
+    def subscribe(self, callback: Callable[[dict, dict], None]) -> None:
+        """
+        Call a function whenever the config file changes.
+
+        Args:
+            callback: Called with the new and the previous full config
+        """
+        self._subscribers.append(callback)
+
+    def value(self, path: str, default: Any = None) -> Any:
+        """
+        Look a value up by its dotted path, for example 'VOICE.DEFAULT_VOLUME'.
+
+        Unlike load_config(), this reads every section of the file.
+
+        Args:
+            path: Keys separated by dots
+            default: Returned if the key is missing
+
+        Returns:
+            The configured value or the default
+        """
+        self.get()
+        value = self._raw
+        for key in path.split('.'):
+            if not isinstance(value, dict) or key not in value:
+                return default
+            value = value[key]
+        return value
+
+    def get_str(self, path: str, default: str = '') -> str:
+        """Get a string setting."""
+        value = self.value(path, default)
+        return default if value is None else str(value)
+
+    def get_int(self, path: str, default: int = 0) -> int:
+        """Get an integer setting, falling back to the default if it isn't a number."""
+        try:
+            return int(self.value(path, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_float(self, path: str, default: float = 0.0) -> float:
+        """Get a number setting, falling back to the default if it isn't a number."""
+        try:
+            return float(self.value(path, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_bool(self, path: str, default: bool = False) -> bool:
+        """Get a true/false setting; strings such as "false" and "0" count as False."""
+        value = self.value(path, default)
+        if isinstance(value, str):
+            return value.strip().lower() not in ('', '0', 'false', 'no', 'off')
+        return bool(value)
+
+    def get_list(self, path: str, default: list = None) -> list:
+        """Get a list setting."""
+        value = self.value(path, default)
+        return list(value) if isinstance(value, (list, tuple)) else list(default or [])
+
+    def section(self, name: str) -> Dict[str, Any]:
+        """Get a whole section, such as 'QUEUE', as a dict."""
+        value = self.value(name, {})
+        return value if isinstance(value, dict) else {}
+
+
+# Global instance
+config_service = ConfigService()
+
+def load_config():
+    """
+    Get the configuration.
+    
+    The config is read once and kept in memory by config_service, which
+    reloads it when config.json changes. The returned dict is shared between
+    callers and must not be modified.
+    
+    Returns:
+        dict: A dictionary containing all configuration values
+    """
+    return config_service.get()
         
-# Get paths to external tools
-FFMPEG_PATH = get_ffmpeg_path()  # Path to ffmpeg executable
-FFPROBE_PATH = get_ffprobe_path()  # Path to ffprobe executable
-YTDLP_PATH = get_ytdlp_path()  # Path to yt-dlp executable
+with startup_timer.phase('tool discovery'):
+    # Get paths to external tools
+    FFMPEG_PATH = get_ffmpeg_path()  # Path to ffmpeg executable
+    FFPROBE_PATH = get_ffprobe_path()  # Path to ffprobe executable
+    YTDLP_PATH = get_ytdlp_path()  # Path to yt-dlp executable
+
+    # Check for JavaScript runtime (needed for YouTube challenge solving) - silent check
+    # The detection is cached in .cache/tool_probes.json, see scripts/tool_cache.py
+    ensure_ejs_installed(verbose=False)
+    JS_RUNTIME_CONFIG = get_js_runtime_config(verbose=False)
 
 # Get path to cookies file
 COOKIES_PATH = os.path.join(get_root_dir(), 'cookies.txt')  # Path to cookies file
 
-# Check for JavaScript runtime (needed for YouTube challenge solving) - silent check
-ensure_ejs_installed(verbose=False)
-JS_RUNTIME_CONFIG = get_js_runtime_config(verbose=False)
-
 # Export config variables for other modules to use
 config_vars = load_config()
 
 # Get config for volume
 DEFAULT_VOLUME = config_vars.get('VOICE', {}).get('DEFAULT_VOLUME', 100)
-# Convert DEFAULT_VOLUME from percentage (0-100) to float (0.0-1.0)
-volume_float = DEFAULT_VOLUME / 100.0  # This makes 100% = 1.0, 75% = 0.75, 50% = 0.5, etc.
 
-# Get download config values
-_downloads_config = config_vars.get('DOWNLOADS', {})
-_audio_config = config_vars.get('AUDIO', {})
-_apis_config = config_vars.get('APIS', {})
+def _download_options(config):
+    """
+    Get the yt-dlp options that come from the DOWNLOADS section.
+
+    Args:
+        config (dict): The configuration
+
+    Returns:
+        dict: yt-dlp options
+    """
+    downloads_config = config.get('DOWNLOADS', {})
+    return {
+        'concurrent_fragments': downloads_config.get('CONCURRENT_FRAGMENTS', 8),  # Number of fragments to download concurrently
+        'concurrent-downloads': downloads_config.get('CONCURRENT_DOWNLOADS', 4),  # Number of files to download concurrently
+        'fragment_retries': downloads_config.get('FRAGMENT_RETRIES', 10),  # Number of retries for each fragment
+        'retries': downloads_config.get('FILE_RETRIES', 5),  # Number of retries for the whole file
+        'buffersize': downloads_config.get('BUFFER_SIZE', 8192),  # Buffer size for downloads
+        'http_chunk_size': downloads_config.get('HTTP_CHUNK_SIZE', 1048576),  # HTTP chunk size (1MB)
+        'extractor_retries': downloads_config.get('EXTRACTOR_RETRIES', 3),  # Number of retries for extractors
+        'socket_timeout': downloads_config.get('SOCKET_TIMEOUT', 10),  # Socket timeout in seconds
+    }
+
+def _sponsorblock_options(config):
+    """
+    Get the yt-dlp options that enable SponsorBlock.
+
+    Args:
+        config (dict): The configuration
+
+    Returns:
+        dict: yt-dlp options, empty if SponsorBlock is disabled
+    """
+    if not config.get('SPONSORBLOCK', False):
+        return {}
+    sponsorblock_url = config.get('APIS', {}).get('SPONSORBLOCK_URL', 'https://sponsor.ajay.app')
+    sponsorblock_categories = config.get('SPONSORBLOCK_CATEGORIES', ['sponsor', 'intro', 'outro', 'selfpromo', 'interaction', 'music_offtopic'])
+    return {
+        'sponsorblock_remove': sponsorblock_categories,  # Types of segments to remove (from config)
+        'sponsorblock_api': sponsorblock_url,  # SponsorBlock API URL (from config)
+        'postprocessors': [{
+            'key': 'SponsorBlock',  # SponsorBlock postprocessor
+            'when': 'before_dl',  # Apply before download
+            'api': sponsorblock_url,  # SponsorBlock API URL (from config)
+            'categories': sponsorblock_categories  # Categories to remove (from config)
+        }, {
+            'key': 'ModifyChapters',  # ModifyChapters postprocessor
+            'remove_sponsor_segments': sponsorblock_categories  # Segments to remove from chapters (from config)
+        }]
+    }
 
 # Base yt-dlp options for downloading content
 BASE_YTDL_OPTIONS = {
     'format': 'bestaudio[abr<=64]/bestaudio[abr<=72]/bestaudio[abr<=80]/bestaudio[abr<=88]/bestaudio[abr<=96]/bestaudio/worst', # Try different audio bitrates, fallback to worst if all fail
     'outtmpl': '%(id)s.%(ext)s',  # Output filename template
     'extract_audio': True,  # Extract audio from video
-    'concurrent_fragments': _downloads_config.get('CONCURRENT_FRAGMENTS', 8),  # Number of fragments to download concurrently
-    'concurrent-downloads': _downloads_config.get('CONCURRENT_DOWNLOADS', 4),  # Number of files to download concurrently
-    'fragment_retries': _downloads_config.get('FRAGMENT_RETRIES', 10),  # Number of retries for each fragment
-    'retries': _downloads_config.get('FILE_RETRIES', 5),  # Number of retries for the whole file
     'abort_on_unavailable_fragments': True,  # Abort download if fragments are unavailable
     'nopostoverwrites': True,  # Do not overwrite files
     'windowsfilenames': True,  # Use Windows-compatible filenames
@@ -309,66 +553,100 @@ BASE_YTDL_OPTIONS = {
     'ffmpeg_location': FFMPEG_PATH,  # Path to ffmpeg
     'ffprobe_location': FFPROBE_PATH,  # Path to ffprobe
     'yt_dlp_filename': YTDLP_PATH,  # Path to yt-dlp
-    'buffersize': _downloads_config.get('BUFFER_SIZE', 8192),  # Buffer size for downloads
-    'http_chunk_size': _downloads_config.get('HTTP_CHUNK_SIZE', 1048576),  # HTTP chunk size (1MB)
     'cachedir': CACHE_DIR,  # Cache directory
     'write_download_archive': True,  # Write download archive
     'player_client': 'web',  # Pretend to be a web client
     'player_skip': ['mweb', 'android', 'ios'],  # Skip mobile clients
-    'extractor_retries': _downloads_config.get('EXTRACTOR_RETRIES', 3),  # Number of retries for extractors
     'geo_bypass': True,  # Bypass geographic restrictions
-    'socket_timeout': _downloads_config.get('SOCKET_TIMEOUT', 10),  # Socket timeout in seconds
     'ignore_no_formats_error': True,  # Ignore errors when no formats are available
     'ignore_unavailable_video': True,  # Ignore unavailable videos
     'cookiefile': COOKIES_PATH if os.path.exists(COOKIES_PATH) else None,  # Path to cookies file
     'remote_components': ['ejs:github'],  # Auto-download EJS challenge solver scripts from GitHub if not found locally
 }
 
+# Add the download settings from config
+BASE_YTDL_OPTIONS.update(_download_options(config_vars))
+
 # Add JavaScript runtime configuration if available
 if JS_RUNTIME_CONFIG:
     BASE_YTDL_OPTIONS['js_runtimes'] = JS_RUNTIME_CONFIG
 
 # Add SponsorBlock configuration if enabled in config
-if config_vars.get('SPONSORBLOCK', False):
-    _sponsorblock_url = _apis_config.get('SPONSORBLOCK_URL', 'https://sponsor.ajay.app')
-    _sponsorblock_categories = config_vars.get('SPONSORBLOCK_CATEGORIES', ['sponsor', 'intro', 'outro', 'selfpromo', 'interaction', 'music_offtopic'])
-    sponsorblock_config = {
-        'sponsorblock_remove': _sponsorblock_categories,  # Types of segments to remove (from config)
-        'sponsorblock_api': _sponsorblock_url,  # SponsorBlock API URL (from config)
-        'postprocessors': [{
-            'key': 'SponsorBlock',  # SponsorBlock postprocessor
-            'when': 'before_dl',  # Apply before download
-            'api': _sponsorblock_url,  # SponsorBlock API URL (from config)
-            'categories': _sponsorblock_categories  # Categories to remove (from config)
-        }, {
-            'key': 'ModifyChapters',  # ModifyChapters postprocessor
-            'remove_sponsor_segments': _sponsorblock_categories  # Segments to remove from chapters (from config)
-        }]
-    }
-    BASE_YTDL_OPTIONS.update(sponsorblock_config)
+BASE_YTDL_OPTIONS.update(_sponsorblock_options(config_vars))
 
 # For backward compatibility
 YTDL_OPTIONS = BASE_YTDL_OPTIONS
 
 # FFmpeg options for audio playback
-_ffmpeg_bitrate = _audio_config.get('FFMPEG_BITRATE', '96k')
-_reconnect_delay = _audio_config.get('RECONNECT_DELAY_MAX', 5)
-_buffer_size = _audio_config.get('PLAYBACK_BUFFER', '128k')
+def _ffmpeg_options(config):
+    """
+    Build the FFmpeg output options for audio playback.
 
-FFMPEG_OPTIONS = {
-    'executable': FFMPEG_PATH,  # Path to ffmpeg executable
-    'options': (
-        f'-loglevel {config_vars["LOG_LEVEL"].lower()} -v quiet -hide_banner '  # Set logging level and reduce console output
+    Args:
+        config (dict): The configuration
+
+    Returns:
+        str: FFmpeg options
+    """
+    audio_config = config.get('AUDIO', {})
+    ffmpeg_bitrate = audio_config.get('FFMPEG_BITRATE', '96k')
+    reconnect_delay = audio_config.get('RECONNECT_DELAY_MAX', 5)
+    buffer_size = audio_config.get('PLAYBACK_BUFFER', '128k')
+    return (
+        f'-loglevel {config.get("LOG_LEVEL", "INFO").lower()} -v quiet -hide_banner '  # Set logging level and reduce console output
         '-vn '  # Disable video processing completely
-        f'-b:a {_ffmpeg_bitrate} '  # Set audio bitrate (from config)
+        f'-b:a {ffmpeg_bitrate} '  # Set audio bitrate (from config)
         '-reconnect 1 '  # Enable reconnection if the connection is lost
         '-reconnect_streamed 1 '  # Enable reconnection for streamed content
-        f'-reconnect_delay_max {_reconnect_delay} '  # Maximum delay between reconnection attempts (from config)
-        f'-threads {psutil.cpu_count(logical=True)} '  # Use all available CPU threads for processing
+        f'-reconnect_delay_max {reconnect_delay} '  # Maximum delay between reconnection attempts (from config)
         '-af '  # Begin audio filter chain
         'aresample=async=1:min_hard_comp=0.100000:max_soft_comp=0.100000:first_pts=0,'  # Resample audio with async mode to handle timing issues
         'equalizer=f=100:t=h:width=200:g=-3,'  # Apply high-shelf equalizer at 100Hz with -3dB gain
-        f'volume={volume_float} '  # Apply volume adjustment from config
-        f'-buffer_size {_buffer_size}'  # Set buffer size (from config)
-    ),
-}
\ No newline at end of file
+        'volume=1.0 '  # Loudness gain is folded in per track; playback volume is applied per guild by TrackedAudioSource
+        f'-buffer_size {buffer_size}'  # Set buffer size (from config)
+    )
+
+def _passthrough_options(config):
+    """
+    Build the FFmpeg output options for Opus passthrough playback.
+
+    Args:
+        config (dict): The configuration
+
+    Returns:
+        str: FFmpeg options
+    """
+    return f'-loglevel {config.get("LOG_LEVEL", "INFO").lower()} -v quiet -hide_banner -vn'  # Quiet output, audio only
+
+FFMPEG_OPTIONS = {
+    'executable': FFMPEG_PATH,  # Path to ffmpeg executable
+    'options': _ffmpeg_options(config_vars),
+}
+
+# FFmpeg options for Opus passthrough playback (packets are copied, no filters)
+FFMPEG_PASSTHROUGH_OPTIONS = {
+    'executable': FFMPEG_PATH,  # Path to ffmpeg executable
+    'codec': 'copy',  # Copy Opus packets instead of decoding and re-encoding
+    'options': _passthrough_options(config_vars),
+}
+
+def _apply_config_change(config, old_config):
+    """
+    Update the derived yt-dlp and FFmpeg options after config.json changed.
+
+    The option dicts are updated in place, so modules that imported them
+    use the new values for the next download or song.
+
+    Args:
+        config (dict): The new configuration
+        old_config (dict): The previous configuration
+    """
+    BASE_YTDL_OPTIONS.update(_download_options(config))
+    for key in _sponsorblock_options(old_config):
+        BASE_YTDL_OPTIONS.pop(key, None)
+    BASE_YTDL_OPTIONS.update(_sponsorblock_options(config))
+    FFMPEG_OPTIONS['options'] = _ffmpeg_options(config)
+    FFMPEG_PASSTHROUGH_OPTIONS['options'] = _passthrough_options(config)
+    print(f"{GREEN}Config reloaded:{RESET} {BLUE}{config_service.config_path}{RESET}")
+
+config_service.subscribe(_apply_config_change)
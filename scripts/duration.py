@@ -1,6 +1,17 @@
 import json
+import os
+import re
+import struct
 import asyncio
-from typing import Optional, Union
+from typing import Dict, Optional, Union
+from scripts.config import FFMPEG_PATH
+
+# Most files per ffmpeg process when probing durations in a batch
+PROBE_BATCH_SIZE = 32
+
+# Start of each input's section and its "Duration: HH:MM:SS.xx" line in ffmpeg's banner
+_INPUT_RE = re.compile(r'^Input #(\d+),', re.MULTILINE)
+_DURATION_RE = re.compile(r'Duration: (\d+):(\d+):([\d.]+)')
 
 
 def format_duration(seconds: Union[int, float], always_show_hours: bool = False) -> str:
@@ -26,19 +37,178 @@ def format_duration(seconds: Union[int, float], always_show_hours: bool = False)
     return f"{minutes:02d}:{secs:02d}"
 
 
-async def get_audio_duration(file_path) -> float:
+# Durations keyed by (path, mtime), shared by every server
+_duration_cache = {}
+
+# Bytes read from either end of a file when parsing container headers
+HEADER_READ_SIZE = 64 * 1024
+
+# Matroska/WebM element IDs
+_EBML_HEADER = 0x1A45DFA3
+_EBML_SEGMENT = 0x18538067
+_EBML_INFO = 0x1549A966
+_EBML_TIMECODE_SCALE = 0x2AD7B1
+_EBML_DURATION = 0x4489
+_EBML_CLUSTER = 0x1F43B675
+
+
+def _read_ebml_vint(data: bytes, pos: int, keep_marker: bool = False):
     """
-    Get audio file duration using an optimized ffprobe command asynchronously.
-    
-    This function uses ffprobe to extract the duration of an audio file without
-    loading the entire file into memory. It runs ffprobe as a subprocess and
-    parses the JSON output to extract the duration value.
-    
+    Read an EBML variable-length integer.
+
+    Args:
+        data: The buffer to read from
+        pos: Offset of the integer
+        keep_marker: Keep the length marker bit (used for element IDs)
+
+    Returns:
+        tuple: (value, offset after the integer, whether all value bits are set)
+    """
+    first = data[pos]
+    if first == 0:
+        raise ValueError("Invalid EBML integer")
+    length = 9 - first.bit_length()
+    value = first if keep_marker else first & ((1 << (8 - length)) - 1)
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    unknown = not keep_marker and value == (1 << (7 * length)) - 1
+    return value, pos + length, unknown
+
+
+def _parse_webm_duration(head: bytes) -> Optional[float]:
+    """Read the duration from the Segment Info element of a WebM/Matroska file."""
+    pos = 0
+    element_id, pos, _ = _read_ebml_vint(head, pos, keep_marker=True)
+    if element_id != _EBML_HEADER:
+        return None
+    size, pos, _ = _read_ebml_vint(head, pos)
+    pos += size
+    element_id, pos, _ = _read_ebml_vint(head, pos, keep_marker=True)
+    if element_id != _EBML_SEGMENT:
+        return None
+    _, pos, _ = _read_ebml_vint(head, pos)
+
+    # Walk the segment's children until Info; it comes before the first cluster
+    while pos < len(head):
+        element_id, pos, _ = _read_ebml_vint(head, pos, keep_marker=True)
+        size, pos, unknown = _read_ebml_vint(head, pos)
+        if element_id == _EBML_CLUSTER or unknown:
+            return None
+        if element_id != _EBML_INFO:
+            pos += size
+            continue
+        end = min(pos + size, len(head))
+        scale = 1000000
+        duration = None
+        while pos < end:
+            child_id, pos, _ = _read_ebml_vint(head, pos, keep_marker=True)
+            child_size, pos, _ = _read_ebml_vint(head, pos)
+            payload = head[pos:pos + child_size]
+            if child_id == _EBML_TIMECODE_SCALE:
+                scale = int.from_bytes(payload, 'big')
+            elif child_id == _EBML_DURATION and child_size in (4, 8):
+                duration = struct.unpack('>f' if child_size == 4 else '>d', payload)[0]
+            pos += child_size
+        return duration * scale / 1e9 if duration else None
+    return None
+
+
+def _parse_ogg_duration(f, head: bytes, file_size: int) -> Optional[float]:
+    """Read the duration of an Ogg Opus/Vorbis file from its last granule position."""
+    if b'OpusHead' in head[:512]:
+        index = head.index(b'OpusHead')
+        pre_skip = int.from_bytes(head[index + 10:index + 12], 'little')
+        rate = 48000
+    elif b'\x01vorbis' in head[:512]:
+        index = head.index(b'\x01vorbis')
+        pre_skip = 0
+        rate = int.from_bytes(head[index + 12:index + 16], 'little')
+    else:
+        return None
+    if not rate:
+        return None
+
+    f.seek(max(0, file_size - HEADER_READ_SIZE))
+    tail = f.read(HEADER_READ_SIZE)
+    index = tail.rfind(b'OggS')
+    while index >= 0:
+        granule = int.from_bytes(tail[index + 6:index + 14], 'little', signed=True)
+        if granule > 0:
+            return max(0, granule - pre_skip) / rate
+        index = tail.rfind(b'OggS', 0, index)
+    return None
+
+
+def _parse_mp4_duration(f, file_size: int) -> Optional[float]:
+    """Read the duration from the mvhd box of an MP4/M4A file."""
+    offset = 0
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        header = f.read(16)
+        size, box_type = struct.unpack('>I4s', header[:8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - offset
+        if size < header_size:
+            return None
+        if box_type == b'moov':
+            f.seek(offset + header_size)
+            moov = f.read(min(size - header_size, HEADER_READ_SIZE))
+            index = moov.find(b'mvhd')
+            if index < 4:
+                return None
+            body = moov[index + 4:]
+            if body[0] == 1:
+                timescale, duration = struct.unpack('>IQ', body[20:32])
+            else:
+                timescale, duration = struct.unpack('>II', body[12:20])
+            return duration / timescale if timescale else None
+        offset += size
+    return None
+
+
+def parse_container_duration(file_path) -> Optional[float]:
+    """
+    Read an audio file's duration from its container headers without ffprobe.
+
+    Supports WebM/Matroska, Ogg (Opus and Vorbis) and MP4/M4A, which covers
+    what yt-dlp downloads. Only the start (and for Ogg the end) of the file
+    is read.
+
     Args:
         file_path: Path to the audio file
-        
+
     Returns:
-        float: Duration of the audio file in seconds, or 0.0 if an error occurs
+        Optional[float]: Duration in seconds, or None if the format isn't
+            supported or the headers can't be parsed
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(HEADER_READ_SIZE)
+            file_size = os.fstat(f.fileno()).st_size
+            if head[:4] == b'\x1a\x45\xdf\xa3':
+                return _parse_webm_duration(head)
+            if head[:4] == b'OggS':
+                return _parse_ogg_duration(f, head, file_size)
+            if head[4:8] == b'ftyp':
+                return _parse_mp4_duration(f, file_size)
+    except (OSError, ValueError, IndexError, struct.error):
+        pass
+    return None
+
+
+async def _probe_duration(file_path) -> float:
+    """
+    Get one file's duration with ffprobe.
+
+    Args:
+        file_path: Path to the audio file
+
+    Returns:
+        float: Duration in seconds, or 0.0 if an error occurs
     """
     try:
         process = await asyncio.create_subprocess_exec(
@@ -60,3 +230,220 @@ async def get_audio_duration(file_path) -> float:
     except Exception as e:
         print(f"Error getting audio duration: {e}")
         return 0.0
+
+
+async def _probe_durations(file_paths) -> Dict[str, float]:
+    """
+    Get several files' durations from one ffmpeg process.
+
+    ffprobe only accepts one input, but ffmpeg prints the duration of every
+    input before complaining that there is no output, so a single process
+    covers the whole batch. Files it can't report fall back to ffprobe.
+
+    Args:
+        file_paths: Paths to the audio files
+
+    Returns:
+        Dict[str, float]: Duration in seconds by path (0.0 on failure)
+    """
+    file_paths = list(file_paths)
+    if len(file_paths) == 1:
+        return {file_paths[0]: await _probe_duration(file_paths[0])}
+
+    results = {}
+    try:
+        command = [FFMPEG_PATH or 'ffmpeg', '-hide_banner', '-nostdin']
+        for file_path in file_paths:
+            command += ['-i', str(file_path)]
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        output = stderr.decode(errors='ignore')
+        inputs = list(_INPUT_RE.finditer(output))
+        for i, match in enumerate(inputs):
+            index = int(match.group(1))
+            section_end = inputs[i + 1].start() if i + 1 < len(inputs) else len(output)
+            duration = _DURATION_RE.search(output, match.end(), section_end)
+            if duration and index < len(file_paths):
+                hours, minutes, seconds = duration.groups()
+                results[file_paths[index]] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except Exception as e:
+        print(f"Error getting audio durations: {e}")
+
+    for file_path in file_paths:
+        if file_path not in results:
+            results[file_path] = await _probe_duration(file_path)
+    return results
+
+
+class _ProbeBatcher:
+    """
+    Collects ffprobe fallbacks requested in the same event loop iteration.
+
+    Callers that look up durations in a loop or with asyncio.gather share a
+    single ffmpeg process instead of spawning one each.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._scheduled = False
+
+    def probe(self, file_path) -> asyncio.Future:
+        """
+        Request a file's duration.
+
+        Args:
+            file_path: Path to the audio file
+
+        Returns:
+            asyncio.Future: Resolves to the duration in seconds
+        """
+        loop = asyncio.get_running_loop()
+        future = self._pending.get(file_path)
+        if future is None:
+            future = loop.create_future()
+            self._pending[file_path] = future
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(lambda: asyncio.ensure_future(self._flush()))
+        return future
+
+    async def _flush(self) -> None:
+        """Probe every pending file, in batches of PROBE_BATCH_SIZE."""
+        pending, self._pending = self._pending, {}
+        self._scheduled = False
+        paths = list(pending)
+        for i in range(0, len(paths), PROBE_BATCH_SIZE):
+            batch = paths[i:i + PROBE_BATCH_SIZE]
+            try:
+                results = await _probe_durations(batch)
+            except Exception as e:
+                print(f"Error getting audio durations: {e}")
+                results = {}
+            for file_path in batch:
+                if not pending[file_path].done():
+                    pending[file_path].set_result(results.get(file_path, 0.0))
+
+
+_probe_batcher = _ProbeBatcher()
+
+
+def _duration_cache_key(file_path):
+    """Get the memo key for a file, or None if it isn't a local file."""
+    try:
+        return (str(file_path), os.path.getmtime(file_path))
+    except (OSError, TypeError, ValueError):
+        return None
+
+
+async def get_audio_durations(file_paths) -> Dict[str, float]:
+    """
+    Get the durations of several audio files.
+
+    Headers are parsed in-process where possible and the rest are probed by
+    a single ffmpeg process. Results are memoized by path and modification
+    time.
+
+    Args:
+        file_paths: Paths to the audio files
+
+    Returns:
+        Dict[str, float]: Duration in seconds by path (0.0 if unknown)
+    """
+    results = {}
+    to_probe = []
+    for file_path in file_paths:
+        if file_path in results:
+            continue
+        key = _duration_cache_key(file_path)
+        if key is not None and key in _duration_cache:
+            results[file_path] = _duration_cache[key]
+            continue
+        duration = parse_container_duration(file_path) if key is not None else None
+        if duration:
+            _duration_cache[key] = duration
+            results[file_path] = duration
+        else:
+            to_probe.append(file_path)
+
+    if to_probe:
+        durations = await asyncio.gather(*(_probe_batcher.probe(file_path) for file_path in to_probe))
+        for file_path, duration in zip(to_probe, durations):
+            key = _duration_cache_key(file_path)
+            if key is not None and duration > 0:
+                _duration_cache[key] = duration
+            results[file_path] = duration
+    return results
+
+
+async def get_audio_duration(file_path) -> float:
+    """
+    Get an audio file's duration.
+
+    WebM, Ogg and M4A durations are read straight from the container
+    headers. Other formats fall back to ffprobe, batched with any other
+    lookups made at the same time. Results are memoized by path and
+    modification time for every server.
+
+    Args:
+        file_path: Path to the audio file
+
+    Returns:
+        float: Duration of the audio file in seconds, or 0.0 if an error occurs
+    """
+    return (await get_audio_durations([file_path]))[file_path]
+
+
+# Stream format results keyed by (path, mtime) so repeated plays don't re-probe
+_stream_info_cache = {}
+
+
+async def get_audio_stream_info(file_path) -> dict:
+    """
+    Get the codec, sample rate and channel count of an audio file's first audio stream.
+    
+    Results are memoized by path and modification time, since a cached file
+    is played many times but rarely changes.
+    
+    Args:
+        file_path: Path to the audio file
+        
+    Returns:
+        dict: {'codec_name', 'sample_rate', 'channels'}, or an empty dict if probing fails
+    """
+    try:
+        cache_key = (str(file_path), os.path.getmtime(file_path))
+    except OSError:
+        return {}
+    if cache_key in _stream_info_cache:
+        return _stream_info_cache[cache_key]
+    try:
+        process = await asyncio.create_subprocess_exec(
+            'ffprobe', '-v', 'error',
+            '-select_streams', 'a:0',
+            '-show_entries', 'stream=codec_name,sample_rate,channels',
+            '-of', 'json', str(file_path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        
+        if process.returncode != 0:
+            print(f"Error getting audio stream info: {stderr.decode()}")
+            return {}
+            
+        streams = json.loads(stdout.decode()).get('streams') or [{}]
+        stream = streams[0]
+        info = {
+            'codec_name': stream.get('codec_name'),
+            'sample_rate': int(stream.get('sample_rate') or 0),
+            'channels': int(stream.get('channels') or 0),
+        }
+        _stream_info_cache[cache_key] = info
+        return info
+    except Exception as e:
+        print(f"Error getting audio stream info: {e}")
+        return {}
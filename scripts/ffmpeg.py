@@ -1,16 +1,15 @@
 import os
 import sys
+import shutil
 import subprocess
+from scripts.tool_cache import tool_cache
 
-def check_ffmpeg_in_path():
+def _run_ffmpeg_version():
     """
-    Check if FFmpeg is available in the system PATH.
-    
-    Attempts to run 'ffmpeg -version' to verify that FFmpeg is installed
-    and accessible from the command line.
+    Run 'ffmpeg -version' to verify that FFmpeg works.
     
     Returns:
-        bool: True if FFmpeg is found in PATH, False otherwise
+        bool: True if FFmpeg ran successfully, False otherwise
     """
     try:
         subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
@@ -18,6 +17,22 @@ def check_ffmpeg_in_path():
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
 
+def check_ffmpeg_in_path():
+    """
+    Check if FFmpeg is available in the system PATH.
+    
+    Attempts to run 'ffmpeg -version' to verify that FFmpeg is installed
+    and accessible from the command line. When ffmpeg resolves on PATH, the
+    result is cached in .cache/ and reused while PATH and the executable
+    are unchanged, so later starts skip the subprocess.
+    
+    Returns:
+        bool: True if FFmpeg is found in PATH, False otherwise
+    """
+    if shutil.which('ffmpeg') is None:
+        return _run_ffmpeg_version()
+    return bool(tool_cache.get('ffmpeg', _run_ffmpeg_version, ['ffmpeg']))
+
 def install_ffmpeg_windows():
     """
     Install FFmpeg on Windows using winget.
@@ -0,0 +1,298 @@
+"""
+Gapless playback between queued songs.
+
+The next song's ffmpeg process is spawned and primed a few seconds before
+the current one ends. When the current source runs out, the wrapper below
+switches to the primed source inside discord.py's player thread, so the
+next frame goes out on the following 20 ms tick instead of waiting for the
+after-callback, an event loop round trip and a new ffmpeg start. Queue
+bookkeeping and the now playing message are then updated on the event loop
+while the new song is already playing.
+"""
+
+import asyncio
+import time
+from collections.abc import Mapping
+from scripts.config import config_service
+from scripts.duration import get_audio_duration
+from scripts.constants import GREEN, BLUE, RESET
+from scripts.volume import get_guild_volume
+from scripts.voice_metrics import voice_metrics
+from scripts.playback import (
+    TrackedAudioSource,
+    create_audio_source,
+    ensure_encoder,
+    verify_audio_file,
+    log_now_playing,
+    cleanup_queued_message,
+)
+
+# PLAYBACK.GAPLESS and PLAYBACK.GAPLESS_PRELOAD are read for each song, so a config change applies to the next one
+
+
+class GaplessAudioSource(TrackedAudioSource):
+    """
+    Audio source that hands off to a primed next source when it runs out.
+
+    read() is called from the player thread. Once fewer than preload_seconds
+    (PLAYBACK.GAPLESS_PRELOAD) of the current song remain, on_preload() is
+    called so the event loop can prepare the next source with set_next(). When the current source returns
+    no data, accept_handoff(song) decides whether the prepared song may still
+    play; if so the sources are swapped and on_handoff(song, gap_ms) is
+    called. Otherwise playback ends normally and the after-callback takes over.
+
+    The player thread never looks at the queue itself: the event loop clears
+    the prepared source with set_next(None) as soon as the front of the queue
+    changes, so whatever is still prepared at handoff time is the next song.
+    """
+
+    def __init__(self, source, duration=None, on_preload=None, on_handoff=None, accept_handoff=None, volume: float = 1.0, metrics=None, preload_seconds: float = None):
+        super().__init__(source, volume=volume, metrics=metrics)
+        self.duration = duration or 0
+        if preload_seconds is None:
+            preload_seconds = config_service.get_float('PLAYBACK.GAPLESS_PRELOAD', 5)
+        self.preload_seconds = preload_seconds
+        self._on_preload = on_preload
+        self._on_handoff = on_handoff
+        self._accept_handoff = accept_handoff
+        self._preload_requested = False
+        self._next = None
+
+    @property
+    def remaining(self) -> float:
+        """Seconds left in the current song, or None if the duration is unknown."""
+        if not self.duration:
+            return None
+        return self.duration - self.position
+
+    def set_next(self, source, song: dict = None, duration=None) -> None:
+        """
+        Register the primed source for the next song.
+
+        Args:
+            source: The primed audio source, or None to drop the prepared one
+            song: The queue entry the source belongs to
+            duration: Duration of the song in seconds, if known
+        """
+        with self._lock:
+            previous, self._next = self._next, ((source, song, duration) if source is not None else None)
+        if previous:
+            previous[0].cleanup()
+
+    def has_next(self) -> bool:
+        """Whether a primed next source is waiting."""
+        return self._next is not None
+
+    def read(self) -> bytes:
+        data = super().read()
+        if data:
+            remaining = self.remaining
+            looping = self.looper is not None and not self.looper.finished and self.looper.plays_left > 0
+            if not self._preload_requested and not looping and remaining is not None and remaining <= self.preload_seconds:
+                self._preload_requested = True
+                if self._on_preload:
+                    self._on_preload()
+            return data
+        return self._handoff()
+
+    def _handoff(self) -> bytes:
+        """Swap to the primed next source and return its first frame."""
+        ended = time.perf_counter()
+        with self._lock:
+            pending, self._next = self._next, None
+        if not pending:
+            return b''
+        source, song, duration = pending
+        try:
+            accepted = not self._accept_handoff or self._accept_handoff(song)
+        except Exception as e:
+            # An exception here would end discord's player thread; play the song the normal way instead
+            print(f"Error checking gapless handoff: {str(e)}")
+            accepted = False
+        if not accepted:
+            source.cleanup()
+            return b''
+
+        data = source.read()
+        if not data:
+            source.cleanup()
+            return b''
+        gap_ms = (time.perf_counter() - ended) * 1000
+
+        self.replace_source(source)
+        self.frames = 1
+        self.duration = duration or 0
+        self._preload_requested = False
+        if self._on_handoff:
+            self._on_handoff(song, gap_ms)
+        return data
+
+    def cleanup(self) -> None:
+        with self._lock:
+            pending, self._next = self._next, None
+        if pending:
+            pending[0].cleanup()
+        super().cleanup()
+
+
+def log_track_gap(server_name: str, gap_ms: float, mode: str) -> None:
+    """
+    Log the silence between two songs.
+
+    Args:
+        server_name: Name of the server
+        gap_ms: Time between the last frame of one song and the first frame of the next
+        mode: 'gapless' for an in-thread handoff, 'restart' for a new player
+    """
+    print(f"{GREEN}Track gap ({mode}):{RESET}{BLUE} {gap_ms:.1f} ms{RESET}{GREEN} in server: {RESET}{BLUE}{server_name}{RESET}")
+
+
+def _can_preload(music_bot, song: dict) -> bool:
+    """Check whether a queued song can be played through a handoff."""
+    if getattr(music_bot, 'explicitly_stopped', False):
+        return False
+    if not isinstance(song, Mapping) or song.get('is_stream') or not song.get('file_path'):
+        return False
+    return verify_audio_file(song['file_path'])
+
+
+def wrap_gapless_source(music_bot, audio_source, song: dict, ctx):
+    """
+    Wrap an audio source so the next queued song can follow without a gap.
+
+    Streams are never wrapped since they have no end to prepare for.
+
+    Args:
+        music_bot: The MusicBot instance
+        audio_source: The source about to be played
+        song: The queue entry being played
+        ctx: The context used for playback
+
+    Returns:
+        The wrapped source, or a plain TrackedAudioSource if gapless playback is off
+    """
+    guild_id = getattr(music_bot, 'guild_id', None)
+    volume = get_guild_volume(guild_id) / 100
+    metrics = voice_metrics.get(guild_id)
+    if not config_service.get_bool('PLAYBACK.GAPLESS', True) or not isinstance(song, Mapping) or song.get('is_stream'):
+        return TrackedAudioSource(audio_source, volume=volume, metrics=metrics)
+
+    loop = asyncio.get_running_loop()
+    server_name = ctx.guild.name if ctx and getattr(ctx, 'guild', None) else "Unknown Server"
+
+    def on_preload():
+        asyncio.run_coroutine_threadsafe(prepare_next_track(music_bot, source), loop)
+
+    def accept_handoff(next_song):
+        # Runs on the player thread; the queue itself is only read on the event loop
+        return not getattr(music_bot, 'explicitly_stopped', False)
+
+    def on_handoff(next_song, gap_ms):
+        started_at = time.time()
+        log_track_gap(server_name, gap_ms, 'gapless')
+        asyncio.run_coroutine_threadsafe(complete_handoff(music_bot, next_song, ctx, started_at), loop)
+
+    source = GaplessAudioSource(
+        audio_source,
+        duration=song.get('duration'),
+        on_preload=on_preload,
+        on_handoff=on_handoff,
+        accept_handoff=accept_handoff,
+        volume=volume,
+        metrics=metrics,
+    )
+    watch_head = getattr(music_bot.queue, 'watch_head', None)
+    if watch_head:
+        # A prepared song that is no longer at the front must not be handed off to
+        watch_head(lambda: source.set_next(None))
+    if not source.duration:
+        # Probe the duration off the critical path; preloading starts once it is known
+        async def fill_duration():
+            source.duration = await get_audio_duration(song['file_path'])
+        asyncio.ensure_future(fill_duration())
+    return source
+
+
+async def prepare_next_track(music_bot, gapless_source: GaplessAudioSource) -> None:
+    """
+    Spawn and prime the audio source for the song at the front of the queue.
+
+    Args:
+        music_bot: The MusicBot instance
+        gapless_source: The wrapper of the song currently playing
+    """
+    async with music_bot.queue_lock:
+        next_song = music_bot.queue[0] if music_bot.queue else None
+    if not next_song or not _can_preload(music_bot, next_song):
+        return
+
+    try:
+        audio_source = await create_audio_source(
+            next_song['file_path'],
+            use_volume_transformer=False,
+            volume=round(gapless_source.volume * 100),
+            guild_id=getattr(music_bot, 'guild_id', None)
+        )
+    except Exception as e:
+        print(f"Error preparing next song: {str(e)}")
+        return
+
+    try:
+        ensure_encoder(music_bot.voice_client, audio_source)
+    except Exception as e:
+        print(f"Error creating Opus encoder for next song: {str(e)}")
+        audio_source.cleanup()
+        return
+
+    duration = next_song.get('duration') or await get_audio_duration(next_song['file_path'])
+    async with music_bot.queue_lock:
+        # The queue may have changed while ffmpeg was starting
+        if not music_bot.queue or music_bot.queue[0] is not next_song:
+            audio_source.cleanup()
+            return
+        gapless_source.set_next(audio_source, next_song, duration)
+
+
+async def complete_handoff(music_bot, song: dict, ctx, started_at: float = None) -> None:
+    """
+    Update the bot's state after the player switched to the next song.
+
+    This is the part of play_next() that doesn't touch audio: the song is
+    taken off the queue, loop mode is honoured, and the now playing message
+    and presence are updated.
+
+    Args:
+        music_bot: The MusicBot instance
+        song: The queue entry that is now playing
+        ctx: The context used for playback
+        started_at: When the player switched to the song
+    """
+    from scripts.play_next import announce_now_playing
+
+    async with music_bot.playback_lock:
+        previous_song = music_bot.current_song
+
+        # Loop mode re-queues the finished song, same as after_playing_coro
+        if getattr(music_bot, 'after_song_callback', None):
+            await music_bot.after_song_callback()
+
+        async with music_bot.queue_lock:
+            if music_bot.queue and music_bot.queue[0] is song:
+                music_bot.queue.popleft()
+            else:
+                try:
+                    music_bot.queue.remove(song)
+                except ValueError:
+                    pass
+
+        music_bot.current_song = song
+        song['ctx'] = ctx
+        music_bot.last_activity = time.time()
+        music_bot.playback_start_time = started_at or time.time()
+        music_bot.playback_state = "playing"
+
+        server_name = ctx.guild.name if ctx and getattr(ctx, 'guild', None) else "Unknown Server"
+        log_now_playing(song['title'], server_name)
+
+    await cleanup_queued_message(music_bot, song['url'])
+    await announce_now_playing(music_bot, previous_song, ctx)
@@ -6,16 +6,127 @@ import random
 import yt_dlp
 from spotipy.oauth2 import SpotifyClientCredentials
 import os
+from collections import deque
 from scripts.play_next import play_next
 from scripts.process_queue import process_queue
 from dotenv import load_dotenv
 from scripts.messages import create_embed
 from scripts.duration import get_audio_duration
-from scripts.config import config_vars
+from scripts.config import config_service
 from scripts.caching import playlist_cache
+from scripts.spotify_match import pick_best_candidate
 from scripts.constants import RED, GREEN, RESET, BLUE, EMBED_COLOR_ERROR, EMBED_COLOR_INFO, EMBED_COLOR_SPOTIFY
 from scripts.logging import setup_logging, get_ytdlp_logger, CachedVideoFound
 
+# Spotify page sizes are fixed by the API (playlists allow 100 per page, albums 50)
+SPOTIFY_PLAYLIST_PAGE_SIZE = 100
+SPOTIFY_ALBUM_PAGE_SIZE = 50
+
+
+# The limits below are read from config.json when they are used, so changing
+# them applies to the next search or download without a restart.
+def _page_concurrency():
+    """Max Spotify playlist/album pages fetched in parallel."""
+    return max(1, config_service.get_int('DOWNLOADS.SPOTIFY_PAGE_CONCURRENCY', 4))
+
+
+def _resolve_concurrency():
+    """Max concurrent YouTube searches for uncached Spotify tracks."""
+    return max(1, config_service.get_int('DOWNLOADS.SPOTIFY_RESOLVE_CONCURRENCY', 8))
+
+
+def _download_concurrency():
+    """Max concurrent Spotify track downloads."""
+    return max(1, config_service.get_int('DOWNLOADS.CONCURRENT_DOWNLOADS', 4))
+
+
+def _match_candidates():
+    """YouTube results scored when matching a Spotify track."""
+    return max(1, config_service.get_int('DOWNLOADS.SPOTIFY_MATCH_CANDIDATES', 5))
+
+
+def _match_min_score():
+    """Match confidence needed to remember a Spotify to YouTube match."""
+    return config_service.get_float('DOWNLOADS.SPOTIFY_MATCH_MIN_SCORE', 0.6)
+
+
+def _track_window():
+    """Uncached playlist tracks in flight at once: enough for searches to overlap the downloads."""
+    return _resolve_concurrency() + _download_concurrency()
+
+
+# Process-wide limits shared by every guild, created lazily on the bot's event loop
+_semaphores = {}  # Name -> (limit, semaphore)
+
+
+def _shared_semaphore(name, limit):
+    """
+    Get a process-wide semaphore, replacing it if its configured limit changed.
+
+    Tasks holding the old semaphore finish on it; new ones wait on the new one.
+
+    Args:
+        name: Which limit this is
+        limit: The currently configured limit
+
+    Returns:
+        asyncio.Semaphore: The semaphore for the current limit
+    """
+    current = _semaphores.get(name)
+    if current is None or current[0] != limit:
+        current = _semaphores[name] = (limit, asyncio.Semaphore(limit))
+    return current[1]
+
+
+def _get_resolve_semaphore():
+    """Get the semaphore limiting concurrent Spotify-to-YouTube searches."""
+    return _shared_semaphore('resolve', _resolve_concurrency())
+
+
+def _get_download_semaphore():
+    """Get the semaphore limiting concurrent Spotify track downloads."""
+    return _shared_semaphore('download', _download_concurrency())
+
+# Only request what is needed to queue and match a track: id, name, artists, duration, album art and ISRC
+SPOTIFY_PLAYLIST_FIELDS = 'name,images,snapshot_id,tracks.total'
+SPOTIFY_PLAYLIST_ITEM_FIELDS = 'items(track(id,name,artists(name),duration_ms,is_local,album(images),external_ids(isrc)))'
+
+
+def _compact_spotify_track(track, album_images=None):
+    """
+    Reduce a Spotify track object to the fields the bot uses.
+    
+    Args:
+        track: A track object from the Spotify API
+        album_images: Album images to use when the track has none (album listings)
+        
+    Returns:
+        dict: Track with id, name, artists, duration_ms, isrc and album art
+    """
+    images = (track.get('album') or {}).get('images') or album_images or []
+    return {
+        'id': track['id'],
+        'name': track.get('name', ''),
+        'artists': [{'name': artist.get('name', '')} for artist in track.get('artists', [])],
+        'duration_ms': track.get('duration_ms'),
+        'isrc': (track.get('external_ids') or {}).get('isrc'),
+        'album': {'images': images[:1]}
+    }
+
+
+async def _iter_pages(pages):
+    """
+    Wrap an already-materialised list of pages as an async iterator.
+    
+    Args:
+        pages: List of track lists
+        
+    Yields:
+        list: Each page in turn
+    """
+    for page in pages:
+        yield page
+
 class SpotifyHandler:
     """
     Handler for processing and managing Spotify content.
@@ -151,33 +262,18 @@ class SpotifyHandler:
                     ctx=ctx
                 ))
 
-            # First get the YouTube URL without downloading
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'quiet': True,
-                'noplaylist': True,
-                'extract_flat': True,
-            }
-            
             try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = await asyncio.get_event_loop().run_in_executor(None, lambda: ydl.extract_info(f"ytsearch1:{search_query}", download=False))
-                    if not info or 'entries' not in info or not info['entries']:
-                        raise ValueError("No results found")
-                        
-                    video_info = info['entries'][0]
-                    video_url = video_info.get('url') or video_info.get('webpage_url')
+                video_url = await self._resolve_spotify_track(_compact_spotify_track({**track, 'id': track_id}))
+                if not video_url:
+                    raise ValueError("No results found")
                     
-                    if not video_url:
-                        raise ValueError("Could not get video URL")
-                        
-                    # Now use download_song with the actual YouTube URL and spotify_info for combined caching
-                    song_info = await self.download_song(
-                        video_url, 
-                        status_msg=status_msg, 
-                        ctx=ctx,
-                        spotify_info={'track_id': track_id, 'artists': artists}
-                    )
+                # Now use download_song with the actual YouTube URL and spotify_info for combined caching
+                song_info = await self.download_song(
+                    video_url, 
+                    status_msg=status_msg, 
+                    ctx=ctx,
+                    spotify_info={'track_id': track_id, 'artists': artists}
+                )
             except Exception as e:
                 print(f"{RED}Error getting YouTube URL: {str(e)}{RESET}")
                 return None
@@ -233,12 +329,256 @@ class SpotifyHandler:
                 ))
             raise
 
+    async def _run_spotify_request(self, func, *args, **kwargs):
+        """
+        Run a blocking spotipy request in the default executor.
+        
+        Args:
+            func: The spotipy client method to call
+            *args: Positional arguments for the method
+            **kwargs: Keyword arguments for the method
+            
+        Returns:
+            The decoded API response
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+
+    async def _iter_spotify_pages(self, fetch_page, total, page_size, first_page=None):
+        """
+        Fetch a paginated Spotify listing by offset with bounded concurrency.
+        
+        Every page offset is requested up front (at most SPOTIFY_PAGE_CONCURRENCY
+        at a time) instead of following each page's 'next' link in turn. Pages
+        are still yielded in listing order, so the first page is available as
+        soon as it arrives while later pages keep downloading.
+        
+        Args:
+            fetch_page: Blocking callable taking an offset and returning a page
+            total: Total number of items in the listing
+            page_size: Number of items per page
+            first_page: Optional already-fetched page at offset 0
+            
+        Yields:
+            list: The items of each page, in order
+        """
+        start = 0
+        if first_page is not None:
+            yield first_page.get('items', [])
+            start = len(first_page.get('items', [])) or page_size
+
+        semaphore = asyncio.Semaphore(_page_concurrency())
+
+        async def fetch(offset):
+            async with semaphore:
+                return await self._run_spotify_request(fetch_page, offset)
+
+        offsets = range(start, total, page_size) if first_page is not None else range(0, max(total, 1), page_size)
+        tasks = [asyncio.ensure_future(fetch(offset)) for offset in offsets]
+        try:
+            for task in tasks:
+                page = await task
+                yield page.get('items', []) if page else []
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _iter_spotify_playlist_pages(self, playlist_id, snapshot_id, total):
+        """
+        Yield the playable tracks of a Spotify playlist page by page.
+        
+        Listings are cached against the playlist's snapshot_id, so an unchanged
+        playlist is served from the cache without fetching any pages. Local and
+        unavailable tracks are filtered out.
+        
+        Args:
+            playlist_id: The Spotify playlist ID
+            snapshot_id: The playlist's current snapshot_id
+            total: Total number of items in the playlist
+            
+        Yields:
+            list: Compact track dictionaries for each page
+        """
+        cached_tracks = playlist_cache.get_cached_spotify_playlist(playlist_id, snapshot_id)
+        if cached_tracks is not None:
+            print(f"{GREEN}Found cached Spotify playlist: {RESET}{BLUE}{playlist_id} ({len(cached_tracks)} tracks){RESET}")
+            yield cached_tracks
+            return
+
+        def fetch_page(offset):
+            return self.sp.playlist_items(
+                playlist_id,
+                fields=SPOTIFY_PLAYLIST_ITEM_FIELDS,
+                limit=SPOTIFY_PLAYLIST_PAGE_SIZE,
+                offset=offset,
+                additional_types=('track',)
+            )
+
+        fetched = []
+        skipped_local = 0
+        async for items in self._iter_spotify_pages(fetch_page, total, SPOTIFY_PLAYLIST_PAGE_SIZE):
+            page = []
+            for item in items:
+                track = item.get('track') if item else None
+                if not track:
+                    continue
+                if track.get('id') is None or track.get('is_local', False):
+                    skipped_local += 1
+                    continue
+                page.append(_compact_spotify_track(track))
+            fetched.extend(page)
+            yield page
+
+        if skipped_local > 0:
+            print(f"{GREEN}Playlist contains {skipped_local} local tracks. skipping...{RESET}")
+        playlist_cache.add_spotify_playlist(playlist_id, snapshot_id, fetched)
+
+    async def _iter_spotify_album_pages(self, album_id, album):
+        """
+        Yield the tracks of a Spotify album page by page.
+        
+        The album object already embeds its first page of tracks, so only the
+        remaining offsets are requested.
+        
+        Args:
+            album_id: The Spotify album ID
+            album: The album object returned by the Spotify API
+            
+        Yields:
+            list: Compact track dictionaries for each page
+        """
+        images = album.get('images') or []
+        first_page = album.get('tracks')
+        total = first_page.get('total', 0) if first_page else album.get('total_tracks', 0)
+
+        def fetch_page(offset):
+            return self.sp.album_tracks(album_id, limit=SPOTIFY_ALBUM_PAGE_SIZE, offset=offset)
+
+        async for items in self._iter_spotify_pages(fetch_page, total, SPOTIFY_ALBUM_PAGE_SIZE, first_page=first_page):
+            yield [_compact_spotify_track(track, images) for track in items if track and track.get('id')]
+
+    async def _queue_first_spotify_track(self, first_track, ctx, status_msg):
+        """
+        Queue the first track of an album or playlist and start playback.
+        
+        Args:
+            first_track: Compact track dictionary
+            ctx: Discord command context
+            status_msg: Optional "Processing" message to clean up
+            
+        Returns:
+            dict or None: The queued song information, or None if it failed
+        """
+        track_id = first_track['id']
+        artists = ", ".join([artist['name'] for artist in first_track['artists']])
+        
+        # Check cache first for the first track
+        cached_info = playlist_cache.get_cached_spotify_track(track_id)
+        if cached_info:
+            print(f"{GREEN}Found cached Spotify track: {RESET}{BLUE}{track_id} - {cached_info.get('title', 'Unknown')}{RESET}")
+            
+            # Delete the "Processing" message if it exists
+            if status_msg:
+                try:
+                    await status_msg.delete()
+                except discord.NotFound:
+                    print(f"Note: Processing message already deleted")
+                except Exception as e:
+                    print(f"Note: Could not delete processing message: {e}")
+            
+            first_song = {
+                'title': cached_info.get('title', 'Unknown'),
+                'url': cached_info.get('url', f'https://open.spotify.com/track/{track_id}'),
+                'file_path': cached_info['file_path'],
+                'thumbnail': cached_info.get('thumbnail'),
+                'is_from_playlist': True,
+                'requester': ctx.author,
+                'duration': await get_audio_duration(cached_info['file_path']),
+                'ctx': ctx
+            }
+        else:
+            # Resolve and download if not in cache
+            first_song = await self._resolve_and_download_spotify_track(first_track, ctx)
+            if not first_song:
+                return None
+            first_song['is_from_playlist'] = True
+            first_song['requester'] = ctx.author
+            first_song['duration'] = await get_audio_duration(first_song['file_path'])
+            first_song['ctx'] = ctx
+
+        async with self.queue_lock:
+            self.queue.append(first_song)
+            should_play = not self.is_playing and not self.voice_client.is_playing()
+        
+        if should_play:
+            await process_queue(self)
+        return first_song
+
+    async def _queue_spotify_pages(self, pages, ctx, status_msg, source_name):
+        """
+        Queue an album or playlist from its page iterator.
+        
+        The first track is queued as soon as the first page arrives; the rest
+        of that page and all later pages are processed in the background.
+        
+        Args:
+            pages: Async iterator yielding lists of compact track dictionaries
+            ctx: Discord command context
+            status_msg: Optional message to update with progress
+            source_name: Name of the source (album or playlist)
+            
+        Returns:
+            dict or None: Information about the first track if successful, None otherwise
+        """
+        # Shuffling needs the whole listing before anything is queued
+        if config_service.get_bool('DOWNLOADS.SHUFFLE_DOWNLOAD', False):
+            tracks = [track async for page in pages for track in page]
+            random.shuffle(tracks)
+            pages = _iter_pages([tracks])
+
+        first_track = None
+        remaining = []
+        async for page in pages:
+            if page:
+                first_track, remaining = page[0], page[1:]
+                break
+
+        if not first_track:
+            return None
+
+        first_song = await self._queue_first_spotify_track(first_track, ctx, status_msg)
+        asyncio.create_task(self._process_spotify_pages(remaining, pages, ctx, status_msg, source_name))
+        return first_song
+
+    async def _process_spotify_pages(self, remaining, pages, ctx, status_msg, source_name):
+        """
+        Process the rest of an album or playlist page by page in the background.
+        
+        Args:
+            remaining: Tracks left over from the page that supplied the first track
+            pages: Async iterator yielding the remaining pages
+            ctx: Discord command context
+            status_msg: Optional message to update with progress
+            source_name: Name of the source (album or playlist)
+        """
+        try:
+            if remaining:
+                await self._process_spotify_tracks(remaining, ctx, status_msg, source_name)
+            async for page in pages:
+                if not playlist_cache._should_continue_check:
+                    return
+                if page:
+                    await self._process_spotify_tracks(page, ctx, status_msg, source_name)
+        except Exception as e:
+            print(f"{RED}Error processing {source_name}: {str(e)}{RESET}")
+
     async def handle_spotify_album(self, album_id, ctx, status_msg=None):
         """
         Handle a Spotify album.
         
-        This method extracts all tracks from a Spotify album and processes them
-        in the background, allowing the first track to start playing immediately.
+        This method fetches the album's track pages concurrently and starts
+        playing the first track as soon as the first page is available, while
+        the rest are processed in the background.
         
         Args:
             album_id: The Spotify album ID
@@ -249,7 +589,7 @@ class SpotifyHandler:
             dict or None: Information about the first track if successful, None otherwise
         """
         try:
-            album = self.sp.album(album_id)
+            album = await self._run_spotify_request(self.sp.album, album_id)
             if not album:
                 raise ValueError("Could not find album on Spotify")
 
@@ -264,82 +604,12 @@ class SpotifyHandler:
                 # Don't delete the message here, let it be handled later
                 # await status_msg.delete(delay=5)
 
-            tracks = []
-            results = self.sp.album_tracks(album_id)
-            tracks.extend(results['items'])
-            while results['next']:
-                results = self.sp.next(results)
-                tracks.extend(results['items'])
-
-            # Shuffle tracks if enabled
-            if config_vars.get('DOWNLOADS', {}).get('SHUFFLE_DOWNLOAD', False):
-                random.shuffle(tracks)
-
-            if tracks:
-                first_track = tracks[0]
-                track_id = first_track['id']
-                artists = ", ".join([artist['name'] for artist in first_track['artists']])
-                
-                # Check cache first for the first track
-                cached_info = playlist_cache.get_cached_spotify_track(track_id)
-                if cached_info:
-                    print(f"{GREEN}Found cached Spotify track: {RESET}{BLUE}{track_id} - {cached_info.get('title', 'Unknown')}{RESET}")
-                    
-                    # Delete the "Processing" message if it exists
-                    if status_msg:
-                        try:
-                            await status_msg.delete()
-                        except discord.NotFound:
-                            print(f"Note: Processing message already deleted")
-                        except Exception as e:
-                            print(f"Note: Could not delete processing message: {e}")
-                    
-                    first_song = {
-                        'title': cached_info.get('title', 'Unknown'),
-                        'url': cached_info.get('url', f'https://open.spotify.com/track/{track_id}'),
-                        'file_path': cached_info['file_path'],
-                        'thumbnail': cached_info.get('thumbnail'),
-                        'is_from_playlist': True,
-                        'requester': ctx.author,
-                        'duration': await get_audio_duration(cached_info['file_path']),
-                        'ctx': ctx
-                    }
-                    async with self.queue_lock:
-                        self.queue.append(first_song)
-                        should_play = not self.is_playing and not self.voice_client.is_playing()
-                else:
-                    # Download if not in cache
-                    search_query = f"{first_track['name']} {artists}"
-                    first_song = await self.download_song(
-                        search_query, 
-                        status_msg=None, 
-                        ctx=ctx,
-                        spotify_info={'track_id': track_id, 'artists': artists}
-                    )
-                    if first_song:
-                        first_song['is_from_playlist'] = True
-                        first_song['requester'] = ctx.author
-                        first_song['duration'] = await get_audio_duration(first_song['file_path'])
-                        first_song['ctx'] = ctx
-                        
-                        async with self.queue_lock:
-                            self.queue.append(first_song)
-                            should_play = not self.is_playing and not self.voice_client.is_playing()
-                    else:
-                        should_play = False
-                
-                if should_play:
-                    await process_queue(self)
-
-            if len(tracks) > 1:
-                asyncio.create_task(self._process_spotify_tracks(
-                    tracks[1:],
-                    ctx,
-                    status_msg,
-                    f"Album: {album['name']}"
-                ))
-
-            return first_song if tracks else None
+            return await self._queue_spotify_pages(
+                self._iter_spotify_album_pages(album_id, album),
+                ctx,
+                status_msg,
+                f"Album: {album['name']}"
+            )
 
         except Exception as e:
             print(f"Error handling Spotify album: {str(e)}")
@@ -349,8 +619,10 @@ class SpotifyHandler:
         """
         Handle a Spotify playlist.
         
-        This method extracts all tracks from a Spotify playlist and processes them
-        in the background, allowing the first track to start playing immediately.
+        This method fetches the playlist's track pages concurrently (or reuses
+        the cached listing if the playlist's snapshot is unchanged) and starts
+        playing the first track as soon as the first page is available, while
+        the rest are processed in the background.
         
         Args:
             playlist_id: The Spotify playlist ID
@@ -361,126 +633,132 @@ class SpotifyHandler:
             dict or None: Information about the first track if successful, None otherwise
         """
         try:
-            playlist = self.sp.playlist(playlist_id)
+            playlist = await self._run_spotify_request(self.sp.playlist, playlist_id, fields=SPOTIFY_PLAYLIST_FIELDS)
             if not playlist:
                 raise ValueError("Could not find playlist on Spotify")
 
+            total = playlist.get('tracks', {}).get('total', 0)
             if status_msg:
                 await status_msg.edit(embed=create_embed(
                     "Processing Playlist",
-                    f"Processing playlist: {playlist['name']}\nTotal tracks: {playlist['tracks']['total']}",
+                    f"Processing playlist: {playlist['name']}\nTotal tracks: {total}",
                     color=EMBED_COLOR_SPOTIFY,
                     thumbnail_url=playlist['images'][0]['url'] if playlist['images'] else None,
                     ctx=ctx
                 ))
                 await status_msg.delete(delay=5)
 
-            tracks = []
-            skipped_local = 0
-            results = playlist['tracks']
-            
-            # Filter out local tracks
-            for item in results['items']:
-                if item['track']:
-                    if item['track'].get('id') is None or item['track'].get('is_local', False):
-                        skipped_local += 1
-                        continue
-                    tracks.extend([item])
-                    
-            # Get remaining pages
-            while results['next']:
-                results = self.sp.next(results)
-                for item in results['items']:
-                    if item['track']:
-                        if item['track'].get('id') is None or item['track'].get('is_local', False):
-                            skipped_local += 1
-                            continue
-                        tracks.extend([item])
-
-            if skipped_local > 0:
-                print(f"{GREEN}Playlist contains {skipped_local} local tracks. skipping...{RESET}")
-
-            # Shuffle tracks if enabled
-            if config_vars.get('DOWNLOADS', {}).get('SHUFFLE_DOWNLOAD', False):
-                random.shuffle(tracks)
-
-            if tracks:
-                first_track = tracks[0]['track']
-                track_id = first_track['id']
-                artists = ", ".join([artist['name'] for artist in first_track['artists']])
-                
-                # Check cache first for the first track
-                cached_info = playlist_cache.get_cached_spotify_track(track_id)
-                if cached_info:
-                    print(f"{GREEN}Found cached Spotify track: {RESET}{BLUE}{track_id} - {cached_info.get('title', 'Unknown')}{RESET}")
-                    
-                    # Delete the "Processing" message if it exists
-                    if status_msg:
-                        try:
-                            await status_msg.delete()
-                        except discord.NotFound:
-                            print(f"Note: Processing message already deleted")
-                        except Exception as e:
-                            print(f"Note: Could not delete processing message: {e}")
-                    
-                    first_song = {
-                        'title': cached_info.get('title', 'Unknown'),
-                        'url': cached_info.get('url', f'https://open.spotify.com/track/{track_id}'),
-                        'file_path': cached_info['file_path'],
-                        'thumbnail': cached_info.get('thumbnail'),
-                        'is_from_playlist': True,
-                        'requester': ctx.author,
-                        'duration': await get_audio_duration(cached_info['file_path']),
-                        'ctx': ctx
-                    }
-                    async with self.queue_lock:
-                        self.queue.append(first_song)
-                        should_play = not self.is_playing and not self.voice_client.is_playing()
-                else:
-                    # Download if not in cache
-                    search_query = f"{first_track['name']} {artists}"
-                    first_song = await self.download_song(
-                        search_query, 
-                        status_msg=None, 
-                        ctx=ctx,
-                        spotify_info={'track_id': track_id, 'artists': artists}
-                    )
-                    if first_song:
-                        first_song['is_from_playlist'] = True
-                        first_song['requester'] = ctx.author
-                        first_song['duration'] = await get_audio_duration(first_song['file_path'])
-                        first_song['ctx'] = ctx
-                        
-                        async with self.queue_lock:
-                            self.queue.append(first_song)
-                            should_play = not self.is_playing and not self.voice_client.is_playing()
-                    else:
-                        should_play = False
-                
-                if should_play:
-                    await process_queue(self)
-
-            if len(tracks) > 1:
-                asyncio.create_task(self._process_spotify_tracks(
-                    [t['track'] for t in tracks[1:]],
-                    ctx,
-                    status_msg,
-                    f"Playlist: {playlist['name']}"
-                ))
-
-            return first_song if tracks else None
+            return await self._queue_spotify_pages(
+                self._iter_spotify_playlist_pages(playlist_id, playlist.get('snapshot_id'), total),
+                ctx,
+                status_msg,
+                f"Playlist: {playlist['name']}"
+            )
 
         except Exception as e:
             print(f"Error handling Spotify playlist: {str(e)}")
             raise
 
+    async def _resolve_spotify_track(self, track):
+        """
+        Find the YouTube video for a Spotify track without downloading it.
+        
+        A previously chosen match is reused straight from the match index, so
+        re-downloading an evicted track never searches again. Otherwise a small
+        batch of search results is scored against the track's duration, name,
+        artists and ISRC. The best one is recorded in the index only if it
+        carries the ISRC or scores at least SPOTIFY_MATCH_MIN_SCORE; a weaker
+        match is still played but searched again next time. Searches
+        run through the shared resolve semaphore so many tracks can be
+        resolved at once without flooding YouTube.
+        
+        Args:
+            track: Spotify track dictionary with 'id', 'name' and 'artists'
+            
+        Returns:
+            str or None: The YouTube video URL, or None if nothing was found
+        """
+        track_id = track.get('id')
+        match = playlist_cache.get_spotify_match(track_id) if track_id else None
+        if (match and not playlist_cache.is_blacklisted(match['video_id'])
+                and (match.get('confidence') is None or match['confidence'] >= _match_min_score())):
+            return f"https://www.youtube.com/watch?v={match['video_id']}"
+
+        artists = ", ".join([artist['name'] for artist in track['artists']])
+        search_query = f"{track['name']} {artists}"
+        ydl_opts = {
+            'format': 'bestaudio/best',
+            'quiet': True,
+            'noplaylist': True,
+            'extract_flat': True,
+        }
+        async with _get_resolve_semaphore():
+            def search():
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    return ydl.extract_info(f"ytsearch{_match_candidates()}:{search_query}", download=False)
+            info = await asyncio.get_running_loop().run_in_executor(None, search)
+        if not info or not info.get('entries'):
+            return None
+
+        candidates = [entry for entry in info['entries'] if entry and not playlist_cache.is_blacklisted(entry.get('id', ''))]
+        best, confidence = pick_best_candidate(track, candidates)
+        if not best:
+            # No result has a video ID to score; play the first one that isn't blacklisted
+            if not candidates:
+                return None
+            return candidates[0].get('url') or candidates[0].get('webpage_url')
+
+        # An ISRC hit always scores 1.0, so it passes any threshold
+        if track_id and confidence >= _match_min_score():
+            playlist_cache.add_spotify_match(track_id, best['id'], confidence)
+            print(f"{GREEN}Matched Spotify track: {RESET}{BLUE}{track_id} -> {best['id']} ({confidence:.2f}){RESET}")
+        else:
+            print(f"{GREEN}Weak Spotify match, not remembered: {RESET}{BLUE}{track_id} -> {best['id']} ({confidence:.2f}){RESET}")
+        return f"https://www.youtube.com/watch?v={best['id']}"
+
+    async def _resolve_and_download_spotify_track(self, track, ctx):
+        """
+        Resolve a Spotify track to YouTube and download it.
+        
+        Resolution is bounded by SPOTIFY_RESOLVE_CONCURRENCY and downloads by
+        CONCURRENT_DOWNLOADS, so searches for later tracks overlap with the
+        downloads of earlier ones.
+        
+        Args:
+            track: Spotify track dictionary
+            ctx: Discord command context
+            
+        Returns:
+            dict or None: Downloaded song information, or None if it failed
+        """
+        if not playlist_cache._should_continue_check:
+            return None
+        video_url = await self._resolve_spotify_track(track)
+        if not video_url:
+            print(f"{RED}No YouTube results for Spotify track: {track['id']}{RESET}")
+            return None
+        artists = ", ".join([artist['name'] for artist in track['artists']])
+        async with _get_download_semaphore():
+            if not playlist_cache._should_continue_check:
+                return None
+            return await self.download_song(
+                video_url,
+                status_msg=None,
+                ctx=ctx,
+                skip_url_check=True,
+                spotify_info={'track_id': track['id'], 'artists': artists, 'skip_save': True}
+            )
+
     async def _process_spotify_tracks(self, tracks, ctx, status_msg, source_name):
         """
         Process remaining Spotify tracks in the background.
         
-        This method downloads each track in the list and adds it to the queue.
-        It runs asynchronously to allow the first track to start playing immediately
-        while the rest are processed in the background.
+        Cached tracks are queued straight away. Uncached tracks are resolved to
+        YouTube and downloaded concurrently by a bounded window of tasks, then
+        queued in playlist order as each one (and every track before it)
+        finishes. It runs asynchronously to
+        allow the first track to start playing immediately while the rest are
+        processed in the background.
         
         Args:
             tracks: List of Spotify track objects
@@ -545,48 +823,50 @@ class SpotifyHandler:
             loop = asyncio.get_running_loop()
             await loop.run_in_executor(None, playlist_cache._save_cache)
             
-            # Now process uncached tracks normally
-            for track in uncached_tracks:
-                try:
-                    if not playlist_cache._should_continue_check:
+            # Resolve and download uncached tracks concurrently, queueing them in playlist order.
+            # Only a window of tasks exists at a time; the next track is started as each one is queued.
+            if not uncached_tracks:
+                return
+            pending_tracks = iter(uncached_tracks)
+            window = deque()
+
+            def fill_window():
+                while len(window) < _track_window():
+                    track = next(pending_tracks, None)
+                    if track is None:
                         return
-                        
+                    window.append((track, self._track_download_task(self._resolve_and_download_spotify_track(track, ctx))))
+
+            try:
+                fill_window()
+                while window:
+                    track, task = window.popleft()
+                    fill_window()
                     track_id = track['id']
-                    artists = ", ".join([artist['name'] for artist in track['artists']])
-                    search_query = f"{track['name']} {artists}"
-                    
-                    song_info = await self.download_song(
-                        search_query, 
-                        status_msg=None, 
-                        ctx=ctx,
-                        spotify_info={'track_id': track_id, 'artists': artists, 'skip_save': True}
-                    )
-                    if song_info:
-                        if not playlist_cache._should_continue_check:
-                            return
-                        
-                        song_info['duration'] = await get_audio_duration(song_info['file_path'])
-                        song_info['is_from_playlist'] = True
-                        song_info['requester'] = ctx.author
-                        song_info['ctx'] = ctx
-                        
+                    try:
+                        song_info = await task
                         if not playlist_cache._should_continue_check:
                             return
-                        
-                        # Use queue lock to prevent race conditions
-                        async with self.queue_lock:
-                            self.queue.append(song_info)
-                            should_play = not self.is_playing and not self.voice_client.is_playing()
-                        
-                        if should_play:
-                            await process_queue(self)
+                        if song_info:
+                            song_info['duration'] = await get_audio_duration(song_info['file_path'])
+                            song_info['is_from_playlist'] = True
+                            song_info['requester'] = ctx.author
+                            song_info['ctx'] = ctx
                             
-                        # Add a small delay between tracks to prevent blocking
-                        await asyncio.sleep(0.1)
-                    processed += 1
-                except Exception as e:
-                    print(f"{RED}Error processing track {track_id}: {str(e)}{RESET}")
-                    continue
+                            # Use queue lock to prevent race conditions
+                            async with self.queue_lock:
+                                self.queue.append(song_info)
+                                should_play = not self.is_playing and not self.voice_client.is_playing()
+                            
+                            if should_play:
+                                await process_queue(self)
+                        processed += 1
+                    except Exception as e:
+                        print(f"{RED}Error processing track {track_id}: {str(e)}{RESET}")
+                        continue
+            finally:
+                for _, task in window:
+                    task.cancel()
 
         except Exception as e:
             print(f"{RED}Error in _process_spotify_tracks: {str(e)}{RESET}")
\ No newline at end of file
@@ -63,7 +63,7 @@ async def check_inactivity(bot_instance):
                     currently_downloading = server_bot.currently_downloading
                     in_progress_downloads = bool(server_bot.in_progress_downloads)
                     has_download_task = server_bot.current_download_task is not None
-                    has_ydl = server_bot.current_ydl is not None
+                    has_ydl = bool(getattr(server_bot, 'active_ydls', None))
                     
                     # Check if there are active downloads
                     has_active_downloads = (
@@ -97,8 +97,10 @@ async def check_inactivity(bot_instance):
                             server_bot.in_progress_downloads.clear()
                             if server_bot.current_download_task and not server_bot.current_download_task.done():
                                 server_bot.current_download_task.cancel()
+                            for task in list(getattr(server_bot, 'download_tasks', ())):
+                                task.cancel()
                             server_bot.current_download_task = None
-                            server_bot.current_ydl = None
+                            getattr(server_bot, 'active_ydls', set()).clear()
                             server_bot.waiting_for_song = False
                             # Don't reset activity timer to allow disconnection on next check
                     
@@ -10,6 +10,10 @@ import sys
 import subprocess
 import shutil
 from scripts.constants import GREEN, BLUE, RESET, YELLOW, RED
+from scripts.tool_cache import tool_cache
+
+# Commands get_available_js_runtime() probes, in priority order
+JS_RUNTIME_COMMANDS = ('node', 'deno', 'bun', 'qjs')
 
 def install_nodejs_windows():
     """
@@ -100,6 +104,19 @@ def check_runtime(command):
     return (None, None)
 
 def get_available_js_runtime():
+    """
+    Get the preferred JavaScript runtime, reusing the last detection if still valid.
+    
+    The result of detect_js_runtime() is cached in .cache/ and reused while
+    PATH and the runtime executables are unchanged, so startup does not have
+    to run every runtime with --version.
+    
+    Returns:
+        tuple: (runtime_name, runtime_path, version_string, is_supported) or (None, None, None, False) if none found
+    """
+    return tuple(tool_cache.get('js_runtime', detect_js_runtime, JS_RUNTIME_COMMANDS))
+
+def detect_js_runtime():
     """
     Detect available JavaScript runtimes in priority order.
     
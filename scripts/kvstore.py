@@ -0,0 +1,374 @@
+"""
+Embedded key-value store for the bot's state.
+
+Small state used to live in separate JSON files (server prefixes, aliases,
+bandwidth totals and the download caches), each with its own load and save
+code, and most changes rewrote the whole file. It now lives in one SQLite
+database, .cache/state.db, as JSON values in namespaced keys, so a change
+writes only the keys it touched.
+
+Writes are buffered in memory and committed together in one transaction,
+either by a background thread COMMIT_DELAY seconds after the first pending
+write or by an explicit flush(). Reads see pending writes, so callers can
+treat the store as if every write were immediate. The database runs in WAL
+mode, so a crash loses at most the writes that weren't committed yet and
+never corrupts what was.
+
+A commit runs on its own connection and only holds the buffer lock while it
+takes the pending writes; reads and writes on the event loop never wait for
+the disk. Writes being committed stay visible to reads until the commit is
+done.
+
+The old JSON files are imported once, the first time their namespace is
+opened, and then renamed to <name>.migrated.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterator, Tuple
+from scripts.constants import GREEN, BLUE, RESET
+from scripts.paths import get_cache_file
+
+STATE_DB_FILE = get_cache_file('state.db')
+
+# Seconds pending writes are held to be committed together
+COMMIT_DELAY = 0.5
+
+# Marks a pending delete in the write buffer
+_DELETED = object()
+
+
+class KVStore:
+    """Namespaced JSON values in an SQLite database, with batched commits."""
+
+    def __init__(self, path: str = STATE_DB_FILE, commit_delay: float = COMMIT_DELAY):
+        """
+        Initialize the store.
+
+        Args:
+            path: Path to the database file
+            commit_delay: Seconds pending writes wait to be committed together
+        """
+        self.path = path
+        self.commit_delay = commit_delay
+        self._conn = None          # Used for reads, under _lock
+        self._write_conn = None    # Used for commits, under _commit_lock
+        self._lock = threading.RLock()
+        self._commit_lock = threading.RLock()
+        self._pending: Dict[Tuple[str, str], Any] = {}
+        self._cleared = set()  # Namespaces cleared since the last commit
+        self._inflight: Dict[Tuple[str, str], Any] = {}  # Writes being committed
+        self._inflight_cleared = set()
+        self._timer = None
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a connection to the database, creating it if needed."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS kv ('
+            'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+            'PRIMARY KEY (namespace, key)) WITHOUT ROWID'
+        )
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the read connection, opening the database on first use. Caller holds the lock."""
+        if self._conn is None:
+            self._conn = self._open()
+        return self._conn
+
+    def _write_connection(self) -> sqlite3.Connection:
+        """Get the commit connection. Caller holds the commit lock."""
+        if self._write_conn is None:
+            self._write_conn = self._open()
+        return self._write_conn
+
+    def _buffered(self, namespace: str, key: str):
+        """
+        Look up a write that isn't in the database yet. Caller holds the lock.
+
+        Returns:
+            tuple: (True, value or _DELETED) if the buffers decide the key, else (False, None)
+        """
+        for buffer, cleared in ((self._pending, self._cleared), (self._inflight, self._inflight_cleared)):
+            if (namespace, key) in buffer:
+                return True, buffer[(namespace, key)]
+            if namespace in cleared:
+                return True, _DELETED
+        return False, None
+
+    # Reads
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """
+        Get a value.
+
+        Args:
+            namespace: The namespace, such as 'prefixes'
+            key: The key within the namespace
+            default: Returned if the key doesn't exist
+
+        Returns:
+            The stored value or the default
+        """
+        key = str(key)
+        with self._lock:
+            buffered, value = self._buffered(namespace, key)
+            if buffered:
+                return default if value is _DELETED else value
+            row = self._connection().execute(
+                'SELECT value FROM kv WHERE namespace = ? AND key = ?', (namespace, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        """
+        Get every key and value of a namespace.
+
+        Args:
+            namespace: The namespace
+
+        Returns:
+            dict: Keys and values, including pending writes
+        """
+        with self._lock:
+            # The database, then the writes being committed, then pending ones; a clear hides older layers
+            result = {}
+            if namespace in self._cleared:
+                layers = [self._pending]
+            else:
+                layers = [self._inflight, self._pending]
+                if namespace not in self._inflight_cleared:
+                    rows = self._connection().execute('SELECT key, value FROM kv WHERE namespace = ?', (namespace,))
+                    result = {key: json.loads(value) for key, value in rows}
+            for layer in layers:
+                for (layer_namespace, key), value in layer.items():
+                    if layer_namespace != namespace:
+                        continue
+                    if value is _DELETED:
+                        result.pop(key, None)
+                    else:
+                        result[key] = value
+        return result
+
+    # Writes
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        """
+        Store a value (committed with the next batch).
+
+        Args:
+            namespace: The namespace
+            key: The key within the namespace
+            value: A JSON-serializable value
+        """
+        # Serialize now so later changes to a mutable value don't leak into the write
+        value = json.loads(json.dumps(value))
+        with self._lock:
+            self._pending[(namespace, str(key))] = value
+            self._schedule_commit()
+
+    def set_many(self, namespace: str, values: Dict[str, Any]) -> None:
+        """
+        Store several values of a namespace in the same batch.
+
+        Args:
+            namespace: The namespace
+            values: Keys and JSON-serializable values
+        """
+        values = json.loads(json.dumps(values))
+        with self._lock:
+            for key, value in values.items():
+                self._pending[(namespace, str(key))] = value
+            self._schedule_commit()
+
+    def delete(self, namespace: str, key: str) -> None:
+        """
+        Remove a key (committed with the next batch).
+
+        Args:
+            namespace: The namespace
+            key: The key within the namespace
+        """
+        with self._lock:
+            self._pending[(namespace, str(key))] = _DELETED
+            self._schedule_commit()
+
+    def clear(self, namespace: str) -> None:
+        """
+        Remove every key of a namespace.
+
+        Args:
+            namespace: The namespace
+        """
+        with self._lock:
+            for pending_key in [pending_key for pending_key in self._pending if pending_key[0] == namespace]:
+                del self._pending[pending_key]
+            self._cleared.add(namespace)
+            self._schedule_commit()
+
+    def _schedule_commit(self) -> None:
+        """Commit the pending writes soon, from a background thread. Caller holds the lock."""
+        if self._timer is None:
+            self._timer = threading.Timer(self.commit_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        """
+        Commit every pending write in one transaction.
+
+        The buffer lock is only held to take the pending writes, so reads and
+        writes can go on while the transaction is written to disk.
+        """
+        with self._commit_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._pending and not self._cleared:
+                    return
+                pending, self._pending = self._pending, {}
+                cleared, self._cleared = self._cleared, set()
+                self._inflight, self._inflight_cleared = pending, cleared
+            conn = self._write_connection()
+            try:
+                conn.execute('BEGIN')
+                for namespace in cleared:
+                    conn.execute('DELETE FROM kv WHERE namespace = ?', (namespace,))
+                conn.executemany(
+                    'DELETE FROM kv WHERE namespace = ? AND key = ?',
+                    [key for key, value in pending.items() if value is _DELETED]
+                )
+                conn.executemany(
+                    'INSERT OR REPLACE INTO kv (namespace, key, value) VALUES (?, ?, ?)',
+                    [(namespace, key, json.dumps(value)) for (namespace, key), value in pending.items() if value is not _DELETED]
+                )
+                conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                with self._lock:
+                    # Keep the writes so the next flush retries them; newer writes win
+                    retry = {key: value for key, value in pending.items() if key[0] not in self._cleared}
+                    retry.update(self._pending)
+                    self._pending = retry
+                    self._cleared |= cleared
+                print(f"Error committing state: {str(e)}")
+            finally:
+                with self._lock:
+                    self._inflight, self._inflight_cleared = {}, set()
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        with self._commit_lock:
+            self.flush()
+            if self._write_conn is not None:
+                self._write_conn.close()
+                self._write_conn = None
+            with self._lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+    # Migration
+
+    def migrate_json(self, namespace: str, file_path: str,
+                     convert: Callable[[Any], Dict[str, Any]] = None) -> bool:
+        """
+        Import a legacy JSON file into a namespace, once.
+
+        The file is renamed to <file>.migrated afterwards, so it is only
+        imported the first time. A file that can't be parsed is left alone.
+
+        Args:
+            namespace: The namespace to import into
+            file_path: Path to the JSON file
+            convert: Turns the parsed file into the keys and values to store
+                (defaults to using a top-level JSON object as is)
+
+        Returns:
+            bool: True if the file was imported
+        """
+        if not os.path.exists(file_path):
+            return False
+        try:
+            with open(file_path, 'r') as f:
+                data = json.load(f)
+            values = convert(data) if convert else data
+            if not isinstance(values, dict):
+                raise ValueError('expected a JSON object')
+        except (OSError, ValueError) as e:
+            print(f"Error migrating {file_path}: {str(e)}")
+            return False
+        with self._lock:
+            # Anything already stored wins over the old file
+            existing = self.items(namespace)
+            self.set_many(namespace, {key: value for key, value in values.items() if str(key) not in existing})
+        self.flush()
+        os.replace(file_path, f"{file_path}.migrated")
+        print(f"{GREEN}Migrated {BLUE}{os.path.basename(file_path)}{RESET}{GREEN} to the state database{RESET}")
+        return True
+
+    def namespace(self, name: str) -> 'Namespace':
+        """
+        Get a view of one namespace.
+
+        Args:
+            name: The namespace
+
+        Returns:
+            Namespace: Reads and writes scoped to the namespace
+        """
+        return Namespace(self, name)
+
+
+class Namespace:
+    """Reads and writes scoped to one namespace of a KVStore."""
+
+    def __init__(self, store: KVStore, name: str):
+        """
+        Initialize the view.
+
+        Args:
+            store: The store
+            name: The namespace
+        """
+        self.store = store
+        self.name = name
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a value, or the default if the key doesn't exist."""
+        return self.store.get(self.name, key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value."""
+        self.store.set(self.name, key, value)
+
+    def delete(self, key: str) -> None:
+        """Remove a key."""
+        self.store.delete(self.name, key)
+
+    def items(self) -> Dict[str, Any]:
+        """Get every key and value."""
+        return self.store.items(self.name)
+
+    def clear(self) -> None:
+        """Remove every key."""
+        self.store.clear(self.name)
+
+    def migrate_json(self, file_path: str, convert: Callable[[Any], Dict[str, Any]] = None) -> bool:
+        """Import a legacy JSON file into the namespace, once."""
+        return self.store.migrate_json(self.name, file_path, convert)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.items())
+
+
+# Global instance
+state_store = KVStore()
@@ -0,0 +1,438 @@
+"""
+Indexed search over the log files.
+
+!log used to send the last lines of log.txt and commandlog.txt, with no way
+to ask for a time range, a guild or a message without pulling the whole file
+into Discord. This module answers those queries over the live log files and
+their rotated archives (see scripts/log_writer.py).
+
+Lines start with a 'YYYY-MM-DD HH:MM:SS' timestamp, which sorts the same as
+the bytes it is written in, so timestamps are compared without parsing them.
+For each live file a sparse index records the offset and timestamp of the
+first timestamped line after every INDEX_STRIDE bytes. The index is extended
+from where it stopped each time the log writer appends to the file, and
+rebuilt when the file is truncated or rotated. A query memory-maps the file,
+bisects the index to the byte range of its time span, and scans only that
+range: text filters are matched with a regular expression over the mapped
+bytes and expanded to whole lines, and the remaining filters only check
+those lines.
+
+Archives are gzip-compressed and can't be mapped, so only the first and last
+timestamp of each is remembered; an archive is decompressed and scanned only
+when its span overlaps the query and the live file didn't already return
+enough lines.
+"""
+
+import bisect
+import collections
+import gzip
+import mmap
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from scripts.log_writer import log_writer
+
+# Bytes between index entries
+INDEX_STRIDE = 64 * 1024
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+TIMESTAMP_LENGTH = 19
+# A timestamp at the start of a line
+_TIMESTAMP = re.compile(rb'^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d', re.M)
+# Relative times, such as 30m or 2d
+_RELATIVE_TIME = re.compile(r'^(\d+)([smhdw])$')
+_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+
+
+def parse_time(value: str, now: Optional[datetime] = None) -> bytes:
+    """
+    Turn a query time into a comparable timestamp.
+
+    Args:
+        value: A relative time ('30m', '2h', '1d') or an ISO date or time
+            ('2024-05-01', '2024-05-01T18:30')
+        now: The current time (defaults to now)
+
+    Returns:
+        bytes: The timestamp in the log file format
+
+    Raises:
+        ValueError: If the time can't be parsed
+    """
+    match = _RELATIVE_TIME.match(value.lower())
+    if match:
+        moment = (now or datetime.now()) - timedelta(**{_UNITS[match.group(2)]: int(match.group(1))})
+    else:
+        moment = datetime.fromisoformat(value)
+    return moment.strftime(TIMESTAMP_FORMAT).encode()
+
+
+class LogQuery:
+    """
+    Filters for a log search.
+
+    Args:
+        since: Earliest timestamp (inclusive), or None
+        until: Latest timestamp (inclusive), or None
+        text: Text the line must contain (case-insensitive), or None
+        guild: Guild names or IDs, any of which the line must contain, or None
+        level: Log level the line must have, such as 'ERROR', or None
+    """
+    def __init__(self, since: Optional[bytes] = None, until: Optional[bytes] = None,
+                 text: Optional[str] = None, guild: Optional[List[str]] = None,
+                 level: Optional[str] = None):
+        self.since = since
+        self.until = until
+        self.text = text.lower().encode() if text else None
+        self.guild = [name.lower().encode() for name in guild if name] if guild else None
+        self.level = f" {level.upper()} ".encode() if level else None
+
+    @classmethod
+    def parse(cls, query: str, guild=None, now: Optional[datetime] = None) -> 'LogQuery':
+        """
+        Parse the arguments of !log.
+
+        Words of the form since:<time>, until:<time>, guild:<name or ID>
+        (guild:here for the current server) and level:<level> are filters;
+        every other word is part of the text to search for.
+
+        Args:
+            query: The arguments, such as 'since:2h guild:here skipped'
+            guild: The guild the command was used in, for guild:here
+            now: The current time (defaults to now)
+
+        Returns:
+            LogQuery: The parsed query
+
+        Raises:
+            ValueError: If a filter's value is invalid
+        """
+        options = {}
+        words = []
+        for word in query.split():
+            key, _, value = word.partition(':')
+            if value and key.lower() in ('since', 'until', 'guild', 'level'):
+                options[key.lower()] = value
+            else:
+                words.append(word)
+        guild_names = None
+        if 'guild' in options:
+            if options['guild'].lower() == 'here':
+                if guild is None:
+                    raise ValueError('guild:here can only be used in a server')
+                guild_names = [str(guild.id), guild.name]
+            else:
+                guild_names = [options['guild']]
+        return cls(
+            since=parse_time(options['since'], now) if 'since' in options else None,
+            until=parse_time(options['until'], now) if 'until' in options else None,
+            text=' '.join(words) or None,
+            guild=guild_names,
+            level=options.get('level'),
+        )
+
+    def matches(self, line: bytes) -> bool:
+        """Check the text, guild and level filters against one line."""
+        lower = line.lower()
+        if self.text and self.text not in lower:
+            return False
+        if self.guild and not any(name in lower for name in self.guild):
+            return False
+        if self.level and self.level not in line:
+            return False
+        return True
+
+    @property
+    def needle(self) -> Optional[bytes]:
+        """The text the scan looks for, or None to check every line."""
+        if self.text:
+            return self.text
+        if self.guild and len(self.guild) == 1:
+            return self.guild[0]
+        return None
+
+
+def _first_after(data, start: int, end: int, bound: bytes, inclusive: bool) -> Optional[int]:
+    """
+    Find the first timestamped line in data[start:end] at (or after) a timestamp.
+
+    Args:
+        data: The log contents (bytes or a memory map)
+        start: Offset to start at (a line start)
+        end: Offset to stop at
+        bound: The timestamp
+        inclusive: True to stop at a line at the timestamp, False to stop after it
+
+    Returns:
+        int: Offset of the line, or None if there is none in the range
+    """
+    for match in _TIMESTAMP.finditer(data, start, end):
+        stamp = match.group()
+        if stamp >= bound if inclusive else stamp > bound:
+            return match.start()
+    return None
+
+
+def scan(data, start: int, end: int, query: LogQuery, limit: int) -> List[bytes]:
+    """
+    Find the last matching lines in a range.
+
+    Args:
+        data: The log contents (bytes or a memory map)
+        start: Offset of the first line of the range
+        end: Offset the range ends at
+        query: The filters
+        limit: Maximum number of lines to return
+
+    Returns:
+        list: The newest matching lines, oldest first
+    """
+    found = collections.deque(maxlen=limit)
+    needle = query.needle
+    if needle is not None:
+        # Find the text with the regex engine and only look at the lines it is on
+        pattern = re.compile(re.escape(needle), re.I)
+        position = start
+        while position < end:
+            match = pattern.search(data, position, end)
+            if match is None:
+                break
+            line_start = data.rfind(b'\n', start, match.start()) + 1 or start
+            line_end = data.find(b'\n', match.end(), end)
+            line_end = end if line_end == -1 else line_end
+            line = data[line_start:line_end]
+            if query.matches(line):
+                found.append(line)
+            position = line_end + 1
+        return list(found)
+
+    # No text to look for: walk back from the end, so only the returned lines are read
+    line_end = end
+    if line_end > start and data[line_end - 1:line_end] == b'\n':
+        line_end -= 1
+    while line_end > start and len(found) < limit:
+        line_start = data.rfind(b'\n', start, line_end) + 1 or start
+        line = data[line_start:line_end]
+        if line and query.matches(line):
+            found.appendleft(line)
+        line_end = line_start - 1
+    return list(found)
+
+
+class LogIndex:
+    """Sparse timestamp -> offset index of one live log file."""
+
+    def __init__(self, path: str, stride: int = INDEX_STRIDE):
+        """
+        Initialize the index.
+
+        Args:
+            path: The log file
+            stride: Bytes between index entries
+        """
+        self.path = path
+        self.stride = stride
+        self.stamps: List[bytes] = []
+        self.offsets: List[int] = []
+        self.indexed = 0  # Bytes of the file covered by the index
+        self._head = b''  # First bytes of the file, to notice it was replaced
+        self._lock = threading.Lock()
+
+    def _reset(self) -> None:
+        """Forget the index. Caller holds the lock."""
+        self.stamps, self.offsets, self.indexed, self._head = [], [], 0, b''
+
+    def refresh(self) -> None:
+        """Index whatever was appended to the file since the last refresh."""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                self._reset()
+                return
+            if size < self.indexed:
+                self._reset()
+            if size == 0:
+                return
+            with open(self.path, 'rb') as f:
+                head = f.read(TIMESTAMP_LENGTH)
+                if self._head and head != self._head:
+                    # Rotated or cleared and written again since the last refresh
+                    self._reset()
+                self._head = head
+                if size == self.indexed:
+                    return
+                with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as data:
+                    self._extend(data, size)
+
+    def _extend(self, data, size: int) -> None:
+        """Add entries for data[self.indexed:size]. Caller holds the lock."""
+        position = self.indexed
+        next_entry = (self.offsets[-1] + self.stride) if self.offsets else 0
+        while True:
+            position = max(position, next_entry)
+            match = _TIMESTAMP.search(data, position, size)
+            if match is None:
+                break
+            line_end = data.find(b'\n', match.end(), size)
+            if line_end == -1:
+                # The last line is still being written
+                break
+            self.stamps.append(match.group())
+            self.offsets.append(match.start())
+            next_entry = match.start() + self.stride
+            position = line_end + 1
+        # Resume at the last complete line, so a partly written line is indexed later
+        last_newline = data.rfind(b'\n', 0, size)
+        self.indexed = max(self.indexed, last_newline + 1)
+
+    def span(self, data, size: int, query: LogQuery) -> Tuple[int, int]:
+        """
+        Find the byte range of the file the query's time span covers.
+
+        Args:
+            data: The mapped file
+            size: Size of the file
+            query: The filters
+
+        Returns:
+            tuple: (start, end) offsets
+        """
+        with self._lock:
+            stamps, offsets = list(self.stamps), list(self.offsets)
+        start, end = 0, size
+        if query.since is not None and stamps:
+            i = bisect.bisect_left(stamps, query.since)
+            coarse = offsets[i - 1] if i else 0
+            limit = offsets[i] if i < len(offsets) else size
+            found = _first_after(data, coarse, limit, query.since, inclusive=True)
+            start = found if found is not None else limit
+        if query.until is not None and stamps:
+            j = bisect.bisect_right(stamps, query.until)
+            coarse = offsets[j - 1] if j else 0
+            limit = offsets[j] if j < len(offsets) else size
+            found = _first_after(data, coarse, limit, query.until, inclusive=False)
+            end = found if found is not None else limit
+        return start, max(start, end)
+
+
+class LogSearch:
+    """Searches log files and their rotated archives."""
+
+    def __init__(self):
+        self.indexes: Dict[str, LogIndex] = {}
+        # (path, mtime, size) -> (first timestamp, last timestamp) of an archive
+        self._archive_spans: Dict[Tuple[str, int, int], Tuple[bytes, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def index(self, path) -> LogIndex:
+        """
+        Get the index of a live log file.
+
+        Args:
+            path: The log file
+
+        Returns:
+            LogIndex: The file's index
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self.indexes:
+                self.indexes[path] = LogIndex(path)
+            return self.indexes[path]
+
+    def on_append(self, path: str) -> None:
+        """Extend the index of a file the log writer just appended to."""
+        index = self.indexes.get(path)
+        if index is not None:
+            index.refresh()
+
+    def _archives(self, path: str) -> List[str]:
+        """Rotated archives of a log file, newest first."""
+        archives = []
+        number = 1
+        while os.path.exists(f"{path}.{number}.gz"):
+            archives.append(f"{path}.{number}.gz")
+            number += 1
+        return archives
+
+    def _archive_span(self, archive: str, data: Optional[bytes] = None) -> Optional[Tuple[bytes, bytes]]:
+        """
+        Get the first and last timestamp of an archive.
+
+        Args:
+            archive: The archive
+            data: Its decompressed contents, if already read
+
+        Returns:
+            tuple: (first, last) timestamps, or None if it has none
+        """
+        stat = os.stat(archive)
+        key = (archive, stat.st_mtime_ns, stat.st_size)
+        if key not in self._archive_spans:
+            if data is None:
+                with gzip.open(archive, 'rb') as f:
+                    data = f.read()
+            stamps = _TIMESTAMP.findall(data)
+            self._archive_spans[key] = (stamps[0], stamps[-1]) if stamps else None
+        return self._archive_spans[key]
+
+    def search(self, path, query: LogQuery, limit: int) -> List[str]:
+        """
+        Find the newest lines of a log that match a query.
+
+        Args:
+            path: The live log file
+            query: The filters
+            limit: Maximum number of lines to return
+
+        Returns:
+            list: Matching lines, oldest first
+        """
+        path = os.path.abspath(path)
+        lines = self._search_live(path, query, limit)
+        for archive in self._archives(path):
+            if len(lines) >= limit:
+                break
+            span = self._archive_span(archive)
+            if span is None:
+                continue
+            if query.since is not None and span[1] < query.since:
+                # Older archives are older still
+                break
+            if query.until is not None and span[0] > query.until:
+                continue
+            with gzip.open(archive, 'rb') as f:
+                data = f.read()
+            start, end = 0, len(data)
+            if query.since is not None:
+                found = _first_after(data, 0, end, query.since, inclusive=True)
+                start = found if found is not None else end
+            if query.until is not None:
+                found = _first_after(data, start, end, query.until, inclusive=False)
+                end = found if found is not None else end
+            lines = scan(data, start, end, query, limit - len(lines)) + lines
+        return [line.decode('utf-8', errors='replace') for line in lines]
+
+    def _search_live(self, path: str, query: LogQuery, limit: int) -> List[bytes]:
+        """Search the live log file through its index."""
+        index = self.index(path)
+        index.refresh()
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return []
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return []
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as data:
+                start, end = index.span(data, size, query)
+                return scan(data, start, end, query, limit)
+
+
+# Global instance
+log_search = LogSearch()
+log_writer.subscribe(log_search.on_append)
@@ -0,0 +1,193 @@
+"""
+Buffered log writer.
+
+Every print() is captured into log.txt (see OutputCapture in
+scripts/logging.py) and every command is appended to commandlog.txt. Both
+used to open or flush their file for each line, which put synchronous disk
+I/O on the event loop hundreds of times per second under load.
+
+Producers now only put the formatted line on a queue. A single writer thread
+takes everything queued every LOGGING.FLUSH_INTERVAL seconds, appends it to
+each file in one write and flushes it once. A file that grows past
+LOGGING.MAX_BYTES is rotated: it is compressed to <file>.1.gz, older archives
+move up one number, and at most LOGGING.BACKUP_COUNT archives are kept. Subscribers are
+told which files were appended to after every batch (the log search index,
+scripts/log_index.py, uses this to index new lines as they are written).
+"""
+
+import gzip
+import os
+import queue
+import shutil
+import sys
+import threading
+from typing import Callable, Dict, List, Optional
+from scripts.config import config_service
+
+
+class LogWriter:
+    """Appends queued lines to log files from a background thread."""
+
+    def __init__(self, flush_interval: Optional[float] = None,
+                 max_bytes: Optional[int] = None, backup_count: Optional[int] = None):
+        """
+        Initialize the writer.
+
+        Args:
+            flush_interval: Seconds between batched writes (defaults to LOGGING.FLUSH_INTERVAL)
+            max_bytes: Size a file is rotated at, 0 disables rotation (defaults to LOGGING.MAX_BYTES)
+            backup_count: Number of compressed archives kept per file (defaults to LOGGING.BACKUP_COUNT)
+        """
+        self.configure(flush_interval, max_bytes, backup_count)
+        self._queue = queue.SimpleQueue()
+        self._files: Dict[str, object] = {}
+        self._write_lock = threading.Lock()
+        self._writer = None
+        self._stop = threading.Event()
+        self._subscribers: List[Callable[[str], None]] = []
+
+    def configure(self, flush_interval: Optional[float] = None,
+                  max_bytes: Optional[int] = None, backup_count: Optional[int] = None) -> None:
+        """
+        Set the writer's limits; ones that aren't given are read from the config.
+
+        The writer thread picks up a new flush interval after its current wait.
+        """
+        self.flush_interval = config_service.get_float('LOGGING.FLUSH_INTERVAL', 1.0) if flush_interval is None else flush_interval
+        self.max_bytes = config_service.get_int('LOGGING.MAX_BYTES', 10 * 1024 * 1024) if max_bytes is None else max_bytes
+        self.backup_count = config_service.get_int('LOGGING.BACKUP_COUNT', 5) if backup_count is None else backup_count
+
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        """
+        Call a function after each batch, once per file that was written.
+
+        Args:
+            callback: Called from the writer thread with the file's absolute path
+        """
+        self._subscribers.append(callback)
+
+    def write(self, path, text: str) -> None:
+        """
+        Queue text to be appended to a file. Never blocks on disk I/O.
+
+        Args:
+            path: The log file
+            text: The text to append, including its trailing newline
+        """
+        self._queue.put((os.fspath(path), text))
+        if self._writer is None:
+            self._ensure_writer()
+
+    def flush(self) -> None:
+        """Append everything queued so far to the files and flush them."""
+        with self._write_lock:
+            batches: Dict[str, list] = {}
+            while True:
+                try:
+                    path, text = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batches.setdefault(path, []).append(text)
+            for path, texts in batches.items():
+                try:
+                    f = self._open(path)
+                    f.write(''.join(texts))
+                    f.flush()
+                    if self.max_bytes and f.tell() >= self.max_bytes:
+                        self._rotate(path)
+                except OSError as e:
+                    # Not print(): that would be captured and queued again
+                    sys.__stderr__.write(f"Error writing {path}: {str(e)}\n")
+            for path in batches:
+                for callback in self._subscribers:
+                    try:
+                        callback(os.path.abspath(path))
+                    except Exception as e:
+                        sys.__stderr__.write(f"Error in log subscriber: {str(e)}\n")
+
+    def _open(self, path: str):
+        """Get the open handle of a file, opening it for appending. Caller holds the write lock."""
+        f = self._files.get(path)
+        if f is None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            f = self._files[path] = open(path, 'a', encoding='utf-8')
+        return f
+
+    def _close(self, path: str) -> None:
+        """Close a file's handle if it is open. Caller holds the write lock."""
+        f = self._files.pop(path, None)
+        if f is not None:
+            f.close()
+
+    def _rotate(self, path: str) -> None:
+        """
+        Compress a full log file into <file>.1.gz and start a new one.
+
+        Caller holds the write lock.
+
+        Args:
+            path: The log file
+        """
+        self._close(path)
+        if self.backup_count <= 0:
+            os.remove(path)
+            return
+        for number in range(self.backup_count - 1, 0, -1):
+            archive = f"{path}.{number}.gz"
+            if os.path.exists(archive):
+                os.replace(archive, f"{path}.{number + 1}.gz")
+        with open(path, 'rb') as source, gzip.open(f"{path}.1.gz", 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.remove(path)
+
+    def truncate(self, path, text: str = '') -> None:
+        """
+        Replace a file's contents, including anything still queued for it.
+
+        Args:
+            path: The log file
+            text: The new contents
+        """
+        path = os.fspath(path)
+        self.flush()
+        with self._write_lock:
+            self._close(path)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+
+    def _ensure_writer(self) -> None:
+        """Start the background writer thread if it isn't running."""
+        with self._write_lock:
+            if self._writer is not None or self._stop.is_set():
+                return
+            self._writer = threading.Thread(target=self._run, name='log-writer', daemon=True)
+            self._writer.start()
+
+    def _run(self) -> None:
+        """Flush queued lines every flush interval until stopped."""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                sys.__stderr__.write(f"Error flushing logs: {str(e)}\n")
+
+    def stop(self) -> None:
+        """Stop the writer thread, write what is still queued and close the files."""
+        self._stop.set()
+        self.flush()
+        with self._write_lock:
+            for path in list(self._files):
+                self._close(path)
+
+
+# Global instance
+log_writer = LogWriter()
+
+
+def _apply_config_change(config, old_config):
+    """Apply changed LOGGING settings to the shared writer."""
+    log_writer.configure()
+
+config_service.subscribe(_apply_config_change)
@@ -163,7 +163,8 @@ class OutputCapture:
     Captures ALL terminal output and writes it to the log file.
     
     This class intercepts all stdout and stderr output, writes it to the
-    terminal as normal, but also adds timestamps and writes it to a log file.
+    terminal as normal, but also adds timestamps and queues it for the log
+    file (see scripts/log_writer.py), so printing never waits on the disk.
     It removes ANSI color codes from the log file output for better readability.
     
     Args:
@@ -171,12 +172,15 @@ class OutputCapture:
         stream: The stream to capture (sys.stdout or sys.stderr)
     """
     def __init__(self, log_file, stream=None):
+        # Imported here: scripts.config imports this module
+        from scripts.log_writer import log_writer
         self.terminal = stream or sys.stdout
-        self.log_file = open(log_file, 'a', encoding='utf-8')
+        self.log_file = log_file
+        self.writer = log_writer
         
     def write(self, message):
         """
-        Write the message to both terminal and log file.
+        Write the message to the terminal and queue it for the log file.
         
         Args:
             message: The message to write
@@ -190,15 +194,36 @@ class OutputCapture:
         # Remove color codes and clean up the message
         clean_message = message.replace(GREEN, '').replace(BLUE, '').replace(RED, '').replace(RESET, '').strip()
         if clean_message:  # Only log non-empty messages
-            # Add timestamp and write directly to file
+            # Add timestamp and hand the line to the log writer
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self.log_file.write(f"{timestamp} {clean_message}\n")
-            self.log_file.flush()
+            self.writer.write(self.log_file, f"{timestamp} {clean_message}\n")
             
     def flush(self):
-        """Flush both terminal and log file streams."""
+        """Flush the terminal stream; the log file is flushed by the log writer."""
         self.terminal.flush()
-        self.log_file.flush()
+
+class QueuedFileHandler(logging.Handler):
+    """
+    Logging handler that queues formatted records for the log file.
+    
+    Used instead of logging.FileHandler so log records, like printed output,
+    are written by the log writer instead of on the calling thread.
+    
+    Args:
+        log_file: Path to the log file
+    """
+    def __init__(self, log_file):
+        super().__init__()
+        from scripts.log_writer import log_writer
+        self.log_file = log_file
+        self.writer = log_writer
+
+    def emit(self, record):
+        """Format the record and queue it for the log file."""
+        try:
+            self.writer.write(self.log_file, self.format(record) + '\n')
+        except Exception:
+            self.handleError(record)
 
 class YTDLPLogger(logging.Logger):
     """
@@ -300,7 +325,7 @@ def setup_logging(log_level):
 
     # Create handlers
     log_file = 'log.txt'
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler = QueuedFileHandler(log_file)
     console_handler = logging.StreamHandler(sys.stdout)
 
     # Create formatter
@@ -0,0 +1,351 @@
+"""
+Native loop mode for the current song.
+
+Looping used to re-queue the song, so every repetition went through
+after_playing_coro and play_next with a new ffmpeg process and new Discord
+messages. NativeLoop instead repeats the song inside the running player:
+
+- Short songs are played once more from a fresh ffmpeg process while their
+  frames are recorded, and every further repetition is replayed from that
+  in-memory buffer without any ffmpeg process at all.
+- Longer songs get a single ffmpeg process started with -stream_loop that
+  covers all remaining repetitions.
+
+Either way a loop costs at most one ffmpeg spawn and no Discord API calls.
+"""
+
+import asyncio
+import threading
+import discord
+from scripts.config import config_service
+from scripts.duration import get_audio_duration
+from scripts.constants import GREEN, BLUE, RESET
+from scripts.playback import TrackedAudioSource, create_audio_source, ensure_encoder
+
+# Size of one 20 ms PCM frame, used to decide whether a song fits the buffer
+PCM_FRAME_BYTES = 3840
+
+
+class BufferedAudioSource(discord.AudioSource):
+    """Audio source that replays frames recorded from another source."""
+
+    def __init__(self, frames, opus: bool):
+        self._frames = frames
+        self._index = 0
+        self._opus = opus
+
+    def read(self) -> bytes:
+        if self._index >= len(self._frames):
+            return b''
+        data = self._frames[self._index]
+        self._index += 1
+        return data
+
+    def is_opus(self) -> bool:
+        return self._opus
+
+
+class NativeLoop:
+    """
+    Repeats the current song inside a TrackedAudioSource.
+
+    process() is called by the tracked source from the player thread for
+    every frame, and at the end of each pass it swaps in the next one.
+    Source creation happens on the event loop through prepare().
+    """
+
+    def __init__(self, song: dict, count: int, duration=None, loop=None, on_finished=None, buffer_limit=None, voice_client=None, tracked=None, on_fallback=None):
+        """
+        Initialize the loop.
+
+        Args:
+            song: The song being looped
+            count: Number of extra times to play the song after the current pass
+            duration: Song duration in seconds, if known
+            loop: Event loop used for preparing sources and callbacks
+            on_finished: Called on the event loop once the loop ends
+            buffer_limit: Max bytes for the in-memory buffer (defaults to PLAYBACK.LOOP_BUFFER_MB)
+            voice_client: Voice client the song is playing on
+            tracked: The source the loop is attached to, for its volume
+            on_fallback: Called on the event loop with the passes still to play
+                if the next pass wasn't ready in time, to re-queue them instead
+        """
+        if buffer_limit is None:
+            buffer_limit = config_service.get_int('PLAYBACK.LOOP_BUFFER_MB', 32) * 1024 * 1024
+        self.song = song
+        self.total = count
+        self.plays_left = count
+        self.completed = 0
+        self.pass_frames = round(duration / TrackedAudioSource.FRAME_SECONDS) if duration else None
+        self.buffer_limit = buffer_limit
+        self.cancelled = False
+        self.finished = False
+        self._loop = loop
+        self._on_finished = on_finished
+        self._on_fallback = on_fallback
+        self._voice_client = voice_client
+        self._tracked = tracked
+        self._pending = None        # (source, passes it covers, record it)
+        self._pending_lock = threading.Lock()
+        self._preparing = False
+        self._buffer = None
+        self._buffer_opus = False
+        self._recording = None
+        self._recorded_bytes = 0
+        self._buffering_failed = False
+        self._source_frames = 0
+        self._internal_left = 0     # Passes left inside a -stream_loop source
+
+    @property
+    def current_pass(self) -> int:
+        """1-based number of the repetition currently playing."""
+        return self.completed + 1
+
+    def cancel(self) -> None:
+        """Stop looping at the end of the current pass."""
+        self.cancelled = True
+        self._clear_pending()
+
+    def on_seek(self) -> None:
+        """
+        Handle the current pass being replaced by a seek.
+
+        The new source covers only the rest of this pass, so a partial
+        recording is dropped and the next pass is prepared again.
+        """
+        self._recording = None
+        self._internal_left = 0
+        self._source_frames = 0
+        if self._buffer is None and not self._pending and self.plays_left > 0:
+            self._request_prepare()
+
+    def cleanup(self) -> None:
+        """Release the prepared source and the buffer."""
+        self._clear_pending()
+        self._buffer = None
+        self._recording = None
+
+    def _take_pending(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, None
+        return pending
+
+    def _clear_pending(self) -> None:
+        pending = self._take_pending()
+        if pending:
+            pending[0].cleanup()
+
+    def _request_prepare(self) -> None:
+        """Ask the event loop to prepare the next source."""
+        if self._loop and not self._preparing and not self.cancelled:
+            self._preparing = True
+            self._loop.call_soon_threadsafe(lambda: asyncio.ensure_future(self.prepare()))
+
+    def _finish(self) -> bytes:
+        """End the loop and let playback continue normally."""
+        if not self.finished:
+            self.finished = True
+            self.cleanup()
+            print(f"{GREEN}Loop finished:{RESET}{BLUE} {self.song.get('title', 'Unknown')} played {self.completed} times{RESET}")
+            if self._on_finished and self._loop:
+                self._loop.call_soon_threadsafe(self._on_finished)
+        return b''
+
+    def _fall_back(self) -> bytes:
+        """End the native loop and hand the remaining passes to the re-queue path."""
+        if not self._on_fallback or not self._loop:
+            return self._finish()
+        if not self.finished:
+            self.finished = True
+            self.cleanup()
+            plays_left = self.plays_left
+            print(f"{GREEN}Loop source not ready:{RESET}{BLUE} re-queueing {self.song.get('title', 'Unknown')} {plays_left} more times{RESET}")
+            self._loop.call_soon_threadsafe(self._on_fallback, plays_left)
+        return b''
+
+    async def prepare(self) -> None:
+        """Create the source for the next pass if one is needed."""
+        try:
+            if self.cancelled or self.finished or self._pending or self._buffer is not None or self.plays_left <= 0:
+                return
+            file_path = self.song['file_path']
+            volume = round(self._tracked.volume * 100) if self._tracked is not None else None
+            guild_id = getattr(getattr(self._voice_client, 'guild', None), 'id', None)
+            plays = self.plays_left
+            record = False
+            if self.pass_frames and plays > 1 and not self._buffering_failed:
+                # Short songs are recorded once and replayed from memory
+                estimate = self.pass_frames * PCM_FRAME_BYTES
+                record = estimate <= self.buffer_limit
+            if record or not self.pass_frames:
+                # Without a known duration pass boundaries can't be counted, so play one pass at a time
+                source = await create_audio_source(file_path, use_volume_transformer=False, volume=volume, guild_id=guild_id)
+                covers = 1
+            else:
+                source = await create_audio_source(file_path, use_volume_transformer=False, stream_loop=plays - 1, volume=volume, guild_id=guild_id)
+                covers = plays
+            if self._voice_client is not None:
+                ensure_encoder(self._voice_client, source)
+            with self._pending_lock:
+                if not (self.cancelled or self.finished):
+                    self._pending, source = (source, covers, record), None
+            if source is not None:
+                source.cleanup()
+        except Exception as e:
+            print(f"Error preparing loop source: {str(e)}")
+        finally:
+            self._preparing = False
+
+    def process(self, tracked: TrackedAudioSource, data: bytes) -> bytes:
+        """
+        Handle a frame read by the tracked source.
+
+        Called with the tracked source's lock held.
+
+        Args:
+            tracked: The source the loop is attached to
+            data: The frame just read, or b'' at the end of the current source
+
+        Returns:
+            bytes: The frame to play, or b'' if playback should end
+        """
+        if self.finished:
+            return data
+        if data:
+            return self._on_frame(tracked, data)
+
+        # End of the current source: one pass completed
+        self.completed += 1
+        if self._recording is not None:
+            self._buffer, self._recording = self._recording, None
+        if self.cancelled or self.plays_left <= 0:
+            return self._finish()
+
+        pending = None if self._buffer is not None else self._take_pending()
+        if self._buffer is not None:
+            source, covers, record = BufferedAudioSource(self._buffer, self._buffer_opus), 1, False
+        elif pending:
+            source, covers, record = pending
+        else:
+            # Nothing ready in time; re-queue the remaining passes instead
+            return self._fall_back()
+
+        previous = tracked.source
+        tracked.source = source
+        tracked.offset = 0
+        tracked.frames = 0
+        previous.cleanup()
+
+        self.plays_left -= 1
+        self._internal_left = covers - 1
+        self._source_frames = 0
+        if record:
+            self._recording = []
+            self._recorded_bytes = 0
+            self._buffer_opus = source.is_opus()
+        elif self._buffer is None and covers == 1 and self.plays_left > 0:
+            self._request_prepare()
+
+        data = source.read()
+        if not data:
+            return self._finish()
+        return self._on_frame(tracked, data)
+
+    def _on_frame(self, tracked: TrackedAudioSource, data: bytes) -> bytes:
+        """Record a frame and track pass boundaries inside -stream_loop sources."""
+        if self._recording is not None:
+            self._recording.append(data)
+            self._recorded_bytes += len(data)
+            if self._recorded_bytes > self.buffer_limit:
+                # Too big after all; switch to a -stream_loop source for the rest
+                self._recording = None
+                self._buffering_failed = True
+                self._request_prepare()
+
+        if self._internal_left and self.pass_frames:
+            self._source_frames += 1
+            if self._source_frames > self.pass_frames:
+                self._source_frames = 1
+                self._internal_left -= 1
+                self.completed += 1
+                self.plays_left -= 1
+                tracked.offset = 0
+                tracked.frames = 0
+                if self.cancelled:
+                    return self._finish()
+        return data
+
+
+def get_native_loop(music_bot):
+    """
+    Get the native loop running for a server, if any.
+
+    Args:
+        music_bot: The MusicBot instance
+
+    Returns:
+        NativeLoop or None
+    """
+    player = getattr(getattr(music_bot, 'voice_client', None), '_player', None)
+    source = getattr(player, 'source', None)
+    if isinstance(source, TrackedAudioSource):
+        looper = source.looper
+        if looper is not None and not looper.finished:
+            return looper
+    return None
+
+
+async def start_native_loop(music_bot, count: int, on_finished=None, on_fallback=None) -> bool:
+    """
+    Start looping the current song inside the player.
+
+    Args:
+        music_bot: The MusicBot instance
+        count: Number of extra times to play the song
+        on_finished: Called on the event loop when the loop ends
+        on_fallback: Called on the event loop with the passes still to play
+            if the next pass wasn't ready in time
+
+    Returns:
+        bool: True if the loop was started, False if the current source can't loop natively
+    """
+    song = music_bot.current_song
+    player = getattr(getattr(music_bot, 'voice_client', None), '_player', None)
+    source = getattr(player, 'source', None)
+    if not song or song.get('is_stream') or not song.get('file_path') or not isinstance(source, TrackedAudioSource):
+        return False
+
+    duration = song.get('duration') or await get_audio_duration(song['file_path'])
+    looper = NativeLoop(
+        song,
+        count,
+        duration=duration,
+        loop=asyncio.get_running_loop(),
+        on_finished=on_finished,
+        voice_client=music_bot.voice_client,
+        tracked=source,
+        on_fallback=on_fallback,
+    )
+    previous = source.looper
+    source.looper = looper
+    if previous:
+        previous.cleanup()
+    await looper.prepare()
+    return True
+
+
+def stop_native_loop(music_bot) -> bool:
+    """
+    Stop the native loop after the current pass.
+
+    Args:
+        music_bot: The MusicBot instance
+
+    Returns:
+        bool: True if a loop was running
+    """
+    looper = get_native_loop(music_bot)
+    if looper is None:
+        return False
+    looper.cancel()
+    return True
@@ -0,0 +1,173 @@
+"""
+Loudness normalization for cached tracks.
+
+Each cached file is analyzed once with ffmpeg's EBU R128 loudnorm filter in a
+low-priority background process, and the integrated loudness and true peak
+are stored in its PlaylistCache entry. At play time the difference to the
+target loudness is folded into the volume filter that the playback ffmpeg
+already runs, so normalization costs nothing extra per stream. Opus files
+that would otherwise be played through passthrough get their gain baked in
+once instead (see scripts/transcode.py).
+"""
+
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Dict, Optional
+from scripts.caching import playlist_cache
+from scripts.config import config_service, FFMPEG_PATH
+from scripts.priority import set_low_priority
+
+# Headroom kept below 0 dBTP when boosting quiet tracks
+PEAK_CEILING = -1.0
+
+
+def normalization_enabled() -> bool:
+    """Check whether loudness normalization is on (AUDIO.LOUDNESS_NORMALIZATION)."""
+    return config_service.get_bool('AUDIO.LOUDNESS_NORMALIZATION', True)
+
+
+def _loudness_target() -> float:
+    """Target integrated loudness in LUFS (AUDIO.LOUDNESS_TARGET)."""
+    return config_service.get_float('AUDIO.LOUDNESS_TARGET', -14.0)
+
+
+def _max_gain() -> float:
+    """Largest normalization gain in either direction, in dB (AUDIO.LOUDNESS_MAX_GAIN)."""
+    return config_service.get_float('AUDIO.LOUDNESS_MAX_GAIN', 12.0)
+
+
+async def measure_loudness(file_path) -> Optional[Dict]:
+    """
+    Measure the integrated loudness and true peak of an audio file.
+
+    Args:
+        file_path: Path to the audio file
+
+    Returns:
+        Optional[Dict]: {'integrated': LUFS, 'true_peak': dBTP}, or None if analysis fails
+    """
+    try:
+        process = await asyncio.create_subprocess_exec(
+            FFMPEG_PATH or 'ffmpeg', '-hide_banner', '-nostats',
+            '-i', str(file_path),
+            '-vn', '-af', 'loudnorm=print_format=json',
+            '-f', 'null', '-',
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        set_low_priority(process.pid)
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            print(f"Error measuring loudness: {stderr.decode(errors='ignore')[-200:]}")
+            return None
+
+        # loudnorm prints its JSON report last
+        output = stderr.decode(errors='ignore')
+        report = json.loads(output[output.rindex('{'):output.rindex('}') + 1])
+        integrated = float(report['input_i'])
+        true_peak = float(report['input_tp'])
+    except Exception as e:
+        print(f"Error measuring loudness: {e}")
+        return None
+
+    # Silent files report -inf, which can't be normalized
+    if integrated in (float('inf'), float('-inf')):
+        return None
+    return {'integrated': integrated, 'true_peak': true_peak}
+
+
+def compute_gain(loudness: Optional[Dict]) -> float:
+    """
+    Get the gain that brings a track to the target loudness.
+
+    Boosts are limited so the true peak stays below PEAK_CEILING, and all
+    gains are capped at AUDIO.LOUDNESS_MAX_GAIN in either direction.
+
+    Args:
+        loudness: The stored loudness measurement, or None
+
+    Returns:
+        float: Gain in dB (0.0 if the track hasn't been analyzed)
+    """
+    if not normalization_enabled() or not loudness:
+        return 0.0
+    try:
+        gain = _loudness_target() - float(loudness['integrated'])
+        if gain > 0:
+            gain = min(gain, PEAK_CEILING - float(loudness['true_peak']))
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+    max_gain = _max_gain()
+    return max(-max_gain, min(max_gain, gain))
+
+
+def get_track_gain(file_path) -> float:
+    """
+    Get the normalization gain for a downloaded file.
+
+    Downloaded files are named after their YouTube video ID, which is the
+    key of their cache entry.
+
+    Args:
+        file_path: Path to the audio file
+
+    Returns:
+        float: Gain in dB (0.0 if unknown)
+    """
+    if not normalization_enabled() or not file_path:
+        return 0.0
+    video_id = os.path.splitext(os.path.basename(str(file_path)))[0]
+    return compute_gain(playlist_cache.get_loudness(video_id))
+
+
+class LoudnessAnalyzer:
+    """
+    Background worker that measures cached files one at a time.
+
+    Files are queued by the ingest worker (see scripts/transcode.py) when it
+    doesn't convert them itself.
+    """
+
+    def __init__(self):
+        """Initialize the analyzer with an empty work queue."""
+        self._pending = deque()
+        self._queued = set()
+        self._task = None
+
+    def schedule(self, video_id: str) -> None:
+        """
+        Queue a cached video for analysis.
+
+        Args:
+            video_id: The YouTube video ID
+        """
+        if not normalization_enabled() or video_id in self._queued or playlist_cache.get_loudness(video_id):
+            return
+        self._pending.append(video_id)
+        self._queued.add(video_id)
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                # No running event loop; the next schedule() call will start the worker
+                pass
+
+    async def _run(self) -> None:
+        """Measure queued videos until the queue is empty."""
+        while self._pending:
+            video_id = self._pending.popleft()
+            try:
+                file_path = playlist_cache.get_cached_file(video_id)
+                if not file_path:
+                    continue
+                result = await measure_loudness(file_path)
+                if result:
+                    playlist_cache.set_loudness(video_id, result['integrated'], result['true_peak'])
+            finally:
+                self._queued.discard(video_id)
+
+
+# Global instance
+loudness_analyzer = LoudnessAnalyzer()
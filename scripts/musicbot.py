@@ -13,7 +13,6 @@ import time
 import unicodedata
 import urllib.request
 import yt_dlp
-from collections import deque
 from datetime import datetime
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
@@ -37,7 +36,10 @@ from scripts.logging import setup_logging, get_ytdlp_logger, CachedVideoFound
 from scripts.messages import update_or_send_message, create_embed
 from scripts.play_next import play_next
 from scripts.process_queue import process_queue
+from scripts.queue_journal import queue_journal
 from scripts.restart import restart_bot
+from scripts.seek import get_playback_position
+from scripts.song_queue import SongQueue
 from scripts.spotify import get_spotify_album_details, get_spotify_track_details, get_spotify_playlist_details
 from scripts.ui_components import NowPlayingView
 from scripts.updatescheduler import check_updates, update_checker
@@ -47,6 +49,7 @@ from scripts.ytdlp import get_ytdlp_path, ytdlp_version
 from spotipy.oauth2 import SpotifyClientCredentials
 from spotipy.cache_handler import CacheFileHandler
 from scripts.caching import playlist_cache
+from scripts.transcode import ingest_transcoder
 
 # Load configuration variables from config.json
 config_vars = load_config()
@@ -74,6 +77,8 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
             cls._instances[guild_id] = cls(show_credentials=False)
             # Set the guild_id for this instance
             cls._instances[guild_id].guild_id = guild_id
+            if guild_id != 'setup':
+                cls._instances[guild_id].attach_journal()
             
             # If we have a setup instance with a bot reference, copy it to the new instance
             if 'setup' in cls._instances and cls._instances['setup'].bot:
@@ -101,7 +106,6 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
             instance.queue.clear()
             instance.queued_messages.clear()
             instance.in_progress_downloads.clear()
-            instance.duration_cache.clear()
             instance.current_song = None
             instance.voice_client = None
             # Remove from instances
@@ -117,8 +121,10 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
         # Discord bot instance (set later)
         self.bot = None
         self.guild_id = None  # Will be set when get_instance is called
-        self.queue = deque()  # Song queue for this server (deque for efficient front/back operations)
-        self.current_song = None  # Currently playing song
+        self.queue = SongQueue()  # Song queue for this server (indexed, O(log n) positional operations)
+        self.current_song = None  # Currently playing song (journaled, see the property below)
+        self.saved_session = None  # Queue saved by the previous run, offered for !restore
+        self.saved_session_offered = False  # Whether the saved queue has been offered yet
         self.is_playing = False  # Whether audio is currently playing
         self.voice_client = None  # Voice client connection
         self.waiting_for_song = False  # Flag to indicate waiting for a song to download
@@ -153,9 +159,9 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
         self.cache_dir = Path(__file__).parent.parent / '.cache'  # Directory for cache files
         self.spotify_cache = self.cache_dir / 'spotify'  # Directory for Spotify cache
         self.current_download_task = None  # Track current download task for this server
-        self.current_ydl = None  # Track current YoutubeDL instance for this server
+        self.download_tasks = set()  # Every running download task, so all of them can be cancelled
+        self.active_ydls = set()  # YoutubeDL instances running for this server (Spotify playlists run several)
         self.should_stop_downloads = False  # Flag to control download cancellation for this server
-        self.duration_cache = {}  # Cache for storing audio durations
         
         # Create cache directories if they don't exist
         self.cache_dir.mkdir(exist_ok=True)
@@ -197,6 +203,28 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
         self.join_voice_channel = lambda ctx: join_voice_channel(self, ctx)
         self.leave_voice_channel = lambda: leave_voice_channel(self)
 
+    @property
+    def current_song(self):
+        """The song that is currently playing."""
+        return self._current_song
+
+    @current_song.setter
+    def current_song(self, song):
+        previous = getattr(self, '_current_song', None)
+        self._current_song = song
+        journal = getattr(getattr(self, 'queue', None), 'journal', None)
+        if journal is not None and song is not previous:
+            journal.record('current', track=song)
+
+    def attach_journal(self):
+        """
+        Journal this server's queue so it survives a restart.
+
+        Loads the queue saved by the previous run, which is offered to the
+        server the next time the bot joins voice there.
+        """
+        self.saved_session = queue_journal.attach(self.guild_id, self.queue, lambda: get_playback_position(self))
+
     async def setup(self, bot_instance):
         """
         Setup the bot with the event loop and initialize necessary components.
@@ -412,6 +440,21 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
                 print(f"Error in download queue processor: {str(e)}")
                 await asyncio.sleep(1)
 
+    def _track_download_task(self, coro):
+        """
+        Start a download task that cancel_downloads() will cancel.
+        
+        Args:
+            coro: The download coroutine
+            
+        Returns:
+            asyncio.Task: The started task
+        """
+        task = asyncio.create_task(coro)
+        self.download_tasks.add(task)
+        task.add_done_callback(self.download_tasks.discard)
+        return task
+
     async def cancel_downloads(self, disconnect_voice=True):
         """
         Cancel all active downloads and clear the download queue for this server
@@ -439,24 +482,29 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
         """
         self.should_stop_downloads = True
         
-        # Cancel current download task if it exists
-        if self.current_download_task and not self.current_download_task.done():
-            self.current_download_task.cancel()
-            try:
-                await self.current_download_task
-            except (asyncio.CancelledError, Exception):
-                pass
+        # Taken before the tasks are cancelled, since a cancelled task forgets its instance
+        # while its executor thread is still downloading
+        ydls = list(self.active_ydls)
+        
+        # Cancel every running download task (Spotify playlists run several at once)
+        tasks = [task for task in self.download_tasks | {self.current_download_task} if task and not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.download_tasks.clear()
 
-        # Force close current yt-dlp instance if it exists
-        if self.current_ydl:
+        # Force close every running yt-dlp instance
+        for ydl in ydls:
             try:
-                # Try to abort the current download
-                if hasattr(self.current_ydl, '_download_retcode'):
-                    self.current_ydl._download_retcode = 1
+                # Try to abort the download
+                if hasattr(ydl, '_download_retcode'):
+                    ydl._download_retcode = 1
                 # Close the instance
-                self.current_ydl.close()
+                ydl.close()
             except Exception as e:
                 print(f"Error closing yt-dlp instance: {e}")
+        self.active_ydls.clear()
         
         # Clear the download queue for this server
         while not self.download_queue.empty():
@@ -466,8 +514,8 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
             except asyncio.QueueEmpty:
                 break
                 
-        # Clear any incomplete downloads from the queue (maintain deque type)
-        self.queue = deque(song for song in self.queue if not isinstance(song.get('file_path'), type(None)))
+        # Clear any incomplete downloads from the queue
+        self.queue.retain(lambda song: song.get('file_path') is not None)
         
         # Clear in-progress downloads tracking for this server
         self.in_progress_downloads.clear()
@@ -476,7 +524,6 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
         await asyncio.sleep(0.5)
         self.should_stop_downloads = False
         self.current_download_task = None
-        self.current_ydl = None
 
         # Stop any current playback
         if self.voice_client and self.voice_client.is_playing():
@@ -902,7 +949,7 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
                     Various exceptions from yt-dlp that are caught by the caller
                 """
                 try:
-                    self.current_ydl = ydl
+                    self.active_ydls.add(ydl)
                     loop = asyncio.get_event_loop()
                     try:
                         info = await loop.run_in_executor(None, lambda: ydl.extract_info(url, download=download))
@@ -935,7 +982,7 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
                             'ext': os.path.splitext(file_path)[1][1:]  # Get extension without dot
                         }
                 finally:
-                    self.current_ydl = None
+                    self.active_ydls.discard(ydl)
 
             try:
                 # Initialize default options
@@ -971,6 +1018,7 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
                                     thumbnail_url=info.get('thumbnail'),
                                     title=info.get('title', 'Unknown')
                                 )
+                                ingest_transcoder.schedule(video_id)
                                 yt_cached = True
                             
                             # If spotify_info is provided, also cache the Spotify track
@@ -994,10 +1042,8 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
                             elif spotify_cached:
                                 print(f"{GREEN}Added Spotify track to cache: {RESET}{BLUE}{spotify_info['track_id']} - {info.get('title', 'Unknown')}{RESET}")
                         
-                        # Get and cache the duration
-                        duration = await get_audio_duration(file_path)
-                        if duration > 0:
-                            self.duration_cache[file_path] = duration
+                        # Prime the shared duration memo
+                        await get_audio_duration(file_path)
 
                         return {
                             'title': info['title'],
@@ -1092,7 +1138,7 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
                         'extract_flat': True,
                         'noplaylist': not is_youtube_mix  # Allow playlist only for Mix URLs
                     }) as ydl:
-                        self.current_download_task = asyncio.create_task(extract_info(ydl, query, download=False))
+                        self.current_download_task = self._track_download_task(extract_info(ydl, query, download=False))
                         try:
                             info_dict = await self.current_download_task
                             
@@ -1275,7 +1321,7 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
                 }
 
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    self.current_download_task = asyncio.create_task(extract_info(ydl, query, download=True))
+                    self.current_download_task = self._track_download_task(extract_info(ydl, query, download=True))
                     try:
                         info = await self.current_download_task
                     except asyncio.CancelledError:
@@ -1413,6 +1459,7 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
                                 thumbnail_url=info.get('thumbnail'),
                                 title=info.get('title', 'Unknown')  # Save the title
                             )
+                            ingest_transcoder.schedule(video_id)
                             yt_cached = True
                         
                         # If spotify_info is provided, also cache the Spotify track
@@ -1440,10 +1487,8 @@ class MusicBot(PlaylistHandler, AfterPlayingHandler, SpotifyHandler):
                     if ctx:
                         info['requester'] = ctx.author
                     
-                    # Get and cache the duration
-                    duration = await get_audio_duration(file_path)
-                    if duration > 0:
-                        self.duration_cache[file_path] = duration
+                    # Prime the shared duration memo
+                    await get_audio_duration(file_path)
 
                     return {
                         'title': info['title'],
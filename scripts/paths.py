@@ -6,6 +6,7 @@ external executables and directories used by the bot.
 """
 import os
 import sys
+import shutil
 import platform
 
 def _is_executable(path):
@@ -41,41 +42,25 @@ def get_ffmpeg_path():
     """
     Get the path to the FFmpeg executable.
     
-    Attempts to locate the ffmpeg executable using the system's 'where' or 'which'
-    command depending on the platform. Falls back to assuming ffmpeg is in the
-    system PATH if the command fails.
+    Looks the ffmpeg executable up on the system PATH without spawning a
+    process. Falls back to the bare command name if it isn't found.
     
     Returns:
         str: Path to the FFmpeg executable
     """
-    try:
-        import subprocess
-        import platform
-        command = ['where' if platform.system() == 'Windows' else 'which', 'ffmpeg']
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        return result.stdout.strip().split('\n')[0]  # Take first result on Windows
-    except Exception:
-        return "ffmpeg"  # Fallback to PATH
+    return shutil.which('ffmpeg') or "ffmpeg"  # Fallback to PATH
 
 def get_ffprobe_path():
     """
     Get the path to the FFprobe executable.
     
-    Attempts to locate the ffprobe executable using the system's 'where' or 'which'
-    command depending on the platform. Falls back to assuming ffprobe is in the
-    system PATH if the command fails.
+    Looks the ffprobe executable up on the system PATH without spawning a
+    process. Falls back to the bare command name if it isn't found.
     
     Returns:
         str: Path to the FFprobe executable
     """
-    try:
-        import subprocess
-        import platform
-        command = ['where' if platform.system() == 'Windows' else 'which', 'ffprobe']
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        return result.stdout.strip().split('\n')[0]  # Take first result on Windows
-    except Exception:
-        return "ffprobe"  # Fallback to PATH
+    return shutil.which('ffprobe') or "ffprobe"  # Fallback to PATH
 
 def get_root_dir():
     """
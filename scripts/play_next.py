@@ -21,6 +21,9 @@ from scripts.playback import (
     log_now_playing,
     is_bot_explicitly_stopped,
 )
+from scripts.gapless import wrap_gapless_source, log_track_gap
+from scripts.volume import get_guild_volume
+from scripts.voice_metrics import voice_metrics
 
 # Get default volume from config
 config = load_config()
@@ -54,6 +57,7 @@ async def play_next(ctx):
         
     # Get server-specific music bot instance
     server_music_bot = MusicBot.get_instance(str(ctx.guild.id))
+    voice_metrics.mark_play_requested(ctx.guild.id)
     
     # Use the playback lock to prevent race conditions
     async with server_music_bot.playback_lock:
@@ -120,16 +124,6 @@ async def play_next(ctx):
                         print("Voice connection failed. Please try again later or use !join to reconnect manually.")
                         return
                 else:
-                    # Handle previous now playing message
-                    if server_music_bot.now_playing_message:
-                        await _update_previous_song_message(server_music_bot, previous_song, ctx)
-
-                    # Send now playing message
-                    await send_now_playing_message(server_music_bot, server_music_bot.current_song, ctx)
-                    
-                    # Update bot presence
-                    await update_bot_presence(server_music_bot, server_music_bot.current_song, is_playing=True)
-                    
                     # Reset command tracking
                     server_music_bot.current_command_msg = None
                     server_music_bot.current_command_author = None
@@ -148,11 +142,16 @@ async def play_next(ctx):
                             return
                         
                         # Create audio source and start playback
-                        audio_source = create_audio_source(
+                        audio_source = await create_audio_source(
                             server_music_bot.current_song['file_path'],
-                            use_volume_transformer=False
+                            use_volume_transformer=False,
+                            is_stream=server_music_bot.current_song.get('is_stream', False),
+                            volume=get_guild_volume(getattr(server_music_bot, 'guild_id', None)),
+                            guild_id=getattr(server_music_bot, 'guild_id', None)
                         )
                         
+                        audio_source = wrap_gapless_source(server_music_bot, audio_source, server_music_bot.current_song, ctx)
+                        
                         # Set playback state
                         server_music_bot.playback_start_time = time.time()
                         server_music_bot.playback_state = "playing"
@@ -161,15 +160,23 @@ async def play_next(ctx):
                         after_callback = create_after_callback(server_music_bot, ctx)
                         
                         if server_music_bot.voice_client and server_music_bot.voice_client.is_connected():
+                            play_started = time.perf_counter()
                             server_music_bot.voice_client.play(audio_source, after=after_callback)
+                            voice_metrics.record_play_call(ctx.guild.id, time.perf_counter() - play_started)
+                            _log_restart_gap(server_music_bot, server_name)
                         else:
                             print("Voice client became invalid during playback setup")
                             if server_music_bot.current_song:
                                 server_music_bot.queue.appendleft(server_music_bot.current_song)
+                            return
                     except Exception as e:
                         print(f"Error starting playback: {str(e)}")
                         if server_music_bot.queue:
                             await process_queue(server_music_bot, ctx)
+                        return
+
+                    # Update messages and presence once the audio is already playing
+                    await announce_now_playing(server_music_bot, previous_song, ctx)
             except Exception as e:
                 print(f"Error in play_next: {str(e)}")
                 if server_music_bot.queue:
@@ -184,6 +191,43 @@ async def play_next(ctx):
                     await server_music_bot.voice_client.disconnect()
 
 
+async def announce_now_playing(server_music_bot, previous_song, ctx):
+    """
+    Update the now playing message and presence for the current song.
+    
+    Called after playback has started so Discord API calls never delay audio.
+    
+    Args:
+        server_music_bot: The MusicBot instance
+        previous_song: The song that played before, if any
+        ctx: The context
+    """
+    # Handle previous now playing message
+    if server_music_bot.now_playing_message:
+        await _update_previous_song_message(server_music_bot, previous_song, ctx)
+
+    # Send now playing message
+    await send_now_playing_message(server_music_bot, server_music_bot.current_song, ctx)
+    
+    # Update bot presence
+    await update_bot_presence(server_music_bot, server_music_bot.current_song, is_playing=True)
+
+
+def _log_restart_gap(server_music_bot, server_name):
+    """
+    Log the gap between the previous song ending and this one starting.
+    
+    Args:
+        server_music_bot: The MusicBot instance
+        server_name: Name of the server
+    """
+    ended_at = getattr(server_music_bot, 'track_ended_at', None)
+    if ended_at is None:
+        return
+    server_music_bot.track_ended_at = None
+    log_track_gap(server_name, (time.perf_counter() - ended_at) * 1000, 'restart')
+
+
 async def _update_previous_song_message(server_music_bot, previous_song, ctx):
     """
     Update the previous now playing message when transitioning to a new song.
@@ -10,16 +10,25 @@ import discord
 import asyncio
 import time
 import os
+import threading
+import re
+import psutil
 from pathlib import Path
 from scripts.messages import create_embed, should_send_now_playing
-from scripts.config import FFMPEG_OPTIONS, load_config
+from scripts.config import FFMPEG_OPTIONS, FFMPEG_PASSTHROUGH_OPTIONS, config_service
+from scripts.duration import get_audio_stream_info
+from scripts.playback_resources import playback_resources
+from scripts.loudness import get_track_gain
+from scripts.volume import apply_gain, default_volume, get_guild_volume
+from scripts.readahead import wrap_read_ahead
+from scripts.transcode import ingest_transcoder
+from scripts.voice_metrics import voice_metrics
 from scripts.ui_components import create_now_playing_view
 from scripts.activity import update_activity
 from scripts.constants import GREEN, BLUE, RESET, EMBED_COLOR_NOW_PLAYING
 
-# Get default volume from config
-config = load_config()
-DEFAULT_VOLUME = config.get('DEFAULT_VOLUME', 100)
+# Largest loudness correction (dB) that is skipped to keep Opus passthrough
+PASSTHROUGH_GAIN_TOLERANCE = 1.0
 
 
 class RequesterContext:
@@ -89,6 +98,8 @@ def verify_audio_file(file_path: str, is_stream: bool = False) -> bool:
     """
     if is_stream:
         return True
+    # Queued songs may still refer to a download that has since been transcoded
+    file_path = ingest_transcoder.resolve(file_path)
     return os.path.exists(file_path) or Path(file_path).exists()
 
 
@@ -155,24 +166,290 @@ async def update_bot_presence(music_bot, song: dict, is_playing: bool = True) ->
         print(f"Error updating presence: {str(e)}")
 
 
-def create_audio_source(file_path: str, use_volume_transformer: bool = True):
+class MeteredAudioSource(discord.AudioSource):
+    """
+    Audio source wrapper that measures the CPU cost of a stream.
+    
+    discord.py calls read() from its player thread, which also does the Opus
+    encoding for PCM sources, so the thread CPU time between the first and
+    last read is the bot-side cost of the stream. The ffmpeg process CPU time
+    is sampled alongside it. Both are logged when the source is cleaned up.
+    """
+    # Frames between ffmpeg CPU samples (250 frames = 5 seconds of audio)
+    SAMPLE_INTERVAL = 250
+
+    def __init__(self, source, mode: str):
+        self.source = source
+        self.mode = mode
+        self.frames = 0
+        self._thread_start = None
+        self._thread_last = None
+        self._ffmpeg_cpu = 0.0
+        self._reported = False
+        self._ffmpeg = playback_resources.track(source)
+        self._tracked = self._ffmpeg
+
+    def _sample_ffmpeg_cpu(self) -> None:
+        """Record the ffmpeg process's CPU time so far."""
+        if not self._ffmpeg:
+            return
+        try:
+            times = self._ffmpeg.cpu_times()
+            self._ffmpeg_cpu = times.user + times.system
+        except psutil.Error:
+            self._ffmpeg = None
+
+    def read(self) -> bytes:
+        now = time.thread_time()
+        if self._thread_start is None:
+            self._thread_start = now
+        self._thread_last = now
+        data = self.source.read()
+        if data:
+            self.frames += 1
+            if self.frames % self.SAMPLE_INTERVAL == 0:
+                self._sample_ffmpeg_cpu()
+        return data
+
+    def is_opus(self) -> bool:
+        is_opus = getattr(self.source, 'is_opus', None)
+        return is_opus() if is_opus else False
+
+    def cleanup(self) -> None:
+        if not self._reported:
+            self._reported = True
+            # Free the stream's slot first, so a failed report can't leave it counted
+            playback_resources.release(self._tracked)
+            self._sample_ffmpeg_cpu()
+            self.log_cpu_usage()
+        cleanup = getattr(self.source, 'cleanup', None)
+        if cleanup:
+            cleanup()
+
+    def cpu_usage(self) -> dict:
+        """
+        Get the CPU cost of the stream so far.
+        
+        Returns:
+            dict: Audio seconds played, ffmpeg and player-thread CPU seconds,
+                and their combined share of one core in percent
+        """
+        audio_seconds = self.frames * 0.02
+        player_cpu = (self._thread_last - self._thread_start) if self._thread_start is not None else 0.0
+        total = self._ffmpeg_cpu + player_cpu
+        return {
+            'mode': self.mode,
+            'audio_seconds': audio_seconds,
+            'ffmpeg_cpu': self._ffmpeg_cpu,
+            'player_cpu': player_cpu,
+            'percent': (total / audio_seconds * 100) if audio_seconds else 0.0,
+        }
+
+    def log_cpu_usage(self) -> None:
+        """Print the stream's CPU usage to the console."""
+        usage = self.cpu_usage()
+        if not usage['audio_seconds']:
+            return
+        print(
+            f"{GREEN}Stream CPU ({usage['mode']}):{RESET} {BLUE}{usage['percent']:.2f}% of a core "
+            f"(ffmpeg {usage['ffmpeg_cpu']:.2f}s, player {usage['player_cpu']:.2f}s "
+            f"over {usage['audio_seconds']:.0f}s){RESET}"
+        )
+
+
+class TrackedAudioSource(discord.AudioSource):
+    """
+    Audio source wrapper that tracks the playback position.
+    
+    The position is counted from the frames actually handed to the player,
+    so time spent paused is not included. The wrapped source can be swapped
+    with replace_source() for seeking without restarting the player.
+    
+    PCM frames are scaled by the volume attribute, so volume changes apply
+    on the next frame. Opus passthrough frames can't be scaled. When given
+    the server's GuildVoiceMetrics, each frame read is timed into them.
+    """
+    # Length of one frame as read by discord.py's AudioPlayer
+    FRAME_SECONDS = 0.02
+
+    def __init__(self, source, offset: float = 0, volume: float = 1.0, metrics=None):
+        self.source = source
+        self.offset = offset
+        self.frames = 0
+        self.volume = volume
+        self.metrics = metrics
+        self.looper = None  # NativeLoop repeating the current song, if any
+        self._lock = threading.Lock()
+
+    @property
+    def position(self) -> float:
+        """Seconds into the current song."""
+        return self.offset + self.frames * self.FRAME_SECONDS
+
+    def replace_source(self, source, offset: float = 0) -> None:
+        """
+        Swap the wrapped source and clean up the old one.
+        
+        Args:
+            source: The new, primed audio source
+            offset: Position in the song that the new source starts at
+        """
+        with self._lock:
+            previous = self.source
+            self.source = source
+            self.offset = offset
+            self.frames = 0
+            if self.looper is not None:
+                self.looper.on_seek()
+        cleanup = getattr(previous, 'cleanup', None)
+        if cleanup:
+            cleanup()
+
+    def read(self) -> bytes:
+        started = time.perf_counter() if self.metrics is not None else None
+        with self._lock:
+            data = self.source.read()
+            if self.looper is not None:
+                data = self.looper.process(self, data)
+            if data:
+                self.frames += 1
+                if self.volume != 1.0 and not self.source.is_opus():
+                    data = apply_gain(data, self.volume)
+        if started is not None and data:
+            self.metrics.on_frame(started, time.perf_counter() - started)
+        return data
+
+    def is_opus(self) -> bool:
+        is_opus = getattr(self.source, 'is_opus', None)
+        return is_opus() if is_opus else False
+
+    def cleanup(self) -> None:
+        if self.looper is not None:
+            self.looper.cleanup()
+        cleanup = getattr(self.source, 'cleanup', None)
+        if cleanup:
+            cleanup()
+
+
+def ensure_encoder(voice_client, audio_source) -> None:
+    """
+    Make sure the voice client can encode a PCM source.
+    
+    discord.py only creates an Opus encoder when play() is called with a PCM
+    source, so one is needed before a PCM source replaces an Opus one.
+    
+    Args:
+        voice_client: The voice client playing the source
+        audio_source: The source about to be played
+    """
+    if audio_source.is_opus() or not voice_client or getattr(voice_client, 'encoder', None) is not None:
+        return
+    voice_client.encoder = discord.opus.Encoder()
+
+
+def can_use_opus_passthrough(stream_info: dict, is_stream: bool = False, volume: int = None) -> bool:
+    """
+    Check whether a file can be sent as Opus packets without re-encoding.
+    
+    Passthrough needs a local 48 kHz stereo Opus file and no filters, which
+    means the volume must be 100%.
+    
+    Args:
+        stream_info: Result of get_audio_stream_info()
+        is_stream: Whether the source is a stream URL
+        volume: Playback volume in percent (defaults to the default volume)
+        
+    Returns:
+        bool: True if the Opus passthrough path can be used
+    """
+    if not config_service.get_bool('AUDIO.OPUS_PASSTHROUGH', True) or is_stream or not stream_info:
+        return False
+    if (default_volume() if volume is None else volume) != 100:
+        return False
+    return (
+        stream_info.get('codec_name') == 'opus'
+        and stream_info.get('sample_rate') == 48000
+        and stream_info.get('channels') in (1, 2)
+    )
+
+
+def _build_ffmpeg_options(base_options: dict, start: float = 0, gain_db: float = 0, stream_loop: int = 0) -> dict:
+    """
+    Build ffmpeg options for a new source.
+    
+    Args:
+        base_options: Options dictionary such as FFMPEG_OPTIONS
+        start: Position in seconds to start from. The seek is done on the
+            input side so ffmpeg jumps there instead of decoding up to it
+        gain_db: Loudness normalization gain, folded into the existing volume filter
+        stream_loop: Number of extra times ffmpeg should replay the input
+        
+    Returns:
+        dict: Options for FFmpegPCMAudio / FFmpegOpusAudio
+    """
+    options = playback_resources.ffmpeg_options(base_options)
+    before_options = []
+    if stream_loop and stream_loop > 0:
+        before_options.append(f'-stream_loop {int(stream_loop)}')
+    if start and start > 0:
+        before_options.append(f'-ss {start:.3f}')
+    if before_options:
+        options['before_options'] = ' '.join(before_options + [options.get('before_options', '')]).strip()
+    if gain_db:
+        factor = 10 ** (gain_db / 20)
+        options['options'] = re.sub(
+            r'volume=([0-9.]+)',
+            lambda match: f"volume={float(match.group(1)) * factor:.4f}",
+            options['options']
+        )
+    return options
+
+
+async def create_audio_source(file_path: str, use_volume_transformer: bool = True, is_stream: bool = False, start: float = 0, stream_loop: int = 0, volume: int = None, guild_id=None):
     """
     Create an audio source for playback.
     
+    48 kHz Opus files are played through FFmpegOpusAudio with the packets
+    copied as-is, which skips both ffmpeg's decode and discord.py's Opus
+    encode. Everything else goes through the PCM path with the resample,
+    equalizer and volume filter chain, with the track's precomputed
+    loudness gain applied by the volume filter. Playback volume is applied
+    afterwards by TrackedAudioSource. Both paths are read ahead from a
+    separate thread so late pipe reads don't stutter.
+    
     Args:
         file_path: Path to the audio file or stream URL
-        use_volume_transformer: Whether to wrap with PCMVolumeTransformer
+        use_volume_transformer: Unused; kept for existing callers since volume
+            is now applied by TrackedAudioSource
+        is_stream: Whether file_path is a stream URL
+        start: Position in seconds to start from. The seek is done on the
+            input side, so ffmpeg jumps there instead of decoding up to it
+        stream_loop: Number of extra times to play the file within the same ffmpeg process
+        volume: Playback volume in percent, which decides whether passthrough
+            can be used (defaults to the default volume)
+        guild_id: The Discord guild ID buffer underruns are counted for
         
     Returns:
         The audio source ready for playback
     """
-    audio_source = discord.FFmpegPCMAudio(file_path, **FFMPEG_OPTIONS)
+    if not is_stream:
+        file_path = ingest_transcoder.resolve(file_path)
+    stream_info = {} if is_stream else await get_audio_stream_info(file_path)
+    gain_db = 0.0 if is_stream else get_track_gain(file_path)
+    # Passthrough can't change the level, so it's only used when little or no gain is needed
+    started = time.perf_counter()
+    if can_use_opus_passthrough(stream_info, is_stream, volume) and abs(gain_db) < PASSTHROUGH_GAIN_TOLERANCE:
+        audio_source = discord.FFmpegOpusAudio(file_path, **_build_ffmpeg_options(FFMPEG_PASSTHROUGH_OPTIONS, start, stream_loop=stream_loop))
+        # Call read() to prevent speed-up issue
+        audio_source.read()
+        voice_metrics.record_ffmpeg_startup(guild_id, time.perf_counter() - started)
+        return MeteredAudioSource(wrap_read_ahead(audio_source, guild_id), 'opus passthrough')
+
+    audio_source = discord.FFmpegPCMAudio(file_path, **_build_ffmpeg_options(FFMPEG_OPTIONS, start, gain_db, stream_loop))
     # Call read() to prevent speed-up issue
     audio_source.read()
-    
-    if use_volume_transformer:
-        return discord.PCMVolumeTransformer(audio_source, volume=DEFAULT_VOLUME / 100.0)
-    return audio_source
+    voice_metrics.record_ffmpeg_startup(guild_id, time.perf_counter() - started)
+    return MeteredAudioSource(wrap_read_ahead(audio_source, guild_id), 'pcm')
 
 
 def create_after_callback(music_bot, ctx):
@@ -220,7 +497,7 @@ async def start_playback(music_bot, song: dict, ctx, use_volume_transformer: boo
         music_bot: The MusicBot instance
         song: The song dictionary with file_path, title, etc.
         ctx: The context for sending messages
-        use_volume_transformer: Whether to use volume control
+        use_volume_transformer: Unused; see create_audio_source()
         
     Returns:
         bool: True if playback started successfully, False otherwise
@@ -237,11 +514,18 @@ async def start_playback(music_bot, song: dict, ctx, use_volume_transformer: boo
     
     try:
         # Create audio source
-        audio_source = create_audio_source(
+        guild_id = getattr(music_bot, 'guild_id', None)
+        volume = get_guild_volume(guild_id)
+        audio_source = await create_audio_source(
             song['file_path'],
-            use_volume_transformer=use_volume_transformer
+            use_volume_transformer=use_volume_transformer,
+            is_stream=song.get('is_stream', False),
+            volume=volume,
+            guild_id=guild_id
         )
         
+        audio_source = TrackedAudioSource(audio_source, volume=volume / 100, metrics=voice_metrics.get(guild_id))
+        
         # Set playback state
         music_bot.playback_start_time = time.time()
         music_bot.playback_state = "playing"
@@ -254,7 +538,9 @@ async def start_playback(music_bot, song: dict, ctx, use_volume_transformer: boo
         
         # Create callback and start playback
         after_callback = create_after_callback(music_bot, ctx)
+        play_started = time.perf_counter()
         music_bot.voice_client.play(audio_source, after=after_callback)
+        voice_metrics.record_play_call(guild_id, time.perf_counter() - play_started)
         
         return True
         
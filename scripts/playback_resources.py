@@ -0,0 +1,188 @@
+"""
+CPU allocation for playback ffmpeg processes.
+
+Every playing guild runs its own ffmpeg process. Decoding and filtering one
+audio stream needs a fraction of a core, so instead of giving each process
+every CPU thread on the host, the manager here hands out a thread count
+based on how many streams are already running. It can also lower the
+priority of ffmpeg and pin each process to a single core, and it reports
+the number of active processes and their combined CPU use.
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+import psutil
+from scripts.config import config_service
+
+
+class PlaybackResourceManager:
+    """
+    Tracks playback ffmpeg processes and decides how many threads each gets.
+
+    Processes are registered with track() once their source is created and
+    are dropped again with release() or as soon as they exit.
+    """
+
+    def __init__(self, max_threads: Optional[int] = None, nice: Optional[int] = None, pin_cores: Optional[bool] = None):
+        """
+        Initialize the resource manager.
+
+        Args:
+            max_threads: Upper bound for the threads given to one ffmpeg process
+                (defaults to AUDIO.FFMPEG_MAX_THREADS)
+            nice: Niceness applied to ffmpeg processes, 0 leaves it unchanged
+                (defaults to AUDIO.FFMPEG_NICE)
+            pin_cores: Whether to pin each ffmpeg process to one core, round-robin
+                (defaults to AUDIO.FFMPEG_PIN_CORES)
+        """
+        self.cpu_count = psutil.cpu_count(logical=True) or 1
+        self.configure(max_threads, nice, pin_cores)
+        self._processes: Dict[int, psutil.Process] = {}
+        self._next_core = 0
+        self._lock = threading.Lock()
+
+    def configure(self, max_threads: Optional[int] = None, nice: Optional[int] = None, pin_cores: Optional[bool] = None) -> None:
+        """
+        Set the limits applied to processes tracked from now on.
+
+        Limits that aren't given are read from the config.
+        """
+        if max_threads is None:
+            max_threads = config_service.get_int('AUDIO.FFMPEG_MAX_THREADS', 2)
+        self.max_threads = max(1, int(max_threads))
+        self.nice = config_service.get_int('AUDIO.FFMPEG_NICE', 0) if nice is None else nice
+        self.pin_cores = config_service.get_bool('AUDIO.FFMPEG_PIN_CORES', False) if pin_cores is None else pin_cores
+
+    def _prune(self) -> None:
+        """Forget processes that have exited."""
+        for pid, process in list(self._processes.items()):
+            try:
+                alive = process.is_running() and process.status() != psutil.STATUS_ZOMBIE
+            except psutil.Error:
+                alive = False
+            if not alive:
+                self._processes.pop(pid, None)
+
+    @property
+    def active_count(self) -> int:
+        """Number of running playback ffmpeg processes."""
+        with self._lock:
+            self._prune()
+            return len(self._processes)
+
+    def thread_count(self) -> int:
+        """
+        Get the thread count for the next ffmpeg process.
+
+        The host's logical CPUs are split between the running streams and the
+        new one, capped at max_threads and never below one.
+
+        Returns:
+            int: Threads to pass to ffmpeg with -threads
+        """
+        streams = self.active_count + 1
+        return max(1, min(self.max_threads, self.cpu_count // streams))
+
+    def ffmpeg_options(self, base_options: dict, extra: str = '') -> dict:
+        """
+        Build ffmpeg options for a new playback process.
+
+        Args:
+            base_options: Options dictionary such as FFMPEG_OPTIONS
+            extra: Additional output options to append
+
+        Returns:
+            dict: A copy of base_options with -threads (and extra) appended
+        """
+        options = dict(base_options)
+        parts = [options.get('options', ''), f'-threads {self.thread_count()}', extra]
+        options['options'] = ' '.join(part.strip() for part in parts if part and part.strip())
+        return options
+
+    def track(self, source) -> Optional[psutil.Process]:
+        """
+        Register the ffmpeg process behind an audio source.
+
+        Applies the configured niceness and core pinning.
+
+        Args:
+            source: An FFmpeg audio source, optionally wrapped (e.g. PCMVolumeTransformer)
+
+        Returns:
+            psutil.Process: The registered process, or None if there isn't one
+        """
+        popen = getattr(getattr(source, 'original', source), '_process', None)
+        pid = getattr(popen, 'pid', None)
+        if not pid:
+            return None
+        try:
+            process = psutil.Process(pid)
+            process.cpu_percent(None)  # Prime the counter for stats()
+        except psutil.Error:
+            return None
+
+        with self._lock:
+            core = None
+            if self.pin_cores and hasattr(process, 'cpu_affinity'):
+                core = self._next_core % self.cpu_count
+                self._next_core += 1
+            self._processes[pid] = process
+
+        try:
+            if self.nice and os.name == 'posix':
+                process.nice(self.nice)
+            if core is not None:
+                process.cpu_affinity([core])
+        except (psutil.Error, OSError) as e:
+            print(f"Could not adjust ffmpeg process {pid}: {str(e)}")
+        return process
+
+    def release(self, process) -> None:
+        """
+        Stop tracking a process.
+
+        Args:
+            process: The psutil.Process returned by track(), or None
+        """
+        if process is None:
+            return
+        with self._lock:
+            self._processes.pop(process.pid, None)
+
+    def stats(self) -> dict:
+        """
+        Get the current ffmpeg load.
+
+        CPU percentages are averaged since the previous call (or since the
+        process was registered), with 100% being one full core.
+
+        Returns:
+            dict: active_streams, cpu_percent, threads_per_stream and cpu_count
+        """
+        with self._lock:
+            self._prune()
+            processes = list(self._processes.values())
+        cpu_percent = 0.0
+        for process in processes:
+            try:
+                cpu_percent += process.cpu_percent(None)
+            except psutil.Error:
+                pass
+        return {
+            'active_streams': len(processes),
+            'cpu_percent': cpu_percent,
+            'threads_per_stream': max(1, min(self.max_threads, self.cpu_count // max(1, len(processes)))),
+            'cpu_count': self.cpu_count,
+        }
+
+
+# Global instance
+playback_resources = PlaybackResourceManager()
+
+
+def _apply_config_change(config, old_config):
+    """Apply changed AUDIO.FFMPEG_* limits to the shared manager."""
+    playback_resources.configure()
+
+config_service.subscribe(_apply_config_change)
@@ -45,6 +45,30 @@ def set_high_priority():
         logging.error(f"Error setting Windows process priority: {str(e)}")
         return False
 
+def set_low_priority(pid):
+    """
+    Lower the priority of a background helper process.
+    
+    Used for work such as audio analysis that should never compete with
+    playback for CPU time.
+    
+    Args:
+        pid: Process ID of the helper process
+        
+    Returns:
+        bool: True if the priority was lowered, False otherwise
+    """
+    try:
+        process = psutil.Process(pid)
+        if sys.platform == 'win32':
+            process.nice(getattr(psutil, 'BELOW_NORMAL_PRIORITY_CLASS', 16384))
+        else:
+            process.nice(10)
+        return True
+    except Exception as e:
+        logging.debug(f"Could not lower priority of process {pid}: {str(e)}")
+        return False
+
 if __name__ == "__main__":
     # Configure logging
     logging.basicConfig(
@@ -0,0 +1,412 @@
+"""
+Crash-safe queue journal.
+
+Queues only lived in memory, so a restart, an update or a crash lost every
+queued song. Each guild's SongQueue now reports its changes (songs added,
+removed, moved, shuffled or cleared, the song that is playing and how far
+into it playback is) to a journal in .cache/queues/<guild_id>.jsonl.
+
+Changes are only appended to an in-memory list on the event loop. A writer
+thread appends them to the file in one batch every QUEUE.JOURNAL_FLUSH_INTERVAL
+seconds and fsyncs it, and polls the playback position every
+QUEUE.JOURNAL_CHECKPOINT_INTERVAL seconds. Once a journal has more than
+QUEUE.JOURNAL_COMPACT_AFTER lines it is replaced (atomically) by a single
+snapshot of its current state. A torn last line, as left by a crash mid-write, is
+ignored on replay.
+
+Tracks are journaled by their playlist cache key instead of their file path,
+so the journal stays valid when the downloads folder is cleared. When the bot
+starts, the previous journal is replayed into a saved session and the bot
+offers to !restore it once it joins voice in that guild; the songs are only
+looked up in the cache at that point.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from scripts.config import config_service
+from scripts.paths import get_cache_file
+from scripts.track import Track
+
+JOURNAL_DIR = get_cache_file('queues')
+
+
+def _record(track) -> Optional[dict]:
+    """Serialize a song for the journal."""
+    if track is None:
+        return None
+    return Track.from_entry(track).to_record()
+
+
+def replay(lines) -> dict:
+    """
+    Rebuild a queue's state from journal lines.
+
+    Args:
+        lines: Iterable of JSON lines as written by GuildJournal
+
+    Returns:
+        dict: 'entries' ([id, track record] pairs in queue order), 'current'
+        (track record or None) and 'position' (seconds into the current song)
+    """
+    entries: List[list] = []
+    current = None
+    position = 0.0
+    for line in lines:
+        try:
+            event = json.loads(line)
+            op = event['op']
+        except (ValueError, TypeError, KeyError):
+            # A torn write from a crash; nothing after it can be trusted
+            break
+        if op == 'snapshot':
+            entries = [list(pair) for pair in event.get('entries', [])]
+            current = event.get('current')
+            position = event.get('position', 0.0)
+        elif op == 'add':
+            index = max(0, min(event.get('index', len(entries)), len(entries)))
+            entries.insert(index, [event['id'], event['track']])
+        elif op == 'remove':
+            entries = [pair for pair in entries if pair[0] != event['id']]
+        elif op == 'move':
+            moved = [pair for pair in entries if pair[0] == event['id']]
+            if moved:
+                entries.remove(moved[0])
+                entries.insert(max(0, min(event['index'], len(entries))), moved[0])
+        elif op == 'order':
+            by_id = {pair[0]: pair for pair in entries}
+            entries = [by_id[uid] for uid in event['ids'] if uid in by_id]
+        elif op == 'clear':
+            entries = []
+        elif op == 'current':
+            current = event.get('track')
+            position = 0.0
+        elif op == 'position':
+            position = event.get('seconds', 0.0)
+    return {'entries': entries, 'current': current, 'position': position}
+
+
+def _write_atomic(path: str, text: str) -> None:
+    """Replace a file's contents so a crash leaves either the old or the new file."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class GuildJournal:
+    """The journal of one guild's queue."""
+
+    def __init__(self, guild_id: str, directory: str, position: Callable[[], float] = None):
+        """
+        Initialize the journal.
+
+        Args:
+            guild_id: The guild the queue belongs to
+            directory: Directory journal files are kept in
+            position: Callable returning the playback position in seconds, if any
+        """
+        self.guild_id = str(guild_id)
+        self.path = os.path.join(directory, f"{self.guild_id}.jsonl")
+        self.position = position
+        self.lines = 0  # Lines in the journal file since it was last compacted
+        self._pending = []
+        self._lock = threading.Lock()
+        self._playing = False
+        self._last_position = None
+
+    def record(self, op: str, **fields) -> None:
+        """
+        Queue a change to be written by the next flush.
+
+        Args:
+            op: The kind of change (add, remove, move, order, clear, current)
+            **fields: Details of the change; a 'track' is serialized when written
+        """
+        with self._lock:
+            self._pending.append((op, fields))
+
+    def checkpoint(self) -> None:
+        """Record the playback position if it moved since the last checkpoint."""
+        if not self._playing or self.position is None:
+            return
+        try:
+            seconds = round(float(self.position()), 1)
+        except Exception:
+            return
+        if seconds != self._last_position:
+            self._last_position = seconds
+            self.record('position', seconds=seconds)
+
+    def take(self) -> List[str]:
+        """
+        Serialize and remove every pending change.
+
+        Returns:
+            list: JSON lines to append to the journal
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        lines = []
+        for op, fields in pending:
+            event = {'op': op}
+            event.update(fields)
+            if 'track' in fields:
+                event['track'] = _record(fields['track'])
+            if op == 'current':
+                self._playing = fields.get('track') is not None
+                self._last_position = None
+            lines.append(json.dumps(event, default=str))
+        return lines
+
+
+class QueueJournal:
+    """Journals every guild's queue and restores them after a restart."""
+
+    def __init__(self, directory: str = JOURNAL_DIR, enabled: Optional[bool] = None,
+                 flush_interval: Optional[float] = None, compact_after: Optional[int] = None,
+                 checkpoint_interval: Optional[float] = None):
+        """
+        Initialize the journal.
+
+        Args:
+            directory: Directory journal files are kept in
+            enabled: Whether queues are journaled at all (defaults to QUEUE.JOURNAL)
+            flush_interval: Seconds between batched writes (defaults to QUEUE.JOURNAL_FLUSH_INTERVAL)
+            compact_after: Journal lines written before a journal is compacted
+                (defaults to QUEUE.JOURNAL_COMPACT_AFTER)
+            checkpoint_interval: Seconds between playback position checkpoints
+                (defaults to QUEUE.JOURNAL_CHECKPOINT_INTERVAL)
+        """
+        self.directory = directory
+        self.configure(enabled, flush_interval, compact_after, checkpoint_interval)
+        self.journals: Dict[str, GuildJournal] = {}
+        self._write_lock = threading.Lock()
+        self._writer = None
+        self._stop = threading.Event()
+
+    def configure(self, enabled: Optional[bool] = None, flush_interval: Optional[float] = None,
+                  compact_after: Optional[int] = None, checkpoint_interval: Optional[float] = None) -> None:
+        """
+        Set the journal's settings; ones that aren't given are read from the config.
+
+        Turning the journal off stops writing the queues that are already
+        attached; turning it on journals queues attached from then on.
+        """
+        self.enabled = config_service.get_bool('QUEUE.JOURNAL', True) if enabled is None else enabled
+        self.flush_interval = config_service.get_float('QUEUE.JOURNAL_FLUSH_INTERVAL', 1.0) if flush_interval is None else flush_interval
+        self.compact_after = config_service.get_int('QUEUE.JOURNAL_COMPACT_AFTER', 500) if compact_after is None else compact_after
+        self.checkpoint_interval = (config_service.get_float('QUEUE.JOURNAL_CHECKPOINT_INTERVAL', 5)
+                                    if checkpoint_interval is None else checkpoint_interval)
+
+    def _saved_path(self, guild_id) -> str:
+        """Path of a guild's saved session."""
+        return os.path.join(self.directory, f"{guild_id}.saved.json")
+
+    def _read(self, path: str) -> Optional[dict]:
+        """Replay a journal file, or return None if there is none."""
+        lines = self._read_lines(path)
+        return replay(lines) if lines is not None else None
+
+    def _read_lines(self, path: str) -> Optional[List[str]]:
+        """Read a journal file's lines, or return None if there is none."""
+        try:
+            with open(path, 'r') as f:
+                return f.readlines()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Error reading queue journal {path}: {str(e)}")
+            return None
+
+    def attach(self, guild_id, queue, position: Callable[[], float] = None) -> Optional[dict]:
+        """
+        Start journaling a guild's queue.
+
+        If the previous run changed the queue, its journal replaces the
+        guild's saved session (or removes it, if that run ended with an empty
+        queue). A journal holding nothing but its initial snapshot leaves the
+        saved session alone, so a run where nobody queued anything doesn't
+        lose it. A new journal is then started from the queue's current state.
+
+        Args:
+            guild_id: The guild the queue belongs to
+            queue: The guild's SongQueue
+            position: Callable returning the playback position in seconds
+
+        Returns:
+            dict: The saved session (see replay()), or None if there is nothing to restore
+        """
+        if not self.enabled:
+            return None
+        journal = GuildJournal(guild_id, self.directory, position)
+        with self._write_lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                lines = self._read_lines(journal.path)
+                previous = replay(lines) if lines else None
+                if previous and (previous['entries'] or previous['current']):
+                    _write_atomic(self._saved_path(journal.guild_id), json.dumps(previous))
+                elif lines and len(lines) > 1:
+                    # The previous run used the queue and ended empty, so an older saved session is stale
+                    self.discard_saved(journal.guild_id)
+                self._write_snapshot(journal, [[uid, _record(track)] for uid, track in queue.snapshot()], None, 0.0)
+            except OSError as e:
+                print(f"Error starting queue journal for {guild_id}: {str(e)}")
+                return None
+        self.journals[journal.guild_id] = journal
+        queue.journal = journal
+        self._ensure_writer()
+        return self.load_saved(guild_id)
+
+    def _write_snapshot(self, journal: GuildJournal, entries, current, position: float) -> None:
+        """Replace a journal with a single snapshot line of serialized entries."""
+        snapshot = {'op': 'snapshot', 'entries': entries, 'current': current, 'position': position}
+        _write_atomic(journal.path, json.dumps(snapshot) + '\n')
+        journal.lines = 1
+
+    def _compact(self, journal: GuildJournal) -> None:
+        """Rewrite a journal as a snapshot of its current state."""
+        state = self._read(journal.path)
+        if state is None:
+            return
+        self._write_snapshot(journal, state['entries'], state['current'], state['position'])
+
+    def flush(self) -> None:
+        """Append every pending change to the journals and sync them to disk."""
+        with self._write_lock:
+            for journal in list(self.journals.values()):
+                lines = journal.take()
+                if not lines or not self.enabled:
+                    continue
+                try:
+                    with open(journal.path, 'a') as f:
+                        f.write('\n'.join(lines) + '\n')
+                        f.flush()
+                        os.fsync(f.fileno())
+                    journal.lines += len(lines)
+                    if journal.lines > self.compact_after:
+                        self._compact(journal)
+                except OSError as e:
+                    print(f"Error writing queue journal for {journal.guild_id}: {str(e)}")
+
+    def _ensure_writer(self) -> None:
+        """Start the background writer thread if it isn't running."""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        self._writer = threading.Thread(target=self._run, name='queue-journal', daemon=True)
+        self._writer.start()
+
+    def _run(self) -> None:
+        """Flush pending changes and checkpoint positions until stopped."""
+        last_checkpoint = time.monotonic()
+        while not self._stop.wait(self.flush_interval):
+            if time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                last_checkpoint = time.monotonic()
+                for journal in list(self.journals.values()):
+                    journal.checkpoint()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing queue journals: {str(e)}")
+
+    def stop(self) -> None:
+        """Stop the writer thread and write what is still pending."""
+        self._stop.set()
+        self.flush()
+
+    def load_saved(self, guild_id) -> Optional[dict]:
+        """
+        Get a guild's saved session.
+
+        Args:
+            guild_id: The guild ID
+
+        Returns:
+            dict: The saved state (see replay()), or None if there is none
+        """
+        try:
+            with open(self._saved_path(guild_id), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Error reading saved queue for {guild_id}: {str(e)}")
+            return None
+
+    def discard_saved(self, guild_id) -> None:
+        """
+        Forget a guild's saved session.
+
+        Args:
+            guild_id: The guild ID
+        """
+        try:
+            os.remove(self._saved_path(guild_id))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error removing saved queue for {guild_id}: {str(e)}")
+
+
+def restore_tracks(saved: dict, lookup: Callable[[str], Optional[str]]) -> List[Track]:
+    """
+    Rebuild the tracks of a saved session.
+
+    Downloads are looked up by cache key; ones that are no longer cached are
+    skipped. Streams are restored with their URL.
+
+    Args:
+        saved: A saved session as returned by QueueJournal.load_saved()
+        lookup: Callable mapping a cache key to a cached file path, or None
+
+    Returns:
+        list: The current song (if any) followed by the queued songs
+    """
+    records = ([saved['current']] if saved.get('current') else []) + [record for _, record in saved.get('entries', [])]
+    tracks = []
+    for record in records:
+        if record.get('cache_key'):
+            file_path = lookup(record['cache_key'])
+            if not file_path:
+                continue
+            tracks.append(Track.from_record(record, file_path))
+        elif record.get('file_path'):
+            tracks.append(Track.from_record(record))
+    return tracks
+
+
+def describe_saved(saved: dict) -> str:
+    """
+    Summarize a saved session for the restore offer.
+
+    Args:
+        saved: A saved session as returned by QueueJournal.load_saved()
+
+    Returns:
+        str: Description of the current song and the number of queued songs
+    """
+    parts = []
+    current = saved.get('current')
+    if current:
+        minutes, seconds = divmod(int(saved.get('position') or 0), 60)
+        parts.append(f"**{current.get('title', 'Unknown')}** (at {minutes}:{seconds:02d})")
+    count = len(saved.get('entries', []))
+    if count:
+        parts.append(f"{count} queued song{'s' if count != 1 else ''}")
+    return ' and '.join(parts)
+
+
+# Global instance
+queue_journal = QueueJournal()
+
+
+def _apply_config_change(config, old_config):
+    """Apply changed QUEUE.JOURNAL* settings to the shared journal."""
+    queue_journal.configure()
+
+config_service.subscribe(_apply_config_change)
@@ -0,0 +1,153 @@
+"""
+Snapshots of a queue for the !queue view.
+
+The queue view used to walk the whole queue and rebuild its text every time
+a page button was clicked. A QueueSnapshot captures what the view shows (the
+current song and the visible queued songs as plain tuples, plus the totals)
+at one queue version. Pages are formatted from the snapshot on first use and
+memoized, so paging through an unchanged queue only slices a tuple, and a
+new snapshot is taken only after the queue, the current song or its loop
+state changed.
+"""
+
+from typing import Dict, Optional, Tuple
+from scripts.duration import format_duration
+
+
+def _duration_text(duration, is_stream) -> str:
+    """Format the duration shown after a song's title."""
+    if is_stream:
+        return " `[LIVE]`"  # Live streams don't have duration
+    return f" `[{format_duration(duration)}]`" if duration and duration > 0 else ""
+
+
+def snapshot_key(queue, current_song, is_looping: bool) -> tuple:
+    """
+    Get the key a snapshot of a queue is valid for.
+
+    Args:
+        queue: The SongQueue
+        current_song: The song that is playing, if any
+        is_looping: Whether the current song is looping
+
+    Returns:
+        tuple: Changes whenever the rendered queue would change
+    """
+    current_duration = current_song.get('duration') if current_song else None
+    return (queue.version, id(current_song) if current_song else None, current_duration, is_looping)
+
+
+class QueueSnapshot:
+    """Immutable view of a queue at one version, rendered page by page."""
+
+    __slots__ = ('key', 'current', 'is_looping', 'songs', 'total_songs', 'total_duration', 'page_size', '_pages')
+
+    def __init__(self, queue, current_song, is_looping: bool, page_size: int):
+        """
+        Capture a queue.
+
+        Args:
+            queue: The SongQueue
+            current_song: The song that is playing, if any
+            is_looping: Whether the current song is looping (its queued copies are hidden)
+            page_size: Songs per page
+        """
+        self.key = snapshot_key(queue, current_song, is_looping)
+        self.is_looping = is_looping
+        self.page_size = page_size
+        self.current = None
+        total_duration = 0
+        if current_song:
+            self.current = (current_song['title'], current_song['url'], current_song.get('duration'), bool(current_song.get('is_stream')))
+            if not current_song.get('is_stream'):
+                total_duration += current_song.get('duration') or 0
+
+        hidden_url = current_song['url'] if current_song and is_looping else None
+        # Copies of a looped song are hidden from the list (it will play next anyway)
+        self.songs: Tuple[tuple, ...] = tuple(
+            (song['title'], song['url'], song.get('duration'), bool(song.get('is_stream')))
+            for song in queue
+            if hidden_url is None or song['url'] != hidden_url
+        )
+        hidden_duration = sum(queue[position].get('duration') or 0 for position in queue.positions_of_url(hidden_url)) if hidden_url else 0
+        self.total_duration = total_duration + queue.total_duration - hidden_duration
+        self.total_songs = len(self.songs) + (1 if current_song else 0)
+        self._pages: Dict[int, str] = {}
+
+    @property
+    def queue_count(self) -> int:
+        """Number of visible queued songs (excludes the current song)."""
+        return len(self.songs)
+
+    @property
+    def total_pages(self) -> int:
+        """Number of pages of queued songs."""
+        return (len(self.songs) + self.page_size - 1) // self.page_size
+
+    def page_text(self, page: int) -> str:
+        """
+        Get the text of a page, formatting it on first use.
+
+        Args:
+            page: The page number (1-based)
+
+        Returns:
+            str: The current song and the page's queued songs
+        """
+        text = self._pages.get(page)
+        if text is None:
+            text = self._render(page)
+            self._pages[page] = text
+        return text
+
+    def _render(self, page: int) -> str:
+        """Format a page."""
+        text = ""
+        if self.current:
+            title, url, duration, is_stream = self.current
+            text += "**Now playing:**\n"
+            text += f"[{title}]({url}){_duration_text(duration, is_stream)}"
+            if self.is_looping:
+                text += " - :repeat:"  # Add repeat icon if song is looping
+            text += "\n\n"
+
+        if self.songs:
+            text += "**Up Next:**\n"
+            start = (page - 1) * self.page_size
+            # Numbering continues after the current song
+            number = start + (2 if self.current else 1)
+            for title, url, duration, is_stream in self.songs[start:start + self.page_size]:
+                text += f"`{number}.` [{title}]({url}){_duration_text(duration, is_stream)}\n"
+                number += 1
+        return text
+
+    def footer_text(self) -> str:
+        """Get the queue totals shown below the songs."""
+        footer = ""
+        if self.total_songs > 0:
+            footer = f"\n\nTotal in queue: {self.total_songs}"
+            if self.total_duration > 0:
+                footer += f"\nTotal duration: {format_duration(self.total_duration)}"
+        return footer
+
+
+def get_snapshot(cache: dict, guild_id, queue, current_song, is_looping: bool, page_size: int) -> Optional[QueueSnapshot]:
+    """
+    Get a guild's snapshot, taking a new one only if the queue changed.
+
+    Args:
+        cache: Dictionary of snapshots by guild ID
+        guild_id: The guild ID
+        queue: The guild's SongQueue
+        current_song: The song that is playing, if any
+        is_looping: Whether the current song is looping
+        page_size: Songs per page
+
+    Returns:
+        QueueSnapshot: The guild's current snapshot
+    """
+    snapshot = cache.get(guild_id)
+    if snapshot is None or snapshot.key != snapshot_key(queue, current_song, is_looping) or snapshot.page_size != page_size:
+        snapshot = QueueSnapshot(queue, current_song, is_looping, page_size)
+        cache[guild_id] = snapshot
+    return snapshot
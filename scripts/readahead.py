@@ -0,0 +1,157 @@
+"""
+Read-ahead buffering for playback sources.
+
+discord.py's player thread reads one frame every 20 ms straight from the
+ffmpeg pipe, so a read that is late because ffmpeg was starved of CPU or disk
+(for example during concurrent downloads) is heard as a stutter. The wrapper
+below keeps a bounded buffer of frames filled from its own reader thread, so
+short hiccups are absorbed by the frames already buffered. Reads that find
+the buffer empty are counted as underruns per server.
+"""
+
+import threading
+from collections import deque
+import discord
+from scripts.config import config_service
+
+FRAME_MS = 20
+
+# Underruns per guild ID since startup
+_underruns = {}
+_underruns_lock = threading.Lock()
+
+
+def record_underrun(guild_id) -> None:
+    """
+    Count a buffer underrun for a server.
+
+    Args:
+        guild_id: The Discord guild ID, or None if unknown
+    """
+    key = str(guild_id) if guild_id is not None else None
+    with _underruns_lock:
+        _underruns[key] = _underruns.get(key, 0) + 1
+
+
+def get_underruns(guild_id=None):
+    """
+    Get buffer underrun counts.
+
+    Args:
+        guild_id: A Discord guild ID, or None for all servers
+
+    Returns:
+        int or dict: The count for the server, or a dict of counts by guild ID string
+    """
+    with _underruns_lock:
+        if guild_id is None:
+            return dict(_underruns)
+        return _underruns.get(str(guild_id), 0)
+
+
+class ReadAheadAudioSource(discord.AudioSource):
+    """
+    Audio source that reads its wrapped source ahead from a separate thread.
+
+    The reader thread keeps up to depth frames buffered. read() takes the
+    oldest frame; if none is ready it waits for the reader and counts an
+    underrun. The source ends once the wrapped source has ended and the
+    buffer is drained.
+    """
+
+    def __init__(self, source, depth: int, guild_id=None):
+        """
+        Initialize the source and start the reader thread.
+
+        Args:
+            source: The primed audio source to read from
+            depth: Maximum number of frames to buffer
+            guild_id: The Discord guild ID underruns are counted for
+        """
+        # Named like PCMVolumeTransformer's attribute so the ffmpeg process can still be found
+        self.original = source
+        self.depth = max(1, depth)
+        self.guild_id = guild_id
+        self.underruns = 0
+        self._frames = deque()
+        self._condition = threading.Condition()
+        self._ended = False
+        self._closed = False
+        self._started = False
+        self._thread = threading.Thread(target=self._fill, name='audio-read-ahead', daemon=True)
+        self._thread.start()
+
+    @property
+    def buffered(self) -> int:
+        """Number of frames currently buffered."""
+        return len(self._frames)
+
+    def _fill(self) -> None:
+        """Reader thread: keep the buffer topped up until the source ends."""
+        try:
+            while True:
+                with self._condition:
+                    while len(self._frames) >= self.depth and not self._closed:
+                        self._condition.wait()
+                    if self._closed:
+                        return
+                data = self.original.read()
+                with self._condition:
+                    if not data:
+                        return
+                    self._frames.append(data)
+                    self._condition.notify_all()
+        except Exception as e:
+            if not self._closed:
+                print(f"Error reading ahead: {str(e)}")
+        finally:
+            with self._condition:
+                self._ended = True
+                self._condition.notify_all()
+
+    def read(self) -> bytes:
+        with self._condition:
+            if not self._frames and not self._ended:
+                # Waiting for the first frame isn't a stutter, only running dry mid-song is
+                if self._started:
+                    self.underruns += 1
+                    record_underrun(self.guild_id)
+                self._condition.wait_for(lambda: self._frames or self._ended)
+            if not self._frames:
+                return b''
+            self._started = True
+            data = self._frames.popleft()
+            self._condition.notify_all()
+        return data
+
+    def is_opus(self) -> bool:
+        is_opus = getattr(self.original, 'is_opus', None)
+        return is_opus() if is_opus else False
+
+    def cleanup(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._frames.clear()
+            self._condition.notify_all()
+        cleanup = getattr(self.original, 'cleanup', None)
+        if cleanup:
+            cleanup()
+
+
+def wrap_read_ahead(source, guild_id=None, depth_ms: int = None):
+    """
+    Wrap a primed source with read-ahead buffering if it is enabled.
+
+    Args:
+        source: The primed audio source
+        guild_id: The Discord guild ID underruns are counted for
+        depth_ms: Milliseconds to buffer (defaults to AUDIO.READ_AHEAD_MS, 0 disables read-ahead)
+
+    Returns:
+        The wrapped source, or the source itself if read-ahead is disabled
+    """
+    if depth_ms is None:
+        depth_ms = config_service.get_int('AUDIO.READ_AHEAD_MS', 500)
+    if depth_ms <= 0:
+        return source
+    return ReadAheadAudioSource(source, depth_ms // FRAME_MS, guild_id)
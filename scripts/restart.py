@@ -1,6 +1,9 @@
 import os
 import sys
 import subprocess
+from scripts.queue_journal import queue_journal
+from scripts.kvstore import state_store
+from scripts.log_writer import log_writer
 
 def restart_bot():
     """
@@ -22,6 +25,10 @@ def restart_bot():
         python = sys.executable
         script_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bot.py')
         cwd = os.path.dirname(script_path)
+        # Write pending queue changes first; the new process restores queues from them
+        queue_journal.stop()
+        state_store.close()
+        log_writer.stop()
         subprocess.Popen([python, script_path], cwd=cwd)
         os._exit(0)
     except Exception as e:
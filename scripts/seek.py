@@ -1,109 +1,176 @@
-import discord
 import time
-from scripts.config import FFMPEG_OPTIONS
-from scripts.messages import create_embed
-from scripts.duration import format_duration
-from scripts.constants import ERROR_BOT_NOT_CONNECTED, ERROR_NOTHING_PLAYING
+from scripts.duration import format_duration, get_audio_duration
+from scripts.playback import TrackedAudioSource, create_audio_source, ensure_encoder
+from scripts.volume import default_volume
+from scripts.constants import ERROR_BOT_NOT_CONNECTED, ERROR_NOTHING_PLAYING, GREEN, BLUE, RESET
+
+
+def get_playback_position(music_bot, voice_client=None) -> float:
+    """
+    Get how far into the current song playback is.
+
+    The position comes from the frames the player has actually sent, so
+    pauses are not counted. Sources that aren't tracked fall back to the
+    wall-clock time since playback started.
+
+    Args:
+        music_bot: The music bot instance
+        voice_client: The voice client to read from (defaults to music_bot.voice_client)
+
+    Returns:
+        float: Position in seconds
+    """
+    voice_client = voice_client or getattr(music_bot, 'voice_client', None)
+    player = getattr(voice_client, '_player', None)
+    source = getattr(player, 'source', None)
+    if isinstance(source, TrackedAudioSource):
+        return source.position
+    if getattr(music_bot, 'playback_start_time', None):
+        return time.time() - music_bot.playback_start_time
+    return 0
+
+
+def parse_duration(duration):
+    """
+    Convert a song duration to whole seconds.
+
+    Args:
+        duration: Seconds as a number, or a string like "3:45" or "1:23:45"
+
+    Returns:
+        int or None: The duration in seconds, or None if it can't be parsed
+    """
+    if not duration:
+        return None
+    try:
+        if isinstance(duration, str):
+            parts = duration.split(':')
+            if len(parts) == 2:  # MM:SS
+                return int(parts[0]) * 60 + int(parts[1])
+            if len(parts) == 3:  # HH:MM:SS
+                return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
+            return int(float(duration))
+        return int(duration)
+    except (ValueError, TypeError):
+        return None
+
+
+async def restart_at(voice_client, song: dict, position: float, volume: int = None) -> float:
+    """
+    Continue the current song from another position without stopping the player.
+
+    A new ffmpeg source is started with an input-side seek, so ffmpeg jumps
+    straight to the position instead of decoding everything before it, and
+    is swapped into the running player.
+
+    Args:
+        voice_client: The voice client that is playing
+        song: The song being played
+        position: Position in seconds to continue from
+        volume: Playback volume in percent (defaults to the current source's volume)
+
+    Returns:
+        float: Seek latency in milliseconds (ffmpeg start to source swap)
+    """
+    started = time.perf_counter()
+    player = voice_client._player
+    current = player.source
+    if volume is None and isinstance(current, TrackedAudioSource):
+        volume = round(current.volume * 100)
+    guild_id = getattr(getattr(voice_client, 'guild', None), 'id', None)
+    source = await create_audio_source(song['file_path'], use_volume_transformer=False, start=position, volume=volume, guild_id=guild_id)
+    try:
+        ensure_encoder(voice_client, source)
+    except Exception:
+        source.cleanup()
+        raise
+
+    current = player.source
+    if isinstance(current, TrackedAudioSource):
+        current.replace_source(source, offset=position)
+    else:
+        player.source = TrackedAudioSource(source, offset=position, volume=(default_volume() if volume is None else volume) / 100)
+        cleanup = getattr(current, 'cleanup', None)
+        if cleanup:
+            cleanup()
+    return (time.perf_counter() - started) * 1000
 
 
 async def seek_audio(ctx, music_bot, seconds, direction="forward"):
     """
     Seek the currently playing audio forward or backward by a specified number of seconds.
-    
+
     This function handles seeking in the currently playing audio file by:
-    1. Calculating the new position based on current playback time
-    2. Creating a new FFmpeg audio source with the seek position
+    1. Calculating the new position from the frames played so far
+    2. Creating a new FFmpeg audio source that starts at the seek position
     3. Replacing the current audio source without stopping playback
-    
+
     Args:
         ctx: The command context
         music_bot: The music bot instance
         seconds (int): Number of seconds to seek
         direction (str): Either "forward" or "rewind" to indicate seek direction
-        
+
     Returns:
         tuple: (success: bool, message: str, new_position: int or None)
     """
     # Validate that there's a song playing
     if not music_bot.current_song:
         return False, ERROR_NOTHING_PLAYING, None
-        
+
     # Check if the bot is connected and playing
     if not music_bot.voice_client or not ctx.voice_client:
         return False, ERROR_BOT_NOT_CONNECTED, None
-        
+
     # Get current song info
     current_song = music_bot.current_song
-    
+
     # Don't allow seeking on streams
     if current_song.get('is_stream'):
         return False, "Cannot seek on live streams!", None
-    
+
     # Calculate current position in the song
-    if music_bot.playback_start_time:
-        current_position = int(time.time() - music_bot.playback_start_time)
-    else:
-        current_position = 0
-    
+    current_position = int(get_playback_position(music_bot, ctx.voice_client))
+
     # Calculate new position based on direction
     if direction == "forward":
         new_position = current_position + seconds
     else:  # rewind
         new_position = current_position - seconds
-    
+
     # Ensure new position is not negative
     if new_position < 0:
         new_position = 0
-    
-    # Get song duration if available
+
+    # Get song duration, probing the file if the queue entry doesn't have it
     duration = current_song.get('duration')
-    duration_seconds = None
-    if duration:
-        try:
-            # Convert duration string to seconds if needed
-            if isinstance(duration, str):
-                # Parse duration format like "3:45" or "1:23:45"
-                parts = duration.split(':')
-                if len(parts) == 2:  # MM:SS
-                    duration_seconds = int(parts[0]) * 60 + int(parts[1])
-                elif len(parts) == 3:  # HH:MM:SS
-                    duration_seconds = int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-            else:
-                duration_seconds = int(duration)
-        except (ValueError, TypeError):
-            # If duration parsing fails, we'll skip duration check
-            duration_seconds = None
-            
-        # Check if new position exceeds duration
-        if duration_seconds and new_position >= duration_seconds:
-            return False, f"Cannot seek beyond song duration ({duration})", None
-    
+    duration_seconds = parse_duration(duration)
+    if not duration_seconds and current_song.get('file_path'):
+        duration_seconds = parse_duration(await get_audio_duration(current_song['file_path']))
+        if duration_seconds:
+            duration = format_duration(duration_seconds)
+
+    # Check if new position exceeds duration
+    if duration_seconds and new_position >= duration_seconds:
+        return False, f"Cannot seek beyond song duration ({duration})", None
+
     try:
-        # Create a new FFmpeg audio source with seek position
-        ffmpeg_options = FFMPEG_OPTIONS.copy()
-        ffmpeg_options['options'] = ffmpeg_options.get('options', '') + f' -ss {new_position}'
-        
-        # Create new source with seek
-        source = discord.FFmpegPCMAudio(current_song['file_path'], **ffmpeg_options)
-        
-        # Call read() on the audio source before playing to prevent speed-up issue
-        source.read()
-        
         # Check if player exists before trying to replace source
         if not ctx.voice_client._player:
             return False, "Cannot seek: playback is not active", None
-        
+
         # Replace the audio source without stopping playback
-        ctx.voice_client._player.source = source
-        
-        # Update playback start time to reflect the new position
+        latency_ms = await restart_at(ctx.voice_client, current_song, new_position)
+        print(f"{GREEN}Seek latency:{RESET}{BLUE} {latency_ms:.0f} ms to {format_duration(new_position)}{RESET}")
+
+        # Keep the wall-clock start time in line with the new position
         music_bot.playback_start_time = time.time() - new_position
-        
+
         # Update last activity
         music_bot.last_activity = time.time()
-        
+
         position_str = format_duration(new_position)
         return True, position_str, new_position
-        
+
     except Exception as e:
         return False, f"An error occurred while seeking: {str(e)}", None
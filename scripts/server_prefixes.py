@@ -1,43 +1,59 @@
-import json
+"""
+Per-server command prefixes.
+
+get_prefix is discord.py's command_prefix callable and runs for every message
+the bot sees, so the prefix table is kept in memory: it is read from the
+'prefixes' namespace of the state database once and lookups are plain dict
+reads without a lock. A change writes only the guild's own key, batched with
+other pending state writes (see scripts/kvstore.py).
+
+server_prefixes.json, where prefixes used to be stored, is imported the first
+time the table is loaded.
+"""
+
 import os
-import asyncio
+from scripts.kvstore import state_store
 
-# Path to the server prefixes JSON file
+# Path to the legacy server prefixes JSON file (imported once, then renamed)
 SERVER_PREFIXES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'server_prefixes.json')
 
-# Lock for thread-safe file operations
-_file_lock = asyncio.Lock()
+# Namespace of the state database the prefixes are stored in
+PREFIXES_NAMESPACE = 'prefixes'
+
+# In-memory prefix table (guild ID string -> prefix), mutated in place
+_prefixes = {}
+# Store the table was loaded from (None until loaded)
+_loaded_from = None
+
+
+def _ensure_loaded():
+    """Load the prefix table into memory if it hasn't been loaded from the current store."""
+    global _loaded_from
+    if _loaded_from is state_store:
+        return
+    state_store.migrate_json(PREFIXES_NAMESPACE, SERVER_PREFIXES_FILE)
+    prefixes = state_store.items(PREFIXES_NAMESPACE)
+    _prefixes.clear()
+    _prefixes.update(prefixes)
+    _loaded_from = state_store
+
 
 def init_server_prefixes_sync():
     """
-    Initialize the server prefixes file if it doesn't exist.
+    Load the server prefixes.
     This is a synchronous version to be called during bot startup.
-    
+
     Returns:
         dict: A dictionary mapping guild IDs to their custom prefixes
     """
-    if not os.path.exists(SERVER_PREFIXES_FILE):
-        # Create empty file if it doesn't exist
-        with open(SERVER_PREFIXES_FILE, 'w') as f:
-            json.dump({}, f, indent=4)
-        print(f"Created new server_prefixes.json file at {SERVER_PREFIXES_FILE}")
-        return {}
-    
-    try:
-        with open(SERVER_PREFIXES_FILE, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        # If the file is corrupted, create a new empty one
-        with open(SERVER_PREFIXES_FILE, 'w') as f:
-            json.dump({}, f, indent=4)
-        print(f"Recreated server_prefixes.json due to JSON decode error")
-        return {}
+    _ensure_loaded()
+    return dict(_prefixes)
 
 async def init_server_prefixes():
     """
-    Initialize the server prefixes file if it doesn't exist.
-    This should be called during bot startup to ensure the file exists.
-    
+    Load the server prefixes.
+    This should be called during bot startup.
+
     Returns:
         dict: A dictionary mapping guild IDs to their custom prefixes
     """
@@ -45,79 +61,70 @@ async def init_server_prefixes():
 
 async def load_server_prefixes():
     """
-    Load server prefixes from the JSON file.
-    
+    Get a copy of the server prefixes.
+
     Returns:
         dict: A dictionary mapping guild IDs to their custom prefixes
     """
-    async with _file_lock:
-        if not os.path.exists(SERVER_PREFIXES_FILE):
-            # Create empty file if it doesn't exist
-            _save_server_prefixes_unlocked({})
-            print(f"Created new server_prefixes.json file at {SERVER_PREFIXES_FILE}")
-            return {}
-        
-        try:
-            with open(SERVER_PREFIXES_FILE, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            # If the file is corrupted, create a new empty one
-            _save_server_prefixes_unlocked({})
-            print(f"Recreated server_prefixes.json due to JSON decode error")
-            return {}
+    _ensure_loaded()
+    return dict(_prefixes)
 
 
-def _save_server_prefixes_unlocked(prefixes):
+def get_custom_prefix(guild_id):
     """
-    Internal function to save prefixes without acquiring lock.
-    Caller must hold _file_lock.
+    Get a guild's custom prefix without taking a lock.
+
+    Args:
+        guild_id: The ID of the guild
+
+    Returns:
+        str: The custom prefix, or None if the guild uses the default
     """
-    with open(SERVER_PREFIXES_FILE, 'w') as f:
-        json.dump(prefixes, f, indent=4)
+    if _loaded_from is not state_store:
+        _ensure_loaded()
+    return _prefixes.get(str(guild_id))
 
 
 async def save_server_prefixes(prefixes):
     """
-    Save server prefixes to the JSON file.
-    
+    Replace the server prefixes.
+
     Args:
         prefixes (dict): A dictionary mapping guild IDs to their custom prefixes
     """
-    async with _file_lock:
-        _save_server_prefixes_unlocked(prefixes)
+    global _loaded_from
+    _prefixes.clear()
+    _prefixes.update({str(guild_id): prefix for guild_id, prefix in prefixes.items()})
+    _loaded_from = state_store
+    state_store.clear(PREFIXES_NAMESPACE)
+    state_store.set_many(PREFIXES_NAMESPACE, _prefixes)
 
 async def get_prefix(bot, message):
     """
     Get the prefix for a specific guild.
-    
+
     This function is designed to be used as a command_prefix function for discord.py.
     It returns the custom prefix for the guild if one exists, otherwise it returns
     the default prefix from the config.
-    
+
     Args:
         bot: The Discord bot instance
         message: The Discord message object
-        
+
     Returns:
         str: The prefix for the guild
     """
     # Import config here to avoid circular imports
-    from scripts.config import config_vars
-    default_prefix = config_vars.get('PREFIX', '!')
-    
+    from scripts.config import load_config
+    default_prefix = load_config().get('PREFIX', '!')
+
     # If DM channel, use default prefix
     if message.guild is None:
         return default_prefix
-    
+
     try:
-        prefixes = await load_server_prefixes()
-        guild_id = str(message.guild.id)  # Convert to string for JSON compatibility
-        
         # Return custom prefix if it exists, otherwise return default prefix
-        if guild_id in prefixes:
-            return prefixes[guild_id]
-        else:
-            return default_prefix
+        return get_custom_prefix(message.guild.id) or default_prefix
     except Exception as e:
         # If any error occurs, fallback to default prefix
         print(f"Error loading server prefixes: {e}. Using default prefix.")
@@ -126,44 +133,44 @@ async def get_prefix(bot, message):
 async def set_prefix(guild_id, new_prefix):
     """
     Set a custom prefix for a specific guild.
-    
+
+    The new prefix is used right away; it is saved with the next batch of state writes.
+
     Args:
         guild_id: The ID of the guild
         new_prefix: The new prefix to set
-        
+
     Returns:
         bool: True if the prefix was changed, False if it was the same
     """
     guild_id = str(guild_id)  # Convert to string for JSON compatibility
-    prefixes = await load_server_prefixes()
-    
+    _ensure_loaded()
+
     # Check if the prefix is already set to the same value
-    if guild_id in prefixes and prefixes[guild_id] == new_prefix:
+    if _prefixes.get(guild_id) == new_prefix:
         return False
-    
+
     # Update the prefix
-    prefixes[guild_id] = new_prefix
-    await save_server_prefixes(prefixes)
+    _prefixes[guild_id] = new_prefix
+    state_store.set(PREFIXES_NAMESPACE, guild_id, new_prefix)
     return True
 
 async def reset_prefix(guild_id):
     """
     Reset a guild's prefix to the default.
-    
+
     Args:
         guild_id: The ID of the guild
-        
+
     Returns:
         bool: True if the prefix was reset, False if it was already default
     """
     guild_id = str(guild_id)  # Convert to string for JSON compatibility
-    prefixes = await load_server_prefixes()
-    
+    _ensure_loaded()
+
     # Check if the guild has a custom prefix
-    if guild_id not in prefixes:
+    if _prefixes.pop(guild_id, None) is None:
         return False
-    
-    # Remove the custom prefix
-    del prefixes[guild_id]
-    await save_server_prefixes(prefixes)
+
+    state_store.delete(PREFIXES_NAMESPACE, guild_id)
     return True
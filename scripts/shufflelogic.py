@@ -1,5 +1,3 @@
-import random
-from collections import deque
 from discord.ext import commands
 
 async def shuffle_queue(ctx, music_bot):
@@ -17,11 +15,9 @@ async def shuffle_queue(ctx, music_bot):
         if not music_bot.queue:
             return False
             
-        # Convert to list, shuffle, and convert back to deque (with lock for thread safety)
+        # Shuffle in place (with lock for thread safety)
         async with music_bot.queue_lock:
-            queue_list = list(music_bot.queue)
-            random.shuffle(queue_list)
-            music_bot.queue = deque(queue_list)
+            music_bot.queue.shuffle()
         return True
         
     except Exception as e:
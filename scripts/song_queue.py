@@ -0,0 +1,656 @@
+"""
+Indexed song queue.
+
+MusicBot.queue used to be a deque of song dicts, so looking up a song's
+position, removing or moving by index, summing durations and counting
+songs per requester all scanned the whole queue. SongQueue keeps the same
+deque/list interface but stores the songs in an implicit treap (a balanced
+binary tree ordered by position) where every node also knows the size and
+total duration of its subtree. That makes indexing, slicing a page,
+position lookups, insertion and removal anywhere O(log n), and the total
+duration is read off the root.
+
+Every entry gets a stable id when it is added. Entries are also indexed by
+object, by URL and by requester, so finding or removing all copies of a URL
+costs O(k log n) for k copies instead of a rebuild of the queue.
+
+When a journal is attached (see scripts/queue_journal.py), every change is
+also reported to it so the queue can be restored after a restart. Every
+change also bumps version, so views of the queue can tell whether what they
+rendered is still current, and a callback registered with watch_head() is
+called whenever a change leaves a different song at the front.
+"""
+
+import itertools
+import random
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from scripts.track import Track
+
+
+def _entry_seconds(entry) -> float:
+    """
+    Get the known duration of a queue entry.
+
+    Args:
+        entry: A song dict
+
+    Returns:
+        float: Duration in seconds (0 for streams and unknown durations)
+    """
+    if not isinstance(entry, Mapping) or entry.get('is_stream'):
+        return 0.0
+    duration = entry.get('duration')
+    return float(duration) if duration and duration > 0 else 0.0
+
+
+def _requester_key(entry):
+    """
+    Get the requester ID of a queue entry.
+
+    Args:
+        entry: A song dict
+
+    Returns:
+        The requester's user ID, or None if unknown
+    """
+    if isinstance(entry, Track):
+        return entry.requester_id if isinstance(entry.requester_id, int) else None
+    if not isinstance(entry, Mapping):
+        return None
+    requester = entry.get('requester')
+    if requester is None and entry.get('ctx') is not None:
+        requester = getattr(entry['ctx'], 'author', None)
+    return getattr(requester, 'id', requester) if requester is not None else None
+
+
+class _Node:
+    """A queue entry in the treap."""
+
+    __slots__ = ('entry', 'uid', 'priority', 'left', 'right', 'parent', 'size', 'seconds', 'total', 'url', 'requester')
+
+    def __init__(self, entry, uid: int):
+        self.entry = entry
+        self.uid = uid
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.parent = None
+        self.size = 1
+        self.seconds = _entry_seconds(entry)
+        self.total = self.seconds
+        self.url = entry.get('url') if isinstance(entry, Mapping) else None
+        self.requester = _requester_key(entry)
+
+
+def _size(node) -> int:
+    return node.size if node else 0
+
+
+def _total(node) -> float:
+    return node.total if node else 0.0
+
+
+def _update(node) -> None:
+    """Recompute a node's subtree aggregates and its children's parent links."""
+    node.size = 1 + _size(node.left) + _size(node.right)
+    node.total = node.seconds + _total(node.left) + _total(node.right)
+    if node.left:
+        node.left.parent = node
+    if node.right:
+        node.right.parent = node
+
+
+def _merge(left, right):
+    """Concatenate two treaps."""
+    if not left or not right:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+def _split(node, count):
+    """Split a treap into its first count nodes and the rest."""
+    if not node:
+        return None, None
+    if _size(node.left) >= count:
+        left, node.left = _split(node.left, count)
+        _update(node)
+        if left:
+            left.parent = None
+        return left, node
+    node.right, right = _split(node.right, count - _size(node.left) - 1)
+    _update(node)
+    if right:
+        right.parent = None
+    return node, right
+
+
+class SongQueue:
+    """
+    Song queue backed by an order-statistic tree with per-entry indexes.
+
+    Supports the deque operations the bot already uses (append, appendleft,
+    popleft, remove, clear, len, iteration and indexing) plus pop(index),
+    insert() and the indexed lookups below.
+    """
+
+    def __init__(self, entries: Iterable = ()):
+        """
+        Initialize the queue.
+
+        Args:
+            entries: Songs to start with, front first
+        """
+        self._root = None
+        self._ids = itertools.count(1)
+        self._by_uid: Dict[int, _Node] = {}
+        self._by_object: Dict[int, List[_Node]] = {}
+        self._by_url: Dict[Any, Dict[int, _Node]] = {}
+        self._requesters: Dict[Any, int] = {}
+        self._missing_durations: Dict[int, _Node] = {}
+        self.journal = None  # GuildJournal changes are recorded to, if any
+        self.version = 0  # Incremented on every change to the queue
+        self._on_head_change = None
+        self._head = None  # Front node when the head was last checked
+        self.extend(entries)
+
+    # Index maintenance
+
+    def _index(self, node: _Node) -> None:
+        """Add a new node to the lookup indexes."""
+        self._by_uid[node.uid] = node
+        self._by_object.setdefault(id(node.entry), []).append(node)
+        self._by_url.setdefault(node.url, {})[node.uid] = node
+        self._requesters[node.requester] = self._requesters.get(node.requester, 0) + 1
+        if not node.seconds and isinstance(node.entry, Mapping) and not node.entry.get('is_stream'):
+            self._missing_durations[node.uid] = node
+
+    def _unindex(self, node: _Node) -> None:
+        """Remove a detached node from the lookup indexes."""
+        del self._by_uid[node.uid]
+        nodes = self._by_object[id(node.entry)]
+        nodes.remove(node)
+        if not nodes:
+            del self._by_object[id(node.entry)]
+        urls = self._by_url[node.url]
+        del urls[node.uid]
+        if not urls:
+            del self._by_url[node.url]
+        self._requesters[node.requester] -= 1
+        if not self._requesters[node.requester]:
+            del self._requesters[node.requester]
+        self._missing_durations.pop(node.uid, None)
+
+    def _log(self, op: str, **fields) -> None:
+        """Count a change and report it to the attached journal and head watcher."""
+        self.version += 1
+        if self.journal is not None:
+            self.journal.record(op, **fields)
+        if self._on_head_change is not None:
+            head = self._first()
+            if head is not self._head:
+                self._head = head
+                self._on_head_change()
+
+    def watch_head(self, callback: Optional[Callable[[], None]]) -> None:
+        """
+        Call a function whenever a change leaves a different song at the front.
+
+        The callback runs synchronously inside the change, so on the thread
+        (and under the locks) of whoever changed the queue.
+
+        Args:
+            callback: Called without arguments, or None to stop watching
+        """
+        self._on_head_change = callback
+        self._head = self._first()
+
+    def _add(self, index: int, entry) -> None:
+        """Insert a new entry at a position."""
+        node = self._new_node(entry)
+        self._attach(index, node)
+        self._log('add', id=node.uid, index=index, track=node.entry)
+
+    def _new_node(self, entry) -> _Node:
+        if isinstance(entry, Mapping):
+            # Queued songs are stored as Tracks, which don't keep their context alive
+            entry = Track.from_entry(entry)
+        node = _Node(entry, next(self._ids))
+        self._index(node)
+        return node
+
+    # Tree helpers
+
+    def _node_at(self, index: int) -> _Node:
+        """Find the node at a position (negative positions count from the end)."""
+        size = _size(self._root)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('queue index out of range')
+        node = self._root
+        while True:
+            left = _size(node.left)
+            if index < left:
+                node = node.left
+            elif index == left:
+                return node
+            else:
+                index -= left + 1
+                node = node.right
+
+    def _first(self) -> Optional[_Node]:
+        """Get the node at the front, or None if the queue is empty."""
+        node = self._root
+        while node is not None and node.left is not None:
+            node = node.left
+        return node
+
+    def _rank(self, node: _Node) -> int:
+        """Get a node's position by walking up to the root."""
+        rank = _size(node.left)
+        while node.parent:
+            if node is node.parent.right:
+                rank += _size(node.parent.left) + 1
+            node = node.parent
+        return rank
+
+    def _detach(self, index: int) -> _Node:
+        """Cut the node at a position out of the tree."""
+        left, rest = _split(self._root, index)
+        node, right = _split(rest, 1)
+        self._root = _merge(left, right)
+        if self._root:
+            self._root.parent = None
+        node.parent = None
+        return node
+
+    def _attach(self, index: int, node: _Node) -> None:
+        """Insert a detached node at a position."""
+        left, right = _split(self._root, index)
+        self._root = _merge(_merge(left, node), right)
+        self._root.parent = None
+
+    @staticmethod
+    def _walk(node) -> Iterator[_Node]:
+        """Iterate over a subtree in order."""
+        stack = []
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    # deque/list interface
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def __bool__(self) -> bool:
+        return self._root is not None
+
+    def __iter__(self) -> Iterator:
+        for node in self._walk(self._root):
+            yield node.entry
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return list(self)[index]
+            return self.page(start, stop)
+        return self._node_at(index).entry
+
+    def __repr__(self) -> str:
+        return f"SongQueue({list(self)!r})"
+
+    def append(self, entry) -> None:
+        """Add a song to the end of the queue."""
+        self._add(len(self), entry)
+
+    def appendleft(self, entry) -> None:
+        """Add a song to the front of the queue."""
+        self._add(0, entry)
+
+    def extend(self, entries: Iterable) -> None:
+        """Add songs to the end of the queue."""
+        for entry in entries:
+            self.append(entry)
+
+    def insert(self, index: int, entry) -> None:
+        """
+        Insert a song before a position.
+
+        Args:
+            index: Position to insert at (clamped to the queue like list.insert)
+            entry: The song to insert
+        """
+        size = len(self)
+        if index < 0:
+            index = max(0, index + size)
+        self._add(min(index, size), entry)
+
+    def pop(self, index: int = -1):
+        """
+        Remove and return the song at a position.
+
+        Args:
+            index: Position to remove (defaults to the last song)
+
+        Returns:
+            The removed song
+        """
+        if not self._root:
+            raise IndexError('pop from an empty queue')
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('queue index out of range')
+        node = self._detach(index)
+        self._unindex(node)
+        self._log('remove', id=node.uid)
+        return node.entry
+
+    def popleft(self):
+        """Remove and return the song at the front of the queue."""
+        return self.pop(0)
+
+    def remove(self, entry) -> None:
+        """
+        Remove the first occurrence of a song.
+
+        Args:
+            entry: The song to remove
+
+        Raises:
+            ValueError: If the song is not in the queue
+        """
+        nodes = self._by_object.get(id(entry))
+        if nodes:
+            self.pop(min(self._rank(node) for node in nodes))
+            return
+        for position, queued in enumerate(self):
+            if queued == entry:
+                self.pop(position)
+                return
+        raise ValueError('song not in queue')
+
+    def clear(self) -> None:
+        """Remove every song."""
+        self._root = None
+        self._by_uid.clear()
+        self._by_object.clear()
+        self._by_url.clear()
+        self._requesters.clear()
+        self._missing_durations.clear()
+        self._log('clear')
+
+    def index(self, entry) -> int:
+        """
+        Get the position of the first occurrence of a song.
+
+        Args:
+            entry: The song to look up
+
+        Returns:
+            int: The song's position
+
+        Raises:
+            ValueError: If the song is not in the queue
+        """
+        nodes = self._by_object.get(id(entry))
+        if not nodes:
+            raise ValueError('song not in queue')
+        return min(self._rank(node) for node in nodes)
+
+    # Indexed operations
+
+    def page(self, start: int, stop: int) -> List:
+        """
+        Get the songs in a range of positions.
+
+        Args:
+            start: First position
+            stop: Position after the last one
+
+        Returns:
+            list: The songs from start up to stop
+        """
+        start = max(0, start)
+        stop = min(len(self), stop)
+        if start >= stop:
+            return []
+        songs = []
+        node = self._node_at(start)
+        while len(songs) < stop - start:
+            songs.append(node.entry)
+            # In-order successor
+            if node.right:
+                node = node.right
+                while node.left:
+                    node = node.left
+            else:
+                while node.parent and node is node.parent.right:
+                    node = node.parent
+                node = node.parent
+        return songs
+
+    def id_of(self, entry) -> Optional[int]:
+        """
+        Get the stable id of the first occurrence of a song.
+
+        Args:
+            entry: The song to look up
+
+        Returns:
+            int or None: The id assigned when the song was queued
+        """
+        nodes = self._by_object.get(id(entry))
+        if not nodes:
+            return None
+        return min(nodes, key=self._rank).uid
+
+    def get(self, uid: int):
+        """
+        Get a song by its stable id.
+
+        Args:
+            uid: The id assigned when the song was queued
+
+        Returns:
+            The song, or None if it is no longer queued
+        """
+        node = self._by_uid.get(uid)
+        return node.entry if node else None
+
+    def position(self, uid: int) -> Optional[int]:
+        """
+        Get the current position of a song by its stable id.
+
+        Args:
+            uid: The id assigned when the song was queued
+
+        Returns:
+            int or None: The song's position, or None if it is no longer queued
+        """
+        node = self._by_uid.get(uid)
+        return self._rank(node) if node else None
+
+    def remove_id(self, uid: int):
+        """
+        Remove a song by its stable id.
+
+        Args:
+            uid: The id assigned when the song was queued
+
+        Returns:
+            The removed song, or None if it is no longer queued
+        """
+        node = self._by_uid.get(uid)
+        return self.pop(self._rank(node)) if node else None
+
+    def positions_of_url(self, url) -> List[int]:
+        """
+        Get the positions of every song with a URL.
+
+        Args:
+            url: The song URL
+
+        Returns:
+            list: Positions in queue order
+        """
+        return sorted(self._rank(node) for node in self._by_url.get(url, {}).values())
+
+    def count_url(self, url) -> int:
+        """Number of queued songs with a URL."""
+        return len(self._by_url.get(url, ()))
+
+    def remove_url(self, url) -> int:
+        """
+        Remove every song with a URL.
+
+        Args:
+            url: The song URL
+
+        Returns:
+            int: Number of songs removed
+        """
+        positions = self.positions_of_url(url)
+        for position in reversed(positions):
+            self.pop(position)
+        return len(positions)
+
+    def move(self, source: int, target: int) -> None:
+        """
+        Move a song to another position.
+
+        Args:
+            source: Current position of the song
+            target: Position the song should end up at
+        """
+        size = len(self)
+        if source < 0:
+            source += size
+        if not 0 <= source < size:
+            raise IndexError('queue index out of range')
+        node = self._detach(source)
+        target = max(0, min(target, size - 1))
+        self._attach(target, node)
+        self._log('move', id=node.uid, index=target)
+
+    def retain(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        Keep only the songs a predicate accepts.
+
+        Args:
+            predicate: Called with each song; songs it rejects are removed
+
+        Returns:
+            int: Number of songs removed
+        """
+        removed = [position for position, entry in enumerate(self) if not predicate(entry)]
+        for position in reversed(removed):
+            self.pop(position)
+        return len(removed)
+
+    def shuffle(self) -> None:
+        """Shuffle the queue in place, keeping each song's stable id."""
+        nodes = list(self._walk(self._root))
+        random.shuffle(nodes)
+        self._root = None
+        for node in nodes:
+            node.left = node.right = node.parent = None
+            _update(node)
+            self._root = _merge(self._root, node)
+        if self._root:
+            self._root.parent = None
+        self._log('order', ids=[node.uid for node in nodes])
+
+    def snapshot(self) -> List:
+        """
+        Get every queued song with its stable id.
+
+        Returns:
+            list: (id, song) pairs in queue order
+        """
+        return [(node.uid, node.entry) for node in self._walk(self._root)]
+
+    # Aggregates
+
+    @property
+    def total_duration(self) -> float:
+        """Total known duration of the queued songs in seconds."""
+        return _total(self._root)
+
+    def duration_before(self, index: int) -> float:
+        """
+        Get the known duration of the songs ahead of a position.
+
+        Args:
+            index: A queue position
+
+        Returns:
+            float: Seconds of queued audio before the song at index
+        """
+        total = 0.0
+        node = self._root
+        while node:
+            left = _size(node.left)
+            if index <= left:
+                node = node.left
+            else:
+                total += _total(node.left) + node.seconds
+                index -= left + 1
+                node = node.right
+        return total
+
+    def missing_durations(self) -> List:
+        """Queued songs (excluding streams) whose duration isn't known yet."""
+        return [node.entry for node in self._missing_durations.values()]
+
+    def set_duration(self, entry, seconds: float) -> None:
+        """
+        Record the duration of a queued song and update the totals.
+
+        Args:
+            entry: A queued song
+            seconds: Its duration in seconds
+        """
+        if isinstance(entry, Mapping):
+            entry['duration'] = seconds
+        self.version += 1
+        for node in self._by_object.get(id(entry), ()):
+            node.seconds = _entry_seconds(entry)
+            if node.seconds:
+                self._missing_durations.pop(node.uid, None)
+            # Refresh the totals on the way up to the root
+            current = node
+            while current:
+                current.total = current.seconds + _total(current.left) + _total(current.right)
+                current = current.parent
+
+    def requester_count(self, requester) -> int:
+        """
+        Number of queued songs requested by a user.
+
+        Args:
+            requester: A user object or user ID
+
+        Returns:
+            int: The user's queued song count
+        """
+        return self._requesters.get(getattr(requester, 'id', requester), 0)
+
+    @property
+    def requester_counts(self) -> Dict[Any, int]:
+        """Queued song counts by requester user ID."""
+        return dict(self._requesters)
@@ -0,0 +1,175 @@
+"""
+Spotify to YouTube match scoring.
+
+This module picks the YouTube video that best matches a Spotify track from a
+small batch of search results. Candidates are scored on how close their
+duration is to the Spotify duration and how similar their title and channel
+are to the track name and artists. An ISRC found on a candidate is treated as
+a definitive match.
+"""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+# Weights for the individual match signals (they sum to 1.0)
+DURATION_WEIGHT = 0.5
+TITLE_WEIGHT = 0.3
+ARTIST_WEIGHT = 0.2
+
+# A duration difference of this many seconds or more scores zero
+DURATION_TOLERANCE = 15.0
+
+# Words that YouTube uploads add to titles but Spotify track names lack
+_NOISE_WORDS = re.compile(
+    r'\b(official|video|audio|lyrics?|lyric video|music video|hd|hq|4k|visualizer|topic|remastered|\d{4} remaster)\b'
+)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a title or artist name for comparison.
+
+    Lowercases, strips accents, bracketed suffixes, common upload noise words
+    and punctuation.
+
+    Args:
+        text: The text to normalize
+
+    Returns:
+        str: The normalized text
+    """
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r'[\(\[].*?[\)\]]', ' ', text)
+    text = _NOISE_WORDS.sub(' ', text)
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+
+def _duration_score(track_seconds: Optional[float], candidate_seconds: Optional[float]) -> float:
+    """
+    Score how close two durations are.
+
+    Args:
+        track_seconds: Spotify track duration in seconds
+        candidate_seconds: YouTube candidate duration in seconds
+
+    Returns:
+        float: 1.0 for an exact match down to 0.0 at DURATION_TOLERANCE, 0.5 if unknown
+    """
+    if not track_seconds or not candidate_seconds:
+        return 0.5
+    delta = abs(float(track_seconds) - float(candidate_seconds))
+    return max(0.0, 1.0 - delta / DURATION_TOLERANCE)
+
+
+def _title_score(track_name: str, candidate_title: str) -> float:
+    """
+    Score how similar a candidate title is to the Spotify track name.
+
+    Args:
+        track_name: The Spotify track name
+        candidate_title: The YouTube video title
+
+    Returns:
+        float: Similarity between 0.0 and 1.0
+    """
+    name = normalize_text(track_name)
+    title = normalize_text(candidate_title)
+    if not name or not title:
+        return 0.0
+    if name in title:
+        return 1.0
+    return SequenceMatcher(None, name, title).ratio()
+
+
+def _artist_score(artists: List[str], candidate: Dict) -> float:
+    """
+    Score whether the track's artists appear on the candidate.
+
+    Args:
+        artists: Spotify artist names
+        candidate: The YouTube search result
+
+    Returns:
+        float: Fraction of artists found in the title or channel name
+    """
+    names = [normalize_text(a) for a in artists if a]
+    names = [n for n in names if n]
+    if not names:
+        return 0.0
+    haystack = ' '.join(normalize_text(candidate.get(key) or '') for key in ('title', 'channel', 'uploader'))
+    return sum(1 for name in names if name in haystack) / len(names)
+
+
+def _has_isrc(isrc: Optional[str], candidate: Dict) -> bool:
+    """
+    Check whether a candidate carries the track's ISRC.
+
+    YouTube search results rarely expose an ISRC, but auto-generated
+    "Topic" uploads sometimes include it in their metadata.
+
+    Args:
+        isrc: The Spotify track's ISRC, if known
+        candidate: The YouTube search result
+
+    Returns:
+        bool: True if the ISRC appears on the candidate
+    """
+    if not isrc:
+        return False
+    isrc = isrc.upper()
+    if (candidate.get('isrc') or '').upper() == isrc:
+        return True
+    return isrc in (candidate.get('description') or '').upper()
+
+
+def score_candidate(track: Dict, candidate: Dict) -> float:
+    """
+    Score a YouTube search result against a Spotify track.
+
+    Args:
+        track: Spotify track dictionary with 'name', 'artists' and optionally
+            'duration_ms' and 'isrc'
+        candidate: YouTube search result with 'title' and optionally
+            'duration', 'channel', 'uploader' and 'description'
+
+    Returns:
+        float: Match confidence between 0.0 and 1.0
+    """
+    if _has_isrc(track.get('isrc'), candidate):
+        return 1.0
+    artists = [artist.get('name', '') for artist in track.get('artists', [])]
+    track_seconds = track['duration_ms'] / 1000 if track.get('duration_ms') else None
+    score = (
+        DURATION_WEIGHT * _duration_score(track_seconds, candidate.get('duration'))
+        + TITLE_WEIGHT * _title_score(track.get('name', ''), candidate.get('title', ''))
+        + ARTIST_WEIGHT * _artist_score(artists, candidate)
+    )
+    return round(score, 3)
+
+
+def pick_best_candidate(track: Dict, candidates: List[Dict]) -> Tuple[Optional[Dict], float]:
+    """
+    Pick the best matching YouTube result for a Spotify track.
+
+    Ties keep YouTube's own ranking, so the earliest result wins.
+
+    Args:
+        track: Spotify track dictionary
+        candidates: YouTube search results in search order
+
+    Returns:
+        tuple: (best candidate or None, its confidence)
+    """
+    best, best_score = None, -1.0
+    for candidate in candidates:
+        if not candidate or not candidate.get('id'):
+            continue
+        score = score_candidate(track, candidate)
+        if score > best_score:
+            best, best_score = candidate, score
+    return best, max(best_score, 0.0)
@@ -0,0 +1,59 @@
+"""
+Per-phase startup timing.
+
+Startup work is wrapped in startup_timer.phase(name) blocks and the
+durations are printed once the bot is ready, so a slow start can be traced
+to configuration, tool discovery, command loading or the Discord login.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+from scripts.constants import GREEN, BLUE, RESET
+
+
+class StartupTimer:
+    """Records how long each startup phase took."""
+
+    def __init__(self):
+        """Start timing from now."""
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time the enclosed block as a startup phase.
+
+        Args:
+            name: Name of the phase shown in the report
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Record a phase that was timed elsewhere.
+
+        Args:
+            name: Name of the phase shown in the report
+            seconds: Duration of the phase
+        """
+        self.phases.append((name, seconds))
+
+    def elapsed(self) -> float:
+        """Seconds since the timer was created."""
+        return time.perf_counter() - self.started
+
+    def report(self) -> None:
+        """Print the duration of each phase and the total startup time."""
+        for name, seconds in self.phases:
+            print(f"{GREEN}Startup {name}: {BLUE}{seconds * 1000:.0f} ms{RESET}")
+        print(f"{GREEN}Startup total: {BLUE}{self.elapsed() * 1000:.0f} ms{RESET}")
+
+
+# Global instance
+startup_timer = StartupTimer()
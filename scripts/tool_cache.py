@@ -0,0 +1,164 @@
+"""
+Persistent cache for external tool probes.
+
+Finding ffmpeg and the JavaScript runtime means running each candidate with
+--version, and both config.py and bot.py did this on every start. Probe
+results are now stored in .cache/tool_probes.json together with a
+fingerprint of the environment they were taken in: the PATH and the
+resolved location and mtime of every executable the probe depends on.
+
+On start a cached result is used as long as the fingerprint still matches,
+which costs a few stat() calls instead of a subprocess. The probe is then
+re-run once in a background thread so a changed tool (for example an
+in-place upgrade that kept the mtime) is picked up by the next start.
+A missing or stale entry is probed synchronously, exactly as before.
+"""
+
+import json
+import os
+import shutil
+import threading
+from typing import Callable, Iterable
+from scripts.paths import get_cache_file
+
+TOOL_CACHE_FILE = get_cache_file('tool_probes.json')
+
+
+def _fingerprint(executables: Iterable[str]) -> dict:
+    """
+    Describe the environment a probe depends on.
+
+    Args:
+        executables: Command names the probe runs
+
+    Returns:
+        dict: The PATH and each executable's resolved path and mtime
+    """
+    resolved = {}
+    for name in executables:
+        path = shutil.which(name)
+        mtime = None
+        if path:
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                path = None
+        resolved[name] = [path, mtime]
+    return {'path': os.environ.get('PATH', ''), 'executables': resolved}
+
+
+class ToolProbeCache:
+    """
+    Probe results persisted across restarts and keyed by an environment fingerprint.
+
+    Values must be JSON-serializable; tuples come back as lists.
+    """
+
+    def __init__(self, file_path: str = TOOL_CACHE_FILE, revalidate: bool = True):
+        """
+        Initialize the cache.
+
+        Args:
+            file_path: JSON file the probe results are persisted to
+            revalidate: Whether cache hits are re-probed in the background
+        """
+        self.file_path = file_path
+        self.revalidate = revalidate
+        self._entries = None
+        self._revalidated = set()
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        """Load the cached probes from disk if they haven't been loaded yet."""
+        if self._entries is None:
+            entries = {}
+            try:
+                if os.path.exists(self.file_path):
+                    with open(self.file_path, 'r') as f:
+                        entries = json.load(f)
+                    if not isinstance(entries, dict):
+                        entries = {}
+            except (OSError, ValueError) as e:
+                print(f"Error loading tool probe cache: {str(e)}")
+            self._entries = entries
+        return self._entries
+
+    def _save(self) -> None:
+        """Write the cached probes to disk."""
+        temp_path = f"{self.file_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            with open(temp_path, 'w') as f:
+                json.dump(self._entries, f, indent=4)
+            os.replace(temp_path, self.file_path)
+        except OSError as e:
+            print(f"Error saving tool probe cache: {str(e)}")
+
+    def _store(self, name: str, value, fingerprint: dict) -> None:
+        """
+        Remember a probe result.
+
+        Args:
+            name: The probe name
+            value: The probe result
+            fingerprint: The environment the probe ran in
+        """
+        with self._lock:
+            entries = self._load()
+            entry = {'value': value, 'fingerprint': fingerprint}
+            # Round-trip through JSON so a fresh result compares equal to a loaded one
+            entry = json.loads(json.dumps(entry))
+            if entries.get(name) == entry:
+                return
+            entries[name] = entry
+            self._save()
+
+    def get(self, name: str, probe: Callable, executables: Iterable[str]):
+        """
+        Get a probe result, running the probe only if nothing valid is cached.
+
+        Args:
+            name: Key the result is cached under
+            probe: Callable that runs the probe and returns its result
+            executables: Command names the probe depends on
+
+        Returns:
+            The cached or freshly probed result
+        """
+        executables = list(executables)
+        fingerprint = _fingerprint(executables)
+        with self._lock:
+            entry = self._load().get(name)
+        if entry is not None and entry.get('fingerprint') == json.loads(json.dumps(fingerprint)):
+            self._revalidate_later(name, probe, executables)
+            return entry.get('value')
+
+        value = probe()
+        self._revalidated.add(name)
+        self._store(name, value, fingerprint)
+        return value
+
+    def _revalidate_later(self, name: str, probe: Callable, executables) -> None:
+        """
+        Re-run a probe once per process in a background thread.
+
+        Args:
+            name: Key the result is cached under
+            probe: Callable that runs the probe
+            executables: Command names the probe depends on
+        """
+        if not self.revalidate or name in self._revalidated:
+            return
+        self._revalidated.add(name)
+
+        def _run():
+            try:
+                self._store(name, probe(), _fingerprint(executables))
+            except Exception as e:
+                print(f"Error revalidating {name} probe: {str(e)}")
+
+        threading.Thread(target=_run, name=f'tool-probe-{name}', daemon=True).start()
+
+
+# Global instance
+tool_cache = ToolProbeCache()
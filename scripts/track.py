@@ -0,0 +1,386 @@
+"""
+Compact queue entries.
+
+Queued songs used to be dicts that also held the command context and the
+requesting member, so a long playlist kept every Context (with its message,
+author and guild state) alive for as long as its songs were queued. Track is
+a slotted record with the same keys that stores only ids for the guild,
+channel and requester plus the download's cache key. The context and the
+requester are looked up again from the bot's cache when they are read; while
+the original context is still alive (the command is running) it is returned
+as is through a weak reference.
+
+Track implements the mapping interface, so code written against song dicts
+(song['title'], song.get('ctx'), 'ctx' in song, song.copy()) keeps working.
+SongQueue converts dict entries to Tracks as they are queued.
+"""
+
+import os
+import sys
+import tracemalloc
+import weakref
+from collections.abc import MutableMapping
+
+# Marks a key that was never set, so Track can tell missing keys from None values
+_UNSET = object()
+
+# Discord client used to look contexts and members up again (set by bind_client)
+_client = None
+
+
+def bind_client(client) -> None:
+    """
+    Set the Discord client Tracks resolve guilds, channels and members through.
+
+    Args:
+        client: The bot instance
+    """
+    global _client
+    _client = client
+
+
+class TrackContext:
+    """
+    Context rebuilt from the ids stored in a Track.
+
+    Provides the parts of commands.Context the playback code uses: bot,
+    guild, channel, author, voice_client and send().
+    """
+
+    __slots__ = ('bot', 'guild', 'channel', 'author')
+
+    def __init__(self, bot, guild, channel, author):
+        """
+        Initialize the context.
+
+        Args:
+            bot: The bot instance
+            guild: The guild the song was queued in
+            channel: The text channel the song was queued from
+            author: The member who queued the song, or None if unknown
+        """
+        self.bot = bot
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+
+    @property
+    def voice_client(self):
+        """The guild's voice client, if connected."""
+        return self.guild.voice_client if self.guild else None
+
+    async def send(self, *args, **kwargs):
+        """Send a message to the channel the song was queued from."""
+        return await self.channel.send(*args, **kwargs)
+
+
+def _id_of(value):
+    """Get the Discord ID of an object (or the value itself if it has none)."""
+    return getattr(value, 'id', value)
+
+
+class Track(MutableMapping):
+    """A queued song that references its context by id."""
+
+    # Keys stored in their own slot; any other key goes to _extra
+    FIELDS = ('title', 'url', 'file_path', 'thumbnail', 'duration', 'is_stream', 'is_from_playlist')
+
+    __slots__ = FIELDS + ('guild_id', 'channel_id', 'requester_id', '_cache_key', '_ctx_ref', '_extra')
+
+    def __init__(self, **entry):
+        """
+        Initialize the track.
+
+        Args:
+            **entry: Song keys as used by the queue dicts (title, url, file_path, ctx, requester, ...)
+        """
+        for name in self.FIELDS:
+            object.__setattr__(self, name, _UNSET)
+        self.guild_id = None
+        self.channel_id = None
+        self.requester_id = _UNSET
+        self._cache_key = None
+        self._ctx_ref = _UNSET
+        self._extra = None
+        for key, value in entry.items():
+            self[key] = value
+
+    @classmethod
+    def from_entry(cls, entry):
+        """
+        Convert a song dict into a Track.
+
+        Args:
+            entry: A song dict, or a Track (returned unchanged)
+
+        Returns:
+            Track: The converted entry
+        """
+        if isinstance(entry, Track):
+            return entry
+        return cls(**entry)
+
+    @property
+    def cache_key(self):
+        """The playlist cache key of the download, or None for streams."""
+        if self._cache_key is not None:
+            return self._cache_key
+        if self.get('is_stream') or not self.get('file_path'):
+            return None
+        # Downloads are named after their video ID, which is the playlist cache key
+        return os.path.splitext(os.path.basename(str(self.file_path)))[0]
+
+    # Context and requester
+
+    def _live_context(self):
+        """Get the original context if it is still alive."""
+        if self._ctx_ref is _UNSET or self._ctx_ref is None:
+            return None
+        return self._ctx_ref()
+
+    def _set_context(self, ctx) -> None:
+        """Store the ids of a context (or a channel, which some callers pass instead)."""
+        self._ctx_ref = None
+        if ctx is None:
+            return
+        try:
+            self._ctx_ref = weakref.ref(ctx)
+        except TypeError:
+            pass
+        guild = getattr(ctx, 'guild', None)
+        channel = getattr(ctx, 'channel', None)
+        if channel is None and hasattr(ctx, 'send'):
+            channel = ctx
+        self.guild_id = getattr(guild, 'id', None)
+        self.channel_id = getattr(channel, 'id', None)
+        author = getattr(ctx, 'author', None)
+        if author is not None and self.requester_id in (_UNSET, None):
+            self.requester_id = _id_of(author)
+
+    def resolve_requester(self):
+        """
+        Look up the member who queued the song.
+
+        Returns:
+            The member or user, or None if they can't be found
+        """
+        if self.requester_id is _UNSET or self.requester_id is None:
+            return None
+        if not isinstance(self.requester_id, int):
+            # Not a Discord ID (for example a placeholder object); stored as is
+            return self.requester_id
+        live = self._live_context()
+        author = getattr(live, 'author', None)
+        if author is not None and getattr(author, 'id', None) == self.requester_id:
+            return author
+        if _client is None:
+            return None
+        guild = _client.get_guild(self.guild_id) if self.guild_id else None
+        member = guild.get_member(self.requester_id) if guild else None
+        return member or _client.get_user(self.requester_id)
+
+    def resolve_context(self):
+        """
+        Get the context the song was queued from.
+
+        Returns:
+            The original context while it is alive, else a TrackContext, or None
+        """
+        live = self._live_context()
+        if live is not None:
+            return live
+        if _client is None or self.channel_id is None:
+            return None
+        guild = _client.get_guild(self.guild_id) if self.guild_id else None
+        channel = guild.get_channel_or_thread(self.channel_id) if guild else None
+        channel = channel or _client.get_channel(self.channel_id)
+        if channel is None:
+            return None
+        return TrackContext(_client, guild, channel, self.resolve_requester())
+
+    # Mapping interface
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = object.__getattribute__(self, key)
+        elif key == 'ctx':
+            if self._ctx_ref is _UNSET:
+                raise KeyError(key)
+            return self.resolve_context()
+        elif key == 'requester':
+            if self.requester_id is _UNSET:
+                raise KeyError(key)
+            return self.resolve_requester()
+        elif key == 'cache_key':
+            value = self._cache_key if self._cache_key is not None else _UNSET
+        else:
+            value = self._extra.get(key, _UNSET) if self._extra else _UNSET
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        if key in self.FIELDS:
+            object.__setattr__(self, key, value)
+        elif key == 'ctx':
+            self._set_context(value)
+        elif key == 'requester':
+            self.requester_id = _id_of(value) if value is not None else None
+        elif key == 'cache_key':
+            self._cache_key = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key) -> None:
+        if key not in self:
+            raise KeyError(key)
+        if key in self.FIELDS:
+            object.__setattr__(self, key, _UNSET)
+        elif key == 'ctx':
+            self._ctx_ref = _UNSET
+        elif key == 'requester':
+            self.requester_id = _UNSET
+        elif key == 'cache_key':
+            self._cache_key = None
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key) -> bool:
+        if key in self.FIELDS:
+            return object.__getattribute__(self, key) is not _UNSET
+        if key == 'ctx':
+            return self._ctx_ref is not _UNSET
+        if key == 'requester':
+            return self.requester_id is not _UNSET
+        if key == 'cache_key':
+            return self._cache_key is not None
+        return bool(self._extra) and key in self._extra
+
+    def __iter__(self):
+        for name in self.FIELDS:
+            if object.__getattribute__(self, name) is not _UNSET:
+                yield name
+        if self.requester_id is not _UNSET:
+            yield 'requester'
+        if self._ctx_ref is not _UNSET:
+            yield 'ctx'
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Track(title={self.get('title')!r}, url={self.get('url')!r})"
+
+    def to_record(self) -> dict:
+        """
+        Serialize the track for the queue journal.
+
+        Downloads are stored by cache key only; their file is looked up in
+        the playlist cache again when the track is restored.
+
+        Returns:
+            dict: JSON-serializable fields of the track
+        """
+        record = {key: self.get(key) for key in ('title', 'url', 'thumbnail', 'duration', 'is_stream', 'is_from_playlist')}
+        record['cache_key'] = self.cache_key
+        if record['is_stream'] or not record['cache_key']:
+            record['file_path'] = self.get('file_path')
+        record['guild_id'] = self.guild_id
+        record['channel_id'] = self.channel_id
+        record['requester_id'] = self.requester_id if isinstance(self.requester_id, int) else None
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict, file_path: str = None) -> 'Track':
+        """
+        Rebuild a track from a journal record.
+
+        Args:
+            record: A record written by to_record()
+            file_path: The download to play (defaults to the record's file_path)
+
+        Returns:
+            Track: The restored track, whose context is rebuilt from its ids when read
+        """
+        track = cls(**{key: record[key] for key in ('title', 'url', 'thumbnail', 'duration', 'is_stream', 'is_from_playlist')
+                       if record.get(key) is not None})
+        track['file_path'] = file_path or record.get('file_path')
+        track._cache_key = record.get('cache_key')
+        track.guild_id = record.get('guild_id')
+        track.channel_id = record.get('channel_id')
+        track.requester_id = record.get('requester_id')
+        # The original context is gone; 'ctx' is rebuilt from the ids
+        track._ctx_ref = None
+        return track
+
+    def copy(self) -> 'Track':
+        """Get a shallow copy of the track."""
+        track = Track.__new__(Track)
+        for name in self.__slots__:
+            object.__setattr__(track, name, object.__getattribute__(self, name))
+        if self._extra:
+            track._extra = dict(self._extra)
+        return track
+
+
+def measure_memory(count: int = 10000):
+    """
+    Measure the memory held by queued song dicts and by Tracks.
+
+    Both sets of entries reference one shared context and member, as a
+    playlist queued by one command does, so only the entries themselves are
+    counted. With dicts each command's context is additionally kept alive
+    until its last song has played.
+
+    Args:
+        count: Number of songs to build
+
+    Returns:
+        dict: Bytes allocated for count dict entries and for count Tracks
+    """
+    class _Member:
+        def __init__(self):
+            self.id = 123456789012345678
+
+    class _Context:
+        def __init__(self):
+            self.author = _Member()
+            self.guild = _Member()
+            self.channel = _Member()
+
+    ctx = _Context()
+
+    def build_dicts():
+        return [{
+            'title': f'Song {i}',
+            'url': f'https://www.youtube.com/watch?v={i:011d}',
+            'file_path': f'/downloads/{i:011d}.webm',
+            'thumbnail': f'https://i.ytimg.com/vi/{i:011d}/hqdefault.jpg',
+            'ctx': ctx,
+            'is_stream': False,
+            'is_from_playlist': True,
+            'requester': ctx.author,
+        } for i in range(count)]
+
+    def build_tracks():
+        return [Track.from_entry(entry) for entry in build_dicts()]
+
+    results = {}
+    for name, build in (('dict', build_dicts), ('track', build_tracks)):
+        tracemalloc.start()
+        entries = build()
+        results[name] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del entries
+    return results
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    sizes = measure_memory(count)
+    print(f"{count} dict entries: {sizes['dict'] / 1024:.0f} KB")
+    print(f"{count} Tracks:       {sizes['track'] / 1024:.0f} KB")
@@ -0,0 +1,242 @@
+"""
+Optional transcode-on-ingest for cached downloads.
+
+yt-dlp keeps whatever format it picked (webm, m4a, mp3 or opus at various
+bitrates), so every play has to decode an arbitrary codec. With
+AUDIO.TRANSCODE_ON_INGEST enabled, each new download is converted once, in
+a low-priority background ffmpeg process, to 48 kHz Opus in Ogg at
+AUDIO.MAX_BITRATE, and the cache is pointed at the new file.
+
+When loudness normalization is on, the track's gain is measured first and
+baked into the transcode, so the normalized file needs no gain at play time
+and is eligible for Opus passthrough.
+
+Normalization runs through the same worker when transcoding is off. A gain
+applied at play time rules out passthrough, so a download that is already
+48 kHz Opus but needs a correction of at least GAIN_TOLERANCE dB is
+re-encoded once with the gain baked in, which costs about as much as
+playing it once through the PCM path. Other formats are decoded at play
+time anyway, so only their loudness is stored.
+"""
+
+import asyncio
+import os
+from collections import deque
+from typing import Optional
+from scripts.caching import playlist_cache
+from scripts.config import config_service, FFMPEG_PATH
+from scripts.duration import get_audio_stream_info
+from scripts.loudness import normalization_enabled, loudness_analyzer, measure_loudness, compute_gain
+from scripts.priority import set_low_priority
+from scripts.constants import GREEN, BLUE, RESET
+
+# Gains smaller than this (dB) are not worth a transcode of an Opus file
+GAIN_TOLERANCE = 1.0
+
+
+def transcode_enabled() -> bool:
+    """Check whether every new download is converted to Opus (AUDIO.TRANSCODE_ON_INGEST)."""
+    return config_service.get_bool('AUDIO.TRANSCODE_ON_INGEST', False)
+
+
+def is_normalized(stream_info: dict) -> bool:
+    """
+    Check whether a file is already 48 kHz Opus.
+
+    Args:
+        stream_info: Result of get_audio_stream_info()
+
+    Returns:
+        bool: True if the file needs no transcode
+    """
+    return stream_info.get('codec_name') == 'opus' and stream_info.get('sample_rate') == 48000
+
+
+async def transcode_to_opus(source_path: str, target_path: str, gain_db: float = 0.0) -> bool:
+    """
+    Convert an audio file to 48 kHz Opus in Ogg.
+
+    The output is written to a temporary file and moved into place once
+    ffmpeg has finished, so a half-written file is never played.
+
+    Args:
+        source_path: The file to convert
+        target_path: Where to write the Ogg Opus file
+        gain_db: Loudness gain to apply while converting
+
+    Returns:
+        bool: True if the file was converted
+    """
+    temp_path = f"{target_path}.part"
+    command = [
+        FFMPEG_PATH or 'ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error', '-y',
+        '-i', str(source_path),
+        '-vn', '-map_metadata', '-1', '-threads', '1',
+    ]
+    if gain_db:
+        command += ['-af', f'volume={gain_db:.2f}dB']
+    command += ['-c:a', 'libopus', '-b:a', f"{config_service.get_int('AUDIO.MAX_BITRATE', 96)}k", '-ar', '48000', '-f', 'ogg', temp_path]
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        set_low_priority(process.pid)
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            print(f"Error transcoding {os.path.basename(str(source_path))}: {stderr.decode(errors='ignore')[-200:]}")
+            return False
+        os.replace(temp_path, target_path)
+        return True
+    except Exception as e:
+        print(f"Error transcoding {os.path.basename(str(source_path))}: {e}")
+        return False
+    finally:
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+class IngestTranscoder:
+    """
+    Background worker that normalizes new downloads one at a time.
+
+    Songs already queued keep the path of the original download, so replaced
+    paths are remembered and resolve() maps them to the normalized file.
+    """
+
+    def __init__(self):
+        """Initialize the transcoder with an empty work queue."""
+        self._pending = deque()
+        self._queued = set()
+        self._replaced = {}
+        self._task = None
+
+    def resolve(self, file_path: str) -> str:
+        """
+        Get the current file for a path that may have been transcoded.
+
+        Args:
+            file_path: Path of a downloaded file
+
+        Returns:
+            str: The normalized file if the original was replaced, else file_path
+        """
+        if not self._replaced or not file_path:
+            return file_path
+        return self._replaced.get(os.path.abspath(str(file_path)), file_path)
+
+    def schedule(self, video_id: str) -> None:
+        """
+        Queue a newly cached video for ingest.
+
+        Does nothing when both transcoding and loudness normalization are off.
+
+        Args:
+            video_id: The YouTube video ID
+        """
+        if not transcode_enabled() and not normalization_enabled():
+            return
+        if video_id in self._queued:
+            return
+        self._pending.append(video_id)
+        self._queued.add(video_id)
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                # No running event loop; the next schedule() call will start the worker
+                pass
+
+    async def ingest(self, video_id: str) -> Optional[str]:
+        """
+        Normalize one cached video.
+
+        Args:
+            video_id: The YouTube video ID
+
+        Returns:
+            Optional[str]: Path of the normalized file, or None if nothing changed
+        """
+        file_path = playlist_cache.get_cached_file(video_id)
+        if not file_path:
+            return None
+
+        loudness = playlist_cache.get_loudness(video_id)
+        if normalization_enabled() and not loudness:
+            loudness = await measure_loudness(file_path)
+        gain_db = compute_gain(loudness)
+
+        if is_normalized(await get_audio_stream_info(file_path)):
+            # Already playable through passthrough, unless it needs a gain baked in
+            convert = abs(gain_db) >= GAIN_TOLERANCE
+        else:
+            # Other formats are decoded at play time, which applies the gain anyway
+            convert = transcode_enabled()
+        if not convert:
+            if loudness and not playlist_cache.get_loudness(video_id):
+                playlist_cache.set_loudness(video_id, loudness['integrated'], loudness['true_peak'])
+            return None
+
+        target_path = os.path.splitext(file_path)[0] + '.opus'
+        original_size = os.path.getsize(file_path)
+        if not await transcode_to_opus(file_path, target_path, gain_db):
+            if not playlist_cache.get_loudness(video_id):
+                loudness_analyzer.schedule(video_id)
+            return None
+
+        if loudness:
+            # The gain is now part of the file
+            playlist_cache.set_loudness(video_id, loudness['integrated'] + gain_db, loudness['true_peak'] + gain_db)
+        if os.path.abspath(target_path) != os.path.abspath(file_path):
+            self._replaced[os.path.abspath(file_path)] = target_path
+            playlist_cache.replace_cached_file(video_id, target_path)
+            try:
+                os.remove(file_path)
+            except OSError as e:
+                print(f"Could not remove {os.path.basename(file_path)} after transcoding: {e}")
+
+        size = os.path.getsize(target_path)
+        print(f"{GREEN}Transcoded to Opus:{RESET}{BLUE} {video_id} ({original_size / 1024:.0f} KB -> {size / 1024:.0f} KB, {gain_db:+.1f} dB){RESET}")
+        return target_path
+
+    async def scan_cache(self) -> int:
+        """
+        Queue every cached video that may still need loudness work.
+
+        Videos that haven't been measured yet are queued, and so are measured
+        ones whose gain is too large to skip. Waits for the startup import of
+        uncached files first so those are included.
+
+        Returns:
+            int: Number of videos queued
+        """
+        await playlist_cache.ensure_cache_imported()
+        if not normalization_enabled():
+            return 0
+        pending = []
+        for video_id in list(playlist_cache.cache):
+            loudness = playlist_cache.get_loudness(video_id)
+            if not loudness or abs(compute_gain(loudness)) >= GAIN_TOLERANCE:
+                pending.append(video_id)
+        for video_id in pending:
+            self.schedule(video_id)
+        return len(pending)
+
+    async def _run(self) -> None:
+        """Ingest queued videos until the queue is empty."""
+        while self._pending:
+            video_id = self._pending.popleft()
+            try:
+                await self.ingest(video_id)
+            except Exception as e:
+                print(f"Error ingesting {video_id}: {e}")
+            finally:
+                self._queued.discard(video_id)
+
+
+# Global instance
+ingest_transcoder = IngestTranscoder()
@@ -3,7 +3,8 @@ import time
 import asyncio
 import logging
 from scripts.messages import update_or_send_message, create_embed
-from scripts.constants import GREEN, BLUE, RESET, EMBED_COLOR_ERROR, EMBED_COLOR_FINISHED, ERROR_NOT_IN_VOICE
+from scripts.constants import GREEN, BLUE, RESET, EMBED_COLOR_ERROR, EMBED_COLOR_FINISHED, EMBED_COLOR_INFO, ERROR_NOT_IN_VOICE
+from scripts.queue_journal import describe_saved
 from scripts.config import load_config
 import sys
 import warnings
@@ -40,6 +41,29 @@ def _handle_task_exception(loop, context):
     # For other exceptions, use the default handler
     loop.default_exception_handler(context)
 
+async def offer_saved_session(music_bot, ctx):
+    """
+    Offer to restore the queue saved by the previous run, once per run.
+
+    Args:
+        music_bot: The music bot instance
+        ctx: The command context to send the offer to
+    """
+    saved = getattr(music_bot, 'saved_session', None)
+    if not isinstance(saved, dict) or getattr(music_bot, 'saved_session_offered', True):
+        return
+    music_bot.saved_session_offered = True
+    try:
+        prefix = getattr(ctx, 'clean_prefix', None) or load_config().get('PREFIX', '!')
+        await ctx.send(embed=create_embed(
+            "Restore queue",
+            f"The queue was saved before the bot restarted: {describe_saved(saved)}.\nUse `{prefix}restore` to continue where it left off.",
+            color=EMBED_COLOR_INFO,
+            ctx=ctx
+        ))
+    except Exception as e:
+        logging.warning(f"Error offering saved queue: {e}")
+
 async def connect_to_voice(ctx, music_bot):
     """
     Connect or move the bot to the user's voice channel.
@@ -78,6 +102,7 @@ async def connect_to_voice(ctx, music_bot):
 
         # Update the music bot's voice client reference
         music_bot.voice_client = ctx.guild.voice_client
+        await offer_saved_session(music_bot, ctx)
         return True
     except Exception as e:
         logging.error(f"Error connecting to voice channel: {str(e)}")
@@ -146,7 +171,10 @@ async def join_voice_channel(bot_instance, ctx):
         try:
             bot_instance.voice_client = await asyncio.wait_for(connect_task, timeout=connect_timeout)
             bot_instance.last_activity = time.time()
-            return bot_instance.voice_client.is_connected()
+            connected = bot_instance.voice_client.is_connected()
+            if connected:
+                await offer_saved_session(bot_instance, ctx)
+            return connected
         except asyncio.TimeoutError:
             logging.error("Voice connection timed out")
             return False
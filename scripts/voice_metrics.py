@@ -0,0 +1,192 @@
+"""
+Voice playback health metrics per server.
+
+Records where time goes on the voice send path, so audio problems can be
+told apart from network problems:
+
+- Frame read latency: time spent inside the source's read() for each frame.
+- Send jitter: how far the interval between frames drifts from 20 ms. The
+  player thread sends each frame right after reading it, so the read cadence
+  is the send cadence.
+- Underruns: reads that found the read-ahead buffer empty.
+- FFmpeg startup: time for create_audio_source to spawn and prime ffmpeg.
+- Start latency: time from play_next being entered to the first frame
+  being handed to the player, and the duration of voice_client.play().
+
+Per-frame samples are kept in bounded windows, so recording is O(1) and the
+snapshot describes recent playback.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from scripts.readahead import get_underruns
+
+# Samples kept for each rolling statistic
+WINDOW = 500
+FRAME_MS = 20.0
+# Gaps longer than this are pauses or song changes, not jitter
+MAX_INTERVAL_MS = 1000.0
+
+
+def _summarize(samples) -> Dict:
+    """
+    Summarize a window of samples.
+
+    Args:
+        samples: Iterable of values in milliseconds
+
+    Returns:
+        dict: count, avg, p95 and max (zeros if there are no samples)
+    """
+    values = sorted(samples)
+    if not values:
+        return {'count': 0, 'avg': 0.0, 'p95': 0.0, 'max': 0.0}
+    return {
+        'count': len(values),
+        'avg': sum(values) / len(values),
+        'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+        'max': values[-1],
+    }
+
+
+class GuildVoiceMetrics:
+    """Rolling voice metrics for one server."""
+
+    def __init__(self, guild_id: str):
+        """
+        Initialize empty metrics.
+
+        Args:
+            guild_id: The Discord guild ID
+        """
+        self.guild_id = guild_id
+        self.frames = 0
+        self.read_latency = deque(maxlen=WINDOW)
+        self.jitter = deque(maxlen=WINDOW)
+        self.ffmpeg_startup = deque(maxlen=50)
+        self.start_latency = deque(maxlen=50)
+        self.play_call = deque(maxlen=50)
+        self._last_read = None
+        self._requested_at = None
+
+    def on_frame(self, started: float, elapsed: float) -> None:
+        """
+        Record one frame read. Called from the player thread.
+
+        Args:
+            started: perf_counter() value when the read started
+            elapsed: Seconds the read took
+        """
+        self.frames += 1
+        self.read_latency.append(elapsed * 1000)
+        if self._last_read is not None:
+            interval = (started - self._last_read) * 1000
+            if interval < MAX_INTERVAL_MS:
+                self.jitter.append(abs(interval - FRAME_MS))
+        self._last_read = started
+        if self._requested_at is not None:
+            self.start_latency.append((started + elapsed - self._requested_at) * 1000)
+            self._requested_at = None
+
+    def snapshot(self) -> Dict:
+        """
+        Get the current metrics.
+
+        Returns:
+            dict: Summaries of each metric plus frame and underrun counts
+        """
+        return {
+            'frames': self.frames,
+            'underruns': get_underruns(self.guild_id),
+            'read_latency_ms': _summarize(list(self.read_latency)),
+            'jitter_ms': _summarize(list(self.jitter)),
+            'ffmpeg_startup_ms': _summarize(list(self.ffmpeg_startup)),
+            'start_latency_ms': _summarize(list(self.start_latency)),
+            'play_call_ms': _summarize(list(self.play_call)),
+        }
+
+
+class VoiceMetrics:
+    """Registry of GuildVoiceMetrics by guild ID."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._guilds = {}
+        self._lock = threading.Lock()
+
+    def get(self, guild_id) -> Optional[GuildVoiceMetrics]:
+        """
+        Get the metrics for a server, creating them on first use.
+
+        Args:
+            guild_id: The Discord guild ID, or None
+
+        Returns:
+            GuildVoiceMetrics or None if guild_id is None
+        """
+        if guild_id is None:
+            return None
+        key = str(guild_id)
+        metrics = self._guilds.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self._guilds.setdefault(key, GuildVoiceMetrics(key))
+        return metrics
+
+    def mark_play_requested(self, guild_id) -> None:
+        """
+        Note that play_next was entered, to time the first frame against.
+
+        Args:
+            guild_id: The Discord guild ID
+        """
+        metrics = self.get(guild_id)
+        if metrics is not None:
+            metrics._requested_at = time.perf_counter()
+
+    def record_ffmpeg_startup(self, guild_id, seconds: float) -> None:
+        """
+        Record how long an ffmpeg source took to start.
+
+        Args:
+            guild_id: The Discord guild ID
+            seconds: Time from spawning to the primed source
+        """
+        metrics = self.get(guild_id)
+        if metrics is not None:
+            metrics.ffmpeg_startup.append(seconds * 1000)
+
+    def record_play_call(self, guild_id, seconds: float) -> None:
+        """
+        Record how long voice_client.play() took.
+
+        Args:
+            guild_id: The Discord guild ID
+            seconds: Duration of the call
+        """
+        metrics = self.get(guild_id)
+        if metrics is not None:
+            metrics.play_call.append(seconds * 1000)
+
+    def snapshot(self, guild_id=None) -> Dict:
+        """
+        Get a snapshot of the metrics.
+
+        Args:
+            guild_id: A Discord guild ID, or None for all servers
+
+        Returns:
+            dict: One server's metrics, or metrics for every server by guild ID
+        """
+        if guild_id is not None:
+            metrics = self._guilds.get(str(guild_id))
+            return metrics.snapshot() if metrics else {}
+        with self._lock:
+            guilds = list(self._guilds.items())
+        return {key: metrics.snapshot() for key, metrics in guilds}
+
+
+# Global instance
+voice_metrics = VoiceMetrics()
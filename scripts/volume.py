@@ -0,0 +1,203 @@
+"""
+Per-guild playback volume.
+
+Volume used to be baked into the ffmpeg filter chain, so changing it meant
+restarting ffmpeg. It is now applied by TrackedAudioSource as a gain stage on
+the 16-bit PCM frames the player reads, which takes effect on the next 20 ms
+frame. The gain runs over the whole frame in C: audioop.mul (what
+PCMVolumeTransformer uses) where audioop is available, otherwise NumPy, which
+covers Python 3.13+ without audioop-lts. On a 3840-byte frame both cost about
+the same as PCMVolumeTransformer (see benchmark_gain_stage()); the win is that
+a volume change no longer restarts ffmpeg.
+
+Volumes are kept in memory and written to the 'volumes' namespace of the
+state database (see scripts/kvstore.py), one key per guild. volumes.json,
+where they used to be stored, is imported the first time they are loaded.
+"""
+
+import sys
+import time
+from array import array
+from typing import Optional
+from scripts.config import config_service
+from scripts.kvstore import KVStore, state_store
+from scripts.paths import get_cache_file
+
+try:
+    import audioop
+except ImportError:
+    audioop = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def default_volume() -> int:
+    """Get the volume of servers that haven't set one (VOICE.DEFAULT_VOLUME), in percent."""
+    return config_service.get_int('VOICE.DEFAULT_VOLUME', 100)
+
+
+def max_volume() -> int:
+    """Get the highest volume the volume command accepts (VOICE.MAX_VOLUME), in percent."""
+    return config_service.get_int('VOICE.MAX_VOLUME', 200)
+
+
+# Legacy JSON file volumes used to be stored in
+VOLUMES_FILE = get_cache_file('volumes.json')
+
+# Namespace of the state database the volumes are stored in
+VOLUMES_NAMESPACE = 'volumes'
+
+
+def apply_gain(data: bytes, gain: float) -> bytes:
+    """
+    Scale a frame of signed 16-bit PCM, clipping at full scale.
+
+    Args:
+        data: The PCM frame
+        gain: Linear gain (1.0 leaves the frame unchanged)
+
+    Returns:
+        bytes: The scaled frame
+    """
+    if gain == 1.0 or not data:
+        return data
+    if audioop is not None:
+        return audioop.mul(data, 2, gain)
+    if np is not None:
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        samples *= gain
+        np.clip(samples, -32768, 32767, out=samples)
+        return samples.astype(np.int16).tobytes()
+    samples = array('h', data)
+    for i, sample in enumerate(samples):
+        samples[i] = max(-32768, min(32767, int(sample * gain)))
+    return samples.tobytes()
+
+
+class VolumeStore:
+    """
+    In-memory table of guild volumes, persisted to the state database.
+
+    Reads never touch the disk; the table is only read once, on first use.
+    """
+
+    def __init__(self, store: Optional[KVStore] = None, legacy_file: str = VOLUMES_FILE):
+        """
+        Initialize the store.
+
+        Args:
+            store: The state store (defaults to the shared one)
+            legacy_file: JSON file volumes used to be stored in
+        """
+        self.store = store or state_store
+        self.legacy_file = legacy_file
+        self._volumes = None
+
+    def _load(self) -> dict:
+        """Load the volume table from the state database if it hasn't been loaded yet."""
+        if self._volumes is None:
+            self.store.migrate_json(VOLUMES_NAMESPACE, self.legacy_file)
+            volumes = {}
+            for guild_id, volume in self.store.items(VOLUMES_NAMESPACE).items():
+                try:
+                    volumes[str(guild_id)] = int(volume)
+                except (TypeError, ValueError) as e:
+                    print(f"Error loading volume for {guild_id}: {str(e)}")
+            self._volumes = volumes
+        return self._volumes
+
+    def get(self, guild_id) -> int:
+        """
+        Get a guild's volume.
+
+        Args:
+            guild_id: The Discord guild ID
+
+        Returns:
+            int: Volume in percent (the default volume if none was set)
+        """
+        if guild_id is None:
+            return default_volume()
+        return self._load().get(str(guild_id), default_volume())
+
+    def set(self, guild_id, volume: int) -> int:
+        """
+        Set and persist a guild's volume.
+
+        Only the guild's key is written, batched with other state writes.
+
+        Args:
+            guild_id: The Discord guild ID
+            volume: Volume in percent, clamped to 0..max_volume()
+
+        Returns:
+            int: The volume that was stored
+        """
+        volume = max(0, min(max_volume(), int(volume)))
+        self._load()[str(guild_id)] = volume
+        self.store.set(VOLUMES_NAMESPACE, str(guild_id), volume)
+        return volume
+
+
+def get_guild_volume(guild_id) -> int:
+    """
+    Get the playback volume for a guild in percent.
+
+    Args:
+        guild_id: The Discord guild ID, or None
+
+    Returns:
+        int: Volume in percent
+    """
+    return volume_store.get(guild_id)
+
+
+def benchmark_gain_stage(frames: int = 5000, gain: float = 0.5) -> dict:
+    """
+    Compare the per-frame cost of apply_gain with PCMVolumeTransformer.
+
+    Args:
+        frames: Number of 20 ms stereo frames to process
+        gain: Gain to apply
+
+    Returns:
+        dict: Microseconds per frame for each implementation, and which
+            backend apply_gain used
+    """
+    import discord
+
+    # One 20 ms frame of 48 kHz stereo audio
+    frame = array('h', range(-960, 960)).tobytes()
+
+    class _Source(discord.AudioSource):
+        def read(self):
+            return frame
+
+    transformer = discord.PCMVolumeTransformer(_Source(), volume=gain)
+    started = time.perf_counter()
+    for _ in range(frames):
+        transformer.read()
+    transformer_us = (time.perf_counter() - started) / frames * 1e6
+
+    started = time.perf_counter()
+    for _ in range(frames):
+        apply_gain(frame, gain)
+    gain_us = (time.perf_counter() - started) / frames * 1e6
+
+    backend = 'audioop' if audioop is not None else ('numpy' if np is not None else 'python')
+    return {'backend': backend, 'gain_stage_us': gain_us, 'pcm_volume_transformer_us': transformer_us}
+
+
+# Global instance
+volume_store = VolumeStore()
+
+
+if __name__ == "__main__":
+    result = benchmark_gain_stage(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
+    print(
+        f"Gain stage ({result['backend']}): {result['gain_stage_us']:.2f} us/frame, "
+        f"PCMVolumeTransformer: {result['pcm_volume_transformer_us']:.2f} us/frame"
+    )
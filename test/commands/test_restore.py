@@ -0,0 +1,113 @@
+import asyncio
+import sys
+import types
+import pytest
+
+
+def _song(i):
+    return {'title': f't{i}', 'url': f'u{i}', 'file_path': f'/downloads/{i:011d}.webm', 'is_stream': False}
+
+
+class FakeMusicBot:
+    def __init__(self):
+        from scripts.song_queue import SongQueue
+        self.queue = SongQueue()
+        self.queue_lock = asyncio.Lock()
+        self.current_song = None
+        self.saved_session = None
+        self.saved_session_offered = False
+        self.explicitly_stopped = True
+        self.playback_start_time = None
+
+
+def _setup(tmp_path, monkeypatch, stub_ctx, saved_queue, cached):
+    """Save a session through a real journal and stub out voice and playback."""
+    import commands.restore as restore_mod
+    from scripts.queue_journal import QueueJournal
+    from scripts.song_queue import SongQueue
+
+    def journal():
+        j = QueueJournal(str(tmp_path), flush_interval=3600)
+        j._ensure_writer = lambda: None
+        return j
+
+    # The previous run: a song playing 75 seconds in, with two more queued
+    previous = journal()
+    queue = SongQueue()
+    previous.attach('1', queue)
+    queue.extend(saved_queue[1:])
+    previous.journals['1'].record('current', track=saved_queue[0])
+    previous.journals['1'].record('position', seconds=75.0)
+    previous.flush()
+
+    # This run: attaching keeps that journal as the saved session
+    current = journal()
+    music_bot = FakeMusicBot()
+    music_bot.saved_session = current.attach('1', music_bot.queue)
+    monkeypatch.setattr(restore_mod, 'queue_journal', current)
+    monkeypatch.setattr(restore_mod, 'playlist_cache', types.SimpleNamespace(get_cached_file=cached.get))
+    monkeypatch.setitem(sys.modules, 'bot', types.SimpleNamespace(
+        MusicBot=types.SimpleNamespace(get_instance=lambda guild_id: music_bot)))
+    monkeypatch.setattr(restore_mod, 'check_user_in_voice', lambda ctx: (True, None))
+
+    async def connect_to_voice(ctx, bot_instance):
+        return True
+    monkeypatch.setattr(restore_mod, 'connect_to_voice', connect_to_voice)
+
+    async def process_queue(bot_instance, ctx):
+        bot_instance.current_song = bot_instance.queue.popleft()
+    monkeypatch.setattr(restore_mod, 'process_queue', process_queue)
+    monkeypatch.setattr(restore_mod, 'should_start_playback', lambda bot_instance: True)
+
+    restarts = []
+    async def restart_at(voice_client, song, position):
+        restarts.append((song['title'], position))
+    monkeypatch.setattr(restore_mod, 'restart_at', restart_at)
+
+    stub_ctx.voice_client = object()
+    return restore_mod.RestoreCog(None), music_bot, restarts, current
+
+
+@pytest.mark.asyncio
+async def test_restore_replays_journal_and_resumes_position(tmp_path, monkeypatch, stub_ctx):
+    songs = [_song(i) for i in range(3)]
+    cached = {f'{i:011d}': str(tmp_path / f'{i:011d}.opus') for i in range(3)}
+    cog, music_bot, restarts, journal = _setup(tmp_path, monkeypatch, stub_ctx, songs, cached)
+
+    await cog.restore.callback(cog, stub_ctx)
+
+    # The saved current song plays again, from the saved position
+    assert music_bot.current_song['title'] == 't0'
+    assert music_bot.current_song['file_path'] == cached['00000000000']
+    assert restarts == [('t0', 75.0)]
+    assert [song['title'] for song in music_bot.queue] == ['t1', 't2']
+    assert stub_ctx._sent[0].embed.title == 'Restored'
+    # The session is only offered once
+    assert music_bot.saved_session is None and journal.load_saved('1') is None
+
+
+@pytest.mark.asyncio
+async def test_restore_skips_songs_no_longer_cached(tmp_path, monkeypatch, stub_ctx):
+    songs = [_song(i) for i in range(3)]
+    # The song that was playing has been evicted from the cache
+    cached = {f'{i:011d}': str(tmp_path / f'{i:011d}.opus') for i in (1, 2)}
+    cog, music_bot, restarts, _ = _setup(tmp_path, monkeypatch, stub_ctx, songs, cached)
+
+    await cog.restore.callback(cog, stub_ctx)
+
+    assert music_bot.current_song['title'] == 't1'
+    assert [song['title'] for song in music_bot.queue] == ['t2']
+    # The position belonged to the missing song, so nothing is seeked
+    assert restarts == []
+
+
+@pytest.mark.asyncio
+async def test_restore_with_nothing_cached_reports_error(tmp_path, monkeypatch, stub_ctx):
+    cog, music_bot, restarts, journal = _setup(tmp_path, monkeypatch, stub_ctx, [_song(0)], {})
+
+    await cog.restore.callback(cog, stub_ctx)
+
+    assert 'cached' in stub_ctx._sent[0].embed.description
+    assert music_bot.current_song is None and restarts == []
+    # Nothing was restored, so the session can still be offered again
+    assert journal.load_saved('1') is not None
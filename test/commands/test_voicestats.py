@@ -0,0 +1,71 @@
+import pytest
+
+
+class FakeSource:
+    def __init__(self, frames):
+        self.frames = frames
+    def read(self):
+        if self.frames <= 0:
+            return b''
+        self.frames -= 1
+        return b'x'
+    def is_opus(self):
+        return True
+    def cleanup(self):
+        pass
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    import commands.voicestats as voicestats_mod
+    import scripts.voice_metrics as vm
+    registry = vm.VoiceMetrics()
+    monkeypatch.setattr(voicestats_mod, 'voice_metrics', registry)
+    monkeypatch.setattr(vm, 'get_underruns', lambda guild_id: 3 if guild_id == '1' else 0)
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_voicestats_renders_metrics_from_playback(registry, stub_ctx):
+    from commands.voicestats import voicestats
+    from scripts.playback import MeteredAudioSource, TrackedAudioSource
+    # Play a song through the same source stack playback uses
+    registry.mark_play_requested(stub_ctx.guild.id)
+    registry.record_ffmpeg_startup(stub_ctx.guild.id, 0.120)
+    registry.record_play_call(stub_ctx.guild.id, 0.002)
+    source = TrackedAudioSource(MeteredAudioSource(FakeSource(6), 'opus passthrough'),
+                                metrics=registry.get(stub_ctx.guild.id))
+    while source.read():
+        pass
+    source.cleanup()
+
+    await voicestats.callback(stub_ctx)
+
+    embed = stub_ctx._sent[-1].embed
+    assert embed.title == "Voice Playback Metrics"
+    assert embed.description == "6 frames sent · 3 buffer underruns"
+    fields = {field.name: field.value for field in embed.fields}
+    assert list(fields) == ["Frame read latency", "Send jitter", "FFmpeg startup",
+                            "play_next to first frame", "voice_client.play()"]
+    assert fields["FFmpeg startup"] == "avg 120.00 ms · p95 120.00 ms · max 120.00 ms"
+    assert fields["voice_client.play()"] == "avg 2.00 ms · p95 2.00 ms · max 2.00 ms"
+    assert fields["Frame read latency"].startswith("avg ")
+    assert fields["play_next to first frame"].startswith("avg ")
+
+
+@pytest.mark.asyncio
+async def test_voicestats_for_another_guild_and_no_samples(registry, stub_ctx):
+    from commands.voicestats import voicestats
+    registry.record_play_call(55, 0.004)
+
+    await voicestats.callback(stub_ctx, 55)
+    fields = {field.name: field.value for field in stub_ctx._sent[-1].embed.fields}
+    assert stub_ctx._sent[-1].embed.description == "0 frames sent · 0 buffer underruns"
+    assert fields["Frame read latency"] == "No samples"
+    assert fields["voice_client.play()"].startswith("avg 4.00 ms")
+
+    # A server without any recorded playback
+    await voicestats.callback(stub_ctx, 56)
+    embed = stub_ctx._sent[-1].embed
+    assert embed.description == "No playback has been recorded for this server yet."
+    assert not embed.fields
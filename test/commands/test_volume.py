@@ -0,0 +1,103 @@
+import types
+from array import array
+import pytest
+
+
+class FakeSource:
+    def __init__(self, frame, opus=False):
+        self.frame = frame
+        self.opus = opus
+    def read(self):
+        return self.frame
+    def is_opus(self):
+        return self.opus
+    def cleanup(self):
+        pass
+
+
+def _playing(source, song=None):
+    """A music bot whose voice client is playing a source."""
+    voice_client = types.SimpleNamespace(_player=types.SimpleNamespace(source=source),
+                                         is_connected=lambda: False)
+    return types.SimpleNamespace(voice_client=voice_client, current_song=song)
+
+
+@pytest.fixture
+def volume_cog(tmp_path, monkeypatch):
+    import commands.volume as volume_mod
+    from scripts.kvstore import KVStore
+    from scripts.volume import VolumeStore
+    state = KVStore(str(tmp_path / 'state.db'))
+    store = VolumeStore(state, str(tmp_path / 'volumes.json'))
+    monkeypatch.setattr(volume_mod, 'volume_store', store)
+    music_bot = _playing(None)
+    monkeypatch.setattr(volume_mod, 'get_music_bot', lambda ctx: music_bot)
+    yield volume_mod.VolumeCog(None), store, state
+    state.close()
+
+
+@pytest.mark.asyncio
+async def test_volume_is_clamped_and_rejected_out_of_range(volume_cog, stub_ctx):
+    from scripts.volume import max_volume
+    cog, store, _ = volume_cog
+    await cog.volume.callback(cog, stub_ctx, max_volume() + 1)
+    assert stub_ctx._sent[-1].embed.title == 'Error'
+    await cog.volume.callback(cog, stub_ctx, -1)
+    assert stub_ctx._sent[-1].embed.title == 'Error'
+    assert store.get(stub_ctx.guild.id) == store.get(None)
+    # The store clamps values that don't come through the command
+    assert store.set(1, max_volume() * 10) == max_volume()
+    assert store.set(1, -5) == 0
+
+
+@pytest.mark.asyncio
+async def test_volume_is_kept_per_guild(volume_cog, stub_ctx, tmp_path):
+    from scripts.kvstore import KVStore
+    from scripts.volume import VolumeStore, default_volume
+    cog, store, state = volume_cog
+    await cog.volume.callback(cog, stub_ctx, 40)
+    assert '40%' in stub_ctx._sent[-1].embed.description
+    stub_ctx.guild.id = 2
+    await cog.volume.callback(cog, stub_ctx, 150)
+    await cog.volume.callback(cog, stub_ctx, None)
+    assert '150%' in stub_ctx._sent[-1].embed.description
+
+    # Survives a restart
+    state.flush()
+    reloaded = VolumeStore(KVStore(str(tmp_path / 'state.db')), str(tmp_path / 'volumes.json'))
+    assert (reloaded.get(1), reloaded.get(2), reloaded.get(3)) == (40, 150, default_volume())
+
+
+@pytest.mark.asyncio
+async def test_apply_live_volume_changes_playing_pcm_source(monkeypatch):
+    import commands.volume as volume_mod
+    from scripts.playback import TrackedAudioSource
+    restarts = []
+    async def restart_at(*args):
+        restarts.append(args)
+    monkeypatch.setattr(volume_mod, 'restart_at', restart_at)
+
+    frame = array('h', [1000, -1000]).tobytes()
+    tracked = TrackedAudioSource(FakeSource(frame))
+    assert await volume_mod.apply_live_volume(_playing(tracked, {'file_path': 'f'}), 50)
+    # The next frame is scaled, without reopening the song
+    assert list(array('h', tracked.read())) == [500, -500]
+    assert restarts == []
+    assert not await volume_mod.apply_live_volume(_playing(None), 50)
+
+
+@pytest.mark.asyncio
+async def test_apply_live_volume_reopens_opus_passthrough(monkeypatch):
+    import commands.volume as volume_mod
+    from scripts.playback import TrackedAudioSource
+    restarts = []
+    async def restart_at(voice_client, song, position, volume=None):
+        restarts.append((song['file_path'], volume))
+    monkeypatch.setattr(volume_mod, 'restart_at', restart_at)
+
+    tracked = TrackedAudioSource(FakeSource(b'opus', opus=True))
+    assert await volume_mod.apply_live_volume(_playing(tracked, {'file_path': 'f'}), 50)
+    assert restarts == [('f', 50)]
+    # Back at 100% the packets can pass through untouched
+    assert await volume_mod.apply_live_volume(_playing(tracked, {'file_path': 'f'}), 100)
+    assert len(restarts) == 1
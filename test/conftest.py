@@ -1,10 +1,31 @@
 import asyncio
+import os
+import tempfile
 import types
 import pytest
 import discord
 from discord.ext import commands
 
 
+def pytest_configure(config):
+    """Point the state database away from the bot's real .cache before any module loads from it."""
+    from scripts.kvstore import state_store
+    state_store.path = os.path.join(tempfile.mkdtemp(prefix='harmonica-state-'), 'state.db')
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """Keep the state database and queue journals of every test in its own temp directory."""
+    from scripts.kvstore import state_store
+    from scripts.queue_journal import queue_journal
+    state_store.close()
+    monkeypatch.setattr(state_store, 'path', str(tmp_path / 'state.db'))
+    monkeypatch.setattr(queue_journal, 'directory', str(tmp_path / 'queues'))
+    monkeypatch.setattr(queue_journal, 'journals', {})
+    yield
+    state_store.close()
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an event loop for pytest-asyncio."""
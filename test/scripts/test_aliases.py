@@ -0,0 +1,51 @@
+import json
+
+
+class Obj:
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class FakeBot:
+    def __init__(self, commands):
+        self.commands = commands
+
+    def get_command(self, name):
+        return self.commands.get(name)
+
+
+def _ctx(bot, guild_id, invoked_with, command=None):
+    return Obj(bot=bot, guild=Obj(id=guild_id), invoked_with=invoked_with, command=command)
+
+
+def test_alias_resolves_in_its_server_only(tmp_path):
+    from scripts.aliases import AliasTable
+    from scripts.kvstore import KVStore
+    table = AliasTable(KVStore(str(tmp_path / 'state.db')), str(tmp_path / 'aliases.json'))
+    bot = FakeBot({'play': 'play-command'})
+    table.add(1, 'P', 'play')
+
+    ctx = _ctx(bot, 1, 'p')
+    assert table.resolve(ctx) and ctx.command == 'play-command'
+    assert not table.resolve(_ctx(bot, 2, 'p'))
+    # Real commands are never shadowed
+    ctx = _ctx(bot, 1, 'p', command='other')
+    assert not table.resolve(ctx) and ctx.command == 'other'
+
+
+def test_alias_changes_are_saved(tmp_path):
+    from scripts.aliases import AliasTable
+    from scripts.kvstore import KVStore
+    legacy = tmp_path / 'aliases.json'
+    legacy.write_text(json.dumps({'1': {'Q': 'queue'}}))
+    store = KVStore(str(tmp_path / 'state.db'))
+    table = AliasTable(store, str(legacy))
+    table.add(1, 'p', 'play')
+    assert table.server_aliases(1) == {'q': 'queue', 'p': 'play'}
+    assert not legacy.exists()
+    store.flush()
+    assert AliasTable(KVStore(str(tmp_path / 'state.db')), str(legacy)).server_aliases(1) == {'q': 'queue', 'p': 'play'}
+    assert table.remove(1, 'p') == 'play' and table.remove(1, 'p') is None
+    assert table.remove(1, 'q') == 'queue'
+    store.flush()
+    assert KVStore(str(tmp_path / 'state.db')).items('aliases') == {}
@@ -9,4 +9,34 @@ def test_playlistcache_valid_id(monkeypatch):
     monkeypatch.setattr(caching.PlaylistCache, '__init__', fake_init)
     pc = caching.PlaylistCache()
     assert pc._is_valid_youtube_id('abcdefghijk') is True
-    assert pc._is_valid_youtube_id('invalid') is False
\ No newline at end of file
+    assert pc._is_valid_youtube_id('invalid') is False
+
+
+def test_playlist_listings_are_evicted_by_age_and_count(tmp_path, monkeypatch):
+    import json
+    import time
+    import scripts.caching as caching
+    import scripts.config as config
+    from scripts.kvstore import KVStore
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'CACHE': {'SPOTIFY_PLAYLIST_LIMIT': 2, 'SPOTIFY_PLAYLIST_MAX_AGE_DAYS': 30}}))
+    monkeypatch.setattr(config, 'config_service', config.ConfigService(str(config_file)))
+    path = str(tmp_path / 'state.db')
+    store = KVStore(path, commit_delay=60)
+    store.set('spotify_playlists', 'old', {'snapshot_id': 's', 'tracks': [], 'last_accessed': time.time() - 400 * 86400})
+    store.flush()
+    cache = caching.PlaylistCache(store)
+
+    cache.add_spotify_playlist('a', 's', [{'id': '1'}])
+    # Unused for longer than the max age
+    assert 'old' not in cache.spotify_playlists
+    cache.add_spotify_playlist('b', 's', [])
+    cache.spotify_playlists['a']['last_accessed'] -= 2 * caching.PLAYLIST_TOUCH_INTERVAL
+    cache.spotify_playlists['b']['last_accessed'] -= caching.PLAYLIST_TOUCH_INTERVAL // 2
+    # Using 'a' makes 'b' the least recently used listing
+    assert cache.get_cached_spotify_playlist('a', 's') == [{'id': '1'}]
+    cache.add_spotify_playlist('c', 's', [])
+    assert set(cache.spotify_playlists) == {'a', 'c'}
+    cache._save_cache()
+    assert set(KVStore(path).items('spotify_playlists')) == {'a', 'c'}
+    store.close()
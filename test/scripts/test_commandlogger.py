@@ -1,11 +1,14 @@
 import os
 from scripts.commandlogger import CommandLogger
+from scripts.log_writer import log_writer
 
 
 def test_commandlogger_writes(tmp_path):
     logger = CommandLogger()
     logger.log_path = tmp_path / 'commandlog.txt'
     logger.log_command('user', '!ping', 'Guild')
+    # Entries are queued; the log writer appends them in batches
+    log_writer.flush()
     assert os.path.exists(logger.log_path)
     content = logger.log_path.read_text(encoding='utf-8')
-    assert 'user' in content and '!ping' in content and 'Guild' in content
\ No newline at end of file
+    assert 'user' in content and '!ping' in content and 'Guild' in content
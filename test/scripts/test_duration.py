@@ -13,4 +13,79 @@ async def test_get_audio_duration_monkeypatched(monkeypatch):
         return Proc()
     monkeypatch.setattr(dur.asyncio, 'create_subprocess_exec', fake_exec)
     d = await dur.get_audio_duration('a.m4a')
-    assert abs(d - 12.34) < 1e-6
\ No newline at end of file
+    assert abs(d - 12.34) < 1e-6
+
+def _ebml(element_id: bytes, payload: bytes) -> bytes:
+    # One-byte size with the length marker set; fine for payloads under 127 bytes
+    return element_id + bytes([0x80 | len(payload)]) + payload
+
+
+def _ogg_page(granule: int, payload: bytes) -> bytes:
+    import struct
+    header = b'OggS' + bytes([0, 0]) + struct.pack('<q', granule) + b'\0' * 12 + bytes([1, len(payload)])
+    return header + payload
+
+
+def test_parse_webm_duration(tmp_path):
+    import struct
+    from scripts.duration import parse_container_duration
+    info = _ebml(b'\x2a\xd7\xb1', (1000000).to_bytes(3, 'big')) + _ebml(b'\x44\x89', struct.pack('>d', 225500.0))
+    segment = _ebml(b'\x11\x4d\x9b\x74', b'\0' * 4) + _ebml(b'\x15\x49\xa9\x66', info)
+    data = _ebml(b'\x1a\x45\xdf\xa3', b'\x42\x82\x84webm') + b'\x18\x53\x80\x67\x01\xff\xff\xff\xff\xff\xff\xff' + segment
+    path = tmp_path / 'a.webm'
+    path.write_bytes(data)
+    assert parse_container_duration(str(path)) == 225.5
+
+
+def test_parse_ogg_opus_duration(tmp_path):
+    from scripts.duration import parse_container_duration
+    head = b'OpusHead' + bytes([1, 2]) + (312).to_bytes(2, 'little') + (48000).to_bytes(4, 'little') + b'\0' * 3
+    data = _ogg_page(0, head) + _ogg_page(0, b'OpusTags') + _ogg_page(48000 * 10 + 312, b'\0' * 10)
+    path = tmp_path / 'a.opus'
+    path.write_bytes(data)
+    assert parse_container_duration(str(path)) == 10.0
+
+
+def test_parse_m4a_duration(tmp_path):
+    import struct
+    from scripts.duration import parse_container_duration
+    mvhd_body = b'\0\0\0\0' + b'\0' * 8 + struct.pack('>II', 44100, 44100 * 90) + b'\0' * 80
+    mvhd = struct.pack('>I', 8 + len(mvhd_body)) + b'mvhd' + mvhd_body
+    moov = struct.pack('>I', 8 + len(mvhd)) + b'moov' + mvhd
+    ftyp = struct.pack('>I', 16) + b'ftypM4A ' + b'\0' * 4
+    mdat = struct.pack('>I', 16) + b'mdat' + b'\0' * 8
+    path = tmp_path / 'a.m4a'
+    path.write_bytes(ftyp + mdat + moov)
+    assert parse_container_duration(str(path)) == 90.0
+
+
+@pytest.mark.asyncio
+async def test_unparsed_files_share_one_probe_and_are_memoized(monkeypatch, tmp_path):
+    import asyncio
+    from scripts import duration as dur
+    first, second = tmp_path / 'a.mp3', tmp_path / 'b.mp3'
+    first.write_bytes(b'ID3')
+    second.write_bytes(b'ID3')
+    calls = []
+
+    class Proc:
+        returncode = 1
+        async def communicate(self):
+            banner = (
+                f"Input #0, mp3, from '{first}':\n  Duration: 00:01:00.50, start: 0.0\n"
+                f"Input #1, mp3, from '{second}':\n  Duration: 01:00:00.00, start: 0.0\n"
+                "At least one output file must be specified\n"
+            )
+            return b'', banner.encode()
+
+    async def fake_exec(*args, **kwargs):
+        calls.append(args)
+        return Proc()
+    monkeypatch.setattr(dur.asyncio, 'create_subprocess_exec', fake_exec)
+
+    results = await asyncio.gather(dur.get_audio_duration(str(first)), dur.get_audio_duration(str(second)))
+    assert results == [60.5, 3600.0]
+    assert len(calls) == 1 and calls[0].count('-i') == 2
+
+    assert await dur.get_audio_durations([str(first), str(second)]) == {str(first): 60.5, str(second): 3600.0}
+    assert len(calls) == 1
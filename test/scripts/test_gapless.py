@@ -0,0 +1,166 @@
+import asyncio
+from collections import deque
+import pytest
+
+
+class FakeSource:
+    def __init__(self, frames, opus=False):
+        self.frames = list(frames)
+        self.cleaned = False
+        self.opus = opus
+    def read(self):
+        return self.frames.pop(0) if self.frames else b''
+    def is_opus(self):
+        return self.opus
+    def cleanup(self):
+        self.cleaned = True
+
+
+def test_gapless_source_hands_off_to_next():
+    from scripts.gapless import GaplessAudioSource
+    handoffs = []
+    preloads = []
+    first = FakeSource([b'a1', b'a2'])
+    second = FakeSource([b'b0', b'b1', b'b2'])
+    song = {'title': 'next'}
+    src = GaplessAudioSource(
+        first,
+        duration=0.04,
+        on_preload=lambda: preloads.append(True),
+        on_handoff=lambda s, gap: handoffs.append((s, gap)),
+        accept_handoff=lambda s: True,
+    )
+    assert src.read() == b'a1'
+    assert preloads == [True]
+    src.set_next(second, song, duration=10)
+    assert src.read() == b'a2'
+    # First source is exhausted; the next frame comes from the primed source
+    assert src.read() == b'b0'
+    assert first.cleaned is True
+    assert handoffs and handoffs[0][0] is song and handoffs[0][1] >= 0
+    assert src.duration == 10
+    assert src.read() == b'b1'
+
+
+def test_gapless_source_rejects_stale_song():
+    from scripts.gapless import GaplessAudioSource
+    second = FakeSource([b'b0'])
+    src = GaplessAudioSource(FakeSource([]), accept_handoff=lambda s: False)
+    src.set_next(second, {'title': 'stale'})
+    assert src.read() == b''
+    assert second.cleaned is True
+
+
+def test_gapless_source_treats_failed_check_as_rejection():
+    from scripts.gapless import GaplessAudioSource
+    def accept(song):
+        raise IndexError('queue changed')
+    second = FakeSource([b'b0'])
+    src = GaplessAudioSource(FakeSource([]), accept_handoff=accept)
+    src.set_next(second, {'title': 'n'})
+    # The player thread gets the end of the song instead of an exception
+    assert src.read() == b''
+    assert second.cleaned is True
+
+
+def test_gapless_source_cleanup_discards_pending():
+    from scripts.gapless import GaplessAudioSource
+    first, second = FakeSource([b'a']), FakeSource([b'b'])
+    src = GaplessAudioSource(first)
+    src.set_next(second, {'title': 'n'})
+    src.cleanup()
+    assert first.cleaned and second.cleaned
+    assert not src.has_next()
+
+
+@pytest.mark.asyncio
+async def test_complete_handoff_updates_state(monkeypatch):
+    import scripts.gapless as gapless
+    import scripts.play_next as pn
+    announced = []
+    async def fake_announce(mb, previous, ctx):
+        announced.append((previous, mb.current_song))
+    async def fake_cleanup(mb, url):
+        pass
+    monkeypatch.setattr(pn, 'announce_now_playing', fake_announce)
+    monkeypatch.setattr(gapless, 'cleanup_queued_message', fake_cleanup)
+
+    class MB:
+        def __init__(self):
+            self.queue_lock = asyncio.Lock()
+            self.playback_lock = asyncio.Lock()
+            self.after_song_callback = None
+    mb = MB()
+    previous = {'title': 'prev', 'url': 'p'}
+    song = {'title': 'next', 'url': 'n'}
+    mb.current_song = previous
+    mb.queue = deque([song, {'title': 'later', 'url': 'l'}])
+    ctx = type('C', (), {'guild': type('G', (), {'name': 'Guild'})()})()
+
+    await gapless.complete_handoff(mb, song, ctx, started_at=123.0)
+    assert mb.current_song is song
+    assert [s['url'] for s in mb.queue] == ['l']
+    assert mb.playback_start_time == 123.0
+    assert announced == [(previous, song)]
+
+
+@pytest.mark.asyncio
+async def test_gapless_settings_are_read_from_config(tmp_path, monkeypatch):
+    import json
+    import scripts.gapless as gapless
+    from scripts.config import ConfigService
+    from scripts.playback import TrackedAudioSource
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'PLAYBACK': {'GAPLESS': True, 'GAPLESS_PRELOAD': 0.02}}))
+    monkeypatch.setattr(gapless, 'config_service', ConfigService(str(config_file)))
+
+    class MB:
+        guild_id = 'gapless-config'
+        queue = deque()
+
+    song = {'title': 's', 'file_path': '/tmp/s.opus', 'duration': 0.06}
+    source = gapless.wrap_gapless_source(MB(), FakeSource([b'a', b'b', b'c']), song, None)
+    assert isinstance(source, gapless.GaplessAudioSource) and source.preload_seconds == 0.02
+    preloads = []
+    source._on_preload = lambda: preloads.append(True)
+    source.read()
+    assert preloads == []
+    source.read()
+    assert preloads == [True]
+
+    config_file.write_text(json.dumps({'PLAYBACK': {'GAPLESS': False}}))
+    monkeypatch.setattr(gapless, 'config_service', ConfigService(str(config_file)))
+    source = gapless.wrap_gapless_source(MB(), FakeSource([b'a']), song, None)
+    assert type(source) is TrackedAudioSource
+
+
+@pytest.mark.asyncio
+async def test_prepared_song_is_dropped_when_queue_front_changes(tmp_path, monkeypatch):
+    import json
+    import scripts.gapless as gapless
+    from scripts.config import ConfigService
+    from scripts.song_queue import SongQueue
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'PLAYBACK': {'GAPLESS': True}}))
+    monkeypatch.setattr(gapless, 'config_service', ConfigService(str(config_file)))
+
+    class MB:
+        guild_id = 'gapless-head'
+        explicitly_stopped = False
+        queue = SongQueue([{'title': 'next', 'url': 'n'}, {'title': 'later', 'url': 'l'}])
+        queue_lock = asyncio.Lock()
+
+    mb = MB()
+    song = {'title': 's', 'file_path': '/tmp/s.opus', 'duration': 10}
+    source = gapless.wrap_gapless_source(mb, FakeSource([b'a']), song, None)
+    primed = FakeSource([b'b0'])
+    source.set_next(primed, mb.queue[0], 10)
+
+    # Songs added behind the next one keep it prepared
+    mb.queue.append({'title': 'end', 'url': 'e'})
+    assert source.has_next()
+    # Skipping it from the queue drops the prepared source on the event loop
+    mb.queue.popleft()
+    assert not source.has_next() and primed.cleaned
+    assert source.read() == b'a'
+    assert source.read() == b''
@@ -13,7 +13,7 @@ async def test_handle_spotify_album_first_track(monkeypatch, stub_ctx):
             # Fake spotify client with album and pagination
             self.sp = types.SimpleNamespace(
                 album=lambda aid: {'name': 'Album', 'images': [{'url': 'http://img'}]},
-                album_tracks=lambda aid: {'items': [{'id': 't1', 'name': 'Song1', 'artists': [{'name': 'Artist'}]}], 'next': None},
+                album_tracks=lambda aid, **kw: {'items': [{'id': 't1', 'name': 'Song1', 'artists': [{'name': 'Artist'}]}], 'next': None},
                 next=lambda results: {'items': [], 'next': None},
             )
             self.queue = []
@@ -25,7 +25,10 @@ async def test_handle_spotify_album_first_track(monkeypatch, stub_ctx):
             self.voice_client = types.SimpleNamespace(is_playing=lambda: False, is_connected=lambda: True)
             self.waiting_for_song = False
 
-        async def download_song(self, query, status_msg=None, ctx=None, spotify_info=None):
+        async def _resolve_spotify_track(self, track):
+            return 'http://yt'
+
+        async def download_song(self, query, status_msg=None, ctx=None, skip_url_check=False, spotify_info=None):
             return {'title': 'Downloaded', 'url': 'http://yt', 'file_path': __file__, 'thumbnail': None}
 
     mb = MB()
@@ -61,13 +64,15 @@ async def test_handle_spotify_playlist_first_track(monkeypatch, stub_ctx):
     playlist_obj = {
         'name': 'Playlist',
         'images': [{'url': 'http://img'}],
-        'tracks': tracks_page,
+        'snapshot_id': 'snap',
+        'tracks': {'total': 2},
     }
 
     class MB(hs.SpotifyHandler):
         def __init__(self):
             self.sp = types.SimpleNamespace(
-                playlist=lambda pid: playlist_obj,
+                playlist=lambda pid, **kw: playlist_obj,
+                playlist_items=lambda pid, **kw: tracks_page,
                 next=lambda results: {'items': [], 'next': None},
             )
             self.queue = []
@@ -79,12 +84,17 @@ async def test_handle_spotify_playlist_first_track(monkeypatch, stub_ctx):
             self.voice_client = types.SimpleNamespace(is_playing=lambda: False, is_connected=lambda: True)
             self.waiting_for_song = False
 
-        async def download_song(self, query, status_msg=None, ctx=None, spotify_info=None):
+        async def _resolve_spotify_track(self, track):
+            return 'http://ytp'
+
+        async def download_song(self, query, status_msg=None, ctx=None, skip_url_check=False, spotify_info=None):
             return {'title': 'DownloadedP', 'url': 'http://ytp', 'file_path': __file__, 'thumbnail': None}
 
     mb = MB()
     # No cache
     monkeypatch.setattr(caching.playlist_cache, 'get_cached_spotify_track', lambda tid: None)
+    monkeypatch.setattr(caching.playlist_cache, 'get_cached_spotify_playlist', lambda pid, snap: None)
+    monkeypatch.setattr(caching.playlist_cache, 'add_spotify_playlist', lambda pid, snap, tracks: None)
     # Intercept process_queue within handle_spotify module
     calls = {'proc': 0}
     async def fake_process_queue(music_bot): calls['proc'] += 1
@@ -96,4 +106,42 @@ async def test_handle_spotify_playlist_first_track(monkeypatch, stub_ctx):
     res = await mb.handle_spotify_playlist('PL', stub_ctx, status_msg=None)
     assert res and res['title'] in ('DownloadedP', 'CachedTitle')
     assert mb.queue and mb.queue[0]['is_from_playlist'] is True
-    assert calls['proc'] == 1
\ No newline at end of file
+    assert calls['proc'] == 1
+
+
+@pytest.mark.asyncio
+async def test_spotify_playlist_pages_concurrent_and_cached(monkeypatch):
+    import scripts.handle_spotify as hs
+    from scripts import caching as caching
+
+    requested = []
+
+    def playlist_items(pid, fields=None, limit=100, offset=0, additional_types=None):
+        requested.append(offset)
+        count = min(limit, 250 - offset)
+        return {'items': [
+            {'track': {'id': f't{offset + i}', 'name': f'S{offset + i}', 'artists': [{'name': 'A'}], 'duration_ms': 1000}}
+            for i in range(count)
+        ]}
+
+    class MB(hs.SpotifyHandler):
+        def __init__(self):
+            self.sp = types.SimpleNamespace(playlist_items=playlist_items)
+
+    stored = {}
+    monkeypatch.setattr(caching.playlist_cache, 'get_cached_spotify_playlist',
+                        lambda pid, snap: stored.get((pid, snap)))
+    monkeypatch.setattr(caching.playlist_cache, 'add_spotify_playlist',
+                        lambda pid, snap, tracks: stored.__setitem__((pid, snap), tracks))
+
+    mb = MB()
+    pages = [page async for page in mb._iter_spotify_playlist_pages('PL', 'snap1', 250)]
+    assert sorted(requested) == [0, 100, 200]
+    assert [len(p) for p in pages] == [100, 100, 50]
+    assert [t['id'] for p in pages for t in p] == [f't{i}' for i in range(250)]
+
+    # Same snapshot is served from the cache without any page requests
+    requested.clear()
+    cached_pages = [page async for page in mb._iter_spotify_playlist_pages('PL', 'snap1', 250)]
+    assert requested == []
+    assert len(cached_pages[0]) == 250
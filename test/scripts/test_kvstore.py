@@ -0,0 +1,139 @@
+import json
+
+
+def test_writes_are_visible_before_and_after_commit(tmp_path):
+    from scripts.kvstore import KVStore
+    path = str(tmp_path / 'state.db')
+    store = KVStore(path, commit_delay=60)
+    store.set('a', 1, {'x': [1, 2]})
+    store.set('a', '2', None)
+    store.set('b', '1', 'other namespace')
+    assert store.get('a', '1') == {'x': [1, 2]} and store.get('a', '2') is None
+    assert store.items('a') == {'1': {'x': [1, 2]}, '2': None}
+    # Nothing is committed until the batch is flushed
+    assert KVStore(path).items('a') == {}
+    store.flush()
+    assert KVStore(path).items('a') == {'1': {'x': [1, 2]}, '2': None}
+
+    store.delete('a', '1')
+    assert store.get('a', '1', 'gone') == 'gone'
+    store.clear('b')
+    store.set('b', '3', 3)
+    assert store.items('b') == {'3': 3}
+    store.close()
+    reopened = KVStore(path)
+    assert reopened.items('a') == {'2': None} and reopened.items('b') == {'3': 3}
+    reopened.close()
+
+
+def test_values_are_copied_when_set(tmp_path):
+    from scripts.kvstore import KVStore
+    store = KVStore(str(tmp_path / 'state.db'), commit_delay=60)
+    value = {'n': 1}
+    store.set('a', 'k', value)
+    value['n'] = 2
+    assert store.get('a', 'k') == {'n': 1}
+    store.close()
+
+
+def test_json_file_is_migrated_once(tmp_path):
+    from scripts.kvstore import KVStore
+    legacy = tmp_path / 'old.json'
+    legacy.write_text(json.dumps({'1': 'a', '2': 'b'}))
+    store = KVStore(str(tmp_path / 'state.db'))
+    store.set('ns', '2', 'kept')
+    assert store.namespace('ns').migrate_json(str(legacy))
+    assert store.items('ns') == {'1': 'a', '2': 'kept'}
+    assert not legacy.exists() and (tmp_path / 'old.json.migrated').exists()
+    assert not store.migrate_json('ns', str(legacy))
+
+    # Unreadable files are left in place
+    broken = tmp_path / 'broken.json'
+    broken.write_text('not json')
+    assert not store.migrate_json('other', str(broken)) and broken.exists()
+    store.close()
+
+
+def test_playlist_cache_persists_changed_entries(tmp_path):
+    from scripts.caching import PlaylistCache
+    from scripts.kvstore import KVStore
+    path = str(tmp_path / 'state.db')
+    store = KVStore(path, commit_delay=60)
+    cache = PlaylistCache(store)
+    cache.add_to_blacklist('abcdefghijk')
+    cache.add_spotify_match('track', 'abcdefghijk', 0.9)
+    cache._save_cache()
+
+    reloaded = PlaylistCache(KVStore(path))
+    assert reloaded.is_blacklisted('abcdefghijk')
+    assert reloaded.get_spotify_match('track')['video_id'] == 'abcdefghijk'
+    cache.clear()
+    assert not PlaylistCache(KVStore(path)).is_blacklisted('abcdefghijk')
+    store.close()
+
+
+class _SlowConnection:
+    """Wraps the commit connection so a test can hold a commit open or fail it."""
+    def __init__(self, conn, fail_begin=False):
+        import threading
+        self.conn = conn
+        self.fail_begin = fail_begin
+        self.committing = threading.Event()
+        self.release = threading.Event()
+    @property
+    def in_transaction(self):
+        return self.conn.in_transaction
+    def execute(self, sql, *args):
+        import sqlite3
+        if sql == 'BEGIN' and self.fail_begin:
+            raise sqlite3.OperationalError('database is locked')
+        if sql == 'COMMIT':
+            self.committing.set()
+            self.release.wait(5)
+        return self.conn.execute(sql, *args)
+    def executemany(self, sql, rows):
+        return self.conn.executemany(sql, rows)
+    def close(self):
+        self.conn.close()
+
+
+def test_reads_and_writes_do_not_wait_for_a_commit(tmp_path):
+    import threading
+    from scripts.kvstore import KVStore
+    path = str(tmp_path / 'state.db')
+    store = KVStore(path, commit_delay=60)
+    slow = store._write_conn = _SlowConnection(store._open())
+    store.set('a', '1', 'first')
+    store.set('b', '1', 'kept')
+    store.clear('b')
+    committer = threading.Thread(target=store.flush)
+    committer.start()
+    assert slow.committing.wait(5)
+
+    # The commit is still open: the buffer lock is free and its writes stay visible
+    assert store._lock.acquire(timeout=1)
+    store._lock.release()
+    assert store.get('a', '1') == 'first'
+    assert store.items('b') == {}
+    store.set('a', '2', 'second')
+    assert store.items('a') == {'1': 'first', '2': 'second'}
+
+    slow.release.set()
+    committer.join(5)
+    assert store.items('a') == {'1': 'first', '2': 'second'}
+    store.close()
+    assert KVStore(path).items('a') == {'1': 'first', '2': 'second'}
+
+
+def test_failed_begin_keeps_writes_for_the_next_flush(tmp_path):
+    from scripts.kvstore import KVStore
+    path = str(tmp_path / 'state.db')
+    store = KVStore(path, commit_delay=60)
+    store._write_conn = _SlowConnection(store._open(), fail_begin=True)
+    store.set('a', '1', 'v')
+    store.flush()  # Must not raise from ROLLBACK outside a transaction
+    assert store.get('a', '1') == 'v'
+    store._write_conn.fail_begin = False
+    store._write_conn.release.set()
+    store.close()
+    assert KVStore(path).items('a') == {'1': 'v'}
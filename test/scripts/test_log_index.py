@@ -0,0 +1,83 @@
+import gzip
+from datetime import datetime
+
+
+def _write_log(path, start_minute, count, server='Guild A'):
+    with open(path, 'a', encoding='utf-8') as f:
+        for i in range(count):
+            minute = start_minute + i
+            f.write(f"2024-05-01 {minute // 60:02d}:{minute % 60:02d}:00 - user{i} has used command !play song{minute} in server: {server}\n")
+            f.write(f"[00:00:00] INFO discord line without a date {minute}\n")
+
+
+def test_time_range_uses_the_index(tmp_path):
+    from scripts.log_index import LogIndex, LogQuery, LogSearch, parse_time
+    path = tmp_path / 'commandlog.txt'
+    _write_log(path, 0, 600)
+    search = LogSearch()
+    search.indexes[str(path)] = LogIndex(str(path), stride=256)
+    query = LogQuery(since=parse_time('2024-05-01T02:00'), until=parse_time('2024-05-01T02:02'))
+    lines = search.search(path, query, 100)
+    assert [line.split(' - ')[0] for line in lines[::2]] == ['2024-05-01 02:00:00', '2024-05-01 02:01:00', '2024-05-01 02:02:00']
+    # Undated lines belong to the timestamped line above them
+    assert lines[-1].endswith('line without a date 122')
+    assert len(search.indexes[str(path)].offsets) > 10
+
+    # New lines are indexed from where the index stopped
+    indexed = search.indexes[str(path)].indexed
+    _write_log(path, 600, 5)
+    search.on_append(str(path))
+    assert search.indexes[str(path)].indexed > indexed
+    assert search.search(path, LogQuery(since=parse_time('2024-05-01T10:04')), 10)[0].startswith('2024-05-01 10:04:00')
+
+
+def test_text_guild_and_limit_filters(tmp_path):
+    from scripts.log_index import LogQuery, LogSearch
+
+    class Guild:
+        id = 42
+        name = 'Guild B'
+
+    path = tmp_path / 'commandlog.txt'
+    _write_log(path, 0, 50)
+    _write_log(path, 50, 50, server='Guild B')
+    search = LogSearch()
+    guild_b = [f'2024-05-01 01:{m - 60:02d}:00 - user{m - 50} has used command !play song{m} in server: Guild B' for m in range(70, 80)]
+    lines = search.search(path, LogQuery.parse('song7'), 11)
+    assert lines[0] == '2024-05-01 00:07:00 - user7 has used command !play song7 in server: Guild A'
+    assert lines[1:] == guild_b
+    # Only the newest matches are kept
+    assert search.search(path, LogQuery.parse('song7'), 10) == guild_b
+    assert search.search(path, LogQuery.parse('SONG7 guild:here', guild=Guild()), 20) == guild_b
+    assert search.search(path, LogQuery.parse('guild:999'), 20) == []
+    assert len(search.search(path, LogQuery.parse('level:info'), 5)) == 5
+    tail = search.search(path, LogQuery(), 3)
+    assert tail[-1].endswith('line without a date 99') and len(tail) == 3
+
+
+def test_rotated_archives_are_searched(tmp_path):
+    from scripts.log_index import LogQuery, LogSearch, parse_time
+    path = tmp_path / 'log.txt'
+    _write_log(path, 0, 10)
+    with open(path, 'rb') as f, gzip.open(f"{path}.1.gz", 'wb') as archive:
+        archive.write(f.read())
+    path.write_text('')
+    _write_log(path, 10, 10)
+    search = LogSearch()
+    lines = search.search(path, LogQuery(since=parse_time('2024-05-01T00:08'), text='!play'), 100)
+    assert [line[:19] for line in lines] == [f'2024-05-01 00:{m:02d}:00' for m in range(8, 20)]
+    assert search.search(path, LogQuery(until=parse_time('2024-05-01T00:01'), text='!play'), 100)[-1].startswith('2024-05-01 00:01:00')
+
+
+def test_query_parsing():
+    import pytest
+    from scripts.log_index import LogQuery, parse_time
+    now = datetime(2024, 5, 1, 12, 0, 0)
+    query = LogQuery.parse('since:2h until:2024-05-01T11:30 level:error voice failed', now=now)
+    assert query.since == b'2024-05-01 10:00:00' and query.until == b'2024-05-01 11:30:00'
+    assert query.text == b'voice failed' and query.level == b' ERROR '
+    assert parse_time('1d', now) == b'2024-04-30 12:00:00'
+    with pytest.raises(ValueError):
+        LogQuery.parse('since:yesterday')
+    with pytest.raises(ValueError):
+        LogQuery.parse('guild:here')
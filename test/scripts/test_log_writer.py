@@ -0,0 +1,31 @@
+import gzip
+
+
+def test_lines_are_batched_until_flushed(tmp_path):
+    from scripts.log_writer import LogWriter
+    writer = LogWriter(flush_interval=60)
+    path = tmp_path / 'log.txt'
+    writer.write(path, 'one\n')
+    writer.write(path, 'two\n')
+    assert not path.exists()
+    writer.flush()
+    assert path.read_text() == 'one\ntwo\n'
+    writer.truncate(path, '---')
+    writer.write(path, 'three\n')
+    writer.stop()
+    assert path.read_text() == '---three\n'
+
+
+def test_full_files_are_compressed_and_rotated(tmp_path):
+    from scripts.log_writer import LogWriter
+    writer = LogWriter(flush_interval=60, max_bytes=10, backup_count=2)
+    path = tmp_path / 'log.txt'
+    for batch in ('first line\n', 'second line\n', 'third line\n'):
+        writer.write(path, batch)
+        writer.flush()
+    writer.write(path, 'fourth\n')
+    writer.stop()
+    assert path.read_text() == 'fourth\n'
+    assert gzip.open(f"{path}.1.gz", 'rt').read() == 'third line\n'
+    assert gzip.open(f"{path}.2.gz", 'rt').read() == 'second line\n'
+    assert not (tmp_path / 'log.txt.3.gz').exists()
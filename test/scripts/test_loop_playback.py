@@ -0,0 +1,134 @@
+import pytest
+
+
+class FakeSource:
+    def __init__(self, frames, opus=False):
+        self.frames = list(frames)
+        self.opus = opus
+        self.cleaned = False
+    def read(self):
+        return self.frames.pop(0) if self.frames else b''
+    def is_opus(self):
+        return self.opus
+    def cleanup(self):
+        self.cleaned = True
+
+
+def drain(source, limit=1000):
+    out = []
+    for _ in range(limit):
+        data = source.read()
+        if not data:
+            break
+        out.append(data)
+    return out
+
+
+@pytest.mark.asyncio
+async def test_short_song_is_replayed_from_memory(monkeypatch):
+    import scripts.loop_playback as lp
+    from scripts.playback import TrackedAudioSource
+    created = []
+    async def fake_create(path, use_volume_transformer=True, is_stream=False, start=0, stream_loop=0, volume=None, guild_id=None):
+        created.append(stream_loop)
+        return FakeSource([b'1', b'2', b'3'])
+    monkeypatch.setattr(lp, 'create_audio_source', fake_create)
+
+    tracked = TrackedAudioSource(FakeSource([b'1', b'2', b'3']))
+    looper = lp.NativeLoop({'title': 't', 'file_path': 'f'}, 3, duration=0.06)
+    tracked.looper = looper
+    await looper.prepare()
+
+    frames = drain(tracked)
+    assert frames == [b'1', b'2', b'3'] * 4
+    # One ffmpeg source for the recorded pass, then memory only
+    assert created == [0]
+    assert looper.completed == 4
+    assert looper.finished is True
+
+
+@pytest.mark.asyncio
+async def test_long_song_uses_one_stream_loop_process(monkeypatch):
+    import scripts.loop_playback as lp
+    from scripts.playback import TrackedAudioSource
+    created = []
+    async def fake_create(path, use_volume_transformer=True, is_stream=False, start=0, stream_loop=0, volume=None, guild_id=None):
+        created.append(stream_loop)
+        return FakeSource([b'x'] * 3 * (stream_loop + 1))
+    monkeypatch.setattr(lp, 'create_audio_source', fake_create)
+
+    tracked = TrackedAudioSource(FakeSource([b'x'] * 3))
+    looper = lp.NativeLoop({'title': 't', 'file_path': 'f'}, 4, duration=0.06, buffer_limit=0)
+    tracked.looper = looper
+    await looper.prepare()
+
+    positions = []
+    for _ in range(100):
+        if not tracked.read():
+            break
+        positions.append(round(tracked.position, 2))
+    assert len(positions) == 15
+    assert created == [3]
+    assert looper.completed == 5
+    # Position restarts at each repetition
+    assert max(positions) == pytest.approx(0.06)
+
+
+@pytest.mark.asyncio
+async def test_cancel_stops_after_current_pass(monkeypatch):
+    import scripts.loop_playback as lp
+    from scripts.playback import TrackedAudioSource
+    async def fake_create(path, use_volume_transformer=True, is_stream=False, start=0, stream_loop=0, volume=None, guild_id=None):
+        return FakeSource([b'x'] * 3)
+    monkeypatch.setattr(lp, 'create_audio_source', fake_create)
+
+    tracked = TrackedAudioSource(FakeSource([b'x'] * 3))
+    looper = lp.NativeLoop({'title': 't', 'file_path': 'f'}, 10, duration=0.06)
+    tracked.looper = looper
+    await looper.prepare()
+    assert tracked.read() == b'x'
+    looper.cancel()
+    assert len(drain(tracked)) == 2
+    assert looper.finished is True
+
+
+@pytest.mark.asyncio
+async def test_start_native_loop_requires_tracked_source():
+    from scripts.loop_playback import start_native_loop, get_native_loop
+    vc = type('VC', (), {'_player': type('P', (), {'source': FakeSource([])})()})()
+    mb = type('MB', (), {'current_song': {'title': 't', 'file_path': 'f', 'url': 'u'}, 'voice_client': vc})()
+    assert await start_native_loop(mb, 3) is False
+    assert get_native_loop(mb) is None
+
+
+@pytest.mark.asyncio
+async def test_unprepared_pass_falls_back_to_requeue():
+    import asyncio
+    import scripts.loop_playback as lp
+    from scripts.playback import TrackedAudioSource
+    requeued = []
+    finished = []
+    tracked = TrackedAudioSource(FakeSource([b'x'] * 3))
+    looper = lp.NativeLoop({'title': 't', 'file_path': 'f'}, 4, duration=0.06,
+                           loop=asyncio.get_running_loop(),
+                           on_finished=lambda: finished.append(True),
+                           on_fallback=requeued.append)
+    tracked.looper = looper
+    # prepare() never ran, so nothing is ready at the end of the first pass
+    assert len(drain(tracked)) == 3
+    await asyncio.sleep(0)
+    assert looper.finished is True
+    # The loop isn't ended; the remaining passes go back through the queue
+    assert requeued == [4]
+    assert finished == []
+
+
+def test_loop_buffer_size_is_read_from_config(tmp_path, monkeypatch):
+    import json
+    import scripts.loop_playback as lp
+    from scripts.config import ConfigService
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'PLAYBACK': {'LOOP_BUFFER_MB': 2}}))
+    monkeypatch.setattr(lp, 'config_service', ConfigService(str(config_file)))
+    looper = lp.NativeLoop({'title': 't', 'file_path': 'f'}, 1)
+    assert looper.buffer_limit == 2 * 1024 * 1024
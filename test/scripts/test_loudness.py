@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+
+
+def test_compute_gain_targets_and_limits(monkeypatch):
+    import scripts.loudness as ld
+    monkeypatch.setattr(ld, 'normalization_enabled', lambda: True)
+    monkeypatch.setattr(ld, '_loudness_target', lambda: -14.0)
+    monkeypatch.setattr(ld, '_max_gain', lambda: 12.0)
+    # Loud track is turned down
+    assert ld.compute_gain({'integrated': -8.0, 'true_peak': 0.5}) == pytest.approx(-6.0)
+    # Quiet track is boosted only as far as the peak allows
+    assert ld.compute_gain({'integrated': -20.0, 'true_peak': -4.0}) == pytest.approx(3.0)
+    # Gains are capped
+    assert ld.compute_gain({'integrated': 10.0, 'true_peak': 0.0}) == pytest.approx(-12.0)
+    assert ld.compute_gain(None) == 0.0
+    assert ld.compute_gain({'bogus': 1}) == 0.0
+
+
+def test_get_track_gain_uses_cache_entry(monkeypatch):
+    import scripts.loudness as ld
+    monkeypatch.setattr(ld, 'normalization_enabled', lambda: True)
+    monkeypatch.setattr(ld, '_loudness_target', lambda: -14.0)
+    monkeypatch.setattr(ld.playlist_cache, 'get_loudness',
+                        lambda vid: {'integrated': -10.0, 'true_peak': -1.0} if vid == 'abc123DEF45' else None)
+    assert ld.get_track_gain('/x/downloads/abc123DEF45.opus') == pytest.approx(-4.0)
+    assert ld.get_track_gain('/x/downloads/other.opus') == 0.0
+
+
+def test_gain_is_folded_into_volume_filter():
+    from scripts.playback import _build_ffmpeg_options
+    options = _build_ffmpeg_options({'options': '-af equalizer=f=100,volume=1.0 -buffer_size 128k'}, gain_db=-6.0206)
+    assert 'volume=0.5000 ' in options['options']
+
+
+@pytest.mark.asyncio
+async def test_analyzer_measures_each_video_once(monkeypatch):
+    import scripts.loudness as ld
+    monkeypatch.setattr(ld, 'normalization_enabled', lambda: True)
+    stored = {}
+    measured = []
+    async def fake_measure(path):
+        measured.append(path)
+        return {'integrated': -9.0, 'true_peak': -0.5}
+    monkeypatch.setattr(ld, 'measure_loudness', fake_measure)
+    monkeypatch.setattr(ld.playlist_cache, 'get_loudness', lambda vid: stored.get(vid))
+    monkeypatch.setattr(ld.playlist_cache, 'get_cached_file', lambda vid: f'/d/{vid}.opus' if vid != 'gone' else None)
+    monkeypatch.setattr(ld.playlist_cache, 'set_loudness',
+                        lambda vid, i, tp: stored.__setitem__(vid, {'integrated': i, 'true_peak': tp}))
+
+    analyzer = ld.LoudnessAnalyzer()
+    analyzer.schedule('a')
+    analyzer.schedule('a')
+    analyzer.schedule('gone')
+    await analyzer._task
+    assert measured == ['/d/a.opus']
+    assert stored['a']['integrated'] == -9.0
+    analyzer.schedule('a')
+    assert analyzer._task.done()
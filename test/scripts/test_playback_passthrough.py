@@ -0,0 +1,82 @@
+import json
+import pytest
+
+
+def _use_config(tmp_path, monkeypatch, config):
+    """Read playback settings from a temporary config file."""
+    import scripts.playback as pb
+    import scripts.volume as volume
+    from scripts.config import ConfigService
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps(config))
+    service = ConfigService(str(config_file))
+    monkeypatch.setattr(pb, 'config_service', service)
+    monkeypatch.setattr(volume, 'config_service', service)
+    return config_file
+
+
+def test_can_use_opus_passthrough():
+    from scripts.playback import can_use_opus_passthrough
+    opus = {'codec_name': 'opus', 'sample_rate': 48000, 'channels': 2}
+    assert can_use_opus_passthrough(opus, volume=100) is True
+    assert can_use_opus_passthrough(opus, volume=80) is False
+    assert can_use_opus_passthrough(opus, is_stream=True, volume=100) is False
+    assert can_use_opus_passthrough({'codec_name': 'aac', 'sample_rate': 44100, 'channels': 2}, volume=100) is False
+    assert can_use_opus_passthrough({}, volume=100) is False
+
+
+@pytest.mark.asyncio
+async def test_create_audio_source_picks_path(tmp_path, monkeypatch):
+    import discord
+    import scripts.playback as pb
+
+    class FakeSource:
+        def __init__(self, *a, **kw):
+            self.kwargs = kw
+            self.reads = 0
+        def read(self):
+            self.reads += 1
+            return b'x'
+        def cleanup(self):
+            pass
+
+    class FakeOpus(FakeSource):
+        def is_opus(self):
+            return True
+
+    monkeypatch.setattr(discord, 'FFmpegOpusAudio', FakeOpus)
+    monkeypatch.setattr(discord, 'FFmpegPCMAudio', FakeSource)
+    _use_config(tmp_path, monkeypatch, {'VOICE': {'DEFAULT_VOLUME': 100}, 'AUDIO': {'OPUS_PASSTHROUGH': True}})
+
+    async def opus_info(path):
+        return {'codec_name': 'opus', 'sample_rate': 48000, 'channels': 2}
+    monkeypatch.setattr(pb, 'get_audio_stream_info', opus_info)
+    source = await pb.create_audio_source('song.webm', use_volume_transformer=False)
+    assert source.mode == 'opus passthrough' and source.is_opus() is True
+    # Frames are read ahead from the ffmpeg source on a separate thread
+    assert source.source.original.kwargs['codec'] == 'copy'
+    source.cleanup()
+
+    async def aac_info(path):
+        return {'codec_name': 'aac', 'sample_rate': 44100, 'channels': 2}
+    monkeypatch.setattr(pb, 'get_audio_stream_info', aac_info)
+    source = await pb.create_audio_source('song.m4a', use_volume_transformer=False)
+    assert source.mode == 'pcm' and source.is_opus() is False
+
+    # The metered wrapper counts frames read through it
+    source.read()
+    source.read()
+    assert source.frames == 2
+    assert source.cpu_usage()['audio_seconds'] == pytest.approx(0.04)
+    source.cleanup()
+
+
+def test_passthrough_setting_applies_without_restart(tmp_path, monkeypatch):
+    import scripts.playback as pb
+    opus = {'codec_name': 'opus', 'sample_rate': 48000, 'channels': 2}
+    config_file = _use_config(tmp_path, monkeypatch, {'AUDIO': {'OPUS_PASSTHROUGH': True}})
+    assert pb.can_use_opus_passthrough(opus, volume=100) is True
+
+    config_file.write_text(json.dumps({'AUDIO': {'OPUS_PASSTHROUGH': False}}))
+    pb.config_service.reload(force=True)
+    assert pb.can_use_opus_passthrough(opus, volume=100) is False
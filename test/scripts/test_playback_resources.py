@@ -0,0 +1,110 @@
+import subprocess
+import sys
+import types
+import pytest
+
+
+def test_thread_count_shrinks_with_streams(monkeypatch):
+    from scripts.playback_resources import PlaybackResourceManager
+    manager = PlaybackResourceManager(max_threads=4)
+    manager.cpu_count = 8
+    assert manager.thread_count() == 4
+    monkeypatch.setattr(PlaybackResourceManager, 'active_count', property(lambda self: 7))
+    assert manager.thread_count() == 1
+    monkeypatch.setattr(PlaybackResourceManager, 'active_count', property(lambda self: 40))
+    assert manager.thread_count() == 1
+
+
+def test_ffmpeg_options_appends_threads():
+    from scripts.playback_resources import PlaybackResourceManager
+    manager = PlaybackResourceManager(max_threads=1)
+    base = {'executable': 'ffmpeg', 'options': '-vn'}
+    options = manager.ffmpeg_options(base, '-ss 5')
+    assert options['options'] == '-vn -threads 1 -ss 5'
+    assert base['options'] == '-vn'
+
+
+def test_track_and_stats_follow_process_lifetime():
+    from scripts.playback_resources import PlaybackResourceManager
+    manager = PlaybackResourceManager()
+    popen = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(5)'])
+    try:
+        source = type('S', (), {'_process': popen})()
+        process = manager.track(source)
+        assert process is not None
+        assert manager.stats()['active_streams'] == 1
+        manager.release(process)
+        assert manager.active_count == 0
+        manager.track(source)
+    finally:
+        popen.kill()
+        popen.wait()
+    # Exited processes are dropped automatically
+    assert manager.stats()['active_streams'] == 0
+
+
+def test_track_without_process_is_ignored():
+    from scripts.playback_resources import PlaybackResourceManager
+    manager = PlaybackResourceManager()
+    assert manager.track(object()) is None
+
+
+@pytest.mark.asyncio
+async def test_seeking_releases_the_replaced_stream(monkeypatch):
+    import scripts.playback as playback
+    import scripts.seek as seek
+    from scripts.playback_resources import PlaybackResourceManager
+    manager = PlaybackResourceManager(max_threads=4)
+    manager.cpu_count = 8
+    monkeypatch.setattr(playback, 'playback_resources', manager)
+    processes = []
+
+    class FakeFFmpeg:
+        def __init__(self):
+            self._process = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+            processes.append(self._process)
+        def read(self):
+            return bytes(3840)
+        def is_opus(self):
+            return False
+        def cleanup(self):
+            # Leave the process running, so only release() can free its slot
+            pass
+
+    async def fake_create(path, use_volume_transformer=True, start=0, volume=None, guild_id=None):
+        return playback.MeteredAudioSource(FakeFFmpeg(), 'pcm')
+    monkeypatch.setattr(seek, 'create_audio_source', fake_create)
+    monkeypatch.setattr(seek, 'ensure_encoder', lambda voice_client, source: None)
+
+    try:
+        # The first seek replaces an untracked source, the rest swap inside the tracked one
+        player = types.SimpleNamespace(source=await fake_create('f'))
+        voice_client = types.SimpleNamespace(_player=player, guild=None)
+        for position in (10, 20, 30, 0, 5):
+            await seek.restart_at(voice_client, {'file_path': 'f'}, position)
+            assert manager.active_count == 1
+        assert manager.thread_count() == 4
+        player.source.cleanup()
+        assert manager.active_count == 0
+    finally:
+        for process in processes:
+            process.kill()
+            process.wait()
+
+
+def test_config_changes_apply_to_shared_manager(tmp_path, monkeypatch):
+    import json
+    import scripts.playback_resources as pr
+    from scripts.config import ConfigService
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'AUDIO': {'FFMPEG_MAX_THREADS': 3, 'FFMPEG_NICE': 5}}))
+    service = ConfigService(str(config_file))
+    monkeypatch.setattr(pr, 'config_service', service)
+    manager = pr.PlaybackResourceManager()
+    monkeypatch.setattr(pr, 'playback_resources', manager)
+    service.subscribe(pr._apply_config_change)
+    assert (manager.max_threads, manager.nice) == (3, 5)
+
+    config_file.write_text(json.dumps({'AUDIO': {'FFMPEG_MAX_THREADS': 1, 'FFMPEG_NICE': 0}}))
+    service.reload(force=True)
+    assert (manager.max_threads, manager.nice) == (1, 0)
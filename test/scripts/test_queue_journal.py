@@ -0,0 +1,124 @@
+import json
+
+
+def _song(i):
+    return {'title': f't{i}', 'url': f'u{i}', 'file_path': f'/downloads/{i:011d}.webm', 'is_stream': False}
+
+
+def _journal(tmp_path, **kwargs):
+    from scripts.queue_journal import QueueJournal
+    journal = QueueJournal(str(tmp_path), flush_interval=3600, **kwargs)
+    # Flushed explicitly by the tests
+    journal._ensure_writer = lambda: None
+    return journal
+
+
+def test_queue_changes_replay_after_restart(tmp_path):
+    from scripts.song_queue import SongQueue
+    journal = _journal(tmp_path)
+    queue = SongQueue()
+    assert journal.attach('1', queue) is None
+    queue.extend(_song(i) for i in range(5))
+    queue.popleft()
+    queue.move(0, 2)
+    queue.insert(1, _song(9))
+    journal.journals['1'].record('current', track=_song(0))
+    journal.journals['1'].record('position', seconds=42.0)
+    journal.flush()
+    expected = [s['title'] for s in queue]
+
+    # The next run keeps the previous queue as the saved session
+    saved = _journal(tmp_path).attach('1', SongQueue())
+    assert [record['title'] for _, record in saved['entries']] == expected
+    assert saved['current']['cache_key'] == '00000000000' and saved['position'] == 42.0
+    assert 'file_path' not in saved['current']
+
+
+def test_shuffle_and_clear_are_journaled(tmp_path):
+    from scripts.queue_journal import replay
+    from scripts.song_queue import SongQueue
+    journal = _journal(tmp_path)
+    queue = SongQueue()
+    journal.attach('1', queue)
+    queue.extend(_song(i) for i in range(6))
+    queue.shuffle()
+    journal.flush()
+    with open(journal.journals['1'].path) as f:
+        assert [r['title'] for _, r in replay(f)['entries']] == [s['title'] for s in queue]
+    queue.clear()
+    journal.flush()
+    with open(journal.journals['1'].path) as f:
+        assert replay(f)['entries'] == []
+
+
+def test_compaction_and_torn_line(tmp_path):
+    from scripts.queue_journal import replay
+    from scripts.song_queue import SongQueue
+    journal = _journal(tmp_path, compact_after=10)
+    queue = SongQueue()
+    journal.attach('1', queue)
+    for i in range(20):
+        queue.append(_song(i))
+        journal.flush()
+    path = journal.journals['1'].path
+    with open(path) as f:
+        lines = f.readlines()
+    assert len(lines) < 12 and json.loads(lines[0])['op'] == 'snapshot'
+
+    # A crash mid-write leaves a partial last line, which is ignored
+    with open(path, 'a') as f:
+        f.write('{"op": "clear"')
+    with open(path) as f:
+        assert len(replay(f)['entries']) == 20
+
+
+def test_restore_tracks_uses_cache(tmp_path):
+    from scripts.queue_journal import restore_tracks
+    from scripts.track import Track
+    saved = {
+        'current': Track.from_entry(_song(1)).to_record(),
+        'entries': [[1, Track.from_entry(_song(2)).to_record()],
+                    [2, Track.from_entry({'title': 'radio', 'url': 'r', 'file_path': 'http://r', 'is_stream': True}).to_record()]],
+        'position': 10,
+    }
+    cached = {'00000000001': str(tmp_path / '00000000001.opus')}
+    tracks = restore_tracks(saved, cached.get)
+    assert [t['title'] for t in tracks] == ['t1', 'radio']
+    assert tracks[0]['file_path'] == cached['00000000001'] and tracks[1]['file_path'] == 'http://r'
+
+
+def test_journal_settings_are_in_the_config():
+    from scripts.config import load_config
+    assert 'JOURNAL_FLUSH_INTERVAL' in load_config()['QUEUE']
+
+
+def test_empty_previous_session_replaces_stale_saved_one(tmp_path):
+    from scripts.song_queue import SongQueue
+    journal = _journal(tmp_path)
+    queue = SongQueue()
+    journal.attach('1', queue)
+    queue.append(_song(0))
+    journal.flush()
+    # Second run saves the queue, then plays it out and ends with an empty one
+    second = _journal(tmp_path)
+    queue = SongQueue()
+    assert second.attach('1', queue) is not None
+    queue.append(_song(1))
+    queue.popleft()
+    second.flush()
+    # Third run: the empty session is the last one, so nothing is offered
+    assert _journal(tmp_path).attach('1', SongQueue()) is None
+    assert not (tmp_path / '1.saved.json').exists()
+
+
+def test_idle_runs_keep_the_saved_session(tmp_path):
+    from scripts.song_queue import SongQueue
+    journal = _journal(tmp_path)
+    queue = SongQueue()
+    journal.attach('1', queue)
+    queue.append(_song(0))
+    journal.flush()
+    # Two restarts where the guild instance is created but nothing is queued
+    assert _journal(tmp_path).attach('1', SongQueue()) is not None
+    saved = _journal(tmp_path).attach('1', SongQueue())
+    assert [record['title'] for _, record in saved['entries']] == ['t0']
@@ -0,0 +1,42 @@
+def _song(i, url=None, duration=60):
+    return {'title': f't{i}', 'url': url or f'u{i}', 'file_path': f'/tmp/{i}.webm', 'duration': duration}
+
+
+def test_pages_are_memoized_until_queue_changes():
+    from scripts.queue_snapshot import get_snapshot
+    from scripts.song_queue import SongQueue
+    queue = SongQueue(_song(i) for i in range(5000))
+    cache = {}
+    snapshot = get_snapshot(cache, 1, queue, None, False, 10)
+    assert snapshot.total_pages == 500 and snapshot.total_songs == 5000
+    text = snapshot.page_text(250)
+    assert '`2491.` [t2490](u2490)' in text and '`2501.`' not in text
+    assert snapshot.page_text(250) is text
+    # Nothing changed, so the same snapshot is used
+    assert get_snapshot(cache, 1, queue, None, False, 10) is snapshot
+
+    queue.popleft()
+    fresh = get_snapshot(cache, 1, queue, None, False, 10)
+    assert fresh is not snapshot and '`2491.` [t2491](u2491)' in fresh.page_text(250)
+
+
+def test_looped_copies_are_hidden():
+    from scripts.queue_snapshot import get_snapshot
+    from scripts.song_queue import SongQueue
+    current = _song(0)
+    queue = SongQueue([_song(0), _song(1), _song(0)])
+    snapshot = get_snapshot({}, 1, queue, current, True, 10)
+    text = snapshot.page_text(1)
+    assert ':repeat:' in text and '`2.` [t1](u1)' in text and '`3.`' not in text
+    assert snapshot.queue_count == 1 and snapshot.total_duration == 120
+    assert 'Total in queue: 2' in snapshot.footer_text()
+
+
+def test_duration_update_invalidates_snapshot():
+    from scripts.queue_snapshot import get_snapshot
+    from scripts.song_queue import SongQueue
+    queue = SongQueue([_song(1, duration=None)])
+    cache = {}
+    snapshot = get_snapshot(cache, 1, queue, None, False, 10)
+    queue.set_duration(queue[0], 90)
+    assert get_snapshot(cache, 1, queue, None, False, 10).total_duration == 90
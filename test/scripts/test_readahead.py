@@ -0,0 +1,74 @@
+import time
+
+
+class FakeSource:
+    def __init__(self, frames, delay_after=None, delay=0):
+        self.frames = list(frames)
+        self.delay_after = delay_after
+        self.delay = delay
+        self.reads = 0
+        self.cleaned = False
+    def read(self):
+        self.reads += 1
+        if self.delay_after is not None and self.reads == self.delay_after:
+            time.sleep(self.delay)
+        return self.frames.pop(0) if self.frames else b''
+    def is_opus(self):
+        return False
+    def cleanup(self):
+        self.cleaned = True
+
+
+def wait_for(predicate, timeout=2):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_reads_ahead_up_to_depth_and_drains_in_order():
+    from scripts.readahead import ReadAheadAudioSource
+    inner = FakeSource([bytes([i]) for i in range(10)])
+    source = ReadAheadAudioSource(inner, depth=4)
+    assert wait_for(lambda: source.buffered == 4)
+    assert inner.reads == 4
+    out = []
+    while True:
+        data = source.read()
+        if not data:
+            break
+        out.append(data)
+    assert out == [bytes([i]) for i in range(10)]
+    source.cleanup()
+    assert inner.cleaned is True
+
+
+def test_slow_reads_count_underruns_per_guild():
+    from scripts.readahead import ReadAheadAudioSource, get_underruns
+    inner = FakeSource([b'a', b'b', b'c'], delay_after=2, delay=0.1)
+    source = ReadAheadAudioSource(inner, depth=1, guild_id=4242)
+    before = get_underruns(4242)
+    frames = [source.read() for _ in range(4)]
+    assert frames == [b'a', b'b', b'c', b'']
+    assert source.underruns >= 1
+    assert get_underruns('4242') == before + source.underruns
+
+
+def test_cleanup_stops_reader_thread():
+    from scripts.readahead import ReadAheadAudioSource
+    inner = FakeSource([b'x'] * 100)
+    source = ReadAheadAudioSource(inner, depth=2)
+    assert wait_for(lambda: source.buffered == 2)
+    source.cleanup()
+    source._thread.join(1)
+    assert not source._thread.is_alive()
+    assert source.read() == b''
+
+
+def test_disabled_read_ahead_returns_source():
+    from scripts.readahead import wrap_read_ahead, ReadAheadAudioSource
+    inner = FakeSource([])
+    assert wrap_read_ahead(inner, depth_ms=0) is inner
+    wrapped = wrap_read_ahead(inner, depth_ms=100)
+    assert isinstance(wrapped, ReadAheadAudioSource) and wrapped.depth == 5
+    wrapped.cleanup()
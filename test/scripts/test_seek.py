@@ -0,0 +1,93 @@
+import time
+import pytest
+
+
+class FakeSource:
+    def __init__(self, frames=100):
+        self.remaining = frames
+        self.cleaned = False
+    def read(self):
+        if self.remaining <= 0:
+            return b''
+        self.remaining -= 1
+        return b'x'
+    def is_opus(self):
+        return True
+    def cleanup(self):
+        self.cleaned = True
+
+
+def test_tracked_source_counts_frames_and_replaces():
+    from scripts.playback import TrackedAudioSource
+    first = FakeSource()
+    src = TrackedAudioSource(first)
+    for _ in range(50):
+        src.read()
+    assert src.position == pytest.approx(1.0)
+    second = FakeSource()
+    src.replace_source(second, offset=30)
+    assert first.cleaned is True
+    assert src.position == 30
+    src.read()
+    assert src.position == pytest.approx(30.02)
+
+
+def test_start_is_an_input_option():
+    from scripts.playback import _build_ffmpeg_options
+    options = _build_ffmpeg_options({'executable': 'ffmpeg', 'options': '-vn'}, 12)
+    assert options['before_options'] == '-ss 12.000'
+    assert '-ss' not in options['options']
+    assert 'before_options' not in _build_ffmpeg_options({'options': '-vn'}, 0)
+
+
+def test_position_ignores_wall_clock_for_tracked_sources():
+    from scripts.playback import TrackedAudioSource
+    from scripts.seek import get_playback_position
+    src = TrackedAudioSource(FakeSource(), offset=10)
+    vc = type('VC', (), {'_player': type('P', (), {'source': src})()})()
+    mb = type('MB', (), {'voice_client': vc, 'playback_start_time': time.time() - 500})()
+    # Paused for most of those 500 seconds: only frames count
+    assert get_playback_position(mb) == 10
+    mb.voice_client = None
+    assert get_playback_position(mb) == pytest.approx(500, abs=1)
+
+
+def test_parse_duration():
+    from scripts.seek import parse_duration
+    assert parse_duration('3:45') == 225
+    assert parse_duration('1:00:01') == 3601
+    assert parse_duration(200.7) == 200
+    assert parse_duration('bad') is None
+    assert parse_duration(None) is None
+
+
+@pytest.mark.asyncio
+async def test_seek_audio_swaps_source_at_new_position(monkeypatch):
+    import scripts.seek as seek
+    from scripts.playback import TrackedAudioSource
+    created = {}
+    async def fake_create(path, use_volume_transformer=True, is_stream=False, start=0, volume=None, guild_id=None):
+        created['start'] = start
+        return FakeSource()
+    monkeypatch.setattr(seek, 'create_audio_source', fake_create)
+
+    original = FakeSource(1000)
+    tracked = TrackedAudioSource(original)
+    for _ in range(250):  # 5 seconds played
+        tracked.read()
+    vc = type('VC', (), {'_player': type('P', (), {'source': tracked})()})()
+    ctx = type('C', (), {'voice_client': vc})()
+    mb = type('MB', (), {
+        'current_song': {'title': 't', 'url': 'u', 'file_path': 'f', 'duration': 60},
+        'voice_client': vc,
+        'playback_start_time': None,
+    })()
+
+    ok, message, position = await seek.seek_audio(ctx, mb, 10, 'forward')
+    assert ok and position == 15
+    assert created['start'] == 15
+    assert original.cleaned is True
+    assert tracked.position == 15
+
+    ok, message, position = await seek.seek_audio(ctx, mb, 100, 'forward')
+    assert not ok and 'beyond' in message
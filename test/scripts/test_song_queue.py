@@ -0,0 +1,109 @@
+import random
+from collections import Counter
+
+
+def _song(i, url=None, duration=10, requester=1):
+    return {'title': f't{i}', 'url': url or f'u{i}', 'file_path': f'/tmp/{i}.webm', 'duration': duration, 'requester': requester}
+
+
+def test_deque_operations():
+    from scripts.song_queue import SongQueue
+    q = SongQueue([_song(1), _song(2)])
+    q.append(_song(3))
+    q.appendleft(_song(0))
+    assert [s['title'] for s in q] == ['t0', 't1', 't2', 't3']
+    assert q[0]['title'] == 't0' and q[-1]['title'] == 't3'
+    assert q.popleft()['title'] == 't0'
+    assert q.pop(1)['title'] == 't2'
+    assert [s['title'] for s in q[0:5]] == ['t1', 't3']
+    q.clear()
+    assert not q and len(q) == 0
+
+
+def test_matches_list_under_random_operations():
+    from scripts.song_queue import SongQueue
+    rng = random.Random(7)
+    q, ref = SongQueue(), []
+    for i in range(2000):
+        op = rng.random()
+        song = _song(i, url=f'u{rng.randint(0, 9)}', duration=rng.choice([None, 10, 20]), requester=rng.randint(1, 3))
+        if op < 0.4:
+            q.append(song)
+            ref.append(song)
+        elif op < 0.55:
+            index = rng.randint(0, len(ref))
+            q.insert(index, song)
+            ref.insert(index, song)
+        elif op < 0.75 and ref:
+            index = rng.randrange(len(ref))
+            assert q.pop(index)['title'] == ref.pop(index)['title']
+        elif op < 0.85 and ref:
+            source, target = rng.randrange(len(ref)), rng.randrange(len(ref))
+            q.move(source, target)
+            ref.insert(target, ref.pop(source))
+        elif op < 0.9:
+            url = f'u{rng.randint(0, 9)}'
+            removed = q.remove_url(url)
+            kept = [s for s in ref if s['url'] != url]
+            assert removed == len(ref) - len(kept)
+            ref = kept
+        assert len(q) == len(ref)
+        if ref:
+            start = rng.randrange(len(ref))
+            assert [s['title'] for s in q.page(start, start + 10)] == [s['title'] for s in ref[start:start + 10]]
+            assert q.duration_before(start) == sum(s['duration'] or 0 for s in ref[:start])
+    assert [s['title'] for s in q] == [s['title'] for s in ref]
+    assert q.total_duration == sum(s['duration'] or 0 for s in ref)
+    assert q.requester_counts == dict(Counter(s['requester'] for s in ref))
+
+
+def test_stable_ids_and_url_index():
+    from scripts.song_queue import SongQueue
+    q = SongQueue(_song(i) for i in range(5))
+    song = q[3]
+    uid = q.id_of(song)
+    q.popleft()
+    q.appendleft(_song(9))
+    q.appendleft(_song(8))
+    assert q.position(uid) == 4
+    assert q.get(uid) is song
+    assert q.index(song) == 4
+    q.append(_song(10, url='u1'))
+    assert q.positions_of_url('u1') == [2, 6]
+    assert q.count_url('u1') == 2
+    assert q.remove_id(uid) is song
+    assert q.position(uid) is None
+
+
+def test_durations_and_requesters():
+    from scripts.song_queue import SongQueue
+    class User:
+        def __init__(self, id):
+            self.id = id
+    q = SongQueue([_song(0, requester=User(5)), _song(1, duration=None, requester=User(5)), dict(_song(2), is_stream=True, duration=None)])
+    unknown = q[1]
+    assert q.total_duration == 10
+    assert q.missing_durations() == [unknown]
+    q.set_duration(unknown, 30)
+    assert q.total_duration == 40 and not q.missing_durations()
+    assert q.requester_count(User(5)) == 2
+    q.shuffle()
+    assert q.total_duration == 40 and len(q) == 3
+
+
+def test_watch_head_reports_changes_at_the_front():
+    from scripts.song_queue import SongQueue
+    q = SongQueue([_song(1), _song(2)])
+    changes = []
+    q.watch_head(lambda: changes.append(q[0]['title'] if q else None))
+    q.append(_song(3))
+    q.move(2, 1)
+    assert changes == []
+    q.appendleft(_song(0))
+    q.popleft()
+    q.move(1, 0)
+    q.clear()
+    assert changes == ['t0', 't1', 't3', None]
+    q.watch_head(None)
+    q.append(_song(4))
+    assert len(changes) == 4
@@ -0,0 +1,126 @@
+import asyncio
+import types
+import pytest
+
+
+def test_pick_best_candidate_prefers_duration_and_title():
+    from scripts.spotify_match import pick_best_candidate, score_candidate
+
+    track = {'name': 'Blinding Lights', 'artists': [{'name': 'The Weeknd'}], 'duration_ms': 200000}
+    candidates = [
+        {'id': 'live0000000', 'title': 'The Weeknd - Blinding Lights (Live at the Grammys)', 'duration': 320},
+        {'id': 'official000', 'title': 'The Weeknd - Blinding Lights (Official Audio)', 'duration': 201},
+        {'id': 'cover000000', 'title': 'Blinding Lights cover', 'channel': 'Someone', 'duration': 199},
+    ]
+    best, confidence = pick_best_candidate(track, candidates)
+    assert best['id'] == 'official000'
+    assert 0.9 < confidence <= 1.0
+    assert score_candidate(track, candidates[2]) < confidence
+
+    # An ISRC on a candidate is a definitive match
+    track['isrc'] = 'USUG11904206'
+    candidates[0]['description'] = 'Provided to YouTube... ISRC: USUG11904206'
+    best, confidence = pick_best_candidate(track, candidates)
+    assert best['id'] == 'live0000000' and confidence == 1.0
+
+
+@pytest.mark.asyncio
+async def test_resolve_spotify_track_reuses_match_index(monkeypatch):
+    import scripts.handle_spotify as hs
+    from scripts import caching as caching
+    import yt_dlp
+
+    matches = {}
+    monkeypatch.setattr(caching.playlist_cache, 'get_spotify_match', lambda tid: matches.get(tid))
+    monkeypatch.setattr(caching.playlist_cache, 'add_spotify_match',
+                        lambda tid, vid, conf=None: matches.__setitem__(tid, {'video_id': vid, 'confidence': conf}))
+    monkeypatch.setattr(caching.playlist_cache, 'is_blacklisted', lambda vid: False)
+
+    searches = []
+
+    class FakeYDL:
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def extract_info(self, query, download=False):
+            searches.append(query)
+            return {'entries': [
+                {'id': 'wrongwrong0', 'title': 'Unrelated video', 'duration': 600},
+                {'id': 'rightright0', 'title': 'Artist - Song', 'duration': 180},
+            ]}
+    monkeypatch.setattr(yt_dlp, 'YoutubeDL', lambda opts: FakeYDL())
+
+    mb = hs.SpotifyHandler()
+    track = {'id': 'sp1', 'name': 'Song', 'artists': [{'name': 'Artist'}], 'duration_ms': 181000}
+    url = await mb._resolve_spotify_track(track)
+    assert url.endswith('rightright0')
+    assert matches['sp1']['video_id'] == 'rightright0'
+    assert len(searches) == 1
+
+    # Second resolution (e.g. after the file was evicted) skips the search
+    url = await mb._resolve_spotify_track(track)
+    assert url.endswith('rightright0')
+    assert len(searches) == 1
+
+
+def _fake_search(monkeypatch, entries, searches):
+    import yt_dlp
+
+    class FakeYDL:
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def extract_info(self, query, download=False):
+            searches.append(query)
+            return {'entries': entries}
+    monkeypatch.setattr(yt_dlp, 'YoutubeDL', lambda opts: FakeYDL())
+
+
+@pytest.mark.asyncio
+async def test_weak_match_is_not_remembered(monkeypatch):
+    import scripts.handle_spotify as hs
+    from scripts import caching as caching
+
+    matches = {}
+    monkeypatch.setattr(caching.playlist_cache, 'get_spotify_match', lambda tid: matches.get(tid))
+    monkeypatch.setattr(caching.playlist_cache, 'add_spotify_match',
+                        lambda tid, vid, conf=None: matches.__setitem__(tid, {'video_id': vid, 'confidence': conf}))
+    monkeypatch.setattr(caching.playlist_cache, 'is_blacklisted', lambda vid: False)
+    searches = []
+    _fake_search(monkeypatch, [{'id': 'wrongwrong0', 'title': 'Unrelated video', 'duration': 600}], searches)
+
+    mb = hs.SpotifyHandler()
+    track = {'id': 'sp1', 'name': 'Song', 'artists': [{'name': 'Artist'}], 'duration_ms': 181000}
+    assert (await mb._resolve_spotify_track(track)).endswith('wrongwrong0')
+    assert matches == {}
+    # Searched again instead of being stuck with the weak match
+    await mb._resolve_spotify_track(track)
+    assert len(searches) == 2
+
+    # A weak match recorded before the threshold existed is not reused either
+    matches['sp1'] = {'video_id': 'wrongwrong0', 'confidence': 0.1}
+    await mb._resolve_spotify_track(track)
+    assert len(searches) == 3
+
+    # Lowering the threshold lets the same match be remembered
+    monkeypatch.setattr(hs, '_match_min_score', lambda: 0.0)
+    await mb._resolve_spotify_track(track)
+    assert matches['sp1']['video_id'] == 'wrongwrong0'
+
+
+@pytest.mark.asyncio
+async def test_fallback_result_skips_blacklisted(monkeypatch):
+    import scripts.handle_spotify as hs
+    from scripts import caching as caching
+
+    monkeypatch.setattr(caching.playlist_cache, 'get_spotify_match', lambda tid: None)
+    monkeypatch.setattr(caching.playlist_cache, 'is_blacklisted', lambda vid: vid == 'blocked0000')
+    searches = []
+    # Results without a video ID can't be scored
+    _fake_search(monkeypatch, [{'id': 'blocked0000', 'url': 'https://blocked'}], searches)
+
+    mb = hs.SpotifyHandler()
+    track = {'id': 'sp2', 'name': 'Song', 'artists': [{'name': 'Artist'}]}
+    assert await mb._resolve_spotify_track(track) is None
@@ -38,7 +38,11 @@ async def test_spotify_process_tracks_cached_and_uncached(monkeypatch, stub_ctx)
             self.queue_lock = asyncio.Lock()
             self.is_playing = False
             self.voice_client = type('VC', (), {'is_playing': lambda self: False})()
-        async def download_song(self, query, status_msg=None, ctx=None, spotify_info=None):
+        def _track_download_task(self, coro):
+            return asyncio.ensure_future(coro)
+        async def _resolve_spotify_track(self, track):
+            return f"https://www.youtube.com/watch?v={track['id']}"
+        async def download_song(self, query, status_msg=None, ctx=None, skip_url_check=False, spotify_info=None):
             # Track the call to verify uncached tracks are processed
             download_calls.append(spotify_info.get('track_id') if spotify_info else None)
             return {'title': 'DL', 'url': 'http://yt', 'file_path': __file__, 'thumbnail': None}
@@ -59,4 +63,119 @@ async def test_spotify_process_tracks_cached_and_uncached(monkeypatch, stub_ctx)
     assert len(mb.queue) == 2
     # Uncached track was processed via download_song
     assert 'u1' in download_calls
-    assert calls['proc'] >= 1
\ No newline at end of file
+    assert calls['proc'] >= 1
+
+
+@pytest.mark.asyncio
+async def test_spotify_process_tracks_keeps_playlist_order(monkeypatch, stub_ctx):
+    import scripts.handle_spotify as hs
+    from scripts import caching as caching
+    import asyncio
+
+    caching.playlist_cache._should_continue_check = True
+    monkeypatch.setattr(caching.playlist_cache, '_save_cache', lambda: None)
+    monkeypatch.setattr(caching.playlist_cache, 'get_cached_spotify_track', lambda tid: None)
+
+    async def fake_duration(fp):
+        return 1.0
+    monkeypatch.setattr(hs, 'get_audio_duration', fake_duration)
+    async def fake_process_queue(music_bot):
+        return None
+    monkeypatch.setattr(hs, 'process_queue', fake_process_queue)
+
+    # Later tracks finish first; searches for all tracks overlap
+    delays = {'a': 0.05, 'b': 0.02, 'c': 0.0}
+    active = {'now': 0, 'max': 0}
+
+    class MB(hs.SpotifyHandler):
+        def __init__(self):
+            self.queue = []
+            self.queue_lock = asyncio.Lock()
+            self.is_playing = True
+            self.voice_client = type('VC', (), {'is_playing': lambda self: True})()
+        def _track_download_task(self, coro):
+            return asyncio.ensure_future(coro)
+        async def _resolve_spotify_track(self, track):
+            active['now'] += 1
+            active['max'] = max(active['max'], active['now'])
+            await asyncio.sleep(delays[track['id']])
+            active['now'] -= 1
+            return track['id']
+        async def download_song(self, query, status_msg=None, ctx=None, skip_url_check=False, spotify_info=None):
+            return {'title': query, 'url': query, 'file_path': __file__, 'thumbnail': None}
+
+    mb = MB()
+    tracks = [{'id': tid, 'name': tid, 'artists': [{'name': 'A'}]} for tid in ('a', 'b', 'c')]
+    await mb._process_spotify_tracks(tracks, stub_ctx, status_msg=None, source_name='Playlist')
+
+    assert [song['title'] for song in mb.queue] == ['a', 'b', 'c']
+    assert active['max'] > 1
+
+
+@pytest.mark.asyncio
+async def test_spotify_process_tracks_bounds_tasks_in_flight(monkeypatch, stub_ctx):
+    import scripts.handle_spotify as hs
+    from scripts import caching as caching
+    import asyncio
+
+    caching.playlist_cache._should_continue_check = True
+    monkeypatch.setattr(caching.playlist_cache, '_save_cache', lambda: None)
+    monkeypatch.setattr(caching.playlist_cache, 'get_cached_spotify_track', lambda tid: None)
+    monkeypatch.setattr(hs, '_track_window', lambda: 3)
+    async def fake_duration(fp):
+        return 1.0
+    monkeypatch.setattr(hs, 'get_audio_duration', fake_duration)
+    async def fake_process_queue(music_bot):
+        return None
+    monkeypatch.setattr(hs, 'process_queue', fake_process_queue)
+
+    started = []
+
+    class MB(hs.SpotifyHandler):
+        def __init__(self):
+            self.queue = []
+            self.queue_lock = asyncio.Lock()
+            self.is_playing = True
+            self.voice_client = type('VC', (), {'is_playing': lambda self: True})()
+            self.tasks = []
+        def _track_download_task(self, coro):
+            task = asyncio.ensure_future(coro)
+            self.tasks.append(task)
+            return task
+        async def _resolve_spotify_track(self, track):
+            return track['id']
+        async def download_song(self, query, status_msg=None, ctx=None, skip_url_check=False, spotify_info=None):
+            started.append(query)
+            await asyncio.sleep(0)
+            return {'title': query, 'url': query, 'file_path': __file__, 'thumbnail': None}
+
+    mb = MB()
+    tracks = [{'id': str(i), 'name': str(i), 'artists': [{'name': 'A'}]} for i in range(50)]
+    processing = asyncio.ensure_future(mb._process_spotify_tracks(tracks, stub_ctx, status_msg=None, source_name='Playlist'))
+    await asyncio.sleep(0)
+    # Tasks are created as the window moves, not one per track up front
+    assert len(mb.tasks) <= 3
+    await processing
+    assert [song['title'] for song in mb.queue] == [str(i) for i in range(50)]
+
+
+def test_spotify_limits_follow_config_changes(tmp_path, monkeypatch):
+    import json
+    import scripts.handle_spotify as hs
+    from scripts.config import ConfigService
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'DOWNLOADS': {'SPOTIFY_RESOLVE_CONCURRENCY': 2, 'CONCURRENT_DOWNLOADS': 1}}))
+    service = ConfigService(str(config_file))
+    monkeypatch.setattr(hs, 'config_service', service)
+    monkeypatch.setattr(hs, '_semaphores', {})
+
+    resolve = hs._get_resolve_semaphore()
+    assert hs._get_resolve_semaphore() is resolve and resolve._value == 2
+    assert hs._track_window() == 3
+
+    # A new limit gets a new semaphore without a restart
+    config_file.write_text(json.dumps({'DOWNLOADS': {'SPOTIFY_RESOLVE_CONCURRENCY': 5, 'CONCURRENT_DOWNLOADS': 3}}))
+    service.reload(force=True)
+    assert hs._get_resolve_semaphore()._value == 5
+    assert hs._get_download_semaphore()._value == 3
+    assert hs._track_window() == 8
@@ -0,0 +1,74 @@
+import os
+import stat
+
+
+def _make_tool(directory, name):
+    path = directory / name
+    path.write_text('#!/bin/sh\necho 1.0\n')
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return path
+
+
+def test_probe_is_cached_across_instances(tmp_path, monkeypatch):
+    from scripts.tool_cache import ToolProbeCache
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    _make_tool(bin_dir, 'faketool')
+    monkeypatch.setenv('PATH', str(bin_dir))
+    cache_file = str(tmp_path / 'tool_probes.json')
+    calls = []
+
+    def probe():
+        calls.append(1)
+        return ['faketool', '1.0']
+
+    assert ToolProbeCache(cache_file, revalidate=False).get('faketool', probe, ['faketool']) == ['faketool', '1.0']
+    # A new process reuses the result without probing
+    assert ToolProbeCache(cache_file, revalidate=False).get('faketool', probe, ['faketool']) == ['faketool', '1.0']
+    assert len(calls) == 1
+
+
+def test_probe_reruns_when_executable_or_path_changes(tmp_path, monkeypatch):
+    from scripts.tool_cache import ToolProbeCache
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    tool = _make_tool(bin_dir, 'faketool')
+    monkeypatch.setenv('PATH', str(bin_dir))
+    cache_file = str(tmp_path / 'tool_probes.json')
+    calls = []
+
+    def probe():
+        calls.append(1)
+        return len(calls)
+
+    assert ToolProbeCache(cache_file, revalidate=False).get('faketool', probe, ['faketool']) == 1
+    os.utime(tool, (1, 1))
+    assert ToolProbeCache(cache_file, revalidate=False).get('faketool', probe, ['faketool']) == 2
+    monkeypatch.setenv('PATH', str(bin_dir) + os.pathsep + str(tmp_path))
+    assert ToolProbeCache(cache_file, revalidate=False).get('faketool', probe, ['faketool']) == 3
+
+
+def test_cache_hit_revalidates_in_background(tmp_path, monkeypatch):
+    import json
+    from scripts.tool_cache import ToolProbeCache
+    monkeypatch.setenv('PATH', str(tmp_path))
+    cache_file = str(tmp_path / 'tool_probes.json')
+    ToolProbeCache(cache_file, revalidate=False).get('missing', lambda: 'old', ['missingtool'])
+
+    cache = ToolProbeCache(cache_file)
+    assert cache.get('missing', lambda: 'new', ['missingtool']) == 'old'
+    for thread in __import__('threading').enumerate():
+        if thread.name == 'tool-probe-missing':
+            thread.join(5)
+    with open(cache_file) as f:
+        assert json.load(f)['missing']['value'] == 'new'
+
+
+def test_startup_timer_records_phases():
+    from scripts.startup_timing import StartupTimer
+    timer = StartupTimer()
+    with timer.phase('tools'):
+        pass
+    timer.record('login', 0.25)
+    assert [name for name, _ in timer.phases] == ['tools', 'login']
+    assert timer.phases[1][1] == 0.25
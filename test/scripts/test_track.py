@@ -0,0 +1,98 @@
+import gc
+import pytest
+
+
+class Obj:
+    def __init__(self, id, **attrs):
+        self.id = id
+        self.__dict__.update(attrs)
+
+
+class FakeChannel(Obj):
+    async def send(self, *args, **kwargs):
+        self.sent = kwargs
+        return 'message'
+
+
+class FakeGuild(Obj):
+    def __init__(self, id, channel, member):
+        super().__init__(id, voice_client='vc')
+        self._channel = channel
+        self._member = member
+
+    def get_channel_or_thread(self, channel_id):
+        return self._channel if channel_id == self._channel.id else None
+
+    def get_member(self, member_id):
+        return self._member if member_id == self._member.id else None
+
+
+class FakeClient:
+    def __init__(self, guild):
+        self.guild = guild
+
+    def get_guild(self, guild_id):
+        return self.guild if guild_id == self.guild.id else None
+
+    def get_channel(self, channel_id):
+        return None
+
+    def get_user(self, user_id):
+        return None
+
+
+class FakeContext:
+    def __init__(self, guild, channel, author):
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+
+
+def test_track_behaves_like_song_dict():
+    from scripts.track import Track
+    track = Track(title='t', url='u', file_path='/downloads/abcdefghijk.webm', is_stream=False, position=3)
+    assert track['title'] == 't' and track.get('thumbnail') is None
+    assert 'thumbnail' not in track and 'title' in track
+    assert track['position'] == 3
+    assert track.cache_key == 'abcdefghijk'
+    track['duration'] = 12.5
+    copy = track.copy()
+    copy['title'] = 'other'
+    assert track['title'] == 't' and copy['duration'] == 12.5
+    assert set(track) == {'title', 'url', 'file_path', 'is_stream', 'duration', 'position'}
+
+
+@pytest.mark.asyncio
+async def test_track_rebuilds_context_from_ids(monkeypatch):
+    import scripts.track as track_module
+    from scripts.track import Track, TrackContext
+    member = Obj(7, display_name='user')
+    channel = FakeChannel(2)
+    guild = FakeGuild(1, channel, member)
+    monkeypatch.setattr(track_module, '_client', FakeClient(guild))
+
+    ctx = FakeContext(guild, channel, member)
+    track = Track(title='t', url='u', ctx=ctx, requester=member)
+    # While the command's context is alive it is returned as is
+    assert track['ctx'] is ctx
+    assert (track.guild_id, track.channel_id, track.requester_id) == (1, 2, 7)
+
+    del ctx
+    gc.collect()
+    rebuilt = track['ctx']
+    assert isinstance(rebuilt, TrackContext)
+    assert rebuilt.guild is guild and rebuilt.channel is channel and rebuilt.author is member
+    assert rebuilt.voice_client == 'vc'
+    assert await rebuilt.send(embed='e') == 'message'
+    assert track['requester'] is member
+
+
+def test_queue_stores_tracks():
+    from scripts.song_queue import SongQueue
+    from scripts.track import Track
+    queue = SongQueue()
+    queue.append({'title': 't', 'url': 'u', 'file_path': '/downloads/x.webm'})
+    assert isinstance(queue[0], Track)
+    track = queue.popleft()
+    queue.appendleft(track)
+    assert queue[0] is track
@@ -0,0 +1,136 @@
+import os
+import pytest
+
+
+@pytest.fixture
+def fake_cache(monkeypatch, tmp_path):
+    import scripts.transcode as tc
+    original = tmp_path / 'abcdefghijk.m4a'
+    original.write_bytes(b'a' * 2048)
+    state = {'path': str(original), 'loudness': None}
+    monkeypatch.setattr(tc.playlist_cache, 'get_cached_file', lambda vid: state['path'] if os.path.exists(state['path']) else None)
+    monkeypatch.setattr(tc.playlist_cache, 'get_loudness', lambda vid: state['loudness'])
+    monkeypatch.setattr(tc.playlist_cache, 'set_loudness',
+                        lambda vid, i, tp: state.update(loudness={'integrated': i, 'true_peak': tp}))
+    monkeypatch.setattr(tc.playlist_cache, 'replace_cached_file', lambda vid, path: state.update(path=path))
+    return state
+
+
+@pytest.mark.asyncio
+async def test_ingest_bakes_gain_and_repoints_cache(monkeypatch, fake_cache):
+    import scripts.transcode as tc
+    monkeypatch.setattr(tc, 'normalization_enabled', lambda: True)
+    monkeypatch.setattr(tc, 'transcode_enabled', lambda: True)
+    async def fake_measure(path):
+        return {'integrated': -20.0, 'true_peak': -8.0}
+    async def fake_info(path):
+        return {'codec_name': 'aac', 'sample_rate': 44100, 'channels': 2}
+    calls = []
+    async def fake_transcode(source, target, gain_db=0.0):
+        calls.append(gain_db)
+        with open(target, 'wb') as f:
+            f.write(b'o' * 1024)
+        return True
+    monkeypatch.setattr(tc, 'measure_loudness', fake_measure)
+    monkeypatch.setattr(tc, 'compute_gain', lambda loudness: 6.0)
+    monkeypatch.setattr(tc, 'get_audio_stream_info', fake_info)
+    monkeypatch.setattr(tc, 'transcode_to_opus', fake_transcode)
+
+    transcoder = tc.IngestTranscoder()
+    original = fake_cache['path']
+    target = await transcoder.ingest('abcdefghijk')
+
+    assert target.endswith('abcdefghijk.opus') and fake_cache['path'] == target
+    assert calls == [6.0]
+    assert not os.path.exists(original)
+    # The gain is part of the file now, so the stored loudness is the target
+    assert fake_cache['loudness'] == {'integrated': -14.0, 'true_peak': -2.0}
+    # Queued songs that still point at the original resolve to the new file
+    assert transcoder.resolve(original) == target
+    assert transcoder.resolve('/other/file.webm') == '/other/file.webm'
+
+
+@pytest.mark.asyncio
+async def test_ingest_skips_files_that_are_already_opus(monkeypatch, fake_cache):
+    import scripts.transcode as tc
+    monkeypatch.setattr(tc, 'normalization_enabled', lambda: False)
+    async def fake_info(path):
+        return {'codec_name': 'opus', 'sample_rate': 48000, 'channels': 2}
+    async def fail_transcode(*args, **kwargs):
+        raise AssertionError('should not transcode')
+    monkeypatch.setattr(tc, 'get_audio_stream_info', fake_info)
+    monkeypatch.setattr(tc, 'transcode_to_opus', fail_transcode)
+    assert await tc.IngestTranscoder().ingest('abcdefghijk') is None
+
+
+def test_schedule_follows_transcode_and_normalization_settings(tmp_path, monkeypatch):
+    import json
+    import scripts.transcode as tc
+    import scripts.loudness as ld
+    from scripts.config import ConfigService
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'AUDIO': {'TRANSCODE_ON_INGEST': False, 'LOUDNESS_NORMALIZATION': False}}))
+    service = ConfigService(str(config_file))
+    monkeypatch.setattr(tc, 'config_service', service)
+    monkeypatch.setattr(ld, 'config_service', service)
+    transcoder = tc.IngestTranscoder()
+    transcoder.schedule('abcdefghijk')
+    assert not transcoder._pending
+
+    # Normalization alone still goes through the ingest, which may bake the gain in
+    config_file.write_text(json.dumps({'AUDIO': {'TRANSCODE_ON_INGEST': False, 'LOUDNESS_NORMALIZATION': True}}))
+    service.reload(force=True)
+    transcoder.schedule('abcdefghijk')
+    assert list(transcoder._pending) == ['abcdefghijk']
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('codec, gain, baked', [
+    ('opus', 5.0, True),    # Passthrough can't apply the gain, so it is baked in
+    ('opus', 0.5, False),   # Close enough to play as is
+    ('aac', 6.0, False),    # Decoded at play time anyway
+])
+async def test_default_config_bakes_gain_into_opus_files(monkeypatch, fake_cache, codec, gain, baked):
+    import scripts.transcode as tc
+    monkeypatch.setattr(tc, 'normalization_enabled', lambda: True)
+    monkeypatch.setattr(tc, 'transcode_enabled', lambda: False)
+    async def fake_measure(path):
+        return {'integrated': -20.0, 'true_peak': -8.0}
+    async def fake_info(path):
+        return {'codec_name': codec, 'sample_rate': 48000 if codec == 'opus' else 44100, 'channels': 2}
+    calls = []
+    async def fake_transcode(source, target, gain_db=0.0):
+        calls.append(gain_db)
+        with open(target, 'wb') as f:
+            f.write(b'o' * 1024)
+        return True
+    monkeypatch.setattr(tc, 'measure_loudness', fake_measure)
+    monkeypatch.setattr(tc, 'compute_gain', lambda loudness: gain)
+    monkeypatch.setattr(tc, 'get_audio_stream_info', fake_info)
+    monkeypatch.setattr(tc, 'transcode_to_opus', fake_transcode)
+
+    target = await tc.IngestTranscoder().ingest('abcdefghijk')
+
+    assert calls == ([gain] if baked else [])
+    assert (target is not None) == baked
+    # The stored loudness is what plays: shifted by the gain only once it is part of the file
+    expected = -20.0 + gain if baked else -20.0
+    assert fake_cache['loudness']['integrated'] == pytest.approx(expected)
+
+
+@pytest.mark.asyncio
+async def test_scan_queues_unmeasured_and_unbaked_videos(monkeypatch):
+    import scripts.transcode as tc
+    loudness = {'new': None, 'loud': {'integrated': -8.0, 'true_peak': -0.5}, 'done': {'integrated': -14.0, 'true_peak': -2.0}}
+    async def imported():
+        return None
+    monkeypatch.setattr(tc.playlist_cache, 'ensure_cache_imported', imported)
+    monkeypatch.setattr(tc.playlist_cache, 'cache', dict.fromkeys(loudness))
+    monkeypatch.setattr(tc.playlist_cache, 'get_loudness', loudness.get)
+    monkeypatch.setattr(tc, 'normalization_enabled', lambda: True)
+    monkeypatch.setattr(tc, 'compute_gain', lambda entry: -14.0 - entry['integrated'])
+    transcoder = tc.IngestTranscoder()
+    scheduled = []
+    monkeypatch.setattr(transcoder, 'schedule', scheduled.append)
+    assert await transcoder.scan_cache() == 2
+    assert scheduled == ['new', 'loud']
@@ -0,0 +1,54 @@
+import pytest
+
+
+class FakeSource:
+    def __init__(self, frames):
+        self.frames = frames
+    def read(self):
+        if self.frames <= 0:
+            return b''
+        self.frames -= 1
+        return b'x'
+    def is_opus(self):
+        return True
+    def cleanup(self):
+        pass
+
+
+def test_frames_are_timed_into_guild_metrics(monkeypatch):
+    import scripts.voice_metrics as vm
+    from scripts.playback import TrackedAudioSource
+    registry = vm.VoiceMetrics()
+    metrics = registry.get(77)
+    registry.mark_play_requested(77)
+    source = TrackedAudioSource(FakeSource(5), metrics=metrics)
+    while source.read():
+        pass
+
+    snapshot = registry.snapshot(77)
+    assert snapshot['frames'] == 5
+    assert snapshot['read_latency_ms']['count'] == 5
+    assert snapshot['jitter_ms']['count'] == 4
+    # Only the first frame after play_next counts towards start latency
+    assert snapshot['start_latency_ms']['count'] == 1
+    assert '77' in registry.snapshot()
+    assert registry.snapshot(123) == {}
+
+
+def test_jitter_ignores_pauses():
+    import scripts.voice_metrics as vm
+    metrics = vm.GuildVoiceMetrics('1')
+    metrics.on_frame(0.0, 0.001)
+    metrics.on_frame(0.025, 0.001)
+    metrics.on_frame(5.0, 0.001)
+    assert list(metrics.jitter) == [pytest.approx(5.0)]
+
+
+def test_summary_percentiles():
+    from scripts.voice_metrics import _summarize
+    summary = _summarize(range(1, 101))
+    assert summary['count'] == 100
+    assert summary['avg'] == pytest.approx(50.5)
+    assert summary['p95'] == 96
+    assert summary['max'] == 100
+    assert _summarize([])['count'] == 0
@@ -0,0 +1,69 @@
+from array import array
+
+
+class FakeSource:
+    def __init__(self, frame, opus=False):
+        self.frame = frame
+        self.opus = opus
+    def read(self):
+        return self.frame
+    def is_opus(self):
+        return self.opus
+    def cleanup(self):
+        pass
+
+
+def test_apply_gain_scales_and_clips():
+    from scripts.volume import apply_gain
+    frame = array('h', [1000, -1000, 30000, -30000]).tobytes()
+    assert apply_gain(frame, 1.0) is frame
+    assert list(array('h', apply_gain(frame, 0.5))) == [500, -500, 15000, -15000]
+    assert list(array('h', apply_gain(frame, 2.0))) == [2000, -2000, 32767, -32768]
+
+
+def test_volume_store_persists(tmp_path):
+    from scripts.kvstore import KVStore
+    from scripts.volume import VolumeStore, default_volume, max_volume
+    path = str(tmp_path / 'state.db')
+    legacy = str(tmp_path / 'volumes.json')
+    state = KVStore(path)
+    store = VolumeStore(state, legacy)
+    assert store.get(1) == default_volume()
+    assert store.set(1, 50) == 50
+    assert store.set(2, 10_000) == max_volume()
+    state.close()
+    assert VolumeStore(KVStore(path), legacy).get(1) == 50
+
+
+def test_volumes_file_is_migrated(tmp_path):
+    import json
+    from scripts.kvstore import KVStore
+    from scripts.volume import VolumeStore
+    legacy = tmp_path / 'volumes.json'
+    legacy.write_text(json.dumps({'1': 30, '2': 'loud'}))
+    state = KVStore(str(tmp_path / 'state.db'))
+    store = VolumeStore(state, str(legacy))
+    assert store.get(1) == 30
+    assert state.items('volumes')['1'] == 30
+    assert not legacy.exists()
+    state.close()
+
+
+def test_tracked_source_applies_volume_live():
+    from scripts.playback import TrackedAudioSource
+    frame = array('h', [1000, -1000]).tobytes()
+    tracked = TrackedAudioSource(FakeSource(frame), volume=0.5)
+    assert list(array('h', tracked.read())) == [500, -500]
+    tracked.volume = 1.0
+    assert tracked.read() == frame
+    # Opus packets are passed through untouched
+    tracked.replace_source(FakeSource(b'opus', opus=True))
+    tracked.volume = 0.5
+    assert tracked.read() == b'opus'
+
+
+def test_benchmark_reports_both_paths():
+    from scripts.volume import benchmark_gain_stage
+    result = benchmark_gain_stage(frames=50)
+    assert result['gain_stage_us'] > 0
+    assert result['pcm_volume_transformer_us'] > 0
@@ -23,4 +23,60 @@ async def test_load_config_keys(monkeypatch):
 
     # Verify FFMPEG_OPTIONS contains executable and options
     assert 'executable' in cfg.FFMPEG_OPTIONS
-    assert isinstance(cfg.FFMPEG_OPTIONS['options'], str)
\ No newline at end of file
+    assert isinstance(cfg.FFMPEG_OPTIONS['options'], str)
+
+def _write_config(path, **values):
+    import json
+    path.write_text(json.dumps(values))
+
+
+def test_config_service_reloads_on_change(tmp_path):
+    import os
+    from scripts.config import ConfigService
+    config_file = tmp_path / 'config.json'
+    _write_config(config_file, PREFIX='?', QUEUE={'PAGE_SIZE': '25'})
+    service = ConfigService(str(config_file))
+    changes = []
+    service.subscribe(lambda new, old: changes.append((new['PREFIX'], old['PREFIX'])))
+
+    config = service.get()
+    assert config['PREFIX'] == '?' and 'VOICE' in config
+    # Missing keys were filled in from the defaults
+    assert service.get_int('QUEUE.PAGE_SIZE') == 25 and service.get_int('QUEUE.DEFAULT_SKIP_AMOUNT') == 1
+    assert service.get() is config
+    assert not service.reload()
+
+    _write_config(config_file, PREFIX='$')
+    os.utime(config_file, (1, 1))
+    assert service.reload()
+    assert service.get()['PREFIX'] == '$' and changes == [('$', '?')]
+
+
+def test_config_service_typed_accessors(tmp_path):
+    from scripts.config import ConfigService
+    config_file = tmp_path / 'config.json'
+    _write_config(config_file, AUTO_UPDATE='false', VOICE={'DEFAULT_VOLUME': 'loud'})
+    service = ConfigService(str(config_file))
+    assert service.get_bool('AUTO_UPDATE', True) is False
+    assert service.get_int('VOICE.DEFAULT_VOLUME', 100) == 100
+    assert service.get_float('VOICE.CONNECT_TIMEOUT') == 10.0
+    assert service.get_list('SPONSORBLOCK_CATEGORIES')[0] == 'sponsor'
+    assert service.value('MISSING.KEY', 'x') == 'x'
+    assert service.section('QUEUE')['PAGE_SIZE'] == 10
+
+
+def test_config_change_updates_options():
+    from scripts.config import _apply_config_change, BASE_YTDL_OPTIONS, FFMPEG_OPTIONS, config_vars
+    import copy
+    old = copy.deepcopy(config_vars)
+    new = copy.deepcopy(config_vars)
+    new['DOWNLOADS']['SOCKET_TIMEOUT'] = 42
+    new['AUDIO']['FFMPEG_BITRATE'] = '128k'
+    new['SPONSORBLOCK'] = True
+    try:
+        _apply_config_change(new, old)
+        assert BASE_YTDL_OPTIONS['socket_timeout'] == 42 and 'sponsorblock_remove' in BASE_YTDL_OPTIONS
+        assert '-b:a 128k' in FFMPEG_OPTIONS['options']
+    finally:
+        _apply_config_change(old, new)
+    assert 'sponsorblock_remove' not in BASE_YTDL_OPTIONS or old.get('SPONSORBLOCK')
@@ -30,7 +30,7 @@ async def test_check_inactivity_disconnect(monkeypatch):
             self.currently_downloading = False
             self.in_progress_downloads = {}
             self.current_download_task = None
-            self.current_ydl = None
+            self.active_ydls = set()
             self.waiting_for_song = False
             self.last_activity = time.time() - 1000
             self.inactivity_timeout = 1
@@ -65,4 +65,54 @@ def test_musicbot_progress_bar():
     m = mb.MusicBot.get_instance('E')
     bar = m.create_progress_bar(50)
     assert "50%" in bar
-    assert '[' in bar and ']' in bar
\ No newline at end of file
+    assert '[' in bar and ']' in bar
+
+@pytest.mark.asyncio
+async def test_musicbot_cancel_downloads_cancels_every_download(monkeypatch):
+    import asyncio
+    import scripts.musicbot as mb
+    m = mb.MusicBot.get_instance('E')
+    monkeypatch.setattr(asyncio, 'sleep', lambda s, _sleep=asyncio.sleep: _sleep(0))
+
+    async def download():
+        await asyncio.Event().wait()
+    # Parallel Spotify downloads each replace current_download_task
+    tasks = [m._track_download_task(download()) for _ in range(3)]
+    m.current_download_task = tasks[-1]
+    await asyncio.sleep(0)
+
+    await m.cancel_downloads(disconnect_voice=False)
+    assert all(task.cancelled() for task in tasks)
+    assert not m.download_tasks
+
+
+@pytest.mark.asyncio
+async def test_musicbot_cancel_downloads_closes_every_ytdlp_instance(monkeypatch):
+    import asyncio
+    import scripts.musicbot as mb
+    m = mb.MusicBot.get_instance('E')
+    monkeypatch.setattr(asyncio, 'sleep', lambda s, _sleep=asyncio.sleep: _sleep(0))
+
+    class FakeYDL:
+        def __init__(self):
+            self.closed = False
+            self._download_retcode = 0
+        def close(self):
+            self.closed = True
+
+    ydls = [FakeYDL() for _ in range(3)]
+    async def download(ydl):
+        # Same bookkeeping as download_song's extraction
+        try:
+            m.active_ydls.add(ydl)
+            await asyncio.Event().wait()
+        finally:
+            m.active_ydls.discard(ydl)
+    for ydl in ydls:
+        m._track_download_task(download(ydl))
+    await asyncio.sleep(0)
+    assert len(m.active_ydls) == 3
+
+    await m.cancel_downloads(disconnect_voice=False)
+    assert all(ydl.closed and ydl._download_retcode == 1 for ydl in ydls)
+    assert not m.active_ydls
@@ -5,16 +5,16 @@ import pytest
 
 
 @pytest.mark.asyncio
-async def test_server_prefixes_file_lifecycle(tmp_path, monkeypatch):
-    # Import module and redirect the JSON file path to a temp location
+async def test_server_prefixes_lifecycle(tmp_path, monkeypatch):
+    # Import module and redirect the state store and legacy file to a temp location
     import scripts.server_prefixes as sp
-    tmp_file = tmp_path / 'server_prefixes.json'
-    monkeypatch.setattr(sp, 'SERVER_PREFIXES_FILE', str(tmp_file))
+    from scripts.kvstore import KVStore
+    store = KVStore(str(tmp_path / 'state.db'))
+    monkeypatch.setattr(sp, 'state_store', store)
+    monkeypatch.setattr(sp, 'SERVER_PREFIXES_FILE', str(tmp_path / 'server_prefixes.json'))
 
-    # Sync init creates file
     d = sp.init_server_prefixes_sync()
-    assert isinstance(d, dict)
-    assert os.path.exists(tmp_file)
+    assert d == {}
 
     # Async load/save and set/reset behaviors
     prefixes = await sp.load_server_prefixes()
@@ -28,4 +28,34 @@ async def test_server_prefixes_file_lifecycle(tmp_path, monkeypatch):
     reset = await sp.reset_prefix(123)
     assert reset is True
     loaded2 = await sp.load_server_prefixes()
-    assert '123' not in loaded2
\ No newline at end of file
+    assert '123' not in loaded2
+    store.close()
+
+@pytest.mark.asyncio
+async def test_prefix_lookups_use_memory(tmp_path, monkeypatch):
+    import scripts.server_prefixes as sp
+    from scripts.kvstore import KVStore
+    tmp_file = tmp_path / 'server_prefixes.json'
+    tmp_file.write_text(json.dumps({'5': '?'}))
+    store = KVStore(str(tmp_path / 'state.db'))
+    monkeypatch.setattr(sp, 'state_store', store)
+    monkeypatch.setattr(sp, 'SERVER_PREFIXES_FILE', str(tmp_file))
+
+    class Guild:
+        id = 5
+
+    class Message:
+        guild = Guild()
+
+    # The legacy file is imported once
+    assert await sp.get_prefix(None, Message()) == '?'
+    assert not os.path.exists(tmp_file) and os.path.exists(str(tmp_file) + '.migrated')
+    assert sp.get_custom_prefix(5) == '?' and sp.get_custom_prefix(6) is None
+
+    # Changes are written to the store
+    assert await sp.set_prefix(6, '$')
+    assert sp.get_custom_prefix(6) == '$'
+    store.close()
+    reopened = KVStore(str(tmp_path / 'state.db'))
+    assert reopened.items('prefixes') == {'5': '?', '6': '$'}
+    reopened.close()